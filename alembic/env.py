@@ -1,6 +1,6 @@
 # /code/alembic/env.py
 from tckdb.backend.app.db.base_class import Base
-from tckdb.backend.app.models.common import MsgpackExt
+from tckdb.backend.app.models.common import MsgpackExt, MsgpackNDArrayExt
 
 import os
 from logging.config import fileConfig
@@ -35,6 +35,11 @@ def render_item(type_, obj, autogen_context):
     """
     Custom render function to handle custom types
     """
+    if type_ == "type" and isinstance(obj, MsgpackNDArrayExt):
+        autogen_context.imports.add(
+            "from tckdb.backend.app.models.common import MsgpackNDArrayExt"
+        )
+        return f"MsgpackNDArrayExt(compress_threshold={obj.compress_threshold!r})"
     if type_ == "type" and isinstance(obj, MsgpackExt):
         autogen_context.imports.add(
             "from tckdb.backend.app.models.common import MsgpackExt"
@@ -0,0 +1,52 @@
+"""audit logs
+
+Add the audit_logs table, written in bulk when transactions that modify audited models commit.
+
+Revision ID: 1e8f5a3c7b64
+Revises: 9c3d4f6a2e71
+Create Date: 2026-10-18 18:32:05.559120
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "1e8f5a3c7b64"
+down_revision: Union[str, None] = "9c3d4f6a2e71"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "audit_logs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("model", sa.String(length=50), nullable=False),
+        sa.Column("model_id", sa.Integer(), nullable=False),
+        sa.Column("action", sa.String(length=50), nullable=False),
+        sa.Column("changes", sa.JSON(), nullable=True),
+        sa.Column(
+            "timestamp",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("performed_by", sa.String(length=50), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_audit_logs_id"), "audit_logs", ["id"], unique=False)
+    op.create_index(
+        "ix_audit_logs_model_model_id",
+        "audit_logs",
+        ["model", "model_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_audit_logs_model_model_id", table_name="audit_logs")
+    op.drop_index(op.f("ix_audit_logs_id"), table_name="audit_logs")
+    op.drop_table("audit_logs")
@@ -0,0 +1,54 @@
+"""batch validations
+
+Add the batch_validation table, the payloads validated by dry-run batch uploads.
+
+Revision ID: 2d9c5e8a4f16
+Revises: b8e4a6d1f273
+Create Date: 2026-10-18 22:03:41.218536
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "2d9c5e8a4f16"
+down_revision: Union[str, None] = "b8e4a6d1f273"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "batch_validation",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("digest", sa.String(length=64), nullable=False),
+        sa.Column("payload", sa.LargeBinary(), nullable=False),
+        sa.Column("entities", postgresql.JSONB(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_batch_validation_id"), "batch_validation", ["id"], unique=False
+    )
+    op.create_index(
+        op.f("ix_batch_validation_expires_at"),
+        "batch_validation",
+        ["expires_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_batch_validation_expires_at"), table_name="batch_validation")
+    op.drop_index(op.f("ix_batch_validation_id"), table_name="batch_validation")
+    op.drop_table("batch_validation")
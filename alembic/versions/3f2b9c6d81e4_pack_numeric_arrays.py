@@ -0,0 +1,85 @@
+"""pack numeric arrays
+
+Re-encode the Hessians, normal displacement modes, IRC trajectories and torsions
+stored element by element as typed contiguous NumPy buffers (``MsgpackNDArrayExt``).
+Rows already in the new format are re-encoded to the same value; the downgrade restores plain lists.
+
+Revision ID: 3f2b9c6d81e4
+Revises: aa7159c17074
+Create Date: 2026-10-18 09:12:41.318406
+
+"""
+
+from typing import Any, Sequence, Union
+
+from alembic import op
+import numpy as np
+import sqlalchemy as sa
+from tckdb.backend.app.models.common import (
+    msgpackext_dumps,
+    msgpackext_loads,
+    msgpackext_pack_arrays,
+)
+
+# revision identifiers, used by Alembic.
+revision: str = "3f2b9c6d81e4"
+down_revision: Union[str, None] = "aa7159c17074"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ARRAY_COLUMNS = {
+    "species": ("irc_trajectories", "hessian", "normal_displacement_modes", "torsions"),
+    "nonphysicalspecies": ("irc_trajectories",),
+}
+BATCH_SIZE = 500
+
+
+def to_lists(obj: Any) -> Any:
+    """Convert the arrays of a decoded object back to (nested) lists."""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, dict):
+        return {key: to_lists(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [to_lists(item) for item in obj]
+    return obj
+
+
+def reencode(convert) -> None:
+    """Re-encode the array columns of all rows in batches of ``BATCH_SIZE`` rows."""
+    connection = op.get_bind()
+    for table_name, column_names in ARRAY_COLUMNS.items():
+        table = sa.table(
+            table_name,
+            sa.column("id", sa.Integer),
+            *(sa.column(name, sa.LargeBinary) for name in column_names),
+        )
+        last_id = 0
+        while True:
+            rows = connection.execute(
+                sa.select(table)
+                .where(table.c.id > last_id)
+                .order_by(table.c.id)
+                .limit(BATCH_SIZE)
+            ).all()
+            if not rows:
+                break
+            for row in rows:
+                values = {
+                    name: msgpackext_dumps(convert(msgpackext_loads(getattr(row, name))))
+                    for name in column_names
+                    if getattr(row, name) is not None
+                }
+                if values:
+                    connection.execute(
+                        sa.update(table).where(table.c.id == row.id).values(**values)
+                    )
+            last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    reencode(msgpackext_pack_arrays)
+
+
+def downgrade() -> None:
+    reencode(to_lists)
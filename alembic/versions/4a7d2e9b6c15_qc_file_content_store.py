@@ -0,0 +1,62 @@
+"""qc file content store
+
+Add the qc_file_content table of the chunked, content-addressed QC file store,
+and the references of QC files to their stored input and output files.
+
+Revision ID: 4a7d2e9b6c15
+Revises: 1e8f5a3c7b64
+Create Date: 2026-10-18 19:47:21.304518
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "4a7d2e9b6c15"
+down_revision: Union[str, None] = "1e8f5a3c7b64"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "qc_file_content",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("sha256", sa.String(length=64), nullable=False),
+        sa.Column("size", sa.BigInteger(), nullable=False),
+        sa.Column("codec", sa.String(length=32), nullable=False),
+        sa.Column("chunk_hashes", sa.ARRAY(sa.String(length=64)), nullable=False),
+        sa.Column("chunk_sizes", sa.ARRAY(sa.Integer()), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_qc_file_content_id"), "qc_file_content", ["id"], unique=False
+    )
+    op.create_index(
+        op.f("ix_qc_file_content_sha256"), "qc_file_content", ["sha256"], unique=True
+    )
+    for column in ("input_content_id", "output_content_id"):
+        op.add_column("qc_file", sa.Column(column, sa.Integer(), nullable=True))
+        op.create_foreign_key(
+            f"qc_file_{column}_fkey", "qc_file", "qc_file_content", [column], ["id"]
+        )
+        op.create_index(op.f(f"ix_qc_file_{column}"), "qc_file", [column])
+
+
+def downgrade() -> None:
+    for column in ("input_content_id", "output_content_id"):
+        op.drop_index(op.f(f"ix_qc_file_{column}"), table_name="qc_file")
+        op.drop_constraint(f"qc_file_{column}_fkey", "qc_file", type_="foreignkey")
+        op.drop_column("qc_file", column)
+    op.drop_index(op.f("ix_qc_file_content_sha256"), table_name="qc_file_content")
+    op.drop_index(op.f("ix_qc_file_content_id"), table_name="qc_file_content")
+    op.drop_table("qc_file_content")
@@ -0,0 +1,104 @@
+"""reference cache notifications
+
+Add the unique natural key hash of frequency scales (their level of theory), and notify the reference
+cache channel whenever a reference table (level, ess, bot, freqscale) is updated, deleted or truncated,
+so that every worker invalidates its cached rows when the change commits.
+Existing scales that share a level keep their IDs; only the oldest one gets the hash and is used for lookups.
+
+Revision ID: 5b7e2c94a1f8
+Revises: e6a09b3d7c12
+Create Date: 2026-10-18 17:05:12.840391
+
+"""
+
+import hashlib
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "5b7e2c94a1f8"
+down_revision: Union[str, None] = "e6a09b3d7c12"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+REFERENCE_TABLES = ("level", "ess", "bot", "freqscale")
+# The channel listened to by ``services.reference_cache``
+REFERENCE_CACHE_CHANNEL = "tckdb_reference"
+
+
+def upgrade() -> None:
+    op.add_column(
+        "freqscale",
+        sa.Column("natural_key_hash", sa.String(length=64), nullable=True),
+    )
+    connection = op.get_bind()
+    freqscale = sa.table(
+        "freqscale",
+        sa.column("id", sa.Integer),
+        sa.column("level_id", sa.Integer),
+        sa.column("natural_key_hash", sa.String),
+    )
+    seen = set()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(freqscale)
+            .where(freqscale.c.id > last_id)
+            .order_by(freqscale.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        for row in rows:
+            # The natural key of a frequency scale is its level, see ``db.base_class.natural_key_hash``
+            key_hash = hashlib.sha256(
+                json.dumps([row.level_id], separators=(",", ":")).encode()
+            ).hexdigest()
+            if key_hash in seen:
+                continue
+            seen.add(key_hash)
+            connection.execute(
+                sa.update(freqscale)
+                .where(freqscale.c.id == row.id)
+                .values(natural_key_hash=key_hash)
+            )
+        last_id = rows[-1].id
+    op.create_index(
+        op.f("ix_freqscale_natural_key_hash"),
+        "freqscale",
+        ["natural_key_hash"],
+        unique=True,
+    )
+
+    op.execute(
+        f"""
+        CREATE FUNCTION notify_reference_change() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('{REFERENCE_CACHE_CHANNEL}', TG_TABLE_NAME);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    for table_name in REFERENCE_TABLES:
+        op.execute(
+            f"""
+            CREATE TRIGGER {table_name}_notify_reference_change
+            AFTER UPDATE OR DELETE OR TRUNCATE ON {table_name}
+            FOR EACH STATEMENT EXECUTE PROCEDURE notify_reference_change()
+            """
+        )
+
+
+def downgrade() -> None:
+    for table_name in REFERENCE_TABLES:
+        op.execute(
+            f"DROP TRIGGER {table_name}_notify_reference_change ON {table_name}"
+        )
+    op.execute("DROP FUNCTION notify_reference_change()")
+    op.drop_index(op.f("ix_freqscale_natural_key_hash"), table_name="freqscale")
+    op.drop_column("freqscale", "natural_key_hash")
@@ -0,0 +1,57 @@
+"""batch checkpoints
+
+Add the batch_checkpoint table, the progress of the chunked batch uploads by idempotency key.
+
+Revision ID: 6e1a9f3b2c58
+Revises: 2d9c5e8a4f16
+Create Date: 2026-10-18 23:27:12.540918
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "6e1a9f3b2c58"
+down_revision: Union[str, None] = "2d9c5e8a4f16"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "batch_checkpoint",
+        sa.Column("idempotency_key", sa.String(length=255), nullable=False),
+        sa.Column("digest", sa.String(length=64), nullable=False),
+        sa.Column("chunk_size", sa.Integer(), nullable=False),
+        sa.Column("on_duplicate", sa.String(length=16), nullable=False),
+        sa.Column("connections", postgresql.JSONB(), nullable=True),
+        sa.Column("chunks", postgresql.JSONB(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("idempotency_key"),
+    )
+    op.create_index(
+        op.f("ix_batch_checkpoint_updated_at"),
+        "batch_checkpoint",
+        ["updated_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_batch_checkpoint_updated_at"), table_name="batch_checkpoint")
+    op.drop_table("batch_checkpoint")
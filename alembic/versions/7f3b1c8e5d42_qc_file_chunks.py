@@ -0,0 +1,45 @@
+"""qc file chunks
+
+Add the qc_file_chunk table of the chunks shared by the files of the QC file store,
+backfilled from the manifests of the stored files (without their compressed size).
+
+Revision ID: 7f3b1c8e5d42
+Revises: 4a7d2e9b6c15
+Create Date: 2026-10-18 20:36:48.117930
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "7f3b1c8e5d42"
+down_revision: Union[str, None] = "4a7d2e9b6c15"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "qc_file_chunk",
+        sa.Column("sha256", sa.String(length=64), nullable=False),
+        sa.Column("codec", sa.String(length=32), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("stored_size", sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint("sha256", "codec"),
+    )
+    op.execute(
+        """
+        INSERT INTO qc_file_chunk (sha256, codec, size)
+        SELECT DISTINCT chunk.sha256, qc_file_content.codec, chunk.size
+        FROM qc_file_content,
+            unnest(qc_file_content.chunk_hashes, qc_file_content.chunk_sizes)
+            AS chunk(sha256, size)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("qc_file_chunk")
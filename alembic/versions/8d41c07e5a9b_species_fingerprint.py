@@ -0,0 +1,69 @@
+"""species fingerprint
+
+Sidecar table of the chemical search fingerprints of species and non-physical species.
+Existing species are indexed by ``services.search_service.index_missing_fingerprints``
+(see ``devtools/index_fingerprints.py``).
+
+Revision ID: 8d41c07e5a9b
+Revises: 3f2b9c6d81e4
+Create Date: 2026-10-18 13:47:05.120931
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "8d41c07e5a9b"
+down_revision: Union[str, None] = "3f2b9c6d81e4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "speciesfingerprint",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("species_id", sa.Integer(), nullable=True),
+        sa.Column("np_species_id", sa.Integer(), nullable=True),
+        sa.Column("smiles", sa.String(length=5000), nullable=False),
+        sa.Column("morgan", postgresql.BIT(length=2048), nullable=False),
+        sa.Column("morgan_count", sa.SmallInteger(), nullable=False),
+        sa.Column("pattern", postgresql.BIT(length=2048), nullable=False),
+        sa.Column("pattern_count", sa.SmallInteger(), nullable=False),
+        sa.Column("version", sa.String(length=50), nullable=False),
+        sa.CheckConstraint(
+            "(species_id IS NULL) <> (np_species_id IS NULL)",
+            name="ck_speciesfingerprint_one_species",
+        ),
+        sa.ForeignKeyConstraint(
+            ["np_species_id"], ["nonphysicalspecies.id"], ondelete="CASCADE"
+        ),
+        sa.ForeignKeyConstraint(["species_id"], ["species.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("np_species_id"),
+        sa.UniqueConstraint("species_id"),
+    )
+    op.create_index(
+        "ix_speciesfingerprint_morgan_count",
+        "speciesfingerprint",
+        ["morgan_count"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_speciesfingerprint_pattern_count",
+        "speciesfingerprint",
+        ["pattern_count"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_speciesfingerprint_pattern_count", table_name="speciesfingerprint"
+    )
+    op.drop_index("ix_speciesfingerprint_morgan_count", table_name="speciesfingerprint")
+    op.drop_table("speciesfingerprint")
@@ -0,0 +1,33 @@
+"""author lower name index
+
+Add a functional index on the lowercase author names, used by case-insensitive author resolution.
+
+Revision ID: 9c3d4f6a2e71
+Revises: 5b7e2c94a1f8
+Create Date: 2026-10-18 17:48:26.117902
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "9c3d4f6a2e71"
+down_revision: Union[str, None] = "5b7e2c94a1f8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_author_lower_name",
+        "author",
+        [sa.text("lower(first_name)"), sa.text("lower(last_name)")],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_author_lower_name", table_name="author")
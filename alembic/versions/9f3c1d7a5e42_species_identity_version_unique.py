@@ -0,0 +1,50 @@
+"""species identity version unique
+
+Make the version of a species unique among the species with the same identity hash.
+The versions of identities that were uploaded concurrently and share a version are renumbered first.
+
+Revision ID: 9f3c1d7a5e42
+Revises: 6e1a9f3b2c58
+Create Date: 2026-10-18 23:58:41.207365
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9f3c1d7a5e42"
+down_revision: Union[str, None] = "6e1a9f3b2c58"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        UPDATE species SET version = renumbered.version
+        FROM (
+            SELECT id, row_number() OVER (
+                PARTITION BY identity_hash ORDER BY version, id
+            ) AS version
+            FROM species
+            WHERE identity_hash IN (
+                SELECT identity_hash FROM species
+                GROUP BY identity_hash, version
+                HAVING count(*) > 1
+            )
+        ) AS renumbered
+        WHERE species.id = renumbered.id AND species.version <> renumbered.version
+        """
+    )
+    op.create_index(
+        "uq_species_identity_hash_version",
+        "species",
+        ["identity_hash", "version"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_species_identity_hash_version", table_name="species")
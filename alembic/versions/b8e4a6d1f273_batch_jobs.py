@@ -0,0 +1,59 @@
+"""batch jobs
+
+Add the batch_job table, the work queue of the batch uploads processed by worker processes.
+
+Revision ID: b8e4a6d1f273
+Revises: 7f3b1c8e5d42
+Create Date: 2026-10-18 21:14:09.662347
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "b8e4a6d1f273"
+down_revision: Union[str, None] = "7f3b1c8e5d42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "batch_job",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False),
+        sa.Column("payload", postgresql.JSONB(), nullable=False),
+        sa.Column("on_duplicate", sa.String(length=16), nullable=False),
+        sa.Column("progress", postgresql.JSONB(), nullable=True),
+        sa.Column("result", postgresql.JSONB(), nullable=True),
+        sa.Column("error", postgresql.JSONB(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("worker", sa.String(length=255), nullable=True),
+        sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_batch_job_id"), "batch_job", ["id"], unique=False)
+    op.create_index(
+        "ix_batch_job_pending",
+        "batch_job",
+        ["id"],
+        postgresql_where=sa.text("status IN ('queued', 'running')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_batch_job_pending", table_name="batch_job")
+    op.drop_index(op.f("ix_batch_job_id"), table_name="batch_job")
+    op.drop_table("batch_job")
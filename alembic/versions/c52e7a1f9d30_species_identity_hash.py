@@ -0,0 +1,113 @@
+"""species identity hash
+
+Add the indexed species identity hash used to detect duplicate uploads, and the species version.
+The identity hash of existing species is computed in batches; they all keep version 1.
+
+Revision ID: c52e7a1f9d30
+Revises: 8d41c07e5a9b
+Create Date: 2026-10-18 15:02:33.674120
+
+"""
+
+import hashlib
+import json
+from collections import Counter
+from typing import Any, Dict, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from tckdb.backend.app.models.common import msgpackext_loads
+
+# revision identifiers, used by Alembic.
+revision: str = "c52e7a1f9d30"
+down_revision: Union[str, None] = "8d41c07e5a9b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+# The level of theory columns that are part of a species identity, as of this revision
+IDENTITY_LEVEL_COLUMNS = (
+    "opt_level_id",
+    "freq_level_id",
+    "scan_level_id",
+    "irc_level_id",
+    "sp_level_id",
+)
+
+
+def species_identity_hash(values: Dict[str, Any]) -> str:
+    """
+    Compute the identity hash of a species, as ``models.species.species_identity_hash`` did at this revision.
+    """
+    coordinates = values.get("coordinates") or dict()
+    symbols = coordinates.get("symbols") or ()
+    isotopes = coordinates.get("isotopes") or (None,) * len(symbols)
+    composition = sorted(
+        [symbol, isotope, count]
+        for (symbol, isotope), count in Counter(zip(symbols, isotopes)).items()
+    )
+    identity = [
+        (values.get("inchi_key") or "").strip().upper(),
+        values.get("charge"),
+        values.get("multiplicity"),
+        (values.get("electronic_state") or "").strip(),
+        [values.get(column) for column in IDENTITY_LEVEL_COLUMNS],
+        composition,
+    ]
+    return hashlib.sha256(
+        json.dumps(identity, separators=(",", ":")).encode()
+    ).hexdigest()
+
+
+def upgrade() -> None:
+    op.add_column(
+        "species", sa.Column("identity_hash", sa.String(length=64), nullable=True)
+    )
+    op.add_column(
+        "species",
+        sa.Column("version", sa.Integer(), server_default="1", nullable=False),
+    )
+    op.create_index(
+        op.f("ix_species_identity_hash"), "species", ["identity_hash"], unique=False
+    )
+
+    connection = op.get_bind()
+    identity_columns = (
+        "inchi_key",
+        "charge",
+        "multiplicity",
+        "electronic_state",
+        *IDENTITY_LEVEL_COLUMNS,
+    )
+    species = sa.table(
+        "species",
+        sa.column("id", sa.Integer),
+        sa.column("coordinates", sa.LargeBinary),
+        sa.column("identity_hash", sa.String),
+        *(sa.column(name) for name in identity_columns),
+    )
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(species)
+            .where(species.c.id > last_id)
+            .order_by(species.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        for row in rows:
+            values = {name: getattr(row, name) for name in identity_columns}
+            values["coordinates"] = msgpackext_loads(row.coordinates)
+            connection.execute(
+                sa.update(species)
+                .where(species.c.id == row.id)
+                .values(identity_hash=species_identity_hash(values))
+            )
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_species_identity_hash"), table_name="species")
+    op.drop_column("species", "version")
+    op.drop_column("species", "identity_hash")
@@ -0,0 +1,103 @@
+"""reference natural key hash
+
+Add the unique natural key hash of the level, ess and bot reference tables, computed in batches for existing rows.
+Existing rows that share a natural key keep their IDs; only the oldest one gets the hash and is used for lookups.
+
+Revision ID: e6a09b3d7c12
+Revises: c52e7a1f9d30
+Create Date: 2026-10-18 16:21:47.305518
+
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "e6a09b3d7c12"
+down_revision: Union[str, None] = "c52e7a1f9d30"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+# The natural key columns of each table, as of this revision
+NATURAL_KEYS = {
+    "level": (
+        "method",
+        "basis",
+        "auxiliary_basis",
+        "dispersion",
+        "grid",
+        "solvent",
+        "solvation_method",
+        "solvation_description",
+        "level_arguments",
+    ),
+    "ess": ("name", "version", "revision", "url"),
+    "bot": ("name", "version", "url", "git_hash", "git_branch"),
+}
+
+
+def natural_key_hash(values: Dict[str, Any], key_columns: Sequence[str]) -> str:
+    """
+    Compute the natural key hash of a row, as ``db.base_class.natural_key_hash`` did at this revision.
+    """
+    key = []
+    for column in key_columns:
+        value = values.get(column)
+        if isinstance(value, str):
+            value = " ".join(value.split()).lower() or None
+        key.append(value)
+    return hashlib.sha256(json.dumps(key, separators=(",", ":")).encode()).hexdigest()
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    for table_name, key_columns in NATURAL_KEYS.items():
+        op.add_column(
+            table_name,
+            sa.Column("natural_key_hash", sa.String(length=64), nullable=True),
+        )
+        table = sa.table(
+            table_name,
+            sa.column("id", sa.Integer),
+            sa.column("natural_key_hash", sa.String),
+            *(sa.column(name) for name in key_columns),
+        )
+        seen = set()
+        last_id = 0
+        while True:
+            rows = connection.execute(
+                sa.select(table)
+                .where(table.c.id > last_id)
+                .order_by(table.c.id)
+                .limit(BATCH_SIZE)
+            ).all()
+            if not rows:
+                break
+            for row in rows:
+                key_hash = natural_key_hash(row._mapping, key_columns)
+                if key_hash in seen:
+                    continue
+                seen.add(key_hash)
+                connection.execute(
+                    sa.update(table)
+                    .where(table.c.id == row.id)
+                    .values(natural_key_hash=key_hash)
+                )
+            last_id = rows[-1].id
+        op.create_index(
+            op.f(f"ix_{table_name}_natural_key_hash"),
+            table_name,
+            ["natural_key_hash"],
+            unique=True,
+        )
+
+
+def downgrade() -> None:
+    for table_name in reversed(list(NATURAL_KEYS)):
+        op.drop_index(op.f(f"ix_{table_name}_natural_key_hash"), table_name=table_name)
+        op.drop_column(table_name, "natural_key_hash")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+"""
+Microbenchmark of ``converter.is_linear`` against the previous implementation,
+which built a full 3 x n x n distance tensor before testing the atom triples.
+
+Usage (from the repository root):
+
+    python devtools/benchmark_is_linear.py [--repeat 5]
+"""
+
+import argparse
+import math
+import timeit
+
+import numpy as np
+
+from tckdb.backend.app.conversions.converter import is_linear, is_linear_batch
+
+
+def is_linear_distance_tensor(coordinates):
+    """
+    The previous O(n^2) implementation of ``is_linear``, kept for comparison.
+    """
+    epsilon = 0.1
+    number_of_atoms = len(coordinates)
+    if number_of_atoms == 1:
+        return False
+    if number_of_atoms == 2:
+        return True
+    d = -np.array([c[:, np.newaxis] - c[np.newaxis, :] for c in coordinates.T])
+    for i in range(2, len(coordinates)):
+        u1 = d[:, 0, 1] / np.linalg.norm(d[:, 0, 1])
+        u2 = d[:, 1, i] / np.linalg.norm(d[:, 1, i])
+        a = math.degrees(np.arccos(np.clip(np.dot(u1, u2), -1.0, 1.0)))
+        if abs(180 - a) > epsilon and abs(a) > epsilon:
+            return False
+    return True
+
+
+def linear_chain(n_atoms: int) -> np.ndarray:
+    """
+    A linear chain, the worst case for both implementations (no early exit).
+    """
+    coordinates = np.zeros((n_atoms, 3))
+    coordinates[:, 2] = np.arange(n_atoms) * 1.2
+    return coordinates
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark converter.is_linear against the distance tensor implementation."
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'atoms':>6} {'tensor [ms]':>12} {'vectorized [ms]':>16} {'speedup':>8}")
+    for n_atoms in (10, 100, 1000):
+        coordinates = linear_chain(n_atoms)
+        assert is_linear(coordinates) and is_linear_distance_tensor(coordinates)
+        number = max(1, 2000 // n_atoms)
+        old = (
+            min(
+                timeit.repeat(
+                    lambda: is_linear_distance_tensor(coordinates),
+                    number=number,
+                    repeat=args.repeat,
+                )
+            )
+            / number
+        )
+        new = (
+            min(
+                timeit.repeat(
+                    lambda: is_linear(coordinates), number=number, repeat=args.repeat
+                )
+            )
+            / number
+        )
+        print(f"{n_atoms:>6} {old * 1e3:>12.3f} {new * 1e3:>16.3f} {old / new:>7.0f}x")
+
+    geometries = np.repeat(linear_chain(100)[np.newaxis], 500, axis=0)
+    batch = min(
+        timeit.repeat(lambda: is_linear_batch(geometries), number=1, repeat=args.repeat)
+    )
+    print(f"is_linear_batch: 500 geometries of 100 atoms in {batch * 1e3:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+#!/usr/bin/env python
+"""
+Compute the chemical search fingerprints of all species and non-physical species that do not have
+up to date fingerprints, e.g., after applying the species fingerprint migration to an existing database.
+
+Usage (from the repository root, with the database environment variables set):
+
+    python devtools/index_fingerprints.py [--batch-size 1000]
+"""
+
+import argparse
+
+from tckdb.backend.app.db.session import SessionLocal
+from tckdb.backend.app.services.search_service import index_missing_fingerprints
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill the species search fingerprints.")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        count = index_missing_fingerprints(db, batch_size=args.batch_size)
+        db.commit()
+    print(f"Fingerprinted {count} species")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,256 +1,371 @@
-from typing import Any, Dict
+import hashlib
+from typing import Any, Dict, List, Literal, Optional, Tuple
 from xml.dom import ValidationErr
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
+from tckdb.backend.app.conversions.descriptor_resolver import resolve_descriptors
+from tckdb.backend.app.core.config import (
+    BATCH_STREAM_CHUNK_SIZE,
+    SPECIES_DUPLICATE_POLICY,
+)
 from tckdb.backend.app.db.session import get_db
-from tckdb.backend.app.models.ess import ESS as ESSModel
-from tckdb.backend.app.models.bot import Bot as BotModel
-from tckdb.backend.app.models.freqscale import FreqScale as FrequencyScaleModel
-from tckdb.backend.app.models.level import Level as LevelModel
-from tckdb.backend.app.models.literature import Literature as LiteratureModel
-from tckdb.backend.app.models.species import Species as SpeciesModel
 from tckdb.backend.app.schemas.batch import BatchUploadPayload
-from tckdb.backend.app.services.author_service import get_or_create_author
+from tckdb.backend.app.schemas.batch_job import BatchJobRead
+from tckdb.backend.app.services.batch_commit_service import (
+    batch_digest,
+    commit_batch_in_chunks,
+    split_species_errors,
+)
+from tckdb.backend.app.services.batch_job_service import (
+    enqueue_batch_job,
+    get_batch_job,
+)
+from tckdb.backend.app.services.batch_service import persist_batch
+from tckdb.backend.app.services.batch_stream_service import (
+    iter_ndjson_lines,
+    new_chunk,
+    parse_record,
+    persist_chunk,
+    validate_chunk,
+    validate_species_records,
+)
+from tckdb.backend.app.services.batch_validation_service import (
+    count_entities,
+    dry_run_batch,
+    load_validated_batch,
+)
+from tckdb.backend.app.services.species_validation_service import validate_species
 
 router = APIRouter(
     tags=["batch"],
 )
 
+DuplicatePolicy = Literal["skip", "merge", "version"]
+
+
+async def read_json_body(request: Request) -> Any:
+    """
+    Read the JSON body of a request.
+
+    Args:
+        request (Request): The request.
+
+    Returns:
+        Any: The decoded body.
+
+    Raises:
+        RequestValidationError: If the body is not valid JSON.
+    """
+    try:
+        body = await request.json()
+    except ValueError as e:
+        raise RequestValidationError(
+            [{"type": "json_invalid", "loc": ("body",), "msg": f"JSON decode error: {e}", "input": {}}]
+        ) from e
+    return body
+
+
+async def validate_batch_payload(
+    body: Any,
+) -> Tuple[Optional[BatchUploadPayload], List[Dict[str, Any]]]:
+    """
+    Validate a batch upload body.
+    The missing species descriptors of the whole payload are derived concurrently
+    before the payload is validated, instead of one species at a time during validation.
+    The species are then validated in parallel in the process pool, and the rest of the payload inline.
+
+    Args:
+        body (Any): The decoded request body. Its species are moved to the payload.
+
+    Returns:
+        Tuple[Optional[BatchUploadPayload], List[Dict[str, Any]]]: The validated payload (``None`` if invalid),
+                                                                   and the errors, located from the request body.
+    """
+    species_data = None
+    if isinstance(body, dict) and isinstance(body.get("species"), list):
+        species_data = body.pop("species")
+        await resolve_descriptors(species_data)
+    errors = []
+    if species_data is not None:
+        species, species_errors = await validate_species(species_data)
+        for index, species_error in species_errors.items():
+            errors += [
+                {**error, "loc": ("species", index, *error["loc"])}
+                for error in species_error
+            ]
+    payload = None
+    try:
+        payload = await run_in_threadpool(BatchUploadPayload.model_validate, body)
+    except ValidationError as e:
+        errors += e.errors(include_url=False)
+    if payload is not None and species_data is not None:
+        payload.species = species
+    return payload, [{**error, "loc": ("body", *error["loc"])} for error in errors]
+
+
+async def parse_batch_payload(request: Request) -> BatchUploadPayload:
+    """
+    Dependency parsing the batch upload body, see ``validate_batch_payload``.
+
+    Args:
+        request (Request): The request.
+
+    Returns:
+        BatchUploadPayload: The validated payload.
+
+    Raises:
+        RequestValidationError: If the body is not valid JSON or does not match the payload schema.
+    """
+    payload, errors = await validate_batch_payload(await read_json_body(request))
+    if errors:
+        raise RequestValidationError(errors)
+    return payload
+
+
+def commit_batch(
+    db: Session, payload: BatchUploadPayload, on_duplicate: str
+) -> Dict[str, Any]:
+    """
+    Persist a validated batch upload payload.
+
+    Args:
+        db (Session): The database session.
+        payload (BatchUploadPayload): The validated payload.
+        on_duplicate (str): The duplicate species policy.
+
+    Returns:
+        Dict[str, Any]: The response of the batch upload.
+    """
+    try:
+        with db.begin_nested():
+            created_species = persist_batch(db, payload, on_duplicate)
+
+    except ValidationErr as ve:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Validation Error: {ve}") from ve
+    except HTTPException as he:
+        db.rollback()
+        raise he
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=500, detail=f"Internal Server Error: {e}"
+        ) from e
+
+    return {"detail": "Batch upload successful.", "species": created_species}
+
 
 @router.post(
     "/",
     summary="Upload a batch of data to the database.",
     response_model=Dict[str, Any],
 )
-def batch_upload(payload: BatchUploadPayload, db=Depends(get_db)):
+async def batch_upload(
+    request: Request,
+    on_duplicate: DuplicatePolicy = Query(
+        SPECIES_DUPLICATE_POLICY,
+        description="How to handle species with the identity of an existing species.",
+    ),
+    dry_run: bool = Query(
+        False,
+        description="Only validate the batch, and return a token to commit it with later.",
+    ),
+    chunk_size: Optional[int] = Query(
+        None,
+        ge=1,
+        description="Commit the species in chunks of this size, each in its own transaction.",
+    ),
+    idempotency_key: Optional[str] = Header(
+        None,
+        alias="Idempotency-Key",
+        max_length=255,
+        description="Resume a chunked upload from the chunks committed with the same key.",
+    ),
+    db=Depends(get_db),
+):
     """
     Batch upload multiple related entities: Authors, Literature, Levels, Species, EnCorrs, Bots, ESS Entries, and Frequencies.
 
     Establishes relationships based on temporary IDs provided in the payload.
+    Each entity class is resolved in bulk, with a fixed number of statements per table.
+
+    A dry run persists nothing but the validated payload, and reports the validation results of each entity class.
+    The token it returns for a valid batch commits it with ``POST /batch-upload/commit/{token}``,
+    without deriving the descriptors or validating the batch again.
+
+    With a ``chunk_size``, the species are committed in chunks (see ``services.batch_commit_service``):
+    a chunk with an invalid species or a failing insert fails on its own, and the outcome of each chunk is reported.
+    Uploads with an ``Idempotency-Key`` header can be repeated to resume them.
+    """
+    if dry_run:
+        body = await read_json_body(request)
+        entities = count_entities(body)
+        payload, errors = await validate_batch_payload(body)
+        return await run_in_threadpool(dry_run_batch, db, payload, entities, errors)
+    if chunk_size is None:
+        payload = await parse_batch_payload(request)
+        return await run_in_threadpool(commit_batch, db, payload, on_duplicate)
+    body = await read_json_body(request)
+    digest = batch_digest(body)
+    payload, errors = await validate_batch_payload(body)
+    species_errors, errors = split_species_errors(errors)
+    if errors:
+        raise RequestValidationError(errors)
+    return await run_in_threadpool(
+        commit_batch_in_chunks,
+        db,
+        payload,
+        on_duplicate,
+        chunk_size,
+        species_errors,
+        idempotency_key,
+        digest,
+    )
+
+
+@router.post(
+    "/commit/{token}",
+    summary="Commit a batch validated by a dry run.",
+    response_model=Dict[str, Any],
+)
+def batch_upload_commit(
+    token: str,
+    on_duplicate: DuplicatePolicy = Query(
+        SPECIES_DUPLICATE_POLICY,
+        description="How to handle species with the identity of an existing species.",
+    ),
+    chunk_size: Optional[int] = Query(
+        None,
+        ge=1,
+        description="Commit the species in chunks of this size, each in its own transaction.",
+    ),
+    idempotency_key: Optional[str] = Header(
+        None,
+        alias="Idempotency-Key",
+        max_length=255,
+        description="Resume a chunked upload from the chunks committed with the same key.",
+    ),
+    db=Depends(get_db),
+):
+    """
+    Persist the batch referenced by the token of a dry run, until the token expires.
+    The batch is not validated again, its validated and normalized payload is persisted directly,
+    in chunks if a ``chunk_size`` is given (see ``POST /batch-upload``).
+    """
+    payload = load_validated_batch(db, token)
+    if chunk_size is None:
+        return commit_batch(db, payload, on_duplicate)
+    digest = hashlib.sha256(token.encode()).hexdigest()
+    return commit_batch_in_chunks(
+        db,
+        payload,
+        on_duplicate,
+        chunk_size,
+        idempotency_key=idempotency_key,
+        digest=digest,
+    )
+
+
+@router.post(
+    "/jobs",
+    summary="Queue a batch upload to be processed by a worker.",
+    status_code=202,
+    response_model=Dict[str, Any],
+)
+async def batch_upload_job(
+    request: Request,
+    on_duplicate: DuplicatePolicy = Query(
+        SPECIES_DUPLICATE_POLICY,
+        description="How to handle species with the identity of an existing species.",
+    ),
+    db=Depends(get_db),
+):
+    """
+    Queue a batch upload with the payload of ``POST /batch-upload`` and return its job ID immediately.
+
+    Descriptors are derived, and the payload validated and persisted, by a batch job worker process;
+    poll ``GET /batch-upload/jobs/{job_id}`` for the status, progress and result of the upload.
+    """
+    body = await read_json_body(request)
+    job = await run_in_threadpool(enqueue_batch_job, db, body, on_duplicate)
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": str(request.url_for("read_batch_job", job_id=job.id)),
+    }
+
+
+@router.get(
+    "/jobs/{job_id}",
+    summary="Get the status and progress of a queued batch upload.",
+    response_model=BatchJobRead,
+)
+def read_batch_job(job_id: int, db=Depends(get_db)):
+    """
+    Get a queued batch upload. Its ``result`` is the response of the upload once it succeeded.
+    """
+    return get_batch_job(db, job_id)
+
+
+@router.post(
+    "/stream",
+    summary="Upload a batch of data to the database as newline-delimited JSON records.",
+    response_model=Dict[str, Any],
+)
+async def batch_upload_stream(
+    request: Request,
+    chunk_size: int = Query(
+        BATCH_STREAM_CHUNK_SIZE,
+        ge=1,
+        description="The number of records validated and persisted together.",
+    ),
+    on_duplicate: DuplicatePolicy = Query(
+        SPECIES_DUPLICATE_POLICY,
+        description="How to handle species with the identity of an existing species.",
+    ),
+    db=Depends(get_db),
+):
+    """
+    Batch upload entities sent as one ``{"type": ..., "data": ...}`` record per line.
+
+    The body is read incrementally and records are validated and persisted in chunks of ``chunk_size``,
+    so memory use is bounded by the chunk size rather than the upload size.
+    Levels, ESS, bots, literature and frequency scales should precede the species that reference them;
+    within a chunk, entities are persisted in dependency order.
     """
 
     temp_id_map: Dict[str, int] = {}
+    progress = []
+    raw_chunk, chunk_records = new_chunk(), 0
+
+    async def flush():
+        nonlocal raw_chunk, chunk_records
+        species_records, raw_chunk["species"] = raw_chunk["species"], []
+        await resolve_descriptors([data for _, data in species_records])
+        chunk = await run_in_threadpool(validate_chunk, raw_chunk)
+        chunk["species"] = await validate_species_records(species_records)
+        result = await run_in_threadpool(
+            persist_chunk, db, chunk, temp_id_map, on_duplicate
+        )
+        progress.append({"chunk": len(progress) + 1, **result})
+        raw_chunk, chunk_records = new_chunk(), 0
 
     try:
         with db.begin_nested():
+            async for line_number, line in iter_ndjson_lines(request.stream()):
+                entity, data = parse_record(line, line_number)
+                raw_chunk[entity].append((line_number, data))
+                chunk_records += 1
+                if chunk_records >= chunk_size:
+                    await flush()
+            if chunk_records:
+                await flush()
 
-            # 1. Process Literature
-            for literature_data in payload.literature:
-                # Check if existing literature
-                existing_literature = (
-                    db.query(LiteratureModel)
-                    .filter(
-                        LiteratureModel.doi == literature_data.doi,
-                        LiteratureModel.isbn == literature_data.isbn,
-                    )
-                    .first()
-                )
-
-                if existing_literature:
-                    temp_id_map[literature_data.connection_id] = existing_literature.id
-                else:
-                    new_literature = LiteratureModel(
-                        **literature_data.model_dump(
-                            exclude={"connection_id", "authors"}
-                        )
-                    )
-                    db.add(new_literature)
-                    db.flush()
-                    temp_id_map[literature_data.connection_id] = new_literature.id
-
-                    # # Process Authors
-                    authors = literature_data.authors or []
-                    for author_data in authors:
-                        author = get_or_create_author(db, author_data)
-                        new_literature.authors.append(author)
-
-            # 2. Process Levels
-            for level_data in payload.levels:
-                # Check if existing level
-                existing_level = (
-                    db.query(LevelModel)
-                    .filter(
-                        LevelModel.method == level_data.method,
-                        LevelModel.basis == level_data.basis,
-                        LevelModel.auxiliary_basis == level_data.auxiliary_basis,
-                        LevelModel.dispersion == level_data.dispersion,
-                        LevelModel.grid == level_data.grid,
-                        LevelModel.solvent == level_data.solvent,
-                        LevelModel.solvation_method == level_data.solvation_method,
-                        LevelModel.solvation_description
-                        == level_data.solvation_description,
-                        LevelModel.level_arguments == level_data.level_arguments,
-                    )
-                    .first()
-                )
-
-                if existing_level:
-                    temp_id_map[level_data.connection_id] = existing_level.id
-                else:
-                    new_level = LevelModel(
-                        **level_data.model_dump(exclude={"connection_id"})
-                    )
-                    db.add(new_level)
-                    db.flush()
-                    temp_id_map[level_data.connection_id] = new_level.id
-
-            # 3. Process Bots
-            for bot_data in payload.bots:
-                # Check if existing bot
-                existing_bot = (
-                    db.query(BotModel)
-                    .filter(
-                        BotModel.name == bot_data.name,
-                        BotModel.version == bot_data.version,
-                        BotModel.url == bot_data.url,
-                        BotModel.git_hash == bot_data.git_hash,
-                        BotModel.git_branch == bot_data.git_branch,
-                    )
-                    .first()
-                )
-
-                if existing_bot:
-                    temp_id_map[bot_data.connection_id] = existing_bot.id
-                else:
-                    new_bot = BotModel(**bot_data.model_dump(exclude={"connection_id"}))
-                    db.add(new_bot)
-                    db.flush()
-                    temp_id_map[bot_data.connection_id] = new_bot.id
-
-            # 4. Process ESS
-            for ess_data in payload.ess:
-                # Check if existing ess
-                existing_ess = (
-                    db.query(ESSModel)
-                    .filter(
-                        ESSModel.name == ess_data.name,
-                        ESSModel.version == ess_data.version,
-                        ESSModel.revision == ess_data.revision,
-                        ESSModel.url == ess_data.url,
-                    )
-                    .first()
-                )
-
-                if existing_ess:
-                    temp_id_map[ess_data.connection_id] = existing_ess.id
-                else:
-                    new_ess = ESSModel(**ess_data.model_dump(exclude={"connection_id"}))
-                    db.add(new_ess)
-                    db.flush()
-                    temp_id_map[ess_data.connection_id] = new_ess.id
-
-            # 5. Process Frequencies Scale
-            for freq_scale_data in payload.freq_scales:
-                # Grab the connection level ID
-                freq_level_connection = freq_scale_data.level_connection_id
-
-                # Retrieve the level ID from the temp ID map
-                freq_level_id = temp_id_map.get(freq_level_connection)
-
-                if not freq_level_id:
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"Level connection ID {freq_level_connection} not found for Encorr Data.",
-                    )
-
-                new_freq_scale = FrequencyScaleModel(
-                    level_id=freq_level_id,
-                    **freq_scale_data.model_dump(
-                        exclude={"level_connection_id", "connection_id"}
-                    ),
-                )
-                db.add(new_freq_scale)
-                db.flush()
-                temp_id_map[freq_scale_data.connection_id] = new_freq_scale.id
-
-                # 7. Process Species
-                created_species = []
-                for species_data in payload.species:
-                    # Grab all connection IDS for Levels
-                    level_connections = species_data.level_connections
-                    opt_level_id = None
-                    freq_level_id = None
-                    scan_level_id = None
-                    irc_level_id = None
-                    sp_level_id = None
-
-                    if level_connections:
-                        opt_level_id = temp_id_map.get(level_connections.opt)
-                        freq_level_id = temp_id_map.get(level_connections.freq)
-                        scan_level_id = temp_id_map.get(level_connections.scan)
-                        irc_level_id = temp_id_map.get(level_connections.irc)
-                        sp_level_id = temp_id_map.get(level_connections.sp)
-
-                    # Grab all connection IDS for ESS
-                    ess_connections = species_data.ess_connections
-                    opt_ess_id = None
-                    freq_ess_id = None
-                    scan_ess_id = None
-                    irc_ess_id = None
-                    sp_ess_id = None
-
-                    if ess_connections:
-                        opt_ess_id = temp_id_map.get(ess_connections.opt)
-                        freq_ess_id = temp_id_map.get(ess_connections.freq)
-                        scan_ess_id = temp_id_map.get(ess_connections.scan)
-                        irc_ess_id = temp_id_map.get(ess_connections.irc)
-                        sp_ess_id = temp_id_map.get(ess_connections.sp)
-
-                    # Gather other connections
-                    literature_id = temp_id_map.get(
-                        species_data.literature_connection_id
-                    )
-                    bot_id = temp_id_map.get(species_data.bot_connection_id)
-                    encorr_id = temp_id_map.get(species_data.encorr_connection_id)
-                    freq_scale_id = temp_id_map.get(
-                        species_data.freq_scale_connection_id
-                    )
-
-                    # Create the species object
-                    new_species: SpeciesModel = SpeciesModel(
-                        **species_data.model_dump(
-                            exclude={
-                                "level_connections",
-                                "ess_connections",
-                                "literature_connection_id",
-                                "bot_connection_id",
-                                "encorr_connection_id",
-                                "freq_scale_connection_id",
-                                "connection_id",
-                            }
-                        )
-                    )
-
-                    # Add the connections
-                    new_species.opt_level_id = opt_level_id
-                    new_species.freq_level_id = freq_level_id
-                    new_species.scan_level_id = scan_level_id
-                    new_species.irc_level_id = irc_level_id
-                    new_species.sp_level_id = sp_level_id
-
-                    new_species.opt_ess_id = opt_ess_id
-                    new_species.freq_ess_id = freq_ess_id
-                    new_species.scan_ess_id = scan_ess_id
-                    new_species.irc_ess_id = irc_ess_id
-                    new_species.sp_ess_id = sp_ess_id
-
-                    new_species.literature_id = literature_id
-                    new_species.bot_id = bot_id
-                    new_species.encorr_id = encorr_id
-                    new_species.freq_scale_id = freq_scale_id
-
-                    db.add(new_species)
-                    db.flush()
-                    created_species.append(
-                        {
-                            "id": new_species.id,
-                        }
-                    )
-
-    except ValidationErr as ve:
-        db.rollback()
-        raise HTTPException(status_code=400, detail=f"Validation Error: {ve}") from ve
     except HTTPException as he:
         db.rollback()
         raise he
@@ -260,4 +375,10 @@ def batch_upload(payload: BatchUploadPayload, db=Depends(get_db)):
             status_code=500, detail=f"Internal Server Error: {e}"
         ) from e
 
-    return {"detail": "Batch upload successful.", "species": created_species}
+    return {
+        "detail": "Batch upload successful.",
+        "chunks": progress,
+        "species": [
+            species for chunk_result in progress for species in chunk_result["species"]
+        ],
+    }
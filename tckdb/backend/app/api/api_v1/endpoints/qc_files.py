@@ -0,0 +1,170 @@
+"""
+TCKDB backend app api v1 endpoints qc files module
+
+Upload and download of QC input and output files through the chunked content store
+(see ``services.qc_file_store``). Uploads are raw request bodies read as a stream,
+and downloads are streamed responses that honour single byte ``Range`` requests.
+"""
+
+from typing import Any, Dict, Literal, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from tckdb.backend.app.db.session import get_db
+from tckdb.backend.app.models.qc_file import QCFile, QCFileContent
+from tckdb.backend.app.schemas.qc_file import QCFileContentRead
+from tckdb.backend.app.services.qc_file_store import (
+    ContentWriter,
+    LocalChunkStore,
+    RangeReader,
+    get_qc_file_store,
+    iter_content,
+    parse_range,
+    storage_stats,
+    stored_file,
+)
+
+router = APIRouter(
+    tags=["qc_files"],
+)
+
+
+def range_response(
+    size: int,
+    sha256: str,
+    read: RangeReader,
+    range_header: Optional[str],
+    filename: Optional[str] = None,
+) -> StreamingResponse:
+    """
+    Stream a stored file, or the byte range of it requested by a ``Range`` header.
+
+    Args:
+        size (int): The file size.
+        sha256 (str): The SHA-256 of the file, used as its entity tag.
+        read (RangeReader): A reader of byte ranges of the file.
+        range_header (str): The ``Range`` header of the request, if any.
+        filename (str, optional): The file name suggested to the client.
+
+    Returns:
+        StreamingResponse: A 200 response with the file, or a 206 response with the range.
+    """
+    byte_range = parse_range(range_header, size)
+    start, stop = byte_range or (0, size)
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Length": str(stop - start),
+        "ETag": f'"{sha256}"',
+    }
+    if byte_range is not None:
+        headers["Content-Range"] = f"bytes {start}-{stop - 1}/{size}"
+    if filename:
+        headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return StreamingResponse(
+        read(start, stop),
+        status_code=206 if byte_range is not None else 200,
+        media_type="application/octet-stream",
+        headers=headers,
+    )
+
+
+@router.post(
+    "/content",
+    summary="Upload a QC file to the content store.",
+    response_model=Dict[str, Any],
+)
+async def upload_qc_file_content(
+    request: Request,
+    db=Depends(get_db),
+    store: LocalChunkStore = Depends(get_qc_file_store),
+):
+    """
+    Store the raw request body as a QC file.
+
+    The body is read incrementally and split into content-defined chunks, each hashed, compressed and written
+    as soon as it is complete, so memory use is bounded by the chunk size rather than the file size.
+    Files and chunks that are already stored are not stored again.
+    """
+    writer = ContentWriter(store)
+
+    def save() -> QCFileContent:
+        content = writer.save(db)
+        db.commit()
+        return content
+
+    try:
+        async for piece in request.stream():
+            if piece:
+                await run_in_threadpool(writer.write, piece)
+        content = await run_in_threadpool(save)
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=500, detail=f"Internal Server Error: {e}"
+        ) from e
+
+    return {
+        **QCFileContentRead.model_validate(content).model_dump(),
+        "chunks": len(content.chunk_hashes),
+        "new_chunks": writer.new_chunks,
+        "written_bytes": writer.written_bytes,
+    }
+
+
+@router.get(
+    "/stats",
+    summary="Report the deduplication and compression savings of the QC file store.",
+    response_model=Dict[str, Any],
+)
+def qc_file_store_stats(db=Depends(get_db)):
+    """
+    Get the total size of the stored files, of their unique chunks and of the chunks on disk.
+    """
+    return storage_stats(db)
+
+
+@router.get("/content/{content_id}")
+def download_qc_file_content(
+    content_id: int,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    db=Depends(get_db),
+    store: LocalChunkStore = Depends(get_qc_file_store),
+):
+    """
+    Download a file of the content store.
+    """
+    content = db.get(QCFileContent, content_id)
+    if content is None:
+        raise HTTPException(
+            status_code=404, detail=f"QC file content with ID {content_id} not found."
+        )
+    return range_response(
+        content.size,
+        content.sha256,
+        lambda start, stop: iter_content(store, content, start, stop),
+        range_header,
+    )
+
+
+@router.get("/{qc_file_id}/{kind}")
+def download_qc_file(
+    qc_file_id: int,
+    kind: Literal["input", "output"],
+    range_header: Optional[str] = Header(None, alias="Range"),
+    db=Depends(get_db),
+    store: LocalChunkStore = Depends(get_qc_file_store),
+):
+    """
+    Download the input or output file of a QC calculation.
+    """
+    qc_file = db.get(QCFile, qc_file_id)
+    if qc_file is None or qc_file.deleted_at is not None:
+        raise HTTPException(
+            status_code=404, detail=f"QC file with ID {qc_file_id} not found."
+        )
+    size, sha256, read = stored_file(store, qc_file, kind)
+    return range_response(
+        size, sha256, read, range_header, getattr(qc_file, f"{kind}_name")
+    )
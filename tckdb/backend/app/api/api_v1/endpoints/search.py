@@ -0,0 +1,61 @@
+"""
+TCKDB backend app api v1 endpoints search module
+
+Chemical search endpoints (substructure and similarity) over species and non-physical species.
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from tckdb.backend.app.core.config import SPECIES_MAX_PAGE_SIZE, SPECIES_PAGE_SIZE
+from tckdb.backend.app.db.session import get_db
+from tckdb.backend.app.services.search_service import (
+    SearchSource,
+    similarity_search,
+    substructure_search,
+)
+
+router = APIRouter(
+    tags=["search"],
+)
+
+
+@router.get("/substructure")
+def search_substructure(
+    smarts: str = Query(..., description="The substructure, as SMARTS or SMILES"),
+    after_id: Optional[int] = Query(
+        None, description="The cursor returned by the previous page"
+    ),
+    limit: int = Query(SPECIES_PAGE_SIZE, ge=1, le=SPECIES_MAX_PAGE_SIZE),
+    source: SearchSource = Query("all", description="The species tables to search"),
+    db: Session = Depends(get_db),
+):
+    """
+    Find the species that contain a substructure, in ID order.
+    Pass the returned ``next_cursor`` as ``after_id`` to get the next page; it is ``null`` on the last page.
+    """
+    items, next_cursor = substructure_search(
+        db, smarts, limit=limit, after_id=after_id, source=source
+    )
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.get("/similarity")
+def search_similarity(
+    smiles: str = Query(..., description="The SMILES of the query molecule"),
+    threshold: float = Query(
+        0.7, gt=0, le=1, description="The minimal Tanimoto similarity"
+    ),
+    limit: int = Query(SPECIES_PAGE_SIZE, ge=1, le=SPECIES_MAX_PAGE_SIZE),
+    source: SearchSource = Query("all", description="The species tables to search"),
+    db: Session = Depends(get_db),
+):
+    """
+    Find the species most similar to a molecule, by decreasing Tanimoto similarity of their Morgan fingerprints.
+    """
+    items = similarity_search(
+        db, smiles, threshold=threshold, limit=limit, source=source
+    )
+    return {"items": items}
@@ -0,0 +1,144 @@
+"""
+TCKDB backend app api v1 endpoints species module
+
+Species read endpoints.
+The list and read endpoints are coroutines: their queries run on the asyncio engine if it is enabled
+(``DB_ASYNC_ENABLED``), otherwise in the threadpool, so requests never block the event loop.
+Lists are paginated with an ID cursor (keyset pagination) and exports are streamed row by row
+from a server-side cursor. Callers choose the column groups to read (see ``services.species_service``).
+"""
+
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy import ColumnElement
+from sqlalchemy.orm import Session
+
+from tckdb.backend.app.core.config import SPECIES_MAX_PAGE_SIZE, SPECIES_PAGE_SIZE
+from tckdb.backend.app.db.session import (
+    fetch_mappings,
+    get_db,
+    get_read_db,
+)
+from tckdb.backend.app.services.species_service import (
+    DEFAULT_SPECIES_GROUPS,
+    dumps_species,
+    iter_species_export,
+    resolve_column_groups,
+    select_species,
+    select_species_by_id,
+    species_filters,
+    species_read_dict,
+)
+
+router = APIRouter(
+    tags=["species"],
+)
+
+
+def species_filter_params(
+    inchi_key: Optional[str] = Query(None, description="Filter by InChI Key"),
+    smiles: Optional[str] = Query(None, description="Filter by SMILES"),
+    charge: Optional[int] = Query(None, description="Filter by net charge"),
+    multiplicity: Optional[int] = Query(None, description="Filter by spin multiplicity"),
+    level_id: Optional[int] = Query(
+        None, description="Filter by level of theory ID (any of the species levels)"
+    ),
+    literature_id: Optional[int] = Query(None, description="Filter by literature ID"),
+) -> List[ColumnElement]:
+    """
+    Dependency collecting the species filter query parameters.
+
+    Returns:
+        List[ColumnElement]: The filter conditions.
+    """
+    return species_filters(
+        inchi_key=inchi_key,
+        smiles=smiles,
+        charge=charge,
+        multiplicity=multiplicity,
+        level_id=level_id,
+        literature_id=literature_id,
+    )
+
+
+def column_groups_param(
+    groups: List[str] = Query(
+        list(DEFAULT_SPECIES_GROUPS),
+        description='The column groups to read, "core" is always included',
+    ),
+) -> List[str]:
+    """
+    Dependency checking the requested species column groups.
+
+    Returns:
+        List[str]: The column groups.
+    """
+    return resolve_column_groups(groups)
+
+
+@router.get("/")
+async def list_species(
+    after_id: Optional[int] = Query(
+        None, description="The cursor: return species with a greater ID"
+    ),
+    limit: int = Query(SPECIES_PAGE_SIZE, ge=1, le=SPECIES_MAX_PAGE_SIZE),
+    groups: List[str] = Depends(column_groups_param),
+    filters: List[ColumnElement] = Depends(species_filter_params),
+    db: Session = Depends(get_read_db),
+):
+    """
+    List species ordered by ID, one page at a time.
+    Pass the returned ``next_cursor`` as ``after_id`` to get the next page; it is ``null`` on the last page.
+    """
+    statement = select_species(groups, filters, after_id=after_id, limit=limit)
+    items = [species_read_dict(row) for row in await fetch_mappings(db, statement)]
+    next_cursor = items[-1]["id"] if len(items) == limit else None
+    return Response(
+        content=dumps_species({"items": items, "next_cursor": next_cursor}),
+        media_type="application/json",
+    )
+
+
+@router.get("/export")
+def export_species(
+    format: Literal["ndjson", "json"] = Query(
+        "ndjson", description="Newline-delimited JSON records, or a JSON array"
+    ),
+    after_id: Optional[int] = Query(
+        None, description="Only export species with a greater ID"
+    ),
+    limit: Optional[int] = Query(None, ge=1),
+    groups: List[str] = Depends(column_groups_param),
+    filters: List[ColumnElement] = Depends(species_filter_params),
+    db: Session = Depends(get_db),
+):
+    """
+    Export all matching species, streamed row by row in constant memory.
+    """
+    statement = select_species(groups, filters, after_id=after_id, limit=limit)
+    ndjson = format == "ndjson"
+    return StreamingResponse(
+        iter_species_export(db, statement, ndjson=ndjson),
+        media_type="application/x-ndjson" if ndjson else "application/json",
+    )
+
+
+@router.get("/{species_id}")
+async def read_species(
+    species_id: int,
+    groups: List[str] = Depends(column_groups_param),
+    db: Session = Depends(get_read_db),
+):
+    """
+    Get a species by its ID.
+    """
+    rows = await fetch_mappings(db, select_species_by_id(species_id, groups))
+    if not rows:
+        raise HTTPException(
+            status_code=404, detail=f"Species with ID {species_id} not found."
+        )
+    return Response(
+        content=dumps_species(species_read_dict(rows[0])), media_type="application/json"
+    )
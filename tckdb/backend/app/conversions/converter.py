@@ -6,23 +6,33 @@ Todo: Use the ``raise_atomtype_exception`` and ``raise_charge_exception`` argume
       in adjlist_from_smiles() and smiles_and_inchi_from_adjlist() once RMG's binaries are updated
 """
 
-import math
-from pathlib import Path
-
-# trunk-ignore(bandit/B404)
-import subprocess
+import functools
+import json
+import sqlite3
 import sys
+import threading
 import time
-from typing import Dict, Optional, Tuple, Union
+from collections import OrderedDict, namedtuple
+from importlib import metadata
+from typing import Any, Callable, Dict, Optional, Tuple, Union
 
 import numpy as np
 import qcelemental as qcel
 import requests
-from chembl_webresource_client.new_client import new_client
-from rdkit.Chem import MolFromSmiles, MolToSmiles
+from rdkit.Chem import AddHs, GetPeriodicTable, Kekulize, MolFromSmiles, MolToSmiles
 from rdkit.Chem.inchi import InchiToInchiKey, MolFromInchi, MolToInchi
 
-from tckdb.backend.app.utils.python_paths import MOLECULE_PYTHON
+from tckdb.backend.app.core.config import (
+    ADJLIST_WEB_FALLBACK,
+    IDENTIFIER_CACHE_PATH,
+    IDENTIFIER_CACHE_SIZE,
+)
+from tckdb.backend.app.utils import geometry, molecule_env_pool
+from tckdb.backend.app.utils.molecule_env_pool import (
+    MoleculeEnvError,
+    analyze_adjlist,
+    molecule_env_version,
+)
 
 
 class ServiceUnavailableError(Exception):
@@ -31,6 +41,239 @@ class ServiceUnavailableError(Exception):
     pass
 
 
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "disk_hits", "maxsize", "currsize"])
+
+
+def _distribution_version(name: str) -> str:
+    """
+    Get the installed version of a distribution, or ``"unknown"``.
+    """
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+# The toolkit each cached conversion depends on, versioned so that upgrading a toolkit invalidates its entries.
+TOOLKIT_VERSIONS = {
+    "rdkit": f"rdkit-{_distribution_version('rdkit')}",
+    "rmg-web": "rmg.mit.edu",
+    "chembl": f"chembl-{_distribution_version('chembl_webresource_client')}",
+}
+# The toolkits running on the molecule_env workers, versioned by the molecule package version they report.
+MOLECULE_ENV_TOOLKITS = {
+    "molecule_env": "molecule_env-{}",
+    "adjlist": "molecule_env-{}+" + TOOLKIT_VERSIONS["rdkit"],
+}
+
+
+def toolkit_version(toolkit: str) -> str:
+    """
+    Get the version of a toolkit, as used in the keys of the identifier cache.
+
+    Args:
+        toolkit (str): The key of the toolkit in ``TOOLKIT_VERSIONS`` or ``MOLECULE_ENV_TOOLKITS``.
+
+    Returns:
+        str: The toolkit version.
+    """
+    if toolkit in MOLECULE_ENV_TOOLKITS:
+        version = molecule_env_version() or "unavailable"
+        return MOLECULE_ENV_TOOLKITS[toolkit].format(version)
+    return TOOLKIT_VERSIONS[toolkit]
+
+
+class IdentifierCache:
+    """
+    A cache of chemical identifier conversions, keyed by (function, canonical input, toolkit version).
+    Entries are kept in an in-process LRU and, if a path is given, in an SQLite file shared across processes and restarts.
+
+    Args:
+        maxsize (int): The maximal number of entries of the in-process LRU.
+        path (str, optional): The path of the SQLite file.
+    """
+
+    def __init__(self, maxsize: int = IDENTIFIER_CACHE_SIZE, path: Optional[str] = None):
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = self.misses = self.disk_hits = 0
+        self._entries: "OrderedDict[Tuple[str, str, str], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection = None
+        if path:
+            self._connection = sqlite3.connect(path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS identifier_cache "
+                "(function TEXT, input TEXT, toolkit TEXT, value TEXT, "
+                "PRIMARY KEY (function, input, toolkit))"
+            )
+            self._connection.commit()
+
+    def get(self, key: Tuple[str, str, str]) -> Tuple[bool, Any]:
+        """
+        Look up a conversion.
+
+        Args:
+            key (Tuple[str, str, str]): The function name, canonical input and toolkit version.
+
+        Returns:
+            Tuple[bool, Any]: Whether the key was found, and the cached value.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, self._entries[key]
+            if self._connection is not None:
+                row = self._connection.execute(
+                    "SELECT value FROM identifier_cache WHERE function = ? AND input = ? AND toolkit = ?",
+                    key,
+                ).fetchone()
+                if row is not None:
+                    value = _from_json(json.loads(row[0]))
+                    self._remember(key, value)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return True, value
+            self.misses += 1
+            return False, None
+
+    def set(self, key: Tuple[str, str, str], value: Any) -> None:
+        """
+        Store a conversion.
+
+        Args:
+            key (Tuple[str, str, str]): The function name, canonical input and toolkit version.
+            value (Any): The JSON serializable result of the conversion.
+        """
+        with self._lock:
+            self._remember(key, value)
+            if self._connection is not None:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO identifier_cache VALUES (?, ?, ?, ?)",
+                    (*key, json.dumps(value)),
+                )
+                self._connection.commit()
+
+    def clear(self) -> None:
+        """
+        Remove all entries, including persisted ones, and reset the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.disk_hits = 0
+            if self._connection is not None:
+                self._connection.execute("DELETE FROM identifier_cache")
+                self._connection.commit()
+
+    def info(self) -> CacheInfo:
+        """
+        Get the hit and miss counters of the cache.
+
+        Returns:
+            CacheInfo: The hits, misses, hits served from the SQLite file, maximal size and current size.
+        """
+        with self._lock:
+            return CacheInfo(
+                self.hits, self.misses, self.disk_hits, self.maxsize, len(self._entries)
+            )
+
+    def _remember(self, key: Tuple[str, str, str], value: Any) -> None:
+        """
+        Add an entry to the in-process LRU, evicting the least recently used entry if full.
+        """
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+def _from_json(value: Any) -> Any:
+    """
+    Restore the tuples of a JSON-decoded cached value.
+    """
+    return tuple(value) if isinstance(value, list) else value
+
+
+def canonical_input(value: Any) -> str:
+    """
+    Canonicalize the input of a conversion textually, without invoking a toolkit.
+    Surrounding whitespace is removed, and for multi-line inputs (adjacency lists)
+    each line is stripped and blank lines are dropped.
+
+    Args:
+        value (Any): The input identifier.
+
+    Returns:
+        str: The canonical input.
+    """
+    text = str(value)
+    if "\n" in text.strip():
+        return "\n".join(line.strip() for line in text.splitlines() if line.strip())
+    return text.strip()
+
+
+identifier_cache = IdentifierCache(path=IDENTIFIER_CACHE_PATH)
+
+
+def cached_conversion(toolkit: str) -> Callable:
+    """
+    Cache the results of a conversion function in ``identifier_cache``.
+    The first positional argument is the input identifier; further arguments become part of the key.
+    ``None`` results are not cached, since they may stem from transient failures.
+
+    Args:
+        toolkit (str): The toolkit the conversion depends on, see ``toolkit_version``.
+
+    Returns:
+        Callable: The decorator.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        def cache_key(value, *args, **kwargs) -> Tuple[str, str, str]:
+            extra = json.dumps([args, sorted(kwargs.items())]) if args or kwargs else ""
+            return func.__name__, canonical_input(value) + extra, toolkit_version(toolkit)
+
+        @functools.wraps(func)
+        def wrapper(value, *args, **kwargs):
+            if not isinstance(value, str):
+                return func(value, *args, **kwargs)
+            key = cache_key(value, *args, **kwargs)
+            hit, result = identifier_cache.get(key)
+            if hit:
+                return result
+            result = func(value, *args, **kwargs)
+            if result is not None:
+                identifier_cache.set(key, result)
+            return result
+
+        def cache_lookup(value: str) -> Tuple[bool, Any]:
+            """Look up the cached result for an input without running the conversion."""
+            return identifier_cache.get(cache_key(value))
+
+        def cache_store(value: str, result: Any) -> None:
+            """Cache a result computed elsewhere, e.g. in another process."""
+            if result is not None:
+                identifier_cache.set(cache_key(value), result)
+
+        wrapper.cache_lookup = cache_lookup
+        wrapper.cache_store = cache_store
+        return wrapper
+
+    return decorator
+
+
+def cache_info() -> CacheInfo:
+    """
+    Get the hit and miss counters of the identifier conversion cache.
+
+    Returns:
+        CacheInfo: The hits, misses, hits served from the SQLite file, maximal size and current size.
+    """
+    return identifier_cache.info()
+
+
+@cached_conversion(toolkit="rdkit")
 def inchi_from_smiles(smiles: str) -> Union[str, None]:
     """
     Get an InChI descriptor from a SMILES descriptors.
@@ -50,8 +293,89 @@ def inchi_from_smiles(smiles: str) -> Union[str, None]:
     return inchi
 
 
+RMG_BOND_ORDERS = {1: "S", 2: "D", 3: "T", 4: "Q"}
+
+
+@cached_conversion(toolkit="adjlist")
 def adjlist_from_smiles(
     smiles: str, max_retries: int = 3, timeout: int = 10
+) -> Union[str, None]:
+    """
+    Get an RMG adjacency list from a SMILES descriptor.
+    The conversion runs locally, on a molecule_env worker if RMG's molecule package is available
+    and otherwise with RDKit. The RMG MIT web service is only used as a fallback if
+    ``ADJLIST_WEB_FALLBACK`` is set.
+
+    Args:
+        smiles (str): The SMILES descriptor.
+        max_retries (int): Maximum number of retry attempts of the web fallback (default: 3).
+        timeout (int): Request timeout of the web fallback in seconds (default: 10).
+
+    Returns:
+        str: The corresponding adjacency list.
+
+    Raises:
+        ServiceUnavailableError: If the web fallback is used and the RMG MIT service is unavailable after retries.
+    """
+    adjlist = molecule_env_pool.adjlist_from_smiles(smiles) or rdkit_adjlist_from_smiles(
+        smiles
+    )
+    if adjlist is None and ADJLIST_WEB_FALLBACK:
+        adjlist = adjlist_from_smiles_web(smiles, max_retries=max_retries, timeout=timeout)
+    return adjlist
+
+
+def rdkit_adjlist_from_smiles(smiles: str) -> Union[str, None]:
+    """
+    Get an RMG adjacency list from a SMILES descriptor using RDKit.
+    Hydrogens are made explicit and aromatic rings are kekulized, since RMG adjacency lists
+    use single, double and triple bonds. Unpaired electrons are taken from RDKit's radical count,
+    lone pairs from the remaining valence electrons, and the multiplicity is assumed to be high-spin.
+
+    Args:
+        smiles (str): The SMILES descriptor.
+
+    Returns:
+        str: The corresponding adjacency list, or None if RDKit cannot parse the SMILES.
+    """
+    rd_mol = MolFromSmiles(smiles)
+    if rd_mol is None:
+        return None
+    rd_mol = AddHs(rd_mol)
+    try:
+        Kekulize(rd_mol, clearAromaticFlags=True)
+    except Exception as e:
+        print(f"Failed to kekulize {smiles}: {e}")
+        return None
+    periodic_table = GetPeriodicTable()
+    lines, radicals = [], 0
+    for atom in rd_mol.GetAtoms():
+        unpaired = atom.GetNumRadicalElectrons()
+        charge = atom.GetFormalCharge()
+        bonds = sorted(
+            (bond.GetOtherAtomIdx(atom.GetIdx()) + 1, int(bond.GetBondTypeAsDouble()))
+            for bond in atom.GetBonds()
+        )
+        valence_electrons = periodic_table.GetNOuterElecs(atom.GetAtomicNum())
+        lone_pairs = (
+            valence_electrons - sum(order for _, order in bonds) - unpaired - charge
+        ) // 2
+        if any(order not in RMG_BOND_ORDERS for _, order in bonds) or lone_pairs < 0:
+            return None
+        radicals += unpaired
+        bond_list = "".join(f" {{{index},{RMG_BOND_ORDERS[order]}}}" for index, order in bonds)
+        charge_label = f"c{charge:+d}" if charge else "c0"
+        lines.append(
+            f"{atom.GetIdx() + 1} {atom.GetSymbol()} u{unpaired} p{lone_pairs} {charge_label}{bond_list}"
+        )
+    multiplicity = radicals + 1
+    header = f"multiplicity {multiplicity}\n" if multiplicity != 1 else ""
+    return header + "\n".join(lines) + "\n"
+
+
+@cached_conversion(toolkit="rmg-web")
+def adjlist_from_smiles_web(
+    smiles: str, max_retries: int = 3, timeout: int = 10
 ) -> Union[str, None]:
     """
     Get an RMG adjacency list from a SMILES descriptor.
@@ -155,10 +479,11 @@ def adjlist_from_smiles(
     )
 
 
+@cached_conversion(toolkit="molecule_env")
 def smiles_and_inchi_from_adjlist(adjlist: str) -> Optional[Tuple[str, str]]:
     """
     Get the SMILEs and InChI descriptors corresponding to an RMG adjaceny list
-    Uses a subprocess to call a script in molecule_env for the conversions.
+    Uses a persistent molecule_env worker for the conversions.
 
     Args:
         adjlist (str): The adjacency list.
@@ -170,51 +495,28 @@ def smiles_and_inchi_from_adjlist(adjlist: str) -> Optional[Tuple[str, str]]:
             Returns None if conversion fails
     """
     try:
-        script_dir = Path(__file__).resolve().parent
-        utils_dir = script_dir.parent / "utils"
-        conversion_script = utils_dir / "molecule_env_scripts.py"
-        if not conversion_script.is_file():
-            raise FileNotFoundError(
-                f"Conversion script not found at: {conversion_script}"
-            )
-
-        cmd = [MOLECULE_PYTHON, conversion_script, "convert"]
-
-        # trunk-ignore(bandit/B603)
-        result = subprocess.run(
-            cmd, input=adjlist, text=True, capture_output=True, check=True
-        )
-
-        # Parse
-        output = result.stdout.strip().split("\n")
-        if len(output) >= 2:
-            smiles = output[0]
-            inchi = output[1]
-            return smiles, inchi
-        else:
-            error_message = "Error: Unexpected output format."
-            if result.stderr:
-                error_message += f" Subprocess stderr: {result.stderr.strip()}"
-            print(error_message, file=sys.stderr)
-            return None
-
-    except subprocess.CalledProcessError as e:
-        # If the molecule package isn't available, allow the caller to
-        # continue by returning ``None`` without logging a noisy error.
-        if "Import Error" in e.stderr:
-            return None
+        analysis = analyze_adjlist(adjlist)
+    except MoleculeEnvError as e:
+        print(f"molecule_env error: {e}", file=sys.stderr)
+        return None
+    # If the molecule package isn't available, allow the caller to
+    # continue by returning ``None`` without logging a noisy error.
+    if analysis is None:
+        return None
+    if analysis["smiles"] is None or analysis["inchi"] is None:
         print(
-            f"Subprocess error (exit code {e.returncode}): {e.stderr}", file=sys.stderr
+            f"Error: Could not convert the adjacency list: {analysis['error']}",
+            file=sys.stderr,
         )
         return None
-    except Exception as e:
-        print(f"Unexpected error: {e}", file=sys.stderr)
-        return None
+    return analysis["smiles"], analysis["inchi"]
 
 
+@cached_conversion(toolkit="molecule_env")
 def multiplicity_from_adjlist(adjlist: str) -> Optional[int]:
     """
     Calculate the multiplicity of a molecule from its adjacency list.
+    Uses a persistent molecule_env worker.
 
     Args:
         adjlist (str): The adjacency list.
@@ -223,43 +525,16 @@ def multiplicity_from_adjlist(adjlist: str) -> Optional[int]:
         Optional[int]: The multiplicity if successful, else None.
     """
     try:
-        script_dir = Path(__file__).resolve().parent
-        utils_dir = script_dir.parent / "utils"
-        conversion_script = utils_dir / "molecule_env_scripts.py"
-        if not conversion_script.is_file():
-            raise FileNotFoundError(
-                f"Conversion script not found at: {conversion_script}"
-            )
-
-        cmd = [MOLECULE_PYTHON, conversion_script, "multiplicity"]
-
-        # trunk-ignore(bandit/B603)
-        result = subprocess.run(
-            cmd, input=adjlist, text=True, capture_output=True, check=True
-        )
-
-        # Parse
-        output = result.stdout.strip()
-        if output:
-            multiplicity = int(float(output))
-            return multiplicity
-        else:
-            error_message = "Error: Unexpected output format."
-            if result.stderr:
-                error_message += f" Subprocess stderr: {result.stderr.strip()}"
-            print(error_message, file=sys.stderr)
-    except subprocess.CalledProcessError as e:
-        if "Import Error" in e.stderr:
-            return None
-        print(
-            f"Subprocess error (exit code {e.returncode}): {e.stderr}", file=sys.stderr
-        )
+        analysis = analyze_adjlist(adjlist)
+    except MoleculeEnvError as e:
+        print(f"molecule_env error: {e}", file=sys.stderr)
         return None
-    except Exception as e:
-        print(f"Unexpected error: {e}", file=sys.stderr)
+    if analysis is None or analysis["multiplicity"] is None:
         return None
+    return int(analysis["multiplicity"])
 
 
+@cached_conversion(toolkit="chembl")
 def inchi_from_inchi_key(
     inchi_key: str,
     inchi_type: Optional[str] = "standard_inchi",
@@ -289,6 +564,9 @@ def inchi_from_inchi_key(
     #     return inchi[0][inchi_type]
     # return None
 
+    # Imported lazily, the ChEMBL client contacts its server on import
+    from chembl_webresource_client.new_client import new_client
+
     molecule = new_client.molecule
     mol = molecule.filter(molecule_structures__standard_inchi_key=inchi_key).only(
         ["molecule_structures"]
@@ -298,6 +576,7 @@ def inchi_from_inchi_key(
     return None
 
 
+@cached_conversion(toolkit="rdkit")
 def inchi_key_from_inchi(inchi: str) -> Union[str, None]:
     """
     Get an InChI Key descriptor from an InChI descriptor.
@@ -317,6 +596,7 @@ def inchi_key_from_inchi(inchi: str) -> Union[str, None]:
     return inchi_key
 
 
+@cached_conversion(toolkit="rdkit")
 def smiles_from_inchi(inchi: str) -> Union[str, None]:
     """
     Get a SMILES descriptor from an InChI descriptor.
@@ -553,34 +833,30 @@ def generate_check_digit(base_digits: str) -> str:
     return "X" if result == 10 else str(result)
 
 
-def is_linear(coordinates):
-    """
-    Determine whether or not the species is linear from its 3D coordinates
-    First, try to reduce the problem into just two dimensions, use 3D if the problem cannot be reduced
-    `coordinates` is a numpy.array of the species' xyz coordinates
-    """
-    # epsilon is in degrees
-    # (from our experience, linear molecules have precisely 180.0 degrees between all atom triples)
-    epsilon = 0.1
-
-    number_of_atoms = len(coordinates)
-    if number_of_atoms == 1:
-        return False
-    if number_of_atoms == 2:
-        return True
-
-    # A tensor containing all distance vectors in the molecule
-    d = -np.array([c[:, np.newaxis] - c[np.newaxis, :] for c in coordinates.T])
-    for i in range(2, len(coordinates)):
-        u1 = d[:, 0, 1] / np.linalg.norm(
-            d[:, 0, 1]
-        )  # unit vector between atoms 0 and 1
-        u2 = d[:, 1, i] / np.linalg.norm(
-            d[:, 1, i]
-        )  # unit vector between atoms 1 and i
-        a = math.degrees(
-            np.arccos(np.clip(np.dot(u1, u2), -1.0, 1.0))
-        )  # angle between atoms 0, 1, i
-        if abs(180 - a) > epsilon and abs(a) > epsilon:
-            return False
-    return True
+def is_linear(coordinates) -> bool:
+    """
+    Determine whether or not the species is linear from its 3D coordinates.
+    Every atom must lie on the line through the first two atoms, up to
+    ``geometry.LINEARITY_TOLERANCE`` (0.1 degrees) between the first bond and the vector from the second atom
+    to any other atom. The test is a single vectorized pass over the atoms, O(n) in time and memory.
+
+    Args:
+        coordinates (np.ndarray): The species' xyz coordinates, shape ``(n_atoms, 3)``.
+
+    Returns:
+        bool: Whether the species is linear. Monoatomic species are not linear, diatomic ones are.
+    """
+    return bool(is_linear_batch([coordinates])[0])
+
+
+def is_linear_batch(geometries) -> np.ndarray:
+    """
+    Determine the linearity of many geometries of the same number of atoms at once.
+
+    Args:
+        geometries: The geometries, shape ``(n_geoms, n_atoms, 3)``.
+
+    Returns:
+        np.ndarray: Whether each geometry is linear, shape ``(n_geoms,)``.
+    """
+    return geometry.linear_geometries(geometry.stack_geometries(geometries))
@@ -0,0 +1,225 @@
+"""
+TCKDB backend app conversions descriptor resolver module
+
+A pre-validation stage for batch payloads. ``SpeciesBase.handle_descriptors`` derives missing
+species descriptors one species at a time; this module derives them for a whole payload at once.
+It collects the missing conversions of all species, deduplicates them, and runs them concurrently:
+
+- RDKit conversions in the shared process pool (inline for small payloads),
+- RMG conversions on the molecule_env workers, from threads, since the work already runs in those processes,
+- ChEMBL lookups with asyncio and a bounded number of concurrent connections.
+
+Results are written back into the raw species data (only into missing fields) and into the
+identifier cache, so that species construction finds every descriptor already in place.
+The stages follow the same precedence as ``handle_descriptors`` (graph, then InChI, SMILES and InChI Key).
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import httpx
+
+from tckdb.backend.app.conversions import converter
+from tckdb.backend.app.core.config import (
+    DESCRIPTOR_INLINE_THRESHOLD,
+    DESCRIPTOR_REMOTE_CONCURRENCY,
+    DESCRIPTOR_REMOTE_TIMEOUT,
+)
+from tckdb.backend.app.utils.process_pool import get_process_pool
+
+CHEMBL_MOLECULE_URL = "https://www.ebi.ac.uk/chembl/api/data/molecule.json"
+
+RDKIT_CONVERSIONS = {"smiles_from_inchi", "inchi_from_smiles", "inchi_key_from_inchi"}
+REMOTE_CONVERSIONS = {"inchi_from_inchi_key"}
+
+Conversion = Tuple[str, str]
+
+
+def pending_conversions(species: Dict[str, Any]) -> List[Conversion]:
+    """
+    Determine the conversions ``handle_descriptors`` would run next for a species,
+    given the descriptors it currently has.
+
+    Args:
+        species (Dict[str, Any]): The raw species data.
+
+    Returns:
+        List[Conversion]: The (converter function name, input) pairs that can run now.
+    """
+    smiles, inchi = species.get("smiles"), species.get("inchi")
+    graph, inchi_key = species.get("graph"), species.get("inchi_key")
+    conversions = []
+    if graph:
+        if not smiles or not inchi:
+            conversions.append(("smiles_and_inchi_from_adjlist", graph))
+    elif inchi:
+        if not smiles:
+            conversions.append(("smiles_from_inchi", inchi))
+        else:
+            conversions.append(("adjlist_from_smiles", smiles))
+    elif smiles:
+        conversions.append(("inchi_from_smiles", smiles))
+        conversions.append(("adjlist_from_smiles", smiles))
+    elif inchi_key:
+        conversions.append(("inchi_from_inchi_key", inchi_key))
+    if not inchi_key and inchi:
+        conversions.append(("inchi_key_from_inchi", inchi))
+    return conversions
+
+
+def apply_conversion(species: Dict[str, Any], function: str, result: Any) -> None:
+    """
+    Write the result of a conversion into the missing descriptor fields of a species.
+
+    Args:
+        species (Dict[str, Any]): The raw species data, updated in place.
+        function (str): The converter function name.
+        result (Any): The result of the conversion.
+    """
+    if result is None:
+        return
+    if function == "smiles_and_inchi_from_adjlist":
+        fields = dict(zip(("smiles", "inchi"), result))
+    else:
+        field = {
+            "smiles_from_inchi": "smiles",
+            "inchi_from_smiles": "inchi",
+            "adjlist_from_smiles": "graph",
+            "inchi_from_inchi_key": "inchi",
+            "inchi_key_from_inchi": "inchi_key",
+        }[function]
+        fields = {field: result}
+    for field, value in fields.items():
+        if not species.get(field):
+            species[field] = value
+
+
+def run_conversion(function: str, value: str) -> Any:
+    """
+    Run a converter function without its cache. Executed in the process pool.
+
+    Args:
+        function (str): The converter function name.
+        value (str): The input identifier.
+
+    Returns:
+        Any: The result of the conversion.
+    """
+    return getattr(converter, function).__wrapped__(value)
+
+
+async def fetch_inchi_from_inchi_key(
+    client: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+    inchi_key: str,
+    inchi_type: str = "standard_inchi",
+) -> Optional[str]:
+    """
+    Get an InChI descriptor from an InChI Key descriptor using the ChEMBL REST API.
+
+    Args:
+        client (httpx.AsyncClient): The HTTP client.
+        semaphore (asyncio.Semaphore): Limits the number of concurrent requests.
+        inchi_key (str): The InChI Key descriptor.
+        inchi_type (str, optional): The InChI type to return.
+
+    Returns:
+        Optional[str]: The InChI descriptor, or None if it was not found or the lookup failed.
+    """
+    params = {
+        "molecule_structures__standard_inchi_key": inchi_key,
+        "only": "molecule_structures",
+    }
+    async with semaphore:
+        try:
+            response = await client.get(CHEMBL_MOLECULE_URL, params=params)
+            response.raise_for_status()
+            molecules = response.json().get("molecules") or []
+        except (httpx.HTTPError, ValueError) as e:
+            print(f"ChEMBL lookup of {inchi_key} failed: {e}")
+            return None
+    for molecule in molecules:
+        structures = molecule.get("molecule_structures") or {}
+        if structures.get(inchi_type):
+            return structures[inchi_type]
+    return None
+
+
+async def resolve_conversions(
+    conversions: Set[Conversion],
+    client: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+) -> Dict[Conversion, Any]:
+    """
+    Run a set of unique conversions concurrently, serving cached results first.
+
+    Args:
+        conversions (Set[Conversion]): The (converter function name, input) pairs.
+        client (httpx.AsyncClient): The HTTP client for remote lookups.
+        semaphore (asyncio.Semaphore): Limits the number of concurrent remote lookups.
+
+    Returns:
+        Dict[Conversion, Any]: The result of each conversion.
+    """
+    results, to_run = {}, []
+    for function, value in conversions:
+        hit, result = getattr(converter, function).cache_lookup(value)
+        if hit:
+            results[(function, value)] = result
+        else:
+            to_run.append((function, value))
+
+    loop = asyncio.get_running_loop()
+    use_process_pool = (
+        sum(function in RDKIT_CONVERSIONS for function, _ in to_run)
+        >= DESCRIPTOR_INLINE_THRESHOLD
+    )
+    computed, pending, tasks = {}, [], []
+    for function, value in to_run:
+        if function in REMOTE_CONVERSIONS:
+            task = fetch_inchi_from_inchi_key(client, semaphore, value)
+        elif function in RDKIT_CONVERSIONS and not use_process_pool:
+            computed[(function, value)] = run_conversion(function, value)
+            continue
+        elif function in RDKIT_CONVERSIONS:
+            task = loop.run_in_executor(get_process_pool(), run_conversion, function, value)
+        else:
+            task = asyncio.to_thread(run_conversion, function, value)
+        pending.append((function, value))
+        tasks.append(task)
+    computed.update(zip(pending, await asyncio.gather(*tasks)))
+    for (function, value), result in computed.items():
+        getattr(converter, function).cache_store(value, result)
+        results[(function, value)] = result
+    return results
+
+
+async def resolve_descriptors(species_list: List[Dict[str, Any]]) -> None:
+    """
+    Derive the missing descriptors of all species of a payload before validation.
+    Each stage collects the conversions that are possible with the descriptors known so far,
+    deduplicates them across the payload and runs them concurrently. Conversions that fail are
+    left to ``handle_descriptors``, which reports them as it would without this stage.
+
+    Args:
+        species_list (List[Dict[str, Any]]): The raw species data, updated in place.
+    """
+    species_list = [species for species in species_list if isinstance(species, dict)]
+    attempted: Set[Conversion] = set()
+    semaphore = asyncio.Semaphore(DESCRIPTOR_REMOTE_CONCURRENCY)
+    async with httpx.AsyncClient(timeout=DESCRIPTOR_REMOTE_TIMEOUT) as client:
+        while True:
+            stage = {
+                conversion
+                for species in species_list
+                for conversion in pending_conversions(species)
+                if conversion not in attempted and isinstance(conversion[1], str)
+            }
+            if not stage:
+                break
+            attempted |= stage
+            results = await resolve_conversions(stage, client, semaphore)
+            for species in species_list:
+                for function, value in pending_conversions(species):
+                    if (function, value) in results:
+                        apply_conversion(species, function, results[(function, value)])
@@ -0,0 +1,92 @@
+"""
+TCKDB backend app conversions fingerprints module
+
+Chemical fingerprints used by the species search index:
+
+- Morgan fingerprints (ECFP4-like) for Tanimoto similarity,
+- RDKit pattern fingerprints for substructure screening: if a molecule contains a query substructure,
+  every bit set in the query pattern fingerprint is also set in the molecule pattern fingerprint.
+
+Fingerprints are represented as bit strings (e.g., ``"0110..."``) of ``FINGERPRINT_SIZE`` bits,
+the text representation of the PostgreSQL ``BIT`` type they are stored as.
+"""
+
+from typing import NamedTuple, Optional
+
+from rdkit import Chem
+from rdkit.Chem import rdFingerprintGenerator
+from rdkit.DataStructs import ExplicitBitVect
+
+FINGERPRINT_SIZE = 2048
+MORGAN_RADIUS = 2
+# Stored with each fingerprint row, so that rows computed with other parameters can be found and recomputed
+FINGERPRINT_VERSION = f"morgan{MORGAN_RADIUS}-pattern-{FINGERPRINT_SIZE}"
+
+_morgan_generator = rdFingerprintGenerator.GetMorganGenerator(
+    radius=MORGAN_RADIUS, fpSize=FINGERPRINT_SIZE
+)
+
+
+class Fingerprints(NamedTuple):
+    """
+    The search fingerprints of a molecule.
+
+    Attributes:
+        morgan (str): The Morgan fingerprint bit string.
+        morgan_count (int): The number of bits set in the Morgan fingerprint.
+        pattern (str): The pattern fingerprint bit string.
+        pattern_count (int): The number of bits set in the pattern fingerprint.
+    """
+
+    morgan: str
+    morgan_count: int
+    pattern: str
+    pattern_count: int
+
+
+def morgan_fingerprint(mol: Chem.Mol) -> ExplicitBitVect:
+    """
+    Get the Morgan fingerprint of a molecule.
+
+    Args:
+        mol (Chem.Mol): The molecule.
+
+    Returns:
+        ExplicitBitVect: The fingerprint.
+    """
+    return _morgan_generator.GetFingerprint(mol)
+
+
+def pattern_fingerprint(mol: Chem.Mol) -> ExplicitBitVect:
+    """
+    Get the substructure screening (pattern) fingerprint of a molecule or a query molecule.
+
+    Args:
+        mol (Chem.Mol): The molecule, or a query molecule from SMARTS.
+
+    Returns:
+        ExplicitBitVect: The fingerprint.
+    """
+    return Chem.PatternFingerprint(mol, fpSize=FINGERPRINT_SIZE)
+
+
+def fingerprints_from_smiles(smiles: str) -> Optional[Fingerprints]:
+    """
+    Compute the search fingerprints of a molecule.
+
+    Args:
+        smiles (str): The SMILES descriptor.
+
+    Returns:
+        Optional[Fingerprints]: The fingerprints, or ``None`` if the SMILES cannot be parsed.
+    """
+    mol = Chem.MolFromSmiles(smiles) if smiles else None
+    if mol is None:
+        return None
+    morgan, pattern = morgan_fingerprint(mol), pattern_fingerprint(mol)
+    return Fingerprints(
+        morgan=morgan.ToBitString(),
+        morgan_count=morgan.GetNumOnBits(),
+        pattern=pattern.ToBitString(),
+        pattern_count=pattern.GetNumOnBits(),
+    )
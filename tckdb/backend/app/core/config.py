@@ -38,6 +38,9 @@ def getenv_boolean(
 
 API_V1_STR = "/api/v1"
 SECRET_KEY = os.getenv("SECRET_KEY")
+# Signatures verified by other processes or after a restart (the batch validation tokens)
+# are only issued if SECRET_KEY is configured, not with the random per-process fallback
+SECRET_KEY_CONFIGURED = bool(SECRET_KEY)
 if not SECRET_KEY:
     SECRET_KEY = os.urandom(32)
 
@@ -60,6 +63,21 @@ POSTGRES_DB = os.getenv("POSTGRES_DB")
 SQLALCHEMY_DATABASE_URI = (
     f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_SERVER}/{POSTGRES_DB}"
 )
+SQLALCHEMY_ASYNC_DATABASE_URI = (
+    f"postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSWORD}"
+    f"@{POSTGRES_SERVER}/{POSTGRES_DB}"
+)
+
+# Connection pool of each engine: persistent connections, extra connections under load,
+# seconds to wait for a connection and seconds after which connections are recycled
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# Server-side statement timeout in milliseconds (0 disables it)
+DB_STATEMENT_TIMEOUT = int(os.getenv("DB_STATEMENT_TIMEOUT", "0"))
+# Serve read endpoints with an asyncio engine (requires the optional asyncpg and greenlet packages)
+DB_ASYNC_ENABLED = getenv_boolean("DB_ASYNC_ENABLED", False)
 
 SMTP_TLS = getenv_boolean("SMTP_TLS", True)
 SMTP_PORT = None
@@ -82,6 +100,81 @@ USERS_OPEN_REGISTRATION = getenv_boolean("USERS_OPEN_REGISTRATION")
 
 EMAIL_TEST_USER = "test@example.com"
 
+# Number of NDJSON records validated and persisted together by the streaming batch upload
+BATCH_STREAM_CHUNK_SIZE = int(os.getenv("BATCH_STREAM_CHUNK_SIZE", "500"))
+
+# Persistent molecule_env worker processes used for RMG adjacency list validation and conversion
+MOLECULE_ENV_POOL_SIZE = int(os.getenv("MOLECULE_ENV_POOL_SIZE", "2"))
+MOLECULE_ENV_TIMEOUT = float(os.getenv("MOLECULE_ENV_TIMEOUT", "60"))
+MOLECULE_ENV_HEALTH_CHECK_INTERVAL = float(
+    os.getenv("MOLECULE_ENV_HEALTH_CHECK_INTERVAL", "30")
+)
+
+# Memoization of chemical identifier conversions; set IDENTIFIER_CACHE_PATH to persist them in an SQLite file
+IDENTIFIER_CACHE_SIZE = int(os.getenv("IDENTIFIER_CACHE_SIZE", "4096"))
+IDENTIFIER_CACHE_PATH = os.getenv("IDENTIFIER_CACHE_PATH")
+
+# Fall back to the RMG MIT web service if a SMILES cannot be converted to an adjacency list locally
+ADJLIST_WEB_FALLBACK = getenv_boolean("ADJLIST_WEB_FALLBACK", False)
+
+# Worker processes for CPU-bound work (e.g. RDKit conversions) shared across requests
+PROCESS_POOL_SIZE = int(os.getenv("PROCESS_POOL_SIZE", str(os.cpu_count() or 1)))
+# Batch descriptor resolution: fewer conversions than this run inline, without the process pool
+DESCRIPTOR_INLINE_THRESHOLD = int(os.getenv("DESCRIPTOR_INLINE_THRESHOLD", "8"))
+# Maximal number of concurrent remote lookups (ChEMBL) and their timeout in seconds
+DESCRIPTOR_REMOTE_CONCURRENCY = int(os.getenv("DESCRIPTOR_REMOTE_CONCURRENCY", "8"))
+DESCRIPTOR_REMOTE_TIMEOUT = float(os.getenv("DESCRIPTOR_REMOTE_TIMEOUT", "10"))
+# Batch species validation: fewer species than this are validated inline, without the process pool
+SPECIES_VALIDATION_INLINE_THRESHOLD = int(
+    os.getenv("SPECIES_VALIDATION_INLINE_THRESHOLD", "32")
+)
+
+# Handling of uploaded species with the identity of an existing species: "skip", "merge" or "version"
+SPECIES_DUPLICATE_POLICY = os.getenv("SPECIES_DUPLICATE_POLICY", "version")
+
+# Species read API: default and maximal page size, and rows fetched per server-side cursor round trip in exports
+SPECIES_PAGE_SIZE = int(os.getenv("SPECIES_PAGE_SIZE", "100"))
+SPECIES_MAX_PAGE_SIZE = int(os.getenv("SPECIES_MAX_PAGE_SIZE", "1000"))
+SPECIES_EXPORT_FETCH_SIZE = int(os.getenv("SPECIES_EXPORT_FETCH_SIZE", "1000"))
+
+# Process-wide cache of the reference tables (levels, ESS, bots, frequency scales);
+# workers invalidate each other through Postgres LISTEN/NOTIFY, reconnecting after this many seconds
+REFERENCE_CACHE_ENABLED = getenv_boolean("REFERENCE_CACHE_ENABLED", True)
+REFERENCE_CACHE_RECONNECT_INTERVAL = float(
+    os.getenv("REFERENCE_CACHE_RECONNECT_INTERVAL", "5")
+)
+
+# Record creations, updates and deletions of the audited models in the audit_logs table
+AUDIT_LOG_ENABLED = getenv_boolean("AUDIT_LOG_ENABLED", True)
+
+# Chunked, content-addressed store of QC input/output files: the chunk directory,
+# the minimal, average (a power of two) and maximal sizes in bytes of the content-defined chunks,
+# the codec ("zstd", or "gzip" if the optional zstandard package is missing), its level,
+# and an optional zstd dictionary file trained on ESS logs
+QC_FILE_STORE_DIR = os.getenv("QC_FILE_STORE_DIR", "./qc_file_store")
+QC_FILE_CHUNK_MIN_SIZE = int(os.getenv("QC_FILE_CHUNK_MIN_SIZE", str(8 * 1024)))
+QC_FILE_CHUNK_AVG_SIZE = int(os.getenv("QC_FILE_CHUNK_AVG_SIZE", str(32 * 1024)))
+QC_FILE_CHUNK_MAX_SIZE = int(os.getenv("QC_FILE_CHUNK_MAX_SIZE", str(128 * 1024)))
+QC_FILE_CODEC = os.getenv("QC_FILE_CODEC", "zstd")
+QC_FILE_COMPRESSION_LEVEL = int(os.getenv("QC_FILE_COMPRESSION_LEVEL", "6"))
+QC_FILE_ZSTD_DICTIONARY = os.getenv("QC_FILE_ZSTD_DICTIONARY")
+
+# Queued batch uploads: worker processes started by the API process (0 to run workers separately),
+# seconds between polls of an empty queue, species persisted between progress reports,
+# seconds without a progress report after which a running job is claimed again, and claims before a job fails
+BATCH_JOB_WORKERS = int(os.getenv("BATCH_JOB_WORKERS", "2"))
+BATCH_JOB_POLL_INTERVAL = float(os.getenv("BATCH_JOB_POLL_INTERVAL", "1"))
+BATCH_JOB_PROGRESS_CHUNK_SIZE = int(os.getenv("BATCH_JOB_PROGRESS_CHUNK_SIZE", "500"))
+BATCH_JOB_LEASE_SECONDS = int(os.getenv("BATCH_JOB_LEASE_SECONDS", "1800"))
+BATCH_JOB_MAX_ATTEMPTS = int(os.getenv("BATCH_JOB_MAX_ATTEMPTS", "3"))
+
+# Dry-run batch uploads: seconds a validated payload can be committed with its validation token.
+# Tokens are signed with SECRET_KEY, which must be shared by all API processes to accept each other's tokens
+BATCH_VALIDATION_TTL_SECONDS = int(os.getenv("BATCH_VALIDATION_TTL_SECONDS", "86400"))
+
+# Chunked batch uploads: seconds a checkpoint is kept after its last chunk, for uploads resumed with the same idempotency key
+BATCH_CHECKPOINT_TTL_SECONDS = int(os.getenv("BATCH_CHECKPOINT_TTL_SECONDS", "604800"))
+
 FAST_API_PORT = os.getenv("FAST_API_PORT", "8000")
 
 ENV = os.getenv("ENV")
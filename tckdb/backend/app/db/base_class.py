@@ -3,8 +3,12 @@ TCKDB backend app db base_class module
 allows the creation of classes that include directives to describe the actual database table they will be mapped to
 """
 
+import hashlib
+import json
+from typing import Any, Dict, Sequence, Tuple
+
 import sqlalchemy
-from sqlalchemy import Column, DateTime, func
+from sqlalchemy import Column, DateTime, String, event, func
 from sqlalchemy.ext.declarative import declared_attr
 from sqlalchemy.orm import Session
 
@@ -48,4 +52,64 @@ class AuditMixin:
         db.delete(self)
 
 
+def normalize_key_value(value: Any) -> Any:
+    """
+    Normalize a natural key value: strings are stripped, their whitespace collapsed and lowercased,
+    and empty strings are considered missing (``None``).
+    """
+    if isinstance(value, str):
+        return " ".join(value.split()).lower() or None
+    return value
+
+
+def natural_key_hash(values: Dict[str, Any], key_columns: Sequence[str]) -> str:
+    """
+    Compute the NULL-safe natural key hash of a row.
+    Missing values are encoded as JSON ``null``, so they are distinct from any string value.
+
+    Args:
+        values (Dict[str, Any]): The column values of the row.
+        key_columns (Sequence[str]): The columns that identify a row.
+
+    Returns:
+        str: The SHA-256 hex digest of the normalized natural key.
+    """
+    key = [normalize_key_value(values.get(column)) for column in key_columns]
+    return hashlib.sha256(
+        json.dumps(key, separators=(",", ":")).encode()
+    ).hexdigest()
+
+
+class NaturalKeyMixin:
+    """
+    Mixin to add a unique, indexed natural key hash to a reference table (see ``natural_key_hash``),
+    so that rows are looked up by a single index probe and deduplicated by the database.
+    The key columns are listed in ``__natural_key__``.
+    The hash is set on ORM inserts and updates; core inserts must set it explicitly,
+    as ``services.reference_service`` does.
+    """
+
+    __natural_key__: Tuple[str, ...] = ()
+
+    natural_key_hash = Column(String(64), nullable=True, unique=True, index=True)
+
+    @classmethod
+    def compute_natural_key_hash(cls, values: Dict[str, Any]) -> str:
+        """
+        Compute the natural key hash of a row of this table.
+        """
+        return natural_key_hash(values, cls.__natural_key__)
+
+
+@event.listens_for(NaturalKeyMixin, "before_insert", propagate=True)
+@event.listens_for(NaturalKeyMixin, "before_update", propagate=True)
+def _set_natural_key_hash(mapper, connection, target) -> None:
+    """
+    Keep the natural key hash of ORM objects in sync with their key columns.
+    """
+    target.natural_key_hash = target.compute_natural_key_hash(
+        {column: getattr(target, column) for column in target.__natural_key__}
+    )
+
+
 Base = sqlalchemy.orm.declarative_base()
@@ -1,30 +1,135 @@
 """
 TCKDB session module
+
+The pool sizing, connection recycling and statement timeout of the engines are set in ``core.config``.
+Read endpoints can optionally be served by an asyncio engine (``DB_ASYNC_ENABLED``, requires asyncpg),
+so that they do not hold a threadpool worker while waiting on Postgres.
 """
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import scoped_session, sessionmaker
+import threading
+from typing import Any, Dict, List, Union
+
+from sqlalchemy import Executable, RowMapping, create_engine
+from sqlalchemy.orm import Session, scoped_session, sessionmaker
+from starlette.concurrency import run_in_threadpool
+
+from fastapi import Depends
 
 from tckdb.backend.app.core import config
 from tckdb.backend.app.db.query import SoftDeleteQuery
 
-engine = create_engine(config.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
+
+def engine_options(async_driver: bool = False) -> Dict[str, Any]:
+    """
+    The keyword arguments of ``create_engine`` (or ``create_async_engine``) from the configuration.
+
+    Args:
+        async_driver (bool, optional): Whether the engine uses asyncpg rather than psycopg2.
+
+    Returns:
+        Dict[str, Any]: The engine options.
+    """
+    options = {
+        "pool_pre_ping": True,
+        "pool_size": config.DB_POOL_SIZE,
+        "max_overflow": config.DB_MAX_OVERFLOW,
+        "pool_timeout": config.DB_POOL_TIMEOUT,
+        "pool_recycle": config.DB_POOL_RECYCLE,
+    }
+    if config.DB_STATEMENT_TIMEOUT:
+        timeout = str(config.DB_STATEMENT_TIMEOUT)
+        options["connect_args"] = (
+            {"server_settings": {"statement_timeout": timeout}}
+            if async_driver
+            else {"options": f"-c statement_timeout={timeout}"}
+        )
+    return options
+
+
+engine = create_engine(config.SQLALCHEMY_DATABASE_URI, **engine_options())
 SessionLocal = sessionmaker(
     autocommit=False, autoflush=False, bind=engine, query_cls=SoftDeleteQuery
 )
 
 db_session = scoped_session(SessionLocal)
 
+_async_sessionmaker = None
+_async_lock = threading.Lock()
+
 
 def get_db():
     """
     Dependency function to provide a SQLAlchemy database session
 
+    A new session is created per request: dependencies and endpoints may run in different
+    threadpool threads, so a thread-local session could be shared by concurrent requests.
+
     Yields:
         Session: A SQLAlchemy database session object
     """
-    db = db_session()
+    db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+def get_async_sessionmaker():
+    """
+    Get the session factory of the asyncio engine, creating the engine on first use.
+
+    Returns:
+        async_sessionmaker: The AsyncSession factory.
+
+    Raises:
+        ImportError: If the optional asyncio dependencies (asyncpg, greenlet) are not installed.
+    """
+    global _async_sessionmaker
+    with _async_lock:
+        if _async_sessionmaker is None:
+            from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+            async_engine = create_async_engine(
+                config.SQLALCHEMY_ASYNC_DATABASE_URI,
+                **engine_options(async_driver=True),
+            )
+            _async_sessionmaker = async_sessionmaker(
+                async_engine, autoflush=False, expire_on_commit=False
+            )
+        return _async_sessionmaker
+
+
+async def get_read_db(db: Session = Depends(get_db)):
+    """
+    Dependency function to provide a database session to read-only endpoints:
+    an AsyncSession if ``DB_ASYNC_ENABLED``, otherwise the request's SQLAlchemy session.
+    Use ``fetch_mappings`` to run queries with either.
+
+    Yields:
+        Union[Session, AsyncSession]: The database session.
+    """
+    if not config.DB_ASYNC_ENABLED:
+        yield db
+        return
+    async with get_async_sessionmaker()() as async_db:
+        yield async_db
+
+
+async def fetch_mappings(db: Union[Session, Any], statement: Executable) -> List[RowMapping]:
+    """
+    Run a query without blocking the event loop and fetch all its rows as mappings.
+    Synchronous sessions run the query in the threadpool.
+
+    Args:
+        db (Union[Session, AsyncSession]): The database session.
+        statement (Executable): The query.
+
+    Returns:
+        List[RowMapping]: The rows.
+    """
+    if isinstance(db, Session):
+        return await run_in_threadpool(
+            lambda: db.execute(statement).mappings().all()
+        )
+    result = await db.execute(statement)
+    return result.mappings().all()
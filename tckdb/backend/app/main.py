@@ -3,9 +3,17 @@ from contextlib import asynccontextmanager
 import uvicorn
 from fastapi import FastAPI
 
-from tckdb.backend.app.api.api_v1.endpoints import batch
+from tckdb.backend.app.api.api_v1.endpoints import batch, qc_files, search, species
 
-from tckdb.backend.app.core.config import ENV, FAST_API_PORT
+from tckdb.backend.app.core.config import ENV, FAST_API_PORT, TESTING
+from tckdb.backend.app.services.batch_job_service import (
+    start_batch_job_workers,
+    stop_batch_job_workers,
+)
+from tckdb.backend.app.services.reference_cache import (
+    start_reference_cache_listener,
+    stop_reference_cache_listener,
+)
 
 if FAST_API_PORT is None:
     raise ValueError("FAST_API_PORT is not set in the environment variables.")
@@ -18,7 +26,12 @@ except ValueError as e:
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print("Starting application on port: ", port)
+    if not TESTING:
+        start_reference_cache_listener()
+        start_batch_job_workers()
     yield
+    stop_batch_job_workers()
+    stop_reference_cache_listener()
 
 
 app = FastAPI(
@@ -29,6 +42,9 @@ app = FastAPI(
 )
 
 app.include_router(batch.router, prefix="/api/v1/batch-upload")
+app.include_router(species.router, prefix="/api/v1/species")
+app.include_router(search.router, prefix="/api/v1/search")
+app.include_router(qc_files.router, prefix="/api/v1/qc-files")
 
 
 def main():
@@ -24,7 +24,12 @@ from tckdb.backend.app.models.reaction import (
 from tckdb.backend.app.models.transition_state import TransitionState
 from tckdb.backend.app.models.person import Person
 from tckdb.backend.app.models.trans import Trans
-from tckdb.backend.app.models.qc_file import QCFile
+from tckdb.backend.app.models.qc_file import QCFile, QCFileChunk, QCFileContent
+from tckdb.backend.app.models.fingerprint import SpeciesFingerprint
+from tckdb.backend.app.models.audit import AuditLog
+from tckdb.backend.app.models.batch_checkpoint import BatchCheckpoint
+from tckdb.backend.app.models.batch_job import BatchJob
+from tckdb.backend.app.models.batch_validation import BatchValidation
 
 
 __all__ = [
@@ -47,4 +52,11 @@ __all__ = [
     "Person",
     "Trans",
     "QCFile",
+    "QCFileContent",
+    "QCFileChunk",
+    "SpeciesFingerprint",
+    "AuditLog",
+    "BatchJob",
+    "BatchCheckpoint",
+    "BatchValidation",
 ]
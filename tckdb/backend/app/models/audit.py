@@ -1,11 +1,47 @@
+"""
+TCKDB backend app models audit module
+
+The audit log of the ``AuditMixin`` models.
+
+Change records are buffered per (nested) transaction on the session as plain dictionaries,
+and written with a single multi-row insert when the outermost transaction commits;
+records of rolled back savepoints and transactions are discarded.
+Updates diff only the scalar columns: changes of binary, JSON and array columns (e.g., msgpack blobs)
+are recorded as checksums, and deferred columns that were never loaded are not read.
+Rows written with core statements (e.g., bulk inserts) are recorded with ``record_audit``.
+"""
+
+import functools
+import hashlib
+import json
 from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import (
+    ARRAY,
+    JSON,
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    LargeBinary,
+    PickleType,
+    String,
+    TypeDecorator,
+    event,
+    func,
+    inspect,
+    insert,
+)
+from sqlalchemy.orm import Mapper, Session
 
-from sqlalchemy import JSON, Column, DateTime, Integer, String, event, func, inspect
-from sqlalchemy.orm import Session
+from tckdb.backend.app.core.config import AUDIT_LOG_ENABLED
+from tckdb.backend.app.db.base_class import AuditMixin, Base
 
-from tckdb.backend.app.db.base_class import Base
-from tckdb.backend.app.models.bot import Bot as BotModel
-from tckdb.backend.app.models.species import Species as SpeciesModel
+# Session.info key of the change records buffered by each open (nested) transaction
+AUDIT_BUFFERS_KEY = "audit_buffers"
+BLOB_TYPES = (LargeBinary, JSON, ARRAY, PickleType)
 
 
 def serialize_changes(changes):
@@ -18,6 +54,8 @@ def serialize_changes(changes):
         return [serialize_changes(v) for v in changes]
     elif isinstance(changes, datetime):
         return changes.isoformat()
+    elif isinstance(changes, Enum):
+        return changes.value
     else:
         return changes
 
@@ -28,6 +66,7 @@ class AuditLog(Base):
     """
 
     __tablename__ = "audit_logs"
+    __table_args__ = (Index("ix_audit_logs_model_model_id", "model", "model_id"),)
 
     id = Column(Integer, primary_key=True, index=True, nullable=False)
     model = Column(String(50), nullable=False)  # eg. "bots", "species"
@@ -42,43 +81,143 @@ class AuditLog(Base):
     )  # eg. "user1", "bot2" #TODO: Implement this, then make it not nullable
 
 
+def is_blob_type(column_type) -> bool:
+    """
+    Whether values of a column type are diffed by checksum rather than by value.
+    """
+    return isinstance(column_type, (TypeDecorator, *BLOB_TYPES))
+
+
+def checksum(column_type, value: Any, dialect) -> Optional[str]:
+    """
+    The SHA-256 checksum of a column value, computed on its bound (database) representation.
+
+    Args:
+        column_type: The column type.
+        value (Any): The column value.
+        dialect: The database dialect.
+
+    Returns:
+        Optional[str]: The hex digest, or ``None`` if the value is ``None``.
+    """
+    if value is None:
+        return None
+    if isinstance(column_type, TypeDecorator):
+        value = column_type.process_bind_param(value, dialect)
+    if not isinstance(value, (bytes, bytearray, memoryview)):
+        value = json.dumps(value, sort_keys=True, default=str).encode()
+    return hashlib.sha256(value).hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def audited_columns(mapper: Mapper) -> Tuple[Tuple[str, Any], ...]:
+    """
+    The attribute key and column type of each audited column of a mapped class.
+    """
+    return tuple(
+        (prop.key, prop.columns[0].type)
+        for prop in mapper.column_attrs
+        if prop.key not in ("created_at", "updated_at")
+    )
+
+
+def audit_changes(
+    mapper: Mapper, values: Dict[str, Any], dialect
+) -> Dict[str, Dict[str, Any]]:
+    """
+    The changes recorded for new column values written with a core statement (old values are not known).
+
+    Args:
+        mapper (Mapper): The mapper of the audited class.
+        values (Dict[str, Any]): The new column values.
+        dialect: The database dialect.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: The new value (or checksum, for blob columns) of each column.
+    """
+    changes = dict()
+    for key, column_type in audited_columns(mapper):
+        if key in values:
+            if is_blob_type(column_type):
+                new_checksum = checksum(column_type, values[key], dialect)
+                changes[key] = {"new_checksum": new_checksum}
+            else:
+                changes[key] = {"new": values[key]}
+    return serialize_changes(changes)
+
+
+def _current_buffer(session: Session) -> List[Dict[str, Any]]:
+    transaction = session.get_nested_transaction() or session.get_transaction()
+    buffers = session.info.setdefault(AUDIT_BUFFERS_KEY, dict())
+    return buffers.setdefault(transaction, [])
+
+
+def record_audit(
+    session: Session,
+    model: str,
+    model_ids: Sequence[int],
+    action: str,
+    changes: Optional[Sequence[Optional[Dict[str, Any]]]] = None,
+) -> None:
+    """
+    Buffer audit records for rows of a table, to be written when the transaction commits.
+
+    Args:
+        session (Session): The database session.
+        model (str): The table name.
+        model_ids (Sequence[int]): The primary keys of the rows.
+        action (str): The action, e.g., "create", "update", "soft_delete" or "hard_delete".
+        changes (Sequence[Optional[Dict[str, Any]]], optional): The changes of each row.
+    """
+    if not AUDIT_LOG_ENABLED:
+        return
+    changes = changes if changes is not None else [None] * len(model_ids)
+    _current_buffer(session).extend(
+        {"model": model, "model_id": model_id, "action": action, "changes": change}
+        for model_id, change in zip(model_ids, changes)
+    )
+
+
 def after_insert_listener(mapper, connection, target):
     """
     Listener for insert operations.
     """
     session = Session.object_session(target)
-    audit = AuditLog(
-        model=target.__tablename__,
-        model_id=target.id,
-        action="create",
-        changes=None,
-    )
-    session.add(audit)
+    if session is not None:
+        record_audit(session, target.__tablename__, [target.id], "create")
 
 
 def after_update_listener(mapper, connection, target):
     """
     Listener for update operations.
+    Only the history of loaded columns is inspected; blob columns are compared by checksum.
     """
     session = Session.object_session(target)
+    if session is None:
+        return
     state = inspect(target)
     changes = {}
-    for attr in state.attrs:
-        hist = attr.history
-        if hist.has_changes():
-            changes[attr.key] = {
-                "old": hist.deleted[0] if hist.deleted else None,
-                "new": hist.added[0] if hist.added else None,
+    for key, column_type in audited_columns(mapper):
+        hist = state.attrs[key].history
+        if not hist.has_changes():
+            continue
+        old = hist.deleted[0] if hist.deleted else None
+        new = hist.added[0] if hist.added else None
+        if is_blob_type(column_type):
+            changes[key] = {
+                "old_checksum": checksum(column_type, old, connection.dialect),
+                "new_checksum": checksum(column_type, new, connection.dialect),
             }
+        else:
+            changes[key] = {"old": old, "new": new}
     if changes:
-        serialized_changes = serialize_changes(changes)
-        audit = AuditLog(
-            model=target.__tablename__,
-            model_id=target.id,
-            action="update",
-            changes=serialized_changes,
+        record_audit(
+            session,
+            target.__tablename__,
+            [target.id],
+            "update",
+            [serialize_changes(changes)],
         )
-        session.add(audit)
 
 
 def after_delete_listener(mapper, connection, target):
@@ -87,21 +226,62 @@ def after_delete_listener(mapper, connection, target):
     Dtermines if the delection is soft or hard based on the presence of 'deleted_at'
     """
     session = Session.object_session(target)
+    if session is None:
+        return
     if hasattr(target, "deleted_at") and target.deleted_at is not None:
         action = "soft_delete"
     else:
         action = "hard_delete"
-    audit = AuditLog(
-        model=target.__tablename__,
-        model_id=target.id,
-        action=action,
-        changes=None,
+    record_audit(session, target.__tablename__, [target.id], action)
+
+
+def before_commit_listener(session: Session):
+    """
+    Write the buffered audit records of the outermost transaction with a single multi-row insert.
+    """
+    if session.get_nested_transaction() is not None:
+        return
+    session.flush()
+    records = session.info.get(AUDIT_BUFFERS_KEY, {}).pop(
+        session.get_transaction(), []
     )
-    session.add(audit)
+    if records:
+        session.execute(insert(AuditLog), records)
+
+
+def after_commit_listener(session: Session):
+    """
+    Hand the audit records of a released savepoint over to the enclosing transaction.
+    """
+    nested = session.get_nested_transaction()
+    if nested is not None:
+        buffers = session.info.get(AUDIT_BUFFERS_KEY, {})
+        records = buffers.pop(nested, [])
+        if records:
+            buffers.setdefault(nested.parent, []).extend(records)
+
+
+def after_rollback_listener(session: Session):
+    """
+    Discard the audit records of a rolled back savepoint or transaction.
+    """
+    transaction = session.get_nested_transaction() or session.get_transaction()
+    session.info.get(AUDIT_BUFFERS_KEY, {}).pop(transaction, None)
+
+
+def after_transaction_end_listener(session: Session, transaction):
+    """
+    Drop any audit records left when the outermost transaction ends.
+    """
+    if transaction.parent is None:
+        session.info.pop(AUDIT_BUFFERS_KEY, None)
 
 
 # Register the listeners
-for cls in [BotModel, SpeciesModel]:
-    event.listen(cls, "after_insert", after_insert_listener)
-    event.listen(cls, "after_update", after_update_listener)
-    event.listen(cls, "after_delete", after_delete_listener)
+event.listen(AuditMixin, "after_insert", after_insert_listener, propagate=True)
+event.listen(AuditMixin, "after_update", after_update_listener, propagate=True)
+event.listen(AuditMixin, "after_delete", after_delete_listener, propagate=True)
+event.listen(Session, "before_commit", before_commit_listener)
+event.listen(Session, "after_commit", after_commit_listener)
+event.listen(Session, "after_rollback", after_rollback_listener)
+event.listen(Session, "after_transaction_end", after_transaction_end_listener)
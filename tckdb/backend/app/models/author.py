@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Index, Integer, String, UniqueConstraint
+from sqlalchemy import Column, Index, Integer, String, UniqueConstraint, func
 from sqlalchemy.orm import relationship
 
 from tckdb.backend.app.db.base_class import Base
@@ -15,9 +15,11 @@ class Author(Base):
     last_name = Column(String, nullable=False)
     orcid = Column(String(19), nullable=True, unique=True, index=True)
 
-    # Unique constraint to prevent duplicate authors
+    # Unique constraint to prevent duplicate authors,
+    # and a functional index for case-insensitive name lookups
     __table_args__ = (
         UniqueConstraint("first_name", "last_name", name="_author_name_uc"),
+        Index("ix_author_lower_name", func.lower(first_name), func.lower(last_name)),
     )
 
     # Establish many-to-many relationship with Literature
@@ -28,6 +30,3 @@ class Author(Base):
     def __repr__(self):
         return f"<Author(id={self.id}, first_name='{self.first_name}', last_name='{self.last_name}')>"
 
-
-# Adding a composite index for first_name and last_name for faster lookup
-Index("ix_author_full_name", Author.first_name, Author.last_name, unique=True)
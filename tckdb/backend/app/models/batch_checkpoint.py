@@ -0,0 +1,50 @@
+"""
+TCKDB backend app models batch checkpoint module
+"""
+
+from sqlalchemy import Column, DateTime, Integer, String, func
+from sqlalchemy.dialects.postgresql import JSONB
+
+from tckdb.backend.app.db.base_class import Base
+
+
+class BatchCheckpoint(Base):
+    """
+    A class for representing the progress of a chunked batch upload, keyed by the idempotency key of the upload
+    (see ``services.batch_commit_service``)
+
+    Attributes:
+        idempotency_key (str)
+            The idempotency key given by the client, the primary key.
+        digest (str)
+            The SHA-256 of the uploaded batch, so that a key is not reused for a different batch.
+        chunk_size (int)
+            The number of species per chunk.
+        on_duplicate (str)
+            The duplicate species policy.
+        connections (Optional[dict])
+            The primary keys the connection IDs of the reference entities were resolved to, once they are committed.
+        chunks (dict)
+            The outcome of each chunk that was attempted, by chunk index.
+        updated_at (datetime)
+            The time the last chunk was attempted.
+    """
+
+    __tablename__ = "batch_checkpoint"
+
+    idempotency_key = Column(String(255), primary_key=True, nullable=False)
+    digest = Column(String(64), nullable=False)
+    chunk_size = Column(Integer, nullable=False)
+    on_duplicate = Column(String(16), nullable=False)
+    connections = Column(JSONB, nullable=True)
+    chunks = Column(JSONB, nullable=False, default=dict)
+    created_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+        index=True,
+    )
@@ -0,0 +1,62 @@
+"""
+TCKDB backend app models batch job module
+"""
+
+from sqlalchemy import Column, DateTime, Index, Integer, String, func, text
+from sqlalchemy.dialects.postgresql import JSONB
+
+from tckdb.backend.app.db.base_class import Base
+
+
+class BatchJob(Base):
+    """
+    A class for representing a queued batch upload (a row of the work queue consumed by ``services.batch_job_service``)
+
+    Attributes:
+        id (int)
+            The primary key, also the queue order.
+        status (str)
+            "queued", "running", "succeeded" or "failed".
+        payload (dict)
+            The raw batch upload payload, validated by the worker.
+        on_duplicate (str)
+            The duplicate species policy.
+        progress (Optional[dict])
+            The progress reported by the worker, e.g., the number of species persisted so far.
+        result (Optional[dict])
+            The response of the batch upload, once the job succeeded.
+        error (Optional[dict])
+            The error detail, if the job failed.
+        attempts (int)
+            The number of times a worker claimed the job.
+        worker (Optional[str])
+            The name of the worker that last claimed the job.
+        lease_expires_at (Optional[datetime])
+            The time after which a running job whose worker stopped reporting may be claimed again.
+    """
+
+    __tablename__ = "batch_job"
+    __table_args__ = (
+        # Only the pending jobs are scanned by the workers claiming jobs
+        Index(
+            "ix_batch_job_pending",
+            "id",
+            postgresql_where=text("status IN ('queued', 'running')"),
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True, nullable=False)
+    status = Column(String(16), nullable=False, default="queued")
+    payload = Column(JSONB, nullable=False)
+    on_duplicate = Column(String(16), nullable=False)
+    progress = Column(JSONB, nullable=True)
+    result = Column(JSONB, nullable=True)
+    error = Column(JSONB, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    worker = Column(String(255), nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,40 @@
+"""
+TCKDB backend app models batch validation module
+"""
+
+from sqlalchemy import Column, DateTime, Integer, LargeBinary, String, func
+from sqlalchemy.dialects.postgresql import JSONB
+
+from tckdb.backend.app.db.base_class import Base
+
+
+class BatchValidation(Base):
+    """
+    A class for representing a batch upload payload validated by a dry run,
+    which can be committed later with its validation token (see ``services.batch_validation_service``)
+
+    Attributes:
+        id (int)
+            The primary key.
+        digest (str)
+            The SHA-256 of the stored payload, signed by the validation token.
+        payload (bytes)
+            The validated and normalized payload, serialized.
+        entities (dict)
+            The number of items of each entity class of the payload.
+        created_at (datetime)
+            The time the payload was validated.
+        expires_at (datetime)
+            The time after which the payload can no longer be committed.
+    """
+
+    __tablename__ = "batch_validation"
+
+    id = Column(Integer, primary_key=True, index=True, nullable=False)
+    digest = Column(String(64), nullable=False)
+    payload = Column(LargeBinary, nullable=False)
+    entities = Column(JSONB, nullable=False)
+    created_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
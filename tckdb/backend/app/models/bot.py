@@ -5,11 +5,11 @@ TCKDB backend app models bot module
 from sqlalchemy import Column, Integer, String, UniqueConstraint
 from sqlalchemy.orm import relationship
 
-from tckdb.backend.app.db.base_class import AuditMixin, Base
+from tckdb.backend.app.db.base_class import AuditMixin, Base, NaturalKeyMixin
 from tckdb.backend.app.models.common import MsgpackExt
 
 
-class Bot(Base, AuditMixin):
+class Bot(Base, AuditMixin, NaturalKeyMixin):
     """
     A class for representing a TCKDB Bot item
 
@@ -44,9 +44,12 @@ class Bot(Base, AuditMixin):
 
         reviewer_flags (Dict[str, str])
             Backend flags to assist the review process (not a user input)
+        natural_key_hash (str)
+            The hash of the normalized natural key, used for deduplication (not a user input)
     """
 
     __tablename__ = "bot"
+    __natural_key__ = ("name", "version", "url", "git_hash", "git_branch")
 
     id = Column(Integer, primary_key=True, index=True, nullable=False)
     name = Column(String(100), unique=True, nullable=False)
@@ -5,7 +5,8 @@ TCKDB backend app models common module
 import json
 import msgpack
 import numpy as np
-from typing import Any
+import zlib
+from typing import Any, Optional
 
 from pydantic.json import pydantic_encoder
 from sqlalchemy.dialects.postgresql import BYTEA
@@ -87,14 +88,7 @@ def msgpackext_encode(obj: Any) -> Any:
 
     if isinstance(obj, np.ndarray):
         if obj.shape:
-            data = {
-                b"_nd_": True,
-                b"dtype": obj.dtype.str,
-                b"data": np.ascontiguousarray(obj).tobytes(),
-            }
-            if len(obj.shape) > 1:
-                data[b"shape"] = obj.shape
-            return data
+            return _encode_array(obj)
         else:
             # Converts np.array(5) -> 5
             return obj.tolist()
@@ -112,9 +106,15 @@ def msgpackext_decode(obj: Any) -> Any:
         Any: The decoded form of the object.
     """
     if b"_nd_" in obj:
-        arr = np.frombuffer(obj[b"data"], dtype=obj[b"dtype"])
+        data = obj[b"data"]
+        if obj.get(b"codec") == "zlib":
+            data = zlib.decompress(data)
+        arr = np.frombuffer(data, dtype=obj[b"dtype"])
         if b"shape" in obj:
             arr.shape = obj[b"shape"]
+        if b"lengths" in obj:
+            # A ragged array (e.g., a lower triangular matrix): views of rows of a single buffer
+            return np.split(arr, np.cumsum(obj[b"lengths"])[:-1])
         return arr
     return obj
 
@@ -146,6 +146,94 @@ def msgpackext_loads(data: bytes) -> Any:
     return msgpack.loads(data, object_hook=msgpackext_decode, raw=False)
 
 
+def msgpackext_pack_arrays(obj: Any, compress_threshold: Optional[int] = None) -> Any:
+    """
+    Converts the numeric nested lists of an object into encoded contiguous NumPy arrays.
+    Rectangular lists with at least one float are stored as a single float64 array,
+    and lists of float rows of different lengths (e.g., a lower triangular matrix) are stored as one
+    flat array with the row lengths. Dictionaries and other lists are traversed, all other values are kept as is.
+
+    Args:
+        obj (Any): A JSON-like object.
+        compress_threshold (int, optional): The array size in bytes from which array data is zlib compressed.
+                                            ``None`` to never compress.
+
+    Returns:
+        Any: The object with its numeric lists replaced by encoded arrays.
+    """
+    if isinstance(obj, dict):
+        return {
+            key: msgpackext_pack_arrays(value, compress_threshold)
+            for key, value in obj.items()
+        }
+    if isinstance(obj, np.ndarray):
+        return _encode_array(obj, compress_threshold) if obj.shape else obj.tolist()
+    if not isinstance(obj, (list, tuple)) or not obj:
+        return obj
+    try:
+        arr = np.asarray(obj)
+    except ValueError:
+        rows = _ragged_float_rows(obj)
+        if rows is not None:
+            data = _encode_array(np.concatenate(rows), compress_threshold)
+            data[b"lengths"] = [len(row) for row in rows]
+            return data
+    else:
+        if arr.dtype.kind == "f":
+            return _encode_array(arr.astype(np.float64, copy=False), compress_threshold)
+    return [msgpackext_pack_arrays(item, compress_threshold) for item in obj]
+
+
+def _ragged_float_rows(obj: list) -> Optional[list]:
+    """
+    Converts a list of numeric rows of different lengths into float64 arrays.
+
+    Args:
+        obj (list): The ragged list.
+
+    Returns:
+        Optional[list]: The rows, or ``None`` if ``obj`` is not a list of one dimensional numeric rows with a float.
+    """
+    rows = list()
+    for row in obj:
+        if not isinstance(row, (list, tuple, np.ndarray)):
+            return None
+        try:
+            row = np.asarray(row)
+        except ValueError:
+            return None
+        if row.ndim != 1 or row.dtype.kind not in "iuf":
+            return None
+        rows.append(row)
+    if not any(row.dtype.kind == "f" for row in rows):
+        return None
+    return [row.astype(np.float64, copy=False) for row in rows]
+
+
+def _encode_array(arr: np.ndarray, compress_threshold: Optional[int] = None) -> dict:
+    """
+    Encodes a NumPy array as a dtype, a shape and a raw (optionally zlib compressed) buffer.
+
+    Args:
+        arr (np.ndarray): The array.
+        compress_threshold (int, optional): The array size in bytes from which the data is compressed.
+
+    Returns:
+        dict: The msgpack compatible form of the array, as decoded by ``msgpackext_decode``.
+    """
+    data = {
+        b"_nd_": True,
+        b"dtype": arr.dtype.str,
+        b"data": np.ascontiguousarray(arr).tobytes(),
+    }
+    if len(arr.shape) > 1:
+        data[b"shape"] = arr.shape
+    if compress_threshold is not None and arr.nbytes >= compress_threshold:
+        data[b"data"] = zlib.compress(data[b"data"])
+        data[b"codec"] = "zlib"
+    return data
+
+
 class MsgpackExt(TypeDecorator):
     """
     Converts JSON-like data to msgpack with full NumPy Array support.
@@ -170,3 +258,33 @@ class MsgpackExt(TypeDecorator):
             return value
         else:
             return msgpackext_loads(value)
+
+
+class MsgpackNDArrayExt(MsgpackExt):
+    """
+    Converts JSON-like data with numeric arrays to msgpack, storing the arrays as typed contiguous buffers.
+    Numeric nested lists (e.g., a Hessian, normal modes, or scan energies and trajectories)
+    are stored as a single float64 buffer with their shape instead of element by element,
+    and are loaded back as read-only ``np.ndarray`` views of that buffer without creating a Python object per element.
+    Rows of ragged arrays (e.g., a lower triangular Hessian) are loaded as a list of views of one buffer.
+    Values written with ``MsgpackExt`` are read as before.
+    """
+
+    cache_ok = True
+
+    def __init__(self, compress_threshold: Optional[int] = None, *args, **kwargs):
+        """
+        Args:
+            compress_threshold (int, optional): The array size in bytes from which array data is zlib compressed.
+                                                ``None`` (default) to never compress.
+        """
+        super().__init__(*args, **kwargs)
+        self.compress_threshold = compress_threshold
+
+    def process_bind_param(self, value, dialect):
+        """
+        Receive a bound parameter value to be converted.
+        """
+        if value is None:
+            return value
+        return msgpackext_dumps(msgpackext_pack_arrays(value, self.compress_threshold))
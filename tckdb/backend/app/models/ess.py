@@ -4,11 +4,11 @@ TCKDB backend app models electronic structure software (ess) module
 
 from sqlalchemy import Column, Integer, String, UniqueConstraint
 
-from tckdb.backend.app.db.base_class import Base
+from tckdb.backend.app.db.base_class import Base, NaturalKeyMixin
 from tckdb.backend.app.models.common import MsgpackExt
 
 
-class ESS(Base):
+class ESS(Base, NaturalKeyMixin):
     """
     A class for representing a TCKDB ESS item
 
@@ -55,9 +55,11 @@ class ESS(Base):
             A One to Many relationship between ESS and NonPhysicalSpecies.
 
         reviewer_flags (Dict[str, str]): Backend flags to assist the review process (not a user input).
+        natural_key_hash (str): The hash of the normalized natural key, used for deduplication (not a user input).
     """
 
     __tablename__ = "ess"
+    __natural_key__ = ("name", "version", "revision", "url")
 
     id = Column(Integer, primary_key=True, index=True, nullable=False)
     name = Column(String(100), nullable=False)
@@ -0,0 +1,84 @@
+"""
+TCKDB backend app models fingerprint module
+"""
+
+from sqlalchemy import (
+    CheckConstraint,
+    Column,
+    ForeignKey,
+    Index,
+    Integer,
+    SmallInteger,
+    String,
+)
+from sqlalchemy.dialects.postgresql import BIT
+
+from tckdb.backend.app.conversions.fingerprints import FINGERPRINT_SIZE
+from tckdb.backend.app.db.base_class import Base
+
+
+class SpeciesFingerprint(Base):
+    """
+    A class for representing the chemical search fingerprints of a TCKDB Species or NonPhysicalSpecies
+    (a sidecar table of the species tables, maintained by ``services.search_service``)
+
+    Attributes:
+        id (int)
+            The primary key.
+        species_id (Optional[int])
+            The :ref:`Species table <species_model>` key, if the fingerprints describe a species.
+        np_species_id (Optional[int])
+            The NonPhysicalSpecies table key, if the fingerprints describe a non-physical species.
+            Exactly one of ``species_id`` and ``np_species_id`` is set.
+        smiles (str)
+            The SMILES descriptor of the species, used to confirm substructure matches.
+        morgan (str)
+            The Morgan fingerprint (bit string), used for similarity queries.
+        morgan_count (int)
+            The number of bits set in ``morgan``, which bounds the attainable Tanimoto similarity.
+        pattern (str)
+            The pattern fingerprint (bit string), used to screen substructure queries.
+        pattern_count (int)
+            The number of bits set in ``pattern``.
+        version (str)
+            The fingerprint parameters the row was computed with.
+    """
+
+    __tablename__ = "speciesfingerprint"
+    __table_args__ = (
+        CheckConstraint(
+            "(species_id IS NULL) <> (np_species_id IS NULL)",
+            name="ck_speciesfingerprint_one_species",
+        ),
+        Index("ix_speciesfingerprint_morgan_count", "morgan_count"),
+        Index("ix_speciesfingerprint_pattern_count", "pattern_count"),
+    )
+
+    id = Column(Integer, primary_key=True, nullable=False)
+    species_id = Column(
+        Integer,
+        ForeignKey("species.id", ondelete="CASCADE"),
+        nullable=True,
+        unique=True,
+    )
+    np_species_id = Column(
+        Integer,
+        ForeignKey("nonphysicalspecies.id", ondelete="CASCADE"),
+        nullable=True,
+        unique=True,
+    )
+    smiles = Column(String(5000), nullable=False)
+    morgan = Column(BIT(FINGERPRINT_SIZE), nullable=False)
+    morgan_count = Column(SmallInteger, nullable=False)
+    pattern = Column(BIT(FINGERPRINT_SIZE), nullable=False)
+    pattern_count = Column(SmallInteger, nullable=False)
+    version = Column(String(50), nullable=False)
+
+    def __repr__(self) -> str:
+        """
+        A string representation of the object.
+        """
+        return (
+            f"<{self.__class__.__name__}(id={self.id}, species_id={self.species_id}, "
+            f"np_species_id={self.np_species_id}, smiles='{self.smiles}')>"
+        )
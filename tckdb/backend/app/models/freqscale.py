@@ -4,11 +4,11 @@ TCKDB backend app models frequencies (freq) module
 
 from sqlalchemy import Column, Float, ForeignKey, Integer, String
 
-from tckdb.backend.app.db.base_class import Base
+from tckdb.backend.app.db.base_class import Base, NaturalKeyMixin
 from tckdb.backend.app.models.common import MsgpackExt
 
 
-class FreqScale(Base):
+class FreqScale(Base, NaturalKeyMixin):
     """
     A class for representing a TCKDB Freq item (frequency scaling factor)
 
@@ -32,9 +32,12 @@ class FreqScale(Base):
             The source for the determine frequency scaling factor.
         reviewer_flags (Dict[str, str])
             Backend flags to assist the review process (not a user input).
+        natural_key_hash (str)
+            The hash of the natural key (the level of theory), used for deduplication (not a user input).
     """
 
     __tablename__ = "freqscale"
+    __natural_key__ = ("level_id",)
 
     id = Column(Integer, primary_key=True, index=True, nullable=False)
     factor = Column(Float(), nullable=False)
@@ -5,11 +5,11 @@ TCKDB backend app models level of theory module
 from sqlalchemy import Column, Integer, String
 from sqlalchemy.orm import relationship
 
-from tckdb.backend.app.db.base_class import Base
+from tckdb.backend.app.db.base_class import Base, NaturalKeyMixin
 from tckdb.backend.app.models.common import MsgpackExt
 
 
-class Level(Base):
+class Level(Base, NaturalKeyMixin):
     """
     A class for representing a TCKDB Level item
 
@@ -82,9 +82,22 @@ class Level(Base):
 
         reviewer_flags (Dict[str, str])
             Backend flags to assist the review process (not a user input)
+        natural_key_hash (str)
+            The hash of the normalized natural key, used for deduplication (not a user input)
     """
 
     __tablename__ = "level"
+    __natural_key__ = (
+        "method",
+        "basis",
+        "auxiliary_basis",
+        "dispersion",
+        "grid",
+        "solvent",
+        "solvation_method",
+        "solvation_description",
+        "level_arguments",
+    )
 
     id = Column(Integer, primary_key=True, index=True, nullable=False)
     method = Column(String(500), nullable=False)
@@ -11,7 +11,7 @@ from tckdb.backend.app.models.associations import (
     np_species_authors,
     np_species_reviewers,
 )
-from tckdb.backend.app.models.common import MsgpackExt
+from tckdb.backend.app.models.common import MsgpackExt, MsgpackNDArrayExt
 from tckdb.backend.app.models.species import species_as_str
 
 
@@ -276,7 +276,7 @@ class NonPhysicalSpecies(Base, AuditMixin):
 
     # TS
     is_ts = Column(Boolean, nullable=False)
-    irc_trajectories = Column(MsgpackExt, nullable=True)
+    irc_trajectories = Column(MsgpackNDArrayExt, nullable=True)
 
     # relationships - Many to One
     literature_id = Column(
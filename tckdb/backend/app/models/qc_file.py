@@ -1,6 +1,8 @@
 """Model for storing quantum chemistry calculation files."""
 
 from sqlalchemy import (
+    ARRAY,
+    BigInteger,
     Boolean,
     Column,
     ForeignKey,
@@ -10,6 +12,8 @@ from sqlalchemy import (
     Enum,
     UniqueConstraint,
     CheckConstraint,
+    DateTime,
+    func,
 )
 from sqlalchemy.orm import relationship
 from tckdb.backend.app.db.base_class import AuditMixin, Base
@@ -44,6 +48,13 @@ class QCFile(Base, AuditMixin):
     output_name = Column(String(255))
     input_file = Column(LargeBinary)
     output_file = Column(LargeBinary)
+    # Files uploaded to the chunked content store supersede the blob columns
+    input_content_id = Column(
+        Integer, ForeignKey("qc_file_content.id"), nullable=True, index=True
+    )
+    output_content_id = Column(
+        Integer, ForeignKey("qc_file_content.id"), nullable=True, index=True
+    )
     compressed = Column(Boolean, default=True, nullable=False)
     checksum = Column(String(64), nullable=False)
 
@@ -62,3 +73,39 @@ class QCFile(Base, AuditMixin):
     np_species = relationship("NonPhysicalSpecies", back_populates="qc_files")
     level = relationship("Level")
     ess = relationship("ESS")
+    input_content = relationship("QCFileContent", foreign_keys=[input_content_id])
+    output_content = relationship("QCFileContent", foreign_keys=[output_content_id])
+
+
+class QCFileContent(Base):
+    """
+    A file of the content-addressed QC file store (see ``services.qc_file_store``).
+    The file is split into content-defined chunks, each stored once under its SHA-256 and compressed with ``codec``;
+    ``chunk_hashes`` and ``chunk_sizes`` are the manifest of the file.
+    """
+
+    __tablename__ = "qc_file_content"
+
+    id = Column(Integer, primary_key=True, index=True, nullable=False)
+    sha256 = Column(String(64), nullable=False, unique=True, index=True)
+    size = Column(BigInteger, nullable=False)
+    codec = Column(String(32), nullable=False)
+    chunk_hashes = Column(ARRAY(String(64)), nullable=False)
+    chunk_sizes = Column(ARRAY(Integer), nullable=False)
+    created_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class QCFileChunk(Base):
+    """
+    A chunk of the QC file store, shared by all the files that contain it.
+    """
+
+    __tablename__ = "qc_file_chunk"
+
+    sha256 = Column(String(64), primary_key=True)
+    codec = Column(String(32), primary_key=True)
+    size = Column(Integer, nullable=False)
+    # The compressed size on disk, NULL for chunks stored before it was recorded
+    stored_size = Column(Integer, nullable=True)
@@ -2,14 +2,28 @@
 TCKDB backend app models species module
 """
 
-from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Integer, String
+import hashlib
+import json
+from collections import Counter
+from typing import Any, Dict
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+)
 from sqlalchemy.dialects.postgresql import ARRAY
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 
 from tckdb.backend.app.db.base_class import AuditMixin, Base
 from tckdb.backend.app.models.associations import species_authors, species_reviewers
-from tckdb.backend.app.models.common import MsgpackExt
+from tckdb.backend.app.models.common import MsgpackExt, MsgpackNDArrayExt
 
 
 class Species(Base, AuditMixin):
@@ -80,6 +94,11 @@ class Species(Base, AuditMixin):
     Attributes:
         id (int)
             The primary key (not a user input).
+        identity_hash (Optional[str])
+            The canonical identity hash used to detect duplicate uploads, see ``species_identity_hash``
+            (not a user input).
+        version (int)
+            The version of this species among species with the same identity, starting at 1 (not a user input).
 
         label (Optional[str])
             A free user label for the species (maximum 255 characters).
@@ -498,6 +517,15 @@ class Species(Base, AuditMixin):
     """
 
     __tablename__ = "species"
+    __table_args__ = (
+        # Concurrent uploads of the same identity cannot create the same version twice
+        Index(
+            "uq_species_identity_hash_version", "identity_hash", "version", unique=True
+        ),
+    )
+
+    # Heavy columns are deferred in groups ("geometry", "scans", "vibrational" and "extras"):
+    # they are only loaded when accessed or requested, see ``services.species_service``.
 
     id = Column(Integer, primary_key=True, index=True, nullable=False)
 
@@ -513,7 +541,11 @@ class Species(Base, AuditMixin):
     # review
     reviewed = Column(Boolean, nullable=False, default=False)
     approved = Column(Boolean, nullable=True, default=None)
-    reviewer_flags = Column(MsgpackExt, nullable=True)
+    reviewer_flags = deferred(Column(MsgpackExt, nullable=True), group="extras")
+
+    # identity and version among species with the same identity
+    identity_hash = Column(String(64), nullable=True, index=True)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     # chemical identifiers
     smiles = Column(String(5000), nullable=False)
@@ -524,38 +556,46 @@ class Species(Base, AuditMixin):
     electronic_state = Column(String(150), nullable=False)
 
     # geometry and connectivity
-    coordinates = Column(MsgpackExt, nullable=False)
-    graph = Column(String(100000), nullable=True)
+    coordinates = deferred(Column(MsgpackExt, nullable=False), group="geometry")
+    graph = deferred(Column(String(100000), nullable=True), group="geometry")
     fragments = Column(ARRAY(Integer), nullable=True)
-    fragment_orientation = Column(MsgpackExt, nullable=True)
+    fragment_orientation = deferred(Column(MsgpackExt, nullable=True), group="geometry")
     external_symmetry = Column(Integer, nullable=False)
     point_group = Column(String(6), nullable=False)
-    chirality = Column(MsgpackExt, nullable=True)
+    chirality = deferred(Column(MsgpackExt, nullable=True), group="geometry")
     conformation_method = Column(String(500), nullable=False)
     is_well = Column(Boolean, nullable=False)
     is_global_min = Column(Boolean, nullable=True)
-    global_min_geometry = Column(MsgpackExt, nullable=True)
+    global_min_geometry = deferred(Column(MsgpackExt, nullable=True), group="geometry")
 
     # TS
     is_ts = Column(Boolean, nullable=False)
-    irc_trajectories = Column(MsgpackExt, nullable=True)
+    irc_trajectories = deferred(Column(MsgpackNDArrayExt, nullable=True), group="scans")
 
     # energy
     electronic_energy = Column(Float, nullable=False)
     E0 = Column(Float, nullable=False)
-    active_space = Column(MsgpackExt, nullable=True)
+    active_space = deferred(Column(MsgpackExt, nullable=True), group="extras")
 
     # Hessian
-    hessian = Column(MsgpackExt, nullable=True)
+    hessian = deferred(Column(MsgpackNDArrayExt, nullable=True), group="vibrational")
 
     # vibrational modes
-    frequencies = Column(
-        ARRAY(Float, as_tuple=False, dimensions=1, zero_indexes=True), nullable=True
+    frequencies = deferred(
+        Column(
+            ARRAY(Float, as_tuple=False, dimensions=1, zero_indexes=True), nullable=True
+        ),
+        group="vibrational",
     )
-    scaled_projected_frequencies = Column(
-        ARRAY(Float, as_tuple=False, dimensions=1, zero_indexes=True), nullable=False
+    scaled_projected_frequencies = deferred(
+        Column(
+            ARRAY(Float, as_tuple=False, dimensions=1, zero_indexes=True), nullable=False
+        ),
+        group="vibrational",
+    )
+    normal_displacement_modes = deferred(
+        Column(MsgpackNDArrayExt, nullable=True), group="vibrational"
     )
-    normal_displacement_modes = Column(MsgpackExt, nullable=True)
     freq_scale_id = Column(
         Integer, ForeignKey("freqscale.id"), nullable=True, unique=False
     )
@@ -563,13 +603,15 @@ class Species(Base, AuditMixin):
     # rotational modes
     rigid_rotor = Column(String(50), nullable=False)
     statmech_treatment = Column(String(50), nullable=True)
-    rotational_constants = Column(MsgpackExt, nullable=True)
+    rotational_constants = deferred(
+        Column(MsgpackExt, nullable=True), group="vibrational"
+    )
 
     # torsional modes
-    torsions = Column(MsgpackExt, nullable=True)
+    torsions = deferred(Column(MsgpackNDArrayExt, nullable=True), group="scans")
 
     # conformers
-    conformers = Column(MsgpackExt, nullable=True)
+    conformers = deferred(Column(MsgpackExt, nullable=True), group="scans")
 
     # thermochemical properties
     H298 = Column(Float, nullable=False)
@@ -638,10 +680,10 @@ class Species(Base, AuditMixin):
     qc_files = relationship("QCFile", back_populates="species")
 
     # unconverged jobs
-    unconverged_jobs = Column(MsgpackExt, nullable=True)
+    unconverged_jobs = deferred(Column(MsgpackExt, nullable=True), group="extras")
 
     # misc
-    extras = Column(MsgpackExt, nullable=True)
+    extras = deferred(Column(MsgpackExt, nullable=True), group="extras")
 
     def __str__(self) -> str:
         """
@@ -673,3 +715,45 @@ def species_as_str(class_name, id, label, smiles, inchi, inchi_key):
         str_ += f", inchi_key={inchi_key}"
     str_ += ")>"
     return str_
+
+
+# The level of theory columns that are part of a species identity
+IDENTITY_LEVEL_COLUMNS = (
+    "opt_level_id",
+    "freq_level_id",
+    "scan_level_id",
+    "irc_level_id",
+    "sp_level_id",
+)
+
+
+def species_identity_hash(values: Dict[str, Any]) -> str:
+    """
+    Compute the canonical identity hash of a species from its column values.
+    Two species have the same identity if they have the same InChI Key, charge, multiplicity,
+    electronic state, levels of theory and isotopic composition.
+
+    Args:
+        values (Dict[str, Any]): The species column values (or a Species object ``__dict__``).
+
+    Returns:
+        str: The SHA-256 hex digest of the canonical identity.
+    """
+    coordinates = values.get("coordinates") or dict()
+    symbols = coordinates.get("symbols") or ()
+    isotopes = coordinates.get("isotopes") or (None,) * len(symbols)
+    composition = sorted(
+        [symbol, isotope, count]
+        for (symbol, isotope), count in Counter(zip(symbols, isotopes)).items()
+    )
+    identity = [
+        (values.get("inchi_key") or "").strip().upper(),
+        values.get("charge"),
+        values.get("multiplicity"),
+        (values.get("electronic_state") or "").strip(),
+        [values.get(column) for column in IDENTITY_LEVEL_COLUMNS],
+        composition,
+    ]
+    return hashlib.sha256(
+        json.dumps(identity, separators=(",", ":")).encode()
+    ).hexdigest()
@@ -0,0 +1,29 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class BatchJobRead(BaseModel):
+    id: int = Field(..., title="The job ID")
+    status: str = Field(
+        ..., title='The job status: "queued", "running", "succeeded" or "failed"'
+    )
+    on_duplicate: str = Field(..., title="The duplicate species policy")
+    progress: Optional[Dict[str, Any]] = Field(
+        None, title="The progress reported by the worker"
+    )
+    result: Optional[Dict[str, Any]] = Field(
+        None, title="The batch upload response, once the job succeeded"
+    )
+    error: Optional[Dict[str, Any]] = Field(None, title="The error, if the job failed")
+    attempts: int = Field(..., title="The number of times a worker claimed the job")
+    created_at: datetime = Field(..., title="The time the job was queued")
+    started_at: Optional[datetime] = Field(
+        None, title="The time a worker last claimed the job"
+    )
+    finished_at: Optional[datetime] = Field(
+        None, title="The time the job succeeded or failed"
+    )
+
+    model_config = ConfigDict(from_attributes=True)
@@ -3,11 +3,6 @@ TCKDB backend app schemas common module
 """
 
 import re
-from pathlib import Path
-
-# trunk-ignore(bandit/B404)
-import subprocess
-import sys
 from typing import Dict, List, Optional, Tuple, Union, Any
 
 import numpy as np
@@ -24,7 +19,11 @@ from rdkit.Chem.inchi import MolFromInchi
 from typing_extensions import Annotated
 
 from tckdb.backend.app.conversions.converter import inchi_from_inchi_key
-from tckdb.backend.app.utils.python_paths import MOLECULE_PYTHON
+from tckdb.backend.app.utils import geometry
+from tckdb.backend.app.utils.molecule_env_pool import (
+    MoleculeEnvError,
+    analyze_adjlist,
+)
 
 
 class Coordinates(BaseModel):
@@ -250,6 +249,7 @@ def is_valid_smiles(smiles: str) -> Tuple[bool, str]:
 def is_valid_adjlist(adjlist: str) -> Tuple[bool, str]:
     """
     Check whether a string represents a valid adjacency list.
+    The check runs on a persistent molecule_env worker.
 
     Args:
         adjlist (str): The string to be checked.
@@ -259,42 +259,20 @@ def is_valid_adjlist(adjlist: str) -> Tuple[bool, str]:
             - Whether the string represents a valid adjacency list.
             - A reason for invalidating the argument.
     """
+    if not isinstance(adjlist, str):
+        return False, f'An adjacency list must be a string, got "{type(adjlist)}".'
     try:
-        script_dir = Path(__file__).resolve().parent
-        utils_dir = script_dir.parent / "utils"
-        conversion_script = utils_dir / "molecule_env_scripts.py"
-        if not conversion_script.is_file():
-            raise FileNotFoundError(
-                f"Conversion script not found at: {conversion_script}"
-            )
-
-        cmd = [MOLECULE_PYTHON, conversion_script, "validate"]
-
-        # trunk-ignore(bandit/B603)
-        result = subprocess.run(
-            cmd, input=adjlist, text=True, capture_output=True, check=True
-        )
-
-        output = result.stdout.strip()
-        if output == "True":
-            return True, ""
-        else:
-            return False, print(
-                "Unexpected output: {output} and stderr:", file=sys.stderr
-            )
-
-    except subprocess.CalledProcessError as e:
-        error_message = e.stderr.strip()
-        if "Import Error" in error_message:
-            # RMG's molecule package is unavailable. Skip strict validation
-            # and assume the adjacency list is valid so tests can run
-            # without the optional dependency.
-            return True, ""
-        if not error_message:
-            error_message = "Unknown error occurred during validation."
-        return False, f"Validation failed: {error_message}"
-    except Exception as e:
+        analysis = analyze_adjlist(adjlist)
+    except MoleculeEnvError as e:
         return False, f"Unexpected error: {e}"
+    if analysis is None:
+        # RMG's molecule package is unavailable. Skip strict validation
+        # and assume the adjacency list is valid so tests can run
+        # without the optional dependency.
+        return True, ""
+    if analysis["valid"]:
+        return True, ""
+    return False, f"Validation failed: {analysis['error'] or 'Unknown error occurred during validation.'}"
 
 
 def check_colliding_atoms(
@@ -328,118 +306,145 @@ def check_colliding_atoms(
         coords = xyz["coords"]
         symbols = xyz["symbols"]
 
-    if len(xyz["symbols"]) == 1:
-        # monoatomic
-        return False
-    # convert Angstrom to Bohr
-    geometry = np.array(
-        [np.array(coord, np.float64) * 1.8897259886 for coord in coords]
-    )
-    qcel_out = qcel.molutil.guess_connectivity(
-        symbols=symbols, geometry=geometry, threshold=threshold
-    )
-    return bool(len(qcel_out))
+    report = geometry.validate_geometries(symbols, coords, collision_threshold=threshold)
+    return bool(report.colliding[0])
 
 
-def is_valid_coordinates(
+def coordinates_structure_error(
     xyz: Union[Coordinates, Dict[str, Any]],
     allowed_keys: Optional[List[str]] = None,
-    collision_threshold: Optional[float] = None,
-) -> Tuple[bool, str]:
+) -> str:
     """
-    Validate the coordinates of a species, whether provided as a Coordinates instance or a dictionary.
+    Check the structure of coordinates (keys and matching numbers of symbols, isotopes and coordinates),
+    without looking at the coordinates themselves.
 
     Args:
-        xyz (Union[Coordinates, Dict[str, Any]]): The coordinates to validate.
+        xyz (Union[Coordinates, Dict[str, Any]]): The coordinates to check.
         allowed_keys (Optional[List[str]]): Additional keys allowed in the coordinates dictionary.
-        collision_threshold (Optional[float]): Threshold for detecting colliding atoms.
 
     Returns:
-        Tuple[bool, str]: (True, "") if valid, otherwise (False, error_message)
+        str: An error message, empty if the structure is valid.
     """
     valid_keys = ["symbols", "isotopes", "coords"]
     allowed_keys = allowed_keys or []
 
     if isinstance(xyz, Coordinates):
-        # Validate Coordinates instance
         num_symbols = len(xyz.symbols)
         num_isotopes = len(xyz.isotopes)
         num_coords = len(xyz.coords)
-
         if num_symbols != num_isotopes or num_symbols != num_coords:
-            return (
-                False,
-                f"Got {num_symbols} symbols, {num_isotopes} isotopes, and {num_coords} coordinates in\n{xyz}",
-            )
-
-        for idx, coord in enumerate(xyz.coords):
-            if len(coord) != 3:
-                return (
-                    False,
-                    f"All atom coordinates must be of length 3, got: {coord} at index {idx}",
-                )
-
-        if collision_threshold is not None:
-            try:
-                has_collision = check_colliding_atoms(
-                    coordinates=xyz, threshold=collision_threshold
-                )
-            except TypeError as e:
-                return False, str(e)
-            if has_collision:
-                return (
-                    False,
-                    f"The coordinates have colliding atoms (at a tolerance of {collision_threshold}).",
-                )
+            return f"Got {num_symbols} symbols, {num_isotopes} isotopes, and {num_coords} coordinates in\n{xyz}"
+        return ""
 
-        return True, ""
-
-    elif isinstance(xyz, dict):
-        # Validate dictionary input
+    if isinstance(xyz, dict):
         invalid_keys = [
             key for key in xyz.keys() if key not in valid_keys + allowed_keys
         ]
         for valid_key in valid_keys:
             if valid_key not in xyz:
-                return (
-                    False,
-                    f'The "{valid_key}" key is missing from the coordinates dictionary.',
-                )
+                return f'The "{valid_key}" key is missing from the coordinates dictionary.'
         if len(invalid_keys):
-            return (
-                False,
-                f"The coordinates dictionary has the following invalid key(s): {invalid_keys}.",
-            )
+            return f"The coordinates dictionary has the following invalid key(s): {invalid_keys}."
         if len(xyz["coords"]) != len(xyz["symbols"]) or len(xyz["coords"]) != len(
             xyz["isotopes"]
         ):
             return (
-                False,
                 f'Got {len(xyz["symbols"])} symbols, {len(xyz["isotopes"])} isotopes, '
-                f'and {len(xyz["coords"])} coordinates in\n{xyz}',
+                f'and {len(xyz["coords"])} coordinates in\n{xyz}'
             )
-        for coord in xyz["coords"]:
-            if len(coord) != 3:
-                return False, f"All atom coordinates must be of length 3, got:\n{xyz}"
-        if collision_threshold is not None:
-            try:
-                has_collision = check_colliding_atoms(
-                    coordinates=xyz, threshold=collision_threshold
-                )
-            except TypeError as e:
-                return False, str(e)
-            if has_collision:
-                return (
-                    False,
-                    f"The coordinates have colliding atoms (at a tolerance of {collision_threshold}).",
-                )
-        return True, ""
+        return ""
 
-    else:
-        return (
-            False,
-            "Invalid type for coordinates. Expected Coordinates instance or dict.",
-        )
+    return "Invalid type for coordinates. Expected Coordinates instance or dict."
+
+
+def is_valid_coordinates(
+    xyz: Union[Coordinates, Dict[str, Any]],
+    allowed_keys: Optional[List[str]] = None,
+    collision_threshold: Optional[float] = None,
+) -> Tuple[bool, str]:
+    """
+    Validate the coordinates of a species, whether provided as a Coordinates instance or a dictionary.
+
+    Args:
+        xyz (Union[Coordinates, Dict[str, Any]]): The coordinates to validate.
+        allowed_keys (Optional[List[str]]): Additional keys allowed in the coordinates dictionary.
+        collision_threshold (Optional[float]): Threshold for detecting colliding atoms.
+
+    Returns:
+        Tuple[bool, str]: (True, "") if valid, otherwise (False, error_message)
+    """
+    index, err = is_valid_coordinates_batch(
+        [xyz], allowed_keys=allowed_keys, collision_threshold=collision_threshold
+    )
+    return index is None, err
+
+
+def is_valid_coordinates_batch(
+    frames: List[Union[Coordinates, Dict[str, Any]]],
+    allowed_keys: Optional[List[str]] = None,
+    collision_threshold: Optional[float] = None,
+) -> Tuple[Optional[int], str]:
+    """
+    Validate a sequence of coordinates, e.g., conformers, IRC or scan points.
+    The structure of each entry is checked individually, while the geometries of entries with the same
+    atoms are stacked and checked together (shapes and collisions) in a single vectorized pass.
+
+    Args:
+        frames (List[Union[Coordinates, Dict[str, Any]]]): The coordinates to validate.
+        allowed_keys (Optional[List[str]]): Additional keys allowed in the coordinates dictionaries.
+        collision_threshold (Optional[float]): Threshold for detecting colliding atoms.
+
+    Returns:
+        Tuple[Optional[int], str]: (None, "") if all entries are valid,
+                                   otherwise the index of the first invalid entry and an error message.
+    """
+    groups: Dict[Tuple[str, ...], List[int]] = {}
+    for index, frame in enumerate(frames):
+        err = coordinates_structure_error(frame, allowed_keys=allowed_keys)
+        if err:
+            return index, err
+        symbols = frame.symbols if isinstance(frame, Coordinates) else frame["symbols"]
+        groups.setdefault(tuple(symbols), []).append(index)
+
+    invalid = []
+    for symbols, indices in groups.items():
+        coords = [
+            frames[i].coords if isinstance(frames[i], Coordinates) else frames[i]["coords"]
+            for i in indices
+        ]
+        try:
+            report = geometry.validate_geometries(
+                symbols, coords, collision_threshold=collision_threshold
+            )
+        except ValueError:
+            # The group cannot be stacked, validate its entries one by one to locate the invalid ones
+            for i, frame_coords in zip(indices, coords):
+                try:
+                    frame_report = geometry.validate_geometries(
+                        symbols, [frame_coords], collision_threshold=collision_threshold
+                    )
+                except ValueError:
+                    invalid.append(
+                        (i, f"All atom coordinates must be of length 3, got:\n{frames[i]}")
+                    )
+                    break
+                if frame_report.colliding[0]:
+                    invalid.append((i, colliding_atoms_error(collision_threshold)))
+                    break
+            continue
+        colliding = np.flatnonzero(report.colliding)
+        if len(colliding):
+            invalid.append((indices[colliding[0]], colliding_atoms_error(collision_threshold)))
+    if invalid:
+        return min(invalid)
+    return None, ""
+
+
+def colliding_atoms_error(collision_threshold: Optional[float]) -> str:
+    """
+    The error message of coordinates with colliding atoms.
+    """
+    return f"The coordinates have colliding atoms (at a tolerance of {collision_threshold})."
 
 
 def is_valid_atom_index(
@@ -371,6 +371,7 @@ class EnCorrCreateBatch(EnCorrBase, ConnectionBase):
             raise ValueError(
                 "Isodesmic level connection ID must be provided if isodesmic reactions are specified."
             )
+        return v
 
 
 class EnCorrUpdate(EnCorrBase):
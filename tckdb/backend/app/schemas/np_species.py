@@ -18,6 +18,7 @@ from tckdb.backend.app.schemas.common import (
     is_valid_adjlist,
     is_valid_atom_index,
     is_valid_coordinates,
+    is_valid_coordinates_batch,
     is_valid_inchi,
     is_valid_inchi_key,
     is_valid_smiles,
@@ -525,14 +526,14 @@ class NonPhysicalSpeciesBase(BaseModel):
             )
         if value is not None:
             for i, traj in enumerate(value):
-                for j, frame in enumerate(traj):
+                for frame in traj:
                     converter.add_common_isotopes_to_coords(frame)
-                    is_valid, err = is_valid_coordinates(frame)
-                    if not is_valid:
-                        raise ValueError(
-                            f"Frame {j} in IRC trajectory {i}{label} is invalid:\n"
-                            f"{frame}\nReason:\n{err}"
-                        )
+                j, err = is_valid_coordinates_batch(traj)
+                if j is not None:
+                    raise ValueError(
+                        f"Frame {j} in IRC trajectory {i}{label} is invalid:\n"
+                        f"{traj[j]}\nReason:\n{err}"
+                    )
         return value
 
 
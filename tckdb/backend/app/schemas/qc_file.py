@@ -22,9 +22,22 @@ class QCFileCreate(QCFileBase):
     np_species_id: Optional[int] = None
     input_file: Optional[bytes] = None
     output_file: Optional[bytes] = None
+    input_content_id: Optional[int] = None
+    output_content_id: Optional[int] = None
 
 
 class QCFile(QCFileBase):
     id: int
+    input_content_id: Optional[int] = None
+    output_content_id: Optional[int] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class QCFileContentRead(BaseModel):
+    id: int = Field(..., title="Stored file ID")
+    sha256: str = Field(..., title="SHA-256 of the file")
+    size: int = Field(..., title="File size in bytes")
+    codec: str = Field(..., title="Chunk compression codec")
 
     model_config = ConfigDict(from_attributes=True)
@@ -468,14 +468,14 @@ class SpeciesBase(BaseModel):
             )
         if value is not None:
             for i, traj in enumerate(value):
-                for j, frame in enumerate(traj):
+                for frame in traj:
                     converter.add_common_isotopes_to_coords(frame)
-                    is_valid, err = common.is_valid_coordinates(frame)
-                    if not is_valid:
-                        raise ValueError(
-                            f"Frame {j} in IRC trajectory {i}{label} is invalid:\n"
-                            f"{frame}\nReason:\n{err}"
-                        )
+                j, err = common.is_valid_coordinates_batch(traj)
+                if j is not None:
+                    raise ValueError(
+                        f"Frame {j} in IRC trajectory {i}{label} is invalid:\n"
+                        f"{traj[j]}\nReason:\n{err}"
+                    )
         return value
 
     @field_validator("active_space")
@@ -858,15 +858,15 @@ class SpeciesBase(BaseModel):
             raise ValueError(
                 f"Either torsions or conformers must be given, got both{label}."
             )
-        for conformer in value:
-            is_valid, err = common.is_valid_coordinates(
-                conformer, allowed_keys=["energy", "degeneracy"]
+        index, err = common.is_valid_coordinates_batch(
+            value, allowed_keys=["energy", "degeneracy"]
+        )
+        if index is not None:
+            raise ValueError(
+                f"Not all conformers{label} are valid. Reason:\n{err}\n"
+                f"Got:\n{value[index]}\nin:\n{value}."
             )
-            if not is_valid:
-                raise ValueError(
-                    f"Not all conformers{label} are valid. Reason:\n{err}\n"
-                    f"Got:\n{conformer}\nin:\n{value}."
-                )
+        for conformer in value:
             if "energy" not in conformer:
                 raise ValueError(
                     f'A conformer entry in the conformers argument{label} must have an "energy" key.'
@@ -971,6 +971,8 @@ class SpeciesUpdate(SpeciesBase):
 class SpeciesRead(SpeciesBase):
 
     id: int = Field(..., title="Species ID")
+    identity_hash: Optional[str] = Field(None, title="Species identity hash")
+    version: int = Field(1, title="Version among species with the same identity")
 
     # Non-User Input
     reviewed: bool = Field(False, title="Is this species reviewed?")
@@ -1,9 +1,145 @@
+"""
+TCKDB backend app services author module
+
+Set-based resolution of literature authors.
+Authors are matched by ORCID, or case-insensitively by name through the functional index on
+``lower(first_name), lower(last_name)``, so any number of authors is resolved with one lookup
+and the missing ones are created with a single multi-row insert.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import func, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
 from tckdb.backend.app.models.author import Author as AuthorModel
 from tckdb.backend.app.schemas.author import AuthorCreate
 
 
+def normalize_author(author_data: AuthorCreate) -> Dict[str, Optional[str]]:
+    """
+    Normalize the name and ORCID of an author (surrounding and repeated whitespace is removed).
+
+    Args:
+        author_data (AuthorCreate): The author data.
+
+    Returns:
+        Dict[str, Optional[str]]: The ``first_name``, ``last_name`` and ``orcid`` column values.
+    """
+    return {
+        "first_name": " ".join(author_data.first_name.split()),
+        "last_name": " ".join(author_data.last_name.split()),
+        "orcid": author_data.orcid.strip().upper() if author_data.orcid else None,
+    }
+
+
+def _name_key(author: Dict[str, Optional[str]]) -> Tuple[str, str]:
+    return author["first_name"].lower(), author["last_name"].lower()
+
+
+def _match_authors(
+    db: Session, authors: List[Dict[str, Optional[str]]]
+) -> List[Optional[int]]:
+    """
+    Find the existing author matching each normalized author with a single query.
+    An author matches by ORCID, or by name if the existing author has no ORCID or the same one.
+    """
+    orcids = {author["orcid"] for author in authors if author["orcid"]}
+    names = {_name_key(author) for author in authors}
+    first_name = func.lower(AuthorModel.first_name)
+    last_name = func.lower(AuthorModel.last_name)
+    conditions = [tuple_(first_name, last_name).in_(names)]
+    if orcids:
+        conditions.append(AuthorModel.orcid.in_(orcids))
+    rows = db.execute(
+        select(AuthorModel.id, first_name, last_name, AuthorModel.orcid)
+        .where(or_(*conditions))
+        .order_by(AuthorModel.id)
+    ).all()
+    by_orcid = {orcid: author_id for author_id, _, _, orcid in rows if orcid}
+    by_name: Dict[Tuple[str, str], List[Tuple[int, Optional[str]]]] = dict()
+    for author_id, first, last, orcid in rows:
+        by_name.setdefault((first, last), []).append((author_id, orcid))
+
+    matches = []
+    for author in authors:
+        match = by_orcid.get(author["orcid"]) if author["orcid"] else None
+        if match is None:
+            match = next(
+                (
+                    author_id
+                    for author_id, orcid in by_name.get(_name_key(author), [])
+                    if orcid is None or author["orcid"] is None
+                ),
+                None,
+            )
+        matches.append(match)
+    return matches
+
+
+def resolve_authors(db: Session, authors_data: Sequence[AuthorCreate]) -> List[int]:
+    """
+    Get or create a list of authors with one lookup and at most one insert
+    (plus one lookup if a concurrent transaction created some of the authors meanwhile).
+    Nothing is committed.
+
+    Args:
+        db (Session): The database session.
+        authors_data (Sequence[AuthorCreate]): The authors, e.g., of all the literature entries of a batch.
+
+    Returns:
+        List[int]: The primary keys of the authors, in the order of ``authors_data``.
+
+    Raises:
+        HTTPException: If an author conflicts with an existing author of the same name and another ORCID.
+    """
+    authors = [normalize_author(author_data) for author_data in authors_data]
+    if not authors:
+        return []
+    ids = _match_authors(db, authors)
+    missing: Dict[Tuple[str, str], Dict[str, Optional[str]]] = dict()
+    for author, author_id in zip(authors, ids):
+        if author_id is None:
+            missing.setdefault(_name_key(author), author)
+    if missing:
+        inserted = db.execute(
+            insert(AuthorModel)
+            .values(list(missing.values()))
+            .on_conflict_do_nothing()
+            .returning(
+                AuthorModel.id,
+                AuthorModel.orcid,
+                AuthorModel.first_name,
+                AuthorModel.last_name,
+            )
+        ).all()
+        new_authors = {
+            (first.lower(), last.lower()): (author_id, orcid)
+            for author_id, orcid, first, last in inserted
+        }
+        for i, author in enumerate(authors):
+            new_author = new_authors.get(_name_key(author))
+            if ids[i] is None and new_author is not None:
+                if author["orcid"] in (None, new_author[1]) or new_author[1] is None:
+                    ids[i] = new_author[0]
+        if None in ids:
+            # Authors created by a concurrent transaction since the lookup
+            ids = [
+                author_id if author_id is not None else new_id
+                for author_id, new_id in zip(ids, _match_authors(db, authors))
+            ]
+    for author, author_id in zip(authors, ids):
+        if author_id is None:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Author {author['first_name']} {author['last_name']} "
+                f"conflicts with an existing author with another ORCID.",
+            )
+    return ids
+
+
 def get_or_create_author(db: Session, author_data: AuthorCreate) -> AuthorModel:
     """
     Retrieves an existing author or creates a new one if not found.
@@ -15,21 +151,4 @@ def get_or_create_author(db: Session, author_data: AuthorCreate) -> AuthorModel:
     Returns:
         AuthorModel: The retrieved or created author.
     """
-    query = db.query(AuthorModel).filter(
-        AuthorModel.first_name.ilike(author_data.first_name),
-        AuthorModel.last_name.ilike(author_data.last_name),
-    )
-    if author_data.orcid:
-        query = query.filter(AuthorModel.orcid == author_data.orcid)
-    author = query.first()
-    if author:
-        return author
-    else:
-        new_author = AuthorModel(
-            first_name=author_data.first_name,
-            last_name=author_data.last_name,
-            orcid=author_data.orcid,
-        )
-        db.add(new_author)
-        db.flush()
-        return new_author
+    return db.get(AuthorModel, resolve_authors(db, [author_data])[0])
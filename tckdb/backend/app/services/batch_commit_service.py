@@ -0,0 +1,279 @@
+"""
+TCKDB backend app services batch commit module
+
+Chunked commits of large batch uploads. The reference entities of a batch (literature, levels, ESS, bots,
+energy corrections and frequency scales) are persisted and committed first, then the species are persisted
+in chunks, each in a savepoint and committed on its own. A failing chunk (e.g., one with an invalid species)
+only rolls back its own species, and the size of every transaction is bounded by the chunk size.
+
+With an idempotency key, the outcome of every chunk is committed together with its data in a
+``batch_checkpoint`` row, locked while the chunk is persisted. Repeating the upload with the same key
+resumes it: the resolved reference entities and the committed chunks are reused, and only the
+failed or missing chunks are persisted.
+"""
+
+import hashlib
+import json
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from tckdb.backend.app.core.config import BATCH_CHECKPOINT_TTL_SECONDS
+from tckdb.backend.app.models.batch_checkpoint import BatchCheckpoint
+from tckdb.backend.app.schemas.batch import BatchUploadPayload
+from tckdb.backend.app.services.batch_service import (
+    BATCH_ENTITIES,
+    batch_stages,
+    insert_species,
+    persist_entities,
+)
+
+CHECKPOINT_TTL = timedelta(seconds=BATCH_CHECKPOINT_TTL_SECONDS)
+
+
+def batch_digest(body: Any) -> str:
+    """
+    Compute the digest of a raw batch upload payload, independent of the key order of its objects.
+
+    Args:
+        body (Any): The decoded request body.
+
+    Returns:
+        str: The hexadecimal SHA-256 of the canonical JSON of the body.
+    """
+    canonical = json.dumps(body, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def split_species_errors(
+    errors: List[Dict[str, Any]],
+) -> Tuple[Dict[int, List[Dict[str, Any]]], List[Dict[str, Any]]]:
+    """
+    Separate the errors of single species from the other validation errors of a batch.
+
+    Args:
+        errors (List[Dict[str, Any]]): The validation errors, located from the request body.
+
+    Returns:
+        Tuple[Dict[int, List[Dict[str, Any]]], List[Dict[str, Any]]]: The errors of each invalid species by index,
+                                                                      and the other errors.
+    """
+    species_errors, other_errors = {}, []
+    for error in errors:
+        loc = tuple(error["loc"])
+        if len(loc) >= 3 and loc[1] == "species" and isinstance(loc[2], int):
+            species_errors.setdefault(loc[2], []).append(error)
+        else:
+            other_errors.append(error)
+    return species_errors, other_errors
+
+
+def open_checkpoint(
+    db: Session, idempotency_key: str, digest: str, chunk_size: int, on_duplicate: str
+) -> None:
+    """
+    Create the checkpoint of an upload, unless it exists, and commit it. Expired checkpoints are deleted on the way.
+
+    Args:
+        db (Session): The database session.
+        idempotency_key (str): The idempotency key of the upload.
+        digest (str): The digest of the batch, see ``batch_digest``.
+        chunk_size (int): The number of species per chunk.
+        on_duplicate (str): The duplicate species policy.
+
+    Raises:
+        HTTPException: If the key was used for a different batch, chunk size or duplicate policy.
+    """
+    db.execute(
+        delete(BatchCheckpoint).where(
+            BatchCheckpoint.updated_at < func.now() - CHECKPOINT_TTL
+        )
+    )
+    db.execute(
+        insert(BatchCheckpoint)
+        .values(
+            idempotency_key=idempotency_key,
+            digest=digest,
+            chunk_size=chunk_size,
+            on_duplicate=on_duplicate,
+            chunks={},
+        )
+        .on_conflict_do_nothing(index_elements=[BatchCheckpoint.idempotency_key])
+    )
+    db.commit()
+    checkpoint = db.get(BatchCheckpoint, idempotency_key)
+    if (checkpoint.digest, checkpoint.chunk_size, checkpoint.on_duplicate) != (
+        digest,
+        chunk_size,
+        on_duplicate,
+    ):
+        raise HTTPException(
+            status_code=409,
+            detail=f"The idempotency key {idempotency_key!r} was used for a different "
+            "batch upload, chunk size or duplicate policy.",
+        )
+
+
+def lock_checkpoint(
+    db: Session, idempotency_key: Optional[str]
+) -> Optional[BatchCheckpoint]:
+    """
+    Lock the checkpoint of an upload until the current transaction ends,
+    so that concurrent requests with the same key persist each chunk once.
+
+    Args:
+        db (Session): The database session.
+        idempotency_key (str, optional): The idempotency key of the upload.
+
+    Returns:
+        Optional[BatchCheckpoint]: The checkpoint, or ``None`` if the upload has no idempotency key.
+    """
+    if idempotency_key is None:
+        return None
+    return db.execute(
+        select(BatchCheckpoint)
+        .where(BatchCheckpoint.idempotency_key == idempotency_key)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    ).scalar_one()
+
+
+def commit_batch_in_chunks(
+    db: Session,
+    payload: BatchUploadPayload,
+    on_duplicate: str,
+    chunk_size: int,
+    species_errors: Optional[Dict[int, List[Dict[str, Any]]]] = None,
+    idempotency_key: Optional[str] = None,
+    digest: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Persist a batch upload in chunks of species, committing each chunk on its own.
+
+    Args:
+        db (Session): The database session.
+        payload (BatchUploadPayload): The validated payload, whose invalid species are ``None``.
+        on_duplicate (str): The duplicate species policy, see ``batch_service.insert_species``.
+        chunk_size (int): The number of species per chunk.
+        species_errors (Dict[int, List[Dict[str, Any]]], optional): The validation errors of the invalid species
+                                                                    by index, their chunks fail.
+        idempotency_key (str, optional): Checkpoint the upload under this key, to resume it later.
+        digest (str, optional): The digest of the batch, required with an idempotency key.
+
+    Returns:
+        Dict[str, Any]: The outcome of each chunk, and the ID and status of each species
+                        (``{"id": None, "status": "failed"}`` for the species of failed chunks).
+
+    Raises:
+        HTTPException: If the connection IDs of the batch are invalid, the reference entities cannot be persisted,
+                       or the idempotency key was used for a different upload.
+    """
+    species = payload.species or []
+    species_errors = species_errors or {}
+    entities = {entity: getattr(payload, entity) or [] for entity in BATCH_ENTITIES}
+    # The references of all valid species are checked before anything is written
+    entities["species"] = [
+        species_data for species_data in species if species_data is not None
+    ]
+    batch_stages(entities, {})
+    if idempotency_key is not None:
+        open_checkpoint(db, idempotency_key, digest, chunk_size, on_duplicate)
+
+    # 1. Process the reference entities
+    checkpoint = lock_checkpoint(db, idempotency_key)
+    if checkpoint is not None and checkpoint.connections is not None:
+        temp_id_map = dict(checkpoint.connections)
+    else:
+        temp_id_map = {}
+        try:
+            with db.begin_nested():
+                persist_entities(db, {**entities, "species": []}, temp_id_map)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=500, detail=f"Internal Server Error: {e}"
+            ) from e
+        if checkpoint is not None:
+            checkpoint.connections = temp_id_map
+    db.commit()
+
+    # 2. Process the species chunks
+    chunks, created_species = [], []
+    for index, start in enumerate(range(0, len(species), chunk_size)):
+        chunk = species[start : start + chunk_size]
+        checkpoint = lock_checkpoint(db, idempotency_key)
+        result = checkpoint.chunks.get(str(index)) if checkpoint is not None else None
+        if result is not None and result["status"] == "committed":
+            result = {**result, "resumed": True}
+        else:
+            result = persist_species_chunk(
+                db, chunk, start, species_errors, temp_id_map, on_duplicate
+            )
+            result["chunk"] = index
+            if checkpoint is not None:
+                checkpoint.chunks = {**checkpoint.chunks, str(index): result}
+        db.commit()
+        db.expunge_all()
+        if result["status"] == "committed":
+            created_species += result["species"]
+        else:
+            created_species += [{"id": None, "status": "failed"}] * len(chunk)
+        chunks.append({key: value for key, value in result.items() if key != "species"})
+
+    failed = sum(result["status"] == "failed" for result in chunks)
+    detail = "Batch upload partially committed." if failed else "Batch upload successful."
+    return {
+        "detail": detail,
+        "chunks": chunks,
+        "failed_chunks": failed,
+        "species": created_species,
+    }
+
+
+def persist_species_chunk(
+    db: Session,
+    chunk: List[Any],
+    start: int,
+    species_errors: Dict[int, List[Dict[str, Any]]],
+    temp_id_map: Dict[str, int],
+    on_duplicate: str,
+) -> Dict[str, Any]:
+    """
+    Persist a chunk of species in a savepoint, rolled back if the chunk fails. Nothing is committed.
+
+    Args:
+        db (Session): The database session.
+        chunk (List[Any]): The validated species of the chunk, ``None`` for the invalid ones.
+        start (int): The index of the first species of the chunk in the batch.
+        species_errors (Dict[int, List[Dict[str, Any]]]): The validation errors of the invalid species by index.
+        temp_id_map (Dict[str, int]): The connection ID to primary key map.
+        on_duplicate (str): The duplicate species policy.
+
+    Returns:
+        Dict[str, Any]: The outcome of the chunk: its range and status, with the ID and status of each species
+                        if it was committed, or the errors if it failed.
+    """
+    result = {"start": start, "stop": start + len(chunk)}
+    invalid = {
+        index: [
+            {key: error[key] for key in ("type", "loc", "msg") if key in error}
+            for error in species_errors[index]
+        ]
+        for index in range(start, start + len(chunk))
+        if index in species_errors
+    }
+    if invalid:
+        return {**result, "status": "failed", "errors": invalid}
+    try:
+        with db.begin_nested():
+            created = insert_species(db, chunk, temp_id_map, on_duplicate)
+    except HTTPException as he:
+        return {**result, "status": "failed", "errors": he.detail}
+    except Exception as e:
+        return {**result, "status": "failed", "errors": f"Internal Server Error: {e}"}
+    return {**result, "status": "committed", "species": created}
@@ -0,0 +1,435 @@
+"""
+TCKDB backend app services batch job module
+
+Queued batch uploads. The API only stores the raw payload as a ``batch_job`` row and returns its ID;
+worker processes claim queued jobs with ``SELECT ... FOR UPDATE SKIP LOCKED``, so that concurrent
+workers never block on or claim the same job, then derive the descriptors, validate and persist the payload.
+
+A job's data and its final status are committed in a single transaction, while progress is reported
+through a separate session. Every report extends the lease of the job; a running job whose lease expired
+(e.g., its worker was killed) is claimed again, until it has been claimed ``BATCH_JOB_MAX_ATTEMPTS`` times.
+A claim is identified by the worker and the attempt number: a worker whose job was claimed again
+can neither extend the lease nor commit its data or the job status.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import socket
+import threading
+from datetime import timedelta
+from multiprocessing.synchronize import Event
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from tckdb.backend.app.conversions.descriptor_resolver import resolve_descriptors
+from tckdb.backend.app.core.config import (
+    BATCH_JOB_LEASE_SECONDS,
+    BATCH_JOB_MAX_ATTEMPTS,
+    BATCH_JOB_POLL_INTERVAL,
+    BATCH_JOB_PROGRESS_CHUNK_SIZE,
+    BATCH_JOB_WORKERS,
+)
+from tckdb.backend.app.db.session import SessionLocal
+from tckdb.backend.app.models.batch_job import BatchJob
+from tckdb.backend.app.schemas.batch import BatchUploadPayload
+from tckdb.backend.app.services.batch_service import DUPLICATE_POLICIES, persist_batch
+from tckdb.backend.app.services.reference_cache import (
+    start_reference_cache_listener,
+    stop_reference_cache_listener,
+)
+
+LEASE = timedelta(seconds=BATCH_JOB_LEASE_SECONDS)
+
+
+def enqueue_batch_job(db: Session, payload: Any, on_duplicate: str) -> BatchJob:
+    """
+    Queue a batch upload and commit it.
+
+    Args:
+        db (Session): The database session.
+        payload (Any): The raw batch upload payload.
+        on_duplicate (str): The duplicate species policy.
+
+    Returns:
+        BatchJob: The queued job.
+
+    Raises:
+        HTTPException: If the payload is not a JSON object or the policy is invalid.
+    """
+    if not isinstance(payload, dict):
+        raise HTTPException(
+            status_code=400, detail="The batch upload payload must be a JSON object."
+        )
+    if on_duplicate not in DUPLICATE_POLICIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid duplicate policy {on_duplicate!r}, "
+            f"expected one of {DUPLICATE_POLICIES}",
+        )
+    job = BatchJob(
+        status="queued", payload=payload, on_duplicate=on_duplicate, attempts=0
+    )
+    db.add(job)
+    db.commit()
+    return job
+
+
+def get_batch_job(db: Session, job_id: int) -> BatchJob:
+    """
+    Get a batch job by its ID.
+
+    Args:
+        db (Session): The database session.
+        job_id (int): The job ID.
+
+    Returns:
+        BatchJob: The job.
+
+    Raises:
+        HTTPException: If the job does not exist.
+    """
+    job = db.get(BatchJob, job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=404, detail=f"Batch job with ID {job_id} not found."
+        )
+    return job
+
+
+def claim_batch_job(db: Session, worker: str) -> Optional[BatchJob]:
+    """
+    Claim the oldest queued job, or a running job whose lease expired, and commit the claim.
+    Rows locked by other workers are skipped rather than waited for.
+    Jobs claimed ``BATCH_JOB_MAX_ATTEMPTS`` times already are marked as failed instead.
+
+    Args:
+        db (Session): The database session.
+        worker (str): The name of the worker.
+
+    Returns:
+        Optional[BatchJob]: The claimed job, or ``None`` if there is no job to run.
+    """
+    while True:
+        job = db.execute(
+            select(BatchJob)
+            .where(
+                or_(
+                    BatchJob.status == "queued",
+                    and_(
+                        BatchJob.status == "running",
+                        BatchJob.lease_expires_at < func.now(),
+                    ),
+                )
+            )
+            .order_by(BatchJob.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .execution_options(populate_existing=True)
+        ).scalar_one_or_none()
+        if job is None:
+            db.commit()
+            return None
+        if job.attempts >= BATCH_JOB_MAX_ATTEMPTS:
+            job.status = "failed"
+            job.error = {"detail": f"The job was abandoned {job.attempts} times."}
+            job.finished_at = func.now()
+            db.commit()
+            continue
+        job.status = "running"
+        job.attempts += 1
+        job.worker = worker
+        job.started_at = func.now()
+        job.lease_expires_at = func.now() + LEASE
+        db.commit()
+        db.refresh(job)
+        return job
+
+
+class ClaimLostError(Exception):
+    """
+    Raised when a worker no longer holds the claim of its job, i.e., the job was claimed again after its lease expired.
+    """
+
+
+def claimed_by(job_id: int, worker: str, attempts: int):
+    """
+    The condition that a job is still running under a claim.
+
+    Args:
+        job_id (int): The job ID.
+        worker (str): The name of the worker that claimed the job.
+        attempts (int): The attempt number of the claim.
+
+    Returns:
+        The SQL condition.
+    """
+    return and_(
+        BatchJob.id == job_id,
+        BatchJob.status == "running",
+        BatchJob.worker == worker,
+        BatchJob.attempts == attempts,
+    )
+
+
+def lock_claim(db: Session, job_id: int, worker: str, attempts: int) -> None:
+    """
+    Lock a job until the current transaction ends, and check that the claim is still held,
+    so that the job cannot be claimed again before its data and status are committed.
+
+    Args:
+        db (Session): The database session.
+        job_id (int): The job ID.
+        worker (str): The name of the worker that claimed the job.
+        attempts (int): The attempt number of the claim.
+
+    Raises:
+        ClaimLostError: If the job was claimed again.
+    """
+    held = db.execute(
+        select(BatchJob.id)
+        .where(claimed_by(job_id, worker, attempts))
+        .with_for_update()
+    ).scalar_one_or_none()
+    if held is None:
+        raise ClaimLostError(f"Batch job {job_id} was claimed again.")
+
+
+def report_progress(
+    db: Session,
+    job_id: int,
+    worker: str,
+    attempts: int,
+    progress: Dict[str, Any],
+    commit: bool = True,
+) -> None:
+    """
+    Record the progress of a running job and extend its lease, if the claim is still held.
+
+    Args:
+        db (Session): A session that is not used to persist the job data.
+        job_id (int): The job ID.
+        worker (str): The name of the worker that claimed the job.
+        attempts (int): The attempt number of the claim.
+        progress (Dict[str, Any]): The progress.
+        commit (bool, optional): Whether to commit the report.
+
+    Raises:
+        ClaimLostError: If the job was claimed again, in which case nothing is recorded.
+    """
+    reported = db.execute(
+        update(BatchJob)
+        .where(claimed_by(job_id, worker, attempts))
+        .values(progress=progress, lease_expires_at=func.now() + LEASE)
+    ).rowcount
+    if commit:
+        db.commit()
+    if not reported:
+        raise ClaimLostError(f"Batch job {job_id} was claimed again.")
+
+
+def run_batch_job(
+    db: Session, job: BatchJob, progress_db: Optional[Session] = None
+) -> None:
+    """
+    Run a claimed job: derive the missing species descriptors, validate and persist the payload,
+    and commit the data together with the job status.
+    The data is persisted in a savepoint, which is rolled back if the job fails,
+    or if the job was claimed again by another worker since its lease expired.
+
+    Args:
+        db (Session): The database session.
+        job (BatchJob): The claimed job.
+        progress_db (Session, optional): A separate session to report progress through while the job runs.
+                                         Without it, progress is only visible once the job is committed.
+    """
+    job_id, worker, attempts = job.id, job.worker, job.attempts
+
+    def on_progress(progress: Dict[str, Any]) -> None:
+        if progress_db is not None:
+            report_progress(progress_db, job_id, worker, attempts, progress)
+        else:
+            report_progress(db, job_id, worker, attempts, progress, commit=False)
+
+    try:
+        body = job.payload
+        if isinstance(body.get("species"), list):
+            asyncio.run(resolve_descriptors(body["species"]))
+        on_progress({"stage": "validating"})
+        payload = BatchUploadPayload.model_validate(body)
+        on_progress({"stage": "persisting"})
+        with db.begin_nested():
+            species = persist_batch(
+                db,
+                payload,
+                job.on_duplicate,
+                chunk_size=BATCH_JOB_PROGRESS_CHUNK_SIZE,
+                on_progress=lambda progress: on_progress(
+                    {"stage": "persisting", **progress}
+                ),
+            )
+            # Fence out this worker if its lease expired meanwhile, before its data is committed
+            lock_claim(db, job_id, worker, attempts)
+    except ClaimLostError as e:
+        print(f"Batch job worker {worker}: {e}")
+        return
+    except ValidationError as e:
+        error = e.errors(include_url=False, include_context=False)
+    except HTTPException as he:
+        error = he.detail
+    except Exception as e:
+        error = f"Internal Server Error: {e}"
+    else:
+        finish_batch_job(
+            db,
+            job_id,
+            worker,
+            attempts,
+            "succeeded",
+            result={"detail": "Batch upload successful.", "species": species},
+        )
+        return
+    finish_batch_job(db, job_id, worker, attempts, "failed", error={"detail": error})
+
+
+def finish_batch_job(
+    db: Session,
+    job_id: int,
+    worker: str,
+    attempts: int,
+    status: str,
+    result: Optional[Dict[str, Any]] = None,
+    error: Optional[Dict[str, Any]] = None,
+) -> bool:
+    """
+    Record the outcome of a job and commit it, with the job data if it succeeded.
+    If the job was claimed again meanwhile, the transaction is rolled back instead.
+
+    Args:
+        db (Session): The database session of the job.
+        job_id (int): The job ID.
+        worker (str): The name of the worker that claimed the job.
+        attempts (int): The attempt number of the claim.
+        status (str): "succeeded" or "failed".
+        result (Dict[str, Any], optional): The result of a successful job.
+        error (Dict[str, Any], optional): The error of a failed job.
+
+    Returns:
+        bool: Whether the outcome was committed.
+    """
+    finished = db.execute(
+        update(BatchJob)
+        .where(claimed_by(job_id, worker, attempts))
+        .values(
+            status=status,
+            result=result,
+            error=error,
+            lease_expires_at=None,
+            finished_at=func.now(),
+        )
+    ).rowcount
+    if not finished:
+        db.rollback()
+        return False
+    db.commit()
+    return True
+
+
+def run_next_batch_job(
+    db: Session, worker: str, progress_db: Optional[Session] = None
+) -> Optional[int]:
+    """
+    Claim and run the next job, if any.
+
+    Args:
+        db (Session): The database session.
+        worker (str): The name of the worker.
+        progress_db (Session, optional): A separate session to report progress through.
+
+    Returns:
+        Optional[int]: The ID of the job that was run, or ``None`` if the queue is empty.
+    """
+    job = claim_batch_job(db, worker)
+    if job is None:
+        return None
+    job_id = job.id
+    run_batch_job(db, job, progress_db)
+    return job_id
+
+
+def batch_job_worker(stop: Event, name: str) -> None:
+    """
+    The main loop of a batch job worker process: run jobs until stopped, polling while the queue is empty.
+    The worker resolves references through its own process-wide reference cache, so it listens to the
+    reference notifications itself to invalidate the rows updated or deleted by other processes.
+
+    Args:
+        stop (Event): Set to stop the worker once its current job is done.
+        name (str): The name of the worker.
+    """
+    start_reference_cache_listener()
+    try:
+        while not stop.is_set():
+            with SessionLocal() as db, SessionLocal() as progress_db:
+                try:
+                    job_id = run_next_batch_job(db, name, progress_db)
+                except Exception as e:
+                    print(f"Batch job worker {name} error: {e}")
+                    job_id = None
+            if job_id is None:
+                stop.wait(BATCH_JOB_POLL_INTERVAL)
+    finally:
+        stop_reference_cache_listener()
+
+
+_workers: List[multiprocessing.Process] = []
+_stop: Optional[Event] = None
+_workers_lock = threading.Lock()
+
+
+def start_batch_job_workers(count: int = BATCH_JOB_WORKERS) -> None:
+    """
+    Start the batch job worker processes. Workers are spawned rather than forked,
+    so they do not share the database connections of the API process.
+
+    Args:
+        count (int, optional): The number of workers.
+    """
+    global _stop
+    context = multiprocessing.get_context("spawn")
+    with _workers_lock:
+        if _workers or count < 1:
+            return
+        _stop = context.Event()
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        for i in range(count):
+            process = context.Process(
+                target=batch_job_worker,
+                args=(_stop, f"{prefix}:batch-job-{i}"),
+                name=f"batch-job-{i}",
+                daemon=True,
+            )
+            process.start()
+            _workers.append(process)
+
+
+def stop_batch_job_workers(timeout: float = 30) -> None:
+    """
+    Stop the batch job worker processes, waiting for their current jobs.
+    Workers still running after the timeout are terminated; their jobs are claimed again once their lease expires.
+
+    Args:
+        timeout (float, optional): The number of seconds to wait for each worker.
+    """
+    with _workers_lock:
+        if _stop is not None:
+            _stop.set()
+        for process in _workers:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        _workers.clear()
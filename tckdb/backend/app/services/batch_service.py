@@ -0,0 +1,706 @@
+"""
+TCKDB backend app services batch module
+
+Set-based resolution of the entities in a batch upload payload.
+Every entity class is resolved with a constant number of statements per table
+(one VALUES-joined lookup and one multi-row ``INSERT ... RETURNING``),
+so the cost of an upload grows with the number of tables rather than the number of rows.
+
+Entity classes are persisted in the stages of a dependency graph built from the connection IDs
+the items of the payload reference (see ``batch_stages``), so that every entity class is resolved
+exactly once, after all the entity classes it references.
+"""
+
+from graphlib import CycleError, TopologicalSorter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import and_, column, insert, inspect, select, text, update, values
+from sqlalchemy.orm import Session
+
+from tckdb.backend.app.core.config import SPECIES_DUPLICATE_POLICY
+from tckdb.backend.app.db.base_class import AuditMixin
+from tckdb.backend.app.models.audit import audit_changes, record_audit
+from tckdb.backend.app.models.bot import Bot as BotModel
+from tckdb.backend.app.models.encorr import EnCorr as EnCorrModel
+from tckdb.backend.app.models.ess import ESS as ESSModel
+from tckdb.backend.app.models.freqscale import FreqScale as FrequencyScaleModel
+from tckdb.backend.app.models.level import Level as LevelModel
+from tckdb.backend.app.models.literature import Literature as LiteratureModel
+from tckdb.backend.app.models.literatureauthor import literature_author
+from tckdb.backend.app.models.species import Species as SpeciesModel
+from tckdb.backend.app.models.species import species_identity_hash
+from tckdb.backend.app.schemas.batch import BatchUploadPayload
+from tckdb.backend.app.schemas.bot import BotCreateBatch
+from tckdb.backend.app.schemas.encorr import EnCorrCreateBatch
+from tckdb.backend.app.schemas.ess import ESSCreateBatch
+from tckdb.backend.app.schemas.freq_scale import FreqScaleCreateBatch
+from tckdb.backend.app.schemas.level import LevelCreateBatch
+from tckdb.backend.app.schemas.literature import LiteratureCreateBatch
+from tckdb.backend.app.schemas.species import SpeciesCreateBatch
+from tckdb.backend.app.services.author_service import resolve_authors
+from tckdb.backend.app.services.reference_service import (
+    get_or_create_ids,
+    get_reference,
+)
+from tckdb.backend.app.services.search_service import insert_fingerprints
+
+DUPLICATE_POLICIES = ("skip", "merge", "version")
+
+LITERATURE_KEY = ("doi", "isbn")
+
+SPECIES_CONNECTION_FIELDS = {
+    "level_connections",
+    "ess_connections",
+    "literature_connection_id",
+    "bot_connection_id",
+    "encorr_connection_id",
+    "freq_scale_connection_id",
+    "connection_id",
+}
+CALCULATION_TYPES = ("opt", "freq", "scan", "irc", "sp")
+
+# The levels of theory of an energy correction: the column, the inline level field and the connection ID field
+ENCORR_LEVELS = (
+    ("level_id", "primary_level", "primary_level_connection_id"),
+    ("isodesmic_high_level_id", "isodesmic_high_level", "isodesmic_level_connection_id"),
+)
+
+
+def bulk_get_or_create(
+    db: Session,
+    model,
+    rows: List[Dict[str, Any]],
+    key_columns: Sequence[str],
+    created: Optional[set] = None,
+) -> List[int]:
+    """
+    Resolve a list of rows against a table by their natural key, inserting the missing ones.
+    Rows are deduplicated by key before touching the database. Existing rows are found with a
+    single NULL-safe join against a VALUES list, and all missing rows are created with a single
+    multi-row ``INSERT ... RETURNING id``, audited if the model is.
+
+    Args:
+        db (Session): The database session.
+        model: The SQLAlchemy model class.
+        rows (List[Dict[str, Any]]): The column values of each row.
+        key_columns (Sequence[str]): The columns that identify a row.
+        created (set, optional): If given, the primary keys of newly inserted rows are added to it.
+
+    Returns:
+        List[int]: The primary keys of the rows, in the order of ``rows``.
+    """
+    if not rows:
+        return []
+    keys = [tuple(row.get(col) for col in key_columns) for row in rows]
+    unique_rows: Dict[Tuple, Dict[str, Any]] = {}
+    for key, row in zip(keys, rows):
+        unique_rows.setdefault(key, row)
+
+    id_map = lookup_ids(db, model, list(unique_rows.keys()), key_columns)
+    missing_keys = [key for key in unique_rows if key not in id_map]
+    if missing_keys:
+        new_ids = bulk_insert(db, model, [unique_rows[key] for key in missing_keys])
+        if issubclass(model, AuditMixin):
+            record_audit(db, model.__tablename__, new_ids, "create")
+        id_map.update(zip(missing_keys, new_ids))
+        if created is not None:
+            created.update(new_ids)
+    return [id_map[key] for key in keys]
+
+
+def lookup_ids(
+    db: Session,
+    model,
+    keys: List[Tuple],
+    key_columns: Sequence[str],
+) -> Dict[Tuple, int]:
+    """
+    Find the rows matching a list of natural keys with a single NULL-safe join against a VALUES list.
+
+    Args:
+        db (Session): The database session.
+        model: The SQLAlchemy model class.
+        keys (List[Tuple]): The natural keys, each ordered as ``key_columns``.
+        key_columns (Sequence[str]): The columns that identify a row.
+
+    Returns:
+        Dict[Tuple, int]: The primary key of the existing row for each key that was found.
+    """
+    if not keys:
+        return {}
+    table = model.__table__
+    lookup = values(
+        *[column(col, table.c[col].type) for col in key_columns], name="lookup"
+    ).data(keys)
+    stmt = select(table.c.id, *[lookup.c[col] for col in key_columns]).join(
+        lookup,
+        and_(*[table.c[col].is_not_distinct_from(lookup.c[col]) for col in key_columns]),
+    )
+    return {tuple(row[1:]): row[0] for row in db.execute(stmt)}
+
+
+def bulk_insert(db: Session, model, rows: List[Dict[str, Any]]) -> List[int]:
+    """
+    Insert rows with a single multi-row ``INSERT ... RETURNING id``.
+
+    Args:
+        db (Session): The database session.
+        model: The SQLAlchemy model class.
+        rows (List[Dict[str, Any]]): The column values of each row.
+
+    Returns:
+        List[int]: The primary keys of the new rows, in the order of ``rows``.
+    """
+    if not rows:
+        return []
+    stmt = insert(model).returning(model.id, sort_by_parameter_order=True)
+    return list(db.scalars(stmt, rows).all())
+
+
+def resolve_literature(
+    db: Session,
+    literature: Optional[List[LiteratureCreateBatch]],
+    temp_id_map: Dict[str, int],
+) -> None:
+    """
+    Get or create the literature entries of a batch and link the authors of new entries.
+
+    Args:
+        db (Session): The database session.
+        literature (List[LiteratureCreateBatch]): The literature entries.
+        temp_id_map (Dict[str, int]): The connection ID to primary key map, updated in place.
+    """
+    literature = literature or []
+    if not literature:
+        return
+    rows = [
+        item.model_dump(exclude={"connection_id", "authors"}) for item in literature
+    ]
+    created = set()
+    ids = bulk_get_or_create(db, LiteratureModel, rows, LITERATURE_KEY, created)
+
+    new_authors = []
+    for item, literature_id in zip(literature, ids):
+        temp_id_map[item.connection_id] = literature_id
+        if literature_id in created:
+            new_authors.extend(
+                (literature_id, author_data) for author_data in item.authors or []
+            )
+    author_ids = resolve_authors(db, [author_data for _, author_data in new_authors])
+    links = {
+        (literature_id, author_id)
+        for (literature_id, _), author_id in zip(new_authors, author_ids)
+    }
+    if links:
+        db.execute(
+            insert(literature_author),
+            [{"literature_id": lit_id, "author_id": a_id} for lit_id, a_id in links],
+        )
+
+
+def resolve_levels(
+    db: Session,
+    levels: Optional[List[LevelCreateBatch]],
+    temp_id_map: Dict[str, int],
+) -> None:
+    """
+    Get or create the levels of theory of a batch.
+
+    Args:
+        db (Session): The database session.
+        levels (List[LevelCreateBatch]): The levels of theory.
+        temp_id_map (Dict[str, int]): The connection ID to primary key map, updated in place.
+    """
+    _resolve_references(db, LevelModel, levels, temp_id_map)
+
+
+def resolve_bots(
+    db: Session,
+    bots: Optional[List[BotCreateBatch]],
+    temp_id_map: Dict[str, int],
+) -> None:
+    """
+    Get or create the bots of a batch.
+
+    Args:
+        db (Session): The database session.
+        bots (List[BotCreateBatch]): The bots.
+        temp_id_map (Dict[str, int]): The connection ID to primary key map, updated in place.
+    """
+    _resolve_references(db, BotModel, bots, temp_id_map)
+
+
+def resolve_ess(
+    db: Session,
+    ess: Optional[List[ESSCreateBatch]],
+    temp_id_map: Dict[str, int],
+) -> None:
+    """
+    Get or create the electronic structure software entries of a batch.
+
+    Args:
+        db (Session): The database session.
+        ess (List[ESSCreateBatch]): The ESS entries.
+        temp_id_map (Dict[str, int]): The connection ID to primary key map, updated in place.
+    """
+    _resolve_references(db, ESSModel, ess, temp_id_map)
+
+
+def resolve_freq_scales(
+    db: Session,
+    freq_scales: Optional[List[FreqScaleCreateBatch]],
+    temp_id_map: Dict[str, int],
+) -> None:
+    """
+    Get or create the frequency scaling factors of a batch.
+    A level of theory has at most one frequency scaling factor, so the level is the natural key,
+    and a factor uploaded for a level must agree with the stored (or earlier uploaded) factor and source.
+
+    Args:
+        db (Session): The database session.
+        freq_scales (List[FreqScaleCreateBatch]): The frequency scaling factors.
+        temp_id_map (Dict[str, int]): The connection ID to primary key map, updated in place.
+
+    Raises:
+        HTTPException: If a referenced level connection ID was not resolved,
+                       or the factor or source of a level differs from the stored ones.
+    """
+    freq_scales = freq_scales or []
+    rows = []
+    for freq_scale_data in freq_scales:
+        freq_level_connection = freq_scale_data.level_connection_id
+        freq_level_id = temp_id_map.get(freq_level_connection)
+        if not freq_level_id:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Level connection ID {freq_level_connection} not found for Frequency Scale Data.",
+            )
+        rows.append(
+            {
+                "level_id": freq_level_id,
+                **freq_scale_data.model_dump(
+                    exclude={"level_connection_id", "connection_id"}
+                ),
+            }
+        )
+    created = set()
+    ids = get_or_create_ids(db, FrequencyScaleModel, rows, created)
+    stored = dict()
+    for row, freq_scale_id in zip(rows, ids):
+        if freq_scale_id not in stored:
+            # A created row holds the values of the first scale uploaded for its level
+            stored[freq_scale_id] = (
+                row
+                if freq_scale_id in created
+                else get_reference(db, FrequencyScaleModel, freq_scale_id)
+            )
+        values = stored[freq_scale_id]
+        if (values["factor"], values["source"]) != (row["factor"], row["source"]):
+            raise HTTPException(
+                status_code=409,
+                detail=f"Level {row['level_id']} already has the frequency scaling factor "
+                f"{values['factor']} ({values['source']}), "
+                f"the uploaded factor {row['factor']} ({row['source']}) conflicts with it.",
+            )
+    for freq_scale_data, freq_scale_id in zip(freq_scales, ids):
+        temp_id_map[freq_scale_data.connection_id] = freq_scale_id
+
+
+def resolve_encorr(
+    db: Session,
+    encorr: Optional[List[EnCorrCreateBatch]],
+    temp_id_map: Dict[str, int],
+) -> None:
+    """
+    Create the energy corrections of a batch with a single multi-row insert.
+    The levels of theory of a correction are given either by connection ID or inline,
+    inline levels are resolved together with a single get-or-create.
+
+    Args:
+        db (Session): The database session.
+        encorr (List[EnCorrCreateBatch]): The energy corrections.
+        temp_id_map (Dict[str, int]): The connection ID to primary key map, updated in place.
+
+    Raises:
+        HTTPException: If a referenced level connection ID was not resolved.
+    """
+    encorr = encorr or []
+    if not encorr:
+        return
+    rows, inline = [], []
+    for encorr_data in encorr:
+        row = encorr_data.model_dump(
+            include={
+                "supported_elements",
+                "energy_unit",
+                "aec",
+                "bac",
+                "isodesmic_reactions",
+            }
+        )
+        for column_name, field, connection_field in ENCORR_LEVELS:
+            level_connection = getattr(encorr_data, connection_field)
+            level_data = getattr(encorr_data, field)
+            row[column_name] = None
+            if level_connection is not None:
+                if level_connection not in temp_id_map:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Level connection ID {level_connection} not found for Energy Correction Data.",
+                    )
+                row[column_name] = temp_id_map[level_connection]
+            elif level_data is not None:
+                inline.append((row, column_name, level_data.model_dump()))
+        rows.append(row)
+    level_ids = get_or_create_ids(db, LevelModel, [level for _, _, level in inline])
+    for (row, column_name, _), level_id in zip(inline, level_ids):
+        row[column_name] = level_id
+    ids = bulk_insert(db, EnCorrModel, rows)
+    for encorr_data, encorr_id in zip(encorr, ids):
+        temp_id_map[encorr_data.connection_id] = encorr_id
+
+
+def lock_identities(db: Session, identity_hashes: List[str]) -> None:
+    """
+    Lock species identities until the current transaction ends, so that concurrent uploads
+    of the same identity detect each other's species instead of both creating it.
+    The locks are taken in the order of the hashes, to avoid deadlocks between uploads.
+
+    Args:
+        db (Session): The database session.
+        identity_hashes (List[str]): The identity hashes, see ``species_identity_hash``.
+    """
+    db.execute(
+        text(
+            "SELECT pg_advisory_xact_lock(hashtext(identity_hash)) "
+            "FROM (SELECT unnest(CAST(:identity_hashes AS text[])) AS identity_hash "
+            "ORDER BY identity_hash) AS identities"
+        ),
+        {"identity_hashes": identity_hashes},
+    )
+
+
+def insert_species(
+    db: Session,
+    species: Optional[List[SpeciesCreateBatch]],
+    temp_id_map: Dict[str, int],
+    on_duplicate: str = SPECIES_DUPLICATE_POLICY,
+) -> List[Dict[str, Any]]:
+    """
+    Insert the species of a batch with a single multi-row insert, and index them for chemical search.
+    Species with the identity of an existing species (or of an earlier species in the batch)
+    are detected with a single lookup on the indexed identity hash and handled according to ``on_duplicate``:
+
+        - "skip": the existing species is kept as is and its ID is returned,
+        - "merge": the existing species is updated with the given (non-null) values and its ID is returned,
+        - "version": the species is inserted as the next version of the existing species.
+
+    Args:
+        db (Session): The database session.
+        species (List[SpeciesCreateBatch]): The species.
+        temp_id_map (Dict[str, int]): The connection ID to primary key map, updated in place.
+        on_duplicate (str, optional): The duplicate policy, "skip", "merge" or "version".
+
+    Returns:
+        List[Dict[str, Any]]: The ID and status ("created", "skipped", "merged" or "versioned")
+                              of each species, in the order of ``species``.
+    """
+    if on_duplicate not in DUPLICATE_POLICIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid duplicate policy {on_duplicate!r}, "
+            f"expected one of {DUPLICATE_POLICIES}",
+        )
+    species = species or []
+    rows = [species_row(species_data, temp_id_map) for species_data in species]
+    for row in rows:
+        row["identity_hash"] = species_identity_hash(row)
+    # The latest species of each identity: (species ID, or index in new_rows if is_new), version, is_new
+    # The last version of each identity, deleted species included since versions are unique
+    latest, last_version = dict(), dict()
+    if rows:
+        identity_hashes = sorted({row["identity_hash"] for row in rows})
+        lock_identities(db, identity_hashes)
+        existing = db.execute(
+            select(
+                SpeciesModel.identity_hash,
+                SpeciesModel.id,
+                SpeciesModel.version,
+                SpeciesModel.deleted_at.is_(None),
+            )
+            .where(SpeciesModel.identity_hash.in_(identity_hashes))
+            .order_by(SpeciesModel.identity_hash, SpeciesModel.version.desc())
+        )
+        for identity_hash, species_id, version, live in existing:
+            last_version.setdefault(identity_hash, version)
+            if live:
+                latest.setdefault(identity_hash, (species_id, version, False))
+
+    new_rows, merges, targets = [], {}, []
+    for row in rows:
+        known = latest.get(row["identity_hash"])
+        if known is None or on_duplicate == "version":
+            row["version"] = last_version.get(row["identity_hash"], 0) + 1
+            last_version[row["identity_hash"]] = row["version"]
+            latest[row["identity_hash"]] = (len(new_rows), row["version"], True)
+            targets.append((len(new_rows), True, "versioned" if known else "created"))
+            new_rows.append(row)
+            continue
+        target, _, is_new = known
+        if on_duplicate == "merge":
+            values = {key: value for key, value in row.items() if value is not None}
+            if is_new:
+                new_rows[target].update(values)
+            else:
+                merges.setdefault(target, {"id": target}).update(values)
+            targets.append((target, is_new, "merged"))
+        else:
+            targets.append((target, is_new, "skipped"))
+
+    ids = bulk_insert(db, SpeciesModel, new_rows)
+    record_audit(db, SpeciesModel.__tablename__, ids, "create")
+    if merges:
+        db.execute(update(SpeciesModel), list(merges.values()))
+        mapper, dialect = inspect(SpeciesModel), db.get_bind().dialect
+        record_audit(
+            db,
+            SpeciesModel.__tablename__,
+            list(merges),
+            "update",
+            [audit_changes(mapper, values, dialect) for values in merges.values()],
+        )
+    insert_fingerprints(db, zip(ids, (row["smiles"] for row in new_rows)))
+
+    created = []
+    for species_data, (target, is_new, status) in zip(species, targets):
+        species_id = ids[target] if is_new else target
+        temp_id_map[species_data.connection_id] = species_id
+        created.append({"id": species_id, "status": status})
+    return created
+
+
+def species_references(species_data: SpeciesCreateBatch) -> List[Optional[str]]:
+    """
+    Get the connection IDs a batch species references.
+
+    Args:
+        species_data (SpeciesCreateBatch): The species.
+
+    Returns:
+        List[Optional[str]]: The connection IDs, ``None`` for the connections that are not given.
+    """
+    references = [
+        species_data.literature_connection_id,
+        species_data.bot_connection_id,
+        species_data.encorr_connection_id,
+        species_data.freq_scale_connection_id,
+    ]
+    for connections in (species_data.level_connections, species_data.ess_connections):
+        if connections is not None:
+            references.extend(getattr(connections, calc) for calc in CALCULATION_TYPES)
+    return references
+
+
+# The resolver of each entity class of a batch, species are inserted with ``insert_species``
+BATCH_ENTITY_RESOLVERS: Dict[str, Callable[[Session, Any, Dict[str, int]], None]] = {
+    "literature": resolve_literature,
+    "levels": resolve_levels,
+    "bots": resolve_bots,
+    "ess": resolve_ess,
+    "encorr": resolve_encorr,
+    "freq_scales": resolve_freq_scales,
+}
+BATCH_ENTITIES = (*BATCH_ENTITY_RESOLVERS, "species")
+
+# The connection IDs referenced by an item, for the entity classes that reference other entities
+BATCH_ENTITY_REFERENCES: Dict[str, Callable[[Any], Iterable[Optional[str]]]] = {
+    "encorr": lambda encorr_data: (
+        encorr_data.primary_level_connection_id,
+        encorr_data.isodesmic_level_connection_id,
+    ),
+    "freq_scales": lambda freq_scale_data: (freq_scale_data.level_connection_id,),
+    "species": species_references,
+}
+
+
+def batch_stages(
+    entities: Dict[str, Sequence[Any]], temp_id_map: Dict[str, int]
+) -> List[List[str]]:
+    """
+    Order the entity classes of a batch by the connection IDs their items reference.
+    An entity class depends on the classes of all the items its items reference, and the classes
+    are grouped into stages by a topological sort of these dependencies, so that the classes of a stage
+    only depend on classes of earlier stages. Connection IDs resolved before (e.g., by an earlier chunk
+    of a streamed upload) are not dependencies, and classes without items are left out.
+
+    Args:
+        entities (Dict[str, Sequence[Any]]): The items of each entity class, see ``BATCH_ENTITIES``.
+        temp_id_map (Dict[str, int]): The connection IDs resolved so far.
+
+    Returns:
+        List[List[str]]: The stages, each a list of entity classes that do not depend on each other.
+
+    Raises:
+        HTTPException: If a referenced connection ID is unknown or used by several entity classes,
+                       or if the references form a cycle.
+    """
+    owners: Dict[str, set] = {}
+    for entity, items in entities.items():
+        for item in items or []:
+            owners.setdefault(item.connection_id, set()).add(entity)
+
+    graph = TopologicalSorter()
+    for entity, items in entities.items():
+        if not items:
+            continue
+        graph.add(entity)
+        references = BATCH_ENTITY_REFERENCES.get(entity)
+        if references is None:
+            continue
+        for item in items:
+            for connection_id in references(item):
+                if connection_id is None:
+                    continue
+                owner = owners.get(connection_id)
+                if owner is None and connection_id in temp_id_map:
+                    continue
+                if owner is None or len(owner) > 1:
+                    problem = "not found" if owner is None else "ambiguous"
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Connection ID {connection_id} referenced by {entity} "
+                        f"{item.connection_id} is {problem}.",
+                    )
+                graph.add(entity, *owner)
+
+    try:
+        graph.prepare()
+    except CycleError as e:
+        raise HTTPException(
+            status_code=400,
+            detail="The connection IDs of the batch reference each other in a cycle: "
+            + " -> ".join(e.args[1]),
+        ) from e
+    order = list(entities)
+    stages = []
+    while graph.is_active():
+        stage = sorted(graph.get_ready(), key=order.index)
+        graph.done(*stage)
+        stages.append(stage)
+    return stages
+
+
+def persist_entities(
+    db: Session,
+    entities: Dict[str, Sequence[Any]],
+    temp_id_map: Dict[str, int],
+    on_duplicate: str = SPECIES_DUPLICATE_POLICY,
+    chunk_size: Optional[int] = None,
+    on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Persist the items of a batch stage by stage (see ``batch_stages``), resolving each entity class
+    exactly once with its bulk statements. Nothing is committed.
+
+    Args:
+        db (Session): The database session.
+        entities (Dict[str, Sequence[Any]]): The validated items of each entity class, see ``BATCH_ENTITIES``.
+        temp_id_map (Dict[str, int]): The connection ID to primary key map, updated in place.
+        on_duplicate (str, optional): The duplicate species policy, see ``insert_species``.
+        chunk_size (int, optional): Insert the species in chunks of this size, all at once by default.
+        on_progress (Callable[[Dict[str, Any]], None], optional): Called with the number of species
+                                                                  persisted so far after each chunk.
+
+    Returns:
+        List[Dict[str, Any]]: The ID and status of each species, see ``insert_species``.
+    """
+    created_species = []
+    for stage in batch_stages(entities, temp_id_map):
+        # The classes of a stage are independent, but share the transaction of the session,
+        # so they are resolved one after the other
+        for entity in stage:
+            if entity != "species":
+                BATCH_ENTITY_RESOLVERS[entity](db, entities[entity], temp_id_map)
+                continue
+            species = entities["species"]
+            step = chunk_size or len(species)
+            for start in range(0, len(species), step):
+                created_species += insert_species(
+                    db, species[start : start + step], temp_id_map, on_duplicate
+                )
+                if chunk_size is not None and on_progress is not None:
+                    on_progress(
+                        {"species": len(created_species), "total": len(species)}
+                    )
+    return created_species
+
+
+def persist_batch(
+    db: Session,
+    payload: BatchUploadPayload,
+    on_duplicate: str = SPECIES_DUPLICATE_POLICY,
+    chunk_size: Optional[int] = None,
+    on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Persist a validated batch upload payload in dependency order. Nothing is committed.
+
+    Args:
+        db (Session): The database session.
+        payload (BatchUploadPayload): The payload.
+        on_duplicate (str, optional): The duplicate species policy, see ``insert_species``.
+        chunk_size (int, optional): Insert the species in chunks of this size, all at once by default.
+        on_progress (Callable[[Dict[str, Any]], None], optional): Called with the number of species
+                                                                  persisted so far after each chunk.
+
+    Returns:
+        List[Dict[str, Any]]: The ID and status of each species, see ``insert_species``.
+    """
+    entities = {entity: getattr(payload, entity) or [] for entity in BATCH_ENTITIES}
+    return persist_entities(db, entities, {}, on_duplicate, chunk_size, on_progress)
+
+
+def species_row(
+    species_data: SpeciesCreateBatch, temp_id_map: Dict[str, int]
+) -> Dict[str, Any]:
+    """
+    Convert a batch species into the column values of a Species row,
+    replacing connection IDs with the primary keys they were resolved to.
+
+    Args:
+        species_data (SpeciesCreateBatch): The species.
+        temp_id_map (Dict[str, int]): The connection ID to primary key map.
+
+    Returns:
+        Dict[str, Any]: The column values.
+    """
+    row = species_data.model_dump(exclude=SPECIES_CONNECTION_FIELDS)
+    level_connections = species_data.level_connections
+    ess_connections = species_data.ess_connections
+    for calc in CALCULATION_TYPES:
+        row[f"{calc}_level_id"] = (
+            temp_id_map.get(getattr(level_connections, calc))
+            if level_connections
+            else None
+        )
+        row[f"{calc}_ess_id"] = (
+            temp_id_map.get(getattr(ess_connections, calc)) if ess_connections else None
+        )
+    row["literature_id"] = temp_id_map.get(species_data.literature_connection_id)
+    row["bot_id"] = temp_id_map.get(species_data.bot_connection_id)
+    row["encorr_id"] = temp_id_map.get(species_data.encorr_connection_id)
+    row["freq_scale_id"] = temp_id_map.get(species_data.freq_scale_connection_id)
+    return row
+
+
+def _resolve_references(db: Session, model, items, temp_id_map) -> None:
+    """
+    Get or create the rows of a batch reference entity class and record their connection IDs.
+    """
+    items = items or []
+    rows = [item.model_dump(exclude={"connection_id"}) for item in items]
+    ids = get_or_create_ids(db, model, rows)
+    for item, item_id in zip(items, ids):
+        temp_id_map[item.connection_id] = item_id
+
@@ -0,0 +1,213 @@
+"""
+TCKDB backend app services batch stream module
+
+Chunked persistence of newline-delimited (NDJSON) batch uploads.
+Each line of the upload is a single entity record::
+
+    {"type": "levels", "data": {"connection_id": "temp_level_1", "method": "B3LYP", ...}}
+
+where ``type`` is one of the entity keys of ``BatchUploadPayload``.
+Records are buffered, validated and persisted in chunks, so only a single chunk
+of records is held in memory at any point of the upload.
+"""
+
+import json
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+from fastapi import HTTPException
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.orm import Session
+
+from tckdb.backend.app.core.config import SPECIES_DUPLICATE_POLICY
+from tckdb.backend.app.schemas.bot import BotCreateBatch
+from tckdb.backend.app.schemas.encorr import EnCorrCreateBatch
+from tckdb.backend.app.schemas.ess import ESSCreateBatch
+from tckdb.backend.app.schemas.freq_scale import FreqScaleCreateBatch
+from tckdb.backend.app.schemas.level import LevelCreateBatch
+from tckdb.backend.app.schemas.literature import LiteratureCreateBatch
+from tckdb.backend.app.schemas.species import SpeciesCreateBatch
+from tckdb.backend.app.services.batch_service import persist_entities
+from tckdb.backend.app.services.species_validation_service import validate_species
+
+# The entity types accepted by the stream, persisted within a chunk in dependency order (see ``batch_service.batch_stages``).
+# Records may only reference connection IDs of records in the same or an earlier chunk.
+STREAM_ENTITY_SCHEMAS: Dict[str, type] = {
+    "literature": LiteratureCreateBatch,
+    "levels": LevelCreateBatch,
+    "bots": BotCreateBatch,
+    "ess": ESSCreateBatch,
+    "encorr": EnCorrCreateBatch,
+    "freq_scales": FreqScaleCreateBatch,
+    "species": SpeciesCreateBatch,
+}
+
+
+async def iter_ndjson_lines(
+    byte_stream: AsyncIterator[bytes],
+) -> AsyncIterator[Tuple[int, bytes]]:
+    """
+    Split an asynchronous byte stream into lines without buffering more than one line.
+    Blank lines are skipped.
+
+    Only the newly received piece is searched for line breaks, and the pieces of a line spanning
+    several of them are joined once the line ends, so a line costs time linear in its length.
+
+    Args:
+        byte_stream (AsyncIterator[bytes]): The request body stream.
+
+    Yields:
+        Tuple[int, bytes]: The 1-based line number and the content of each non-blank line.
+    """
+    pending: List[bytes] = []
+    line_number = 0
+    async for data in byte_stream:
+        *lines, rest = data.split(b"\n")
+        if lines:
+            pending.append(lines[0])
+            lines[0] = b"".join(pending)
+            pending = []
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield line_number, line
+        if rest:
+            pending.append(rest)
+    line = b"".join(pending)
+    if line.strip():
+        yield line_number + 1, line
+
+
+def parse_record(line: bytes, line_number: int) -> Tuple[str, Dict[str, Any]]:
+    """
+    Parse a single NDJSON entity record and check its type.
+
+    Args:
+        line (bytes): The raw line.
+        line_number (int): The line number, used in error messages.
+
+    Returns:
+        Tuple[str, Dict[str, Any]]: The entity type and the raw entity data.
+
+    Raises:
+        HTTPException: If the line is not a valid record.
+    """
+    try:
+        record = json.loads(line)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400, detail=f"Line {line_number}: invalid JSON ({e})"
+        ) from e
+    if not isinstance(record, dict) or set(record) != {"type", "data"}:
+        raise HTTPException(
+            status_code=400,
+            detail=f'Line {line_number}: a record must have exactly the keys "type" and "data"',
+        )
+    entity = record["type"]
+    schema = STREAM_ENTITY_SCHEMAS.get(entity)
+    if schema is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Line {line_number}: unsupported record type {entity!r}, "
+            f"expected one of {list(STREAM_ENTITY_SCHEMAS)}",
+        )
+    return entity, record["data"]
+
+
+def new_chunk() -> Dict[str, List[Tuple[int, Dict[str, Any]]]]:
+    """
+    Create an empty chunk buffer with one list per entity type.
+
+    Returns:
+        Dict[str, List[Tuple[int, Dict[str, Any]]]]: The empty chunk.
+    """
+    return {entity: [] for entity in STREAM_ENTITY_SCHEMAS}
+
+
+def validate_chunk(
+    raw_chunk: Dict[str, List[Tuple[int, Dict[str, Any]]]],
+) -> Dict[str, List[BaseModel]]:
+    """
+    Validate the records of a chunk against their batch schemas.
+
+    Args:
+        raw_chunk (Dict[str, List[Tuple[int, Dict[str, Any]]]]): The line number and raw data of each record by entity type.
+
+    Returns:
+        Dict[str, List[BaseModel]]: The validated records by entity type.
+
+    Raises:
+        HTTPException: If a record is invalid, reporting its line number.
+    """
+    chunk = {}
+    for entity, records in raw_chunk.items():
+        schema = STREAM_ENTITY_SCHEMAS[entity]
+        chunk[entity] = []
+        for line_number, data in records:
+            try:
+                chunk[entity].append(schema.model_validate(data))
+            except ValidationError as e:
+                raise HTTPException(
+                    status_code=422,
+                    detail={
+                        "line": line_number,
+                        "type": entity,
+                        "errors": e.errors(include_url=False, include_context=False),
+                    },
+                ) from e
+    return chunk
+
+
+async def validate_species_records(
+    records: List[Tuple[int, Dict[str, Any]]],
+) -> List[SpeciesCreateBatch]:
+    """
+    Validate the species records of a chunk in parallel (see ``services.species_validation_service``).
+
+    Args:
+        records (List[Tuple[int, Dict[str, Any]]]): The line number and raw data of each species record.
+
+    Returns:
+        List[SpeciesCreateBatch]: The validated species.
+
+    Raises:
+        HTTPException: If a record is invalid, reporting the line number of the first invalid record.
+    """
+    species, errors = await validate_species([data for _, data in records])
+    if errors:
+        index = min(errors)
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "line": records[index][0],
+                "type": "species",
+                "errors": errors[index],
+            },
+        )
+    return species
+
+
+def persist_chunk(
+    db: Session,
+    chunk: Dict[str, List[BaseModel]],
+    temp_id_map: Dict[str, int],
+    on_duplicate: str = SPECIES_DUPLICATE_POLICY,
+) -> Dict[str, Any]:
+    """
+    Persist a chunk of validated records in dependency order.
+
+    Args:
+        db (Session): The database session.
+        chunk (Dict[str, List[BaseModel]]): The validated records by entity type.
+        temp_id_map (Dict[str, int]): The connection ID to primary key map, updated in place.
+        on_duplicate (str, optional): The duplicate species policy, see ``insert_species``.
+
+    Returns:
+        Dict[str, Any]: The number of records of each type and the ID and status of each species.
+    """
+    species = persist_entities(db, chunk, temp_id_map, on_duplicate)
+    # Rows are inserted with core statements; drop anything loaded so the identity map stays bounded.
+    db.expunge_all()
+    return {
+        "records": {entity: len(items) for entity, items in chunk.items() if items},
+        "species": species,
+    }
@@ -0,0 +1,221 @@
+"""
+TCKDB backend app services batch validation module
+
+Dry-run batch uploads. A dry run validates a payload without persisting it, and stores the validated
+and normalized payload (including the derived species descriptors) as a ``batch_validation`` row.
+The returned validation token references the row and is signed with ``SECRET_KEY``, which must be configured;
+committing the token persists the stored payload directly, without deriving the descriptors
+or validating the payload again.
+
+The payload is stored pickled, since rebuilding the validated models from JSON would run their validators again.
+A stored payload is only unpickled once the token signature and the digest of the stored bytes are verified.
+"""
+
+import hashlib
+import hmac
+import pickle
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from tckdb.backend.app.core.config import (
+    BATCH_VALIDATION_TTL_SECONDS,
+    SECRET_KEY,
+    SECRET_KEY_CONFIGURED,
+)
+from tckdb.backend.app.models.batch_validation import BatchValidation
+from tckdb.backend.app.schemas.batch import BatchUploadPayload
+from tckdb.backend.app.services.batch_service import BATCH_ENTITIES, batch_stages
+
+TTL = timedelta(seconds=BATCH_VALIDATION_TTL_SECONDS)
+
+
+def require_secret_key() -> None:
+    """
+    Check that ``SECRET_KEY`` is configured, since tokens signed with the random per-process fallback
+    would be rejected by the other API processes and after a restart.
+
+    Raises:
+        HTTPException: If ``SECRET_KEY`` is not configured.
+    """
+    if not SECRET_KEY_CONFIGURED:
+        raise HTTPException(
+            status_code=503,
+            detail="Dry-run batch uploads are disabled: "
+            "the SECRET_KEY setting is not configured.",
+        )
+
+
+def count_entities(body: Any) -> Dict[str, int]:
+    """
+    Count the items of each entity class of a raw batch upload payload.
+
+    Args:
+        body (Any): The raw payload.
+
+    Returns:
+        Dict[str, int]: The number of items of each entity class given as a list.
+    """
+    if not isinstance(body, dict):
+        return {}
+    return {
+        entity: len(body[entity])
+        for entity in BATCH_ENTITIES
+        if isinstance(body.get(entity), list)
+    }
+
+
+def validation_report(
+    entities: Dict[str, int], errors: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    Group the validation errors of a payload by entity class.
+
+    Args:
+        entities (Dict[str, int]): The number of items of each entity class, see ``count_entities``.
+        errors (List[Dict[str, Any]]): The validation errors, located from the request body.
+
+    Returns:
+        Dict[str, Any]: Whether the payload is valid, the number of items, of invalid items and the errors
+                        of each entity class, and the errors that do not concern a single item.
+    """
+    report = {
+        entity: {"count": count, "invalid": 0, "errors": []}
+        for entity, count in entities.items()
+    }
+    invalid = {entity: set() for entity in entities}
+    payload_errors = []
+    for error in errors:
+        loc = tuple(error.get("loc", ()))
+        if len(loc) >= 3 and loc[1] in report and isinstance(loc[2], int):
+            report[loc[1]]["errors"].append(error)
+            invalid[loc[1]].add(loc[2])
+        else:
+            payload_errors.append(error)
+    for entity, indices in invalid.items():
+        report[entity]["invalid"] = len(indices)
+    return {"valid": not errors, "entities": report, "errors": payload_errors}
+
+
+def dry_run_batch(
+    db: Session,
+    payload: Optional[BatchUploadPayload],
+    entities: Dict[str, int],
+    errors: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """
+    Report the validation results of a batch upload and, if it is valid, store it and return its validation token.
+    The connection IDs of a valid payload are checked as well, nothing is persisted but the validated payload.
+
+    Args:
+        db (Session): The database session.
+        payload (BatchUploadPayload, optional): The validated payload, ``None`` if it is invalid.
+        entities (Dict[str, int]): The number of items of each entity class, see ``count_entities``.
+        errors (List[Dict[str, Any]]): The validation errors, located from the request body.
+
+    Returns:
+        Dict[str, Any]: The validation report (see ``validation_report``), with the token of a valid payload
+                        and the time it expires at.
+
+    Raises:
+        HTTPException: If ``SECRET_KEY`` is not configured.
+    """
+    require_secret_key()
+    if payload is not None and not errors:
+        try:
+            batch_stages(
+                {entity: getattr(payload, entity) or [] for entity in BATCH_ENTITIES},
+                {},
+            )
+        except HTTPException as he:
+            errors = [{"type": "connection_id", "loc": ("body",), "msg": he.detail}]
+    report = validation_report(entities, errors)
+    if report["valid"]:
+        validation, token = store_validated_batch(db, payload, entities)
+        report.update(token=token, expires_at=validation.expires_at)
+    return report
+
+
+def store_validated_batch(
+    db: Session, payload: BatchUploadPayload, entities: Dict[str, int]
+) -> Tuple[BatchValidation, str]:
+    """
+    Store a validated payload and commit it. Expired payloads are deleted on the way.
+
+    Args:
+        db (Session): The database session.
+        payload (BatchUploadPayload): The validated payload.
+        entities (Dict[str, int]): The number of items of each entity class.
+
+    Returns:
+        Tuple[BatchValidation, str]: The stored payload and its validation token.
+    """
+    db.execute(delete(BatchValidation).where(BatchValidation.expires_at < func.now()))
+    data = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+    digest = hashlib.sha256(data).hexdigest()
+    validation = BatchValidation(
+        digest=digest,
+        payload=data,
+        entities=entities,
+        expires_at=func.now() + TTL,
+    )
+    db.add(validation)
+    db.commit()
+    db.refresh(validation)
+    return validation, f"{validation.id}.{sign_validation(validation.id, digest)}"
+
+
+def load_validated_batch(db: Session, token: str) -> BatchUploadPayload:
+    """
+    Load the payload referenced by a validation token.
+
+    Args:
+        db (Session): The database session.
+        token (str): The validation token returned by the dry run.
+
+    Returns:
+        BatchUploadPayload: The validated payload.
+
+    Raises:
+        HTTPException: If ``SECRET_KEY`` is not configured, the token is invalid, or the payload expired.
+    """
+    require_secret_key()
+    validation_id, _, signature = token.partition(".")
+    validation = (
+        db.get(BatchValidation, int(validation_id))
+        if validation_id.isdigit()
+        else None
+    )
+    if (
+        validation is None
+        or not hmac.compare_digest(
+            signature, sign_validation(validation.id, validation.digest)
+        )
+        or hashlib.sha256(validation.payload).hexdigest() != validation.digest
+    ):
+        raise HTTPException(status_code=400, detail="Invalid validation token.")
+    if validation.expires_at < db.scalar(select(func.now())):
+        raise HTTPException(
+            status_code=410,
+            detail="The validated batch expired, validate the batch again.",
+        )
+    return pickle.loads(validation.payload)
+
+
+def sign_validation(validation_id: int, digest: str) -> str:
+    """
+    Sign a stored payload.
+
+    Args:
+        validation_id (int): The ID of the stored payload.
+        digest (str): The SHA-256 of the stored payload.
+
+    Returns:
+        str: The hexadecimal HMAC-SHA256 signature.
+    """
+    key = SECRET_KEY.encode() if isinstance(SECRET_KEY, str) else SECRET_KEY
+    message = f"batch-validation:{validation_id}:{digest}".encode()
+    return hmac.new(key, message, hashlib.sha256).hexdigest()
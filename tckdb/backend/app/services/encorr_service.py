@@ -4,11 +4,12 @@ from tckdb.backend.app.models.encorr import EnCorr
 from tckdb.backend.app.models.level import Level
 from tckdb.backend.app.schemas.encorr import EnCorrCreate, EnCorrUpdate
 from tckdb.backend.app.schemas.level import LevelCreate
+from tckdb.backend.app.services.reference_service import get_or_create_id
 
 
 def get_or_create_level(db: Session, level_data: LevelCreate) -> Level:
     """
-    Retrieves a Level object matching the provided data.
+    Retrieves a Level object matching the provided data by its natural key hash.
     If it does not exist, creates a new Level entry.
 
     Args:
@@ -18,22 +19,22 @@ def get_or_create_level(db: Session, level_data: LevelCreate) -> Level:
     Returns:
         Level: The existing or newly created Level object.
     """
-    query = db.query(Level).filter_by(
-        method=level_data.method,
-        basis=level_data.basis,
-        auxiliary_basis=level_data.auxiliary_basis,
-        level_arguments=level_data.level_arguments,
-        solvation_description=level_data.solvation_description,
-    )
-    existing_level = query.first()
-    if existing_level:
-        return existing_level
-    else:
-        new_level = Level(**level_data.dict())
-        db.add(new_level)
-        db.commit()
-        db.refresh(new_level)
-        return new_level
+    return db.get(Level, get_or_create_level_id(db, level_data))
+
+
+def get_or_create_level_id(db: Session, level_data: LevelCreate) -> int:
+    """
+    Retrieves the ID of the Level matching the provided data, creating the Level if it does not exist.
+    Existing levels are resolved from the reference cache without a database round trip.
+
+    Args:
+        db (Session): The database session.
+        level_data (LevelCreate): The Level data.
+
+    Returns:
+        int: The Level ID.
+    """
+    return get_or_create_id(db, Level, level_data.model_dump())
 
 
 def create_encorr(db: Session, encorr_data: EnCorrCreate) -> EnCorr:
@@ -48,12 +49,14 @@ def create_encorr(db: Session, encorr_data: EnCorrCreate) -> EnCorr:
         EnCorr: The created EnCorr object.
     """
     # Handle primary_level
-    primary_level = get_or_create_level(db, encorr_data.primary_level)
+    level_id = get_or_create_level_id(db, encorr_data.primary_level)
 
     # Handle isodesmic_high_level if provided
-    isodesmic_high_level = None
+    isodesmic_high_level_id = None
     if encorr_data.isodesmic_high_level:
-        isodesmic_high_level = get_or_create_level(db, encorr_data.isodesmic_high_level)
+        isodesmic_high_level_id = get_or_create_level_id(
+            db, encorr_data.isodesmic_high_level
+        )
 
     # Create EnCorr object
     encorr = EnCorr(
@@ -63,8 +66,8 @@ def create_encorr(db: Session, encorr_data: EnCorrCreate) -> EnCorr:
         bac=encorr_data.bac,
         isodesmic_reactions=encorr_data.isodesmic_reactions,
         reviewer_flags=encorr_data.reviewer_flags,
-        primary_level=primary_level,
-        isodesmic_high_level=isodesmic_high_level,
+        level_id=level_id,
+        isodesmic_high_level_id=isodesmic_high_level_id,
     )
 
     db.add(encorr)
@@ -108,7 +111,7 @@ def update_encorr(db: Session, encorr_id: int, encorr_data: EnCorrUpdate) -> EnC
         if key in ["primary_level", "isodesmic_high_level"]:
             # Handle Level updates
             if value is not None:
-                level = get_or_create_level(db, value)
+                level = get_or_create_level(db, getattr(encorr_data, key))
                 setattr(encorr, key, level)
         else:
             setattr(encorr, key, value)
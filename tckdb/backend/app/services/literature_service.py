@@ -1,16 +1,38 @@
 from typing import List
 
 from fastapi import HTTPException
+from sqlalchemy import insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from tckdb.backend.app.models.author import Author
 from tckdb.backend.app.models.literature import Literature
+from tckdb.backend.app.models.literatureauthor import literature_author
 from tckdb.backend.app.schemas.literature import (
     LiteratureCreate,
     LiteratureType,
     LiteratureUpdate,
 )
+from tckdb.backend.app.services.author_service import resolve_authors
+
+
+def link_authors(db: Session, literature_id: int, author_ids: List[int]) -> None:
+    """
+    Link authors to a literature entry with a single multi-row insert.
+
+    Args:
+        db (Session): The database session.
+        literature_id (int): The literature entry ID.
+        author_ids (List[int]): The author IDs.
+    """
+    author_ids = list(dict.fromkeys(author_ids))
+    if author_ids:
+        db.execute(
+            insert(literature_author),
+            [
+                {"literature_id": literature_id, "author_id": author_id}
+                for author_id in author_ids
+            ],
+        )
 
 
 def create_literature(literature_data: LiteratureCreate, db: Session):
@@ -46,36 +68,12 @@ def create_literature(literature_data: LiteratureCreate, db: Session):
                 detail=f"Article with DOI {literature_data.doi} already exists.",
             )
 
-    # 3. Handle Authors: Check if they exist or create new ones
-    author_instances: List[Author] = []
-    for author_data in literature_data.authors:
-        # Normalize names by stripping whitespace
-        first_name = author_data.first_name.strip()
-        last_name = author_data.last_name.strip()
-
-        # Check if the author already exists
-        existing_author = (
-            db.query(Author)
-            .filter_by(first_name=first_name, last_name=last_name)
-            .first()
-        )
-
-        if existing_author:
-            author_instances.append(existing_author)
-        else:
-            # Create new Author
-            new_author = Author(first_name=first_name, last_name=last_name)
-            db.add(new_author)
-            try:
-                db.commit()  # Commit to assign an ID
-                db.refresh(new_author)
-                author_instances.append(new_author)
-            except IntegrityError as e:
-                db.rollback()
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Author {first_name} {last_name} could not be created due to a database error.",
-                ) from e
+    # 3. Handle Authors: Resolve all of them with one lookup and create the missing ones at once
+    try:
+        author_ids = resolve_authors(db, literature_data.authors)
+    except HTTPException:
+        db.rollback()
+        raise
 
     # 4. Create Literature Instance
     literature = Literature(
@@ -106,12 +104,13 @@ def create_literature(literature_data: LiteratureCreate, db: Session):
             else None
         ),
         advisor=literature_data.advisor.strip() if literature_data.advisor else None,
-        authors=author_instances,  # SQLAlchemy Author instances
     )
 
-    # 5. Add to Session and Commit
+    # 5. Add to Session, link the authors and commit once
     db.add(literature)
     try:
+        db.flush()
+        link_authors(db, literature.id, author_ids)
         db.commit()
         db.refresh(literature)
     except IntegrityError as e:
@@ -150,45 +149,13 @@ def update_literature(
 
     # Handle adding new authors
     if literature_data.authors:
-        # Create a set of tuples containing existing authors' first and last names for quick lookup
-        existing_authors = {
-            (author.first_name.lower(), author.last_name.lower())
-            for author in db_literature.authors
-        }
-
-        for author_data in literature_data.authors:
-            author_tuple = (
-                author_data.first_name.strip().lower(),
-                author_data.last_name.strip().lower(),
-            )
-
-            if author_tuple in existing_authors:
-                # Skip adding duplicate author
-                continue
-
-            # Check if the author already exists in the database
-            existing_author = (
-                db.query(Author)
-                .filter(
-                    Author.first_name.ilike(author_data.first_name.strip()),
-                    Author.last_name.ilike(author_data.last_name.strip()),
-                )
-                .first()
-            )
-
-            if existing_author:
-                # Associate existing author with the literature
-                db_literature.authors.append(existing_author)
-                existing_authors.add(author_tuple)  # Update the existing authors set
-            else:
-                # Create and add a new author
-                new_author = Author(
-                    first_name=author_data.first_name.strip(),
-                    last_name=author_data.last_name.strip(),
-                )
-                db.add(new_author)
-                db_literature.authors.append(new_author)
-                existing_authors.add(author_tuple)  # Update the existing authors set
+        linked = {author.id for author in db_literature.authors}
+        author_ids = resolve_authors(db, literature_data.authors)
+        link_authors(
+            db,
+            literature_id,
+            [author_id for author_id in author_ids if author_id not in linked],
+        )
 
     try:
         db.commit()
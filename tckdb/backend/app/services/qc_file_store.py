@@ -0,0 +1,427 @@
+"""
+TCKDB backend app services qc file store module
+
+A content-addressed store of QC input and output files (e.g., ESS logs of hundreds of MB).
+Uploads are consumed as a stream and split into content-defined chunks, which are hashed and compressed one at a time
+and written under their SHA-256, so a file is never held in memory whole. Chunks shared by files,
+e.g., the route and basis set sections of the outputs of a torsion scan, are stored once (``QCFileChunk``).
+A stored file is a ``QCFileContent`` row listing its chunks; downloads decompress only the chunks of the requested range.
+
+Chunk files are written before the row is committed: chunks of a rolled back upload are left
+unreferenced on disk, and reused by any later upload of the same data.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from tckdb.backend.app.core.config import (
+    QC_FILE_CHUNK_AVG_SIZE,
+    QC_FILE_CHUNK_MAX_SIZE,
+    QC_FILE_CHUNK_MIN_SIZE,
+    QC_FILE_CODEC,
+    QC_FILE_COMPRESSION_LEVEL,
+    QC_FILE_STORE_DIR,
+    QC_FILE_ZSTD_DICTIONARY,
+)
+from tckdb.backend.app.models.qc_file import QCFile, QCFileChunk, QCFileContent
+from tckdb.backend.app.utils.qcfile_utils import (
+    ZSTD_AVAILABLE,
+    ContentDefinedChunker,
+    compress_chunk,
+    decompress_bytes,
+    decompress_chunk,
+    generate_checksum,
+)
+
+# Reads a byte range [start, stop) of a stored file
+RangeReader = Callable[[int, int], Iterator[bytes]]
+
+
+class LocalChunkStore:
+    """
+    Compressed chunks in a local directory, at ``<root>/<hash[:2]>/<hash>.<codec>``.
+    The codec is ``"gzip"``, ``"zstd"`` or ``"zstd-<dictionary ID>"``; dictionaries are kept in
+    ``<root>/dictionaries`` so that chunks stay readable after the configured dictionary changes.
+
+    Args:
+        root (str): The store directory.
+        codec (str, optional): ``"zstd"``, or ``"gzip"`` (used if zstandard is not installed).
+        level (int, optional): The compression level.
+        dictionary_path (str, optional): A zstd dictionary file, e.g., trained on ESS logs.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        codec: str = QC_FILE_CODEC,
+        level: int = QC_FILE_COMPRESSION_LEVEL,
+        dictionary_path: Optional[str] = None,
+    ):
+        self.root = Path(root)
+        self.level = level
+        self._dictionaries: Dict[str, bytes] = dict()
+        self.codec = codec if codec == "gzip" or ZSTD_AVAILABLE else "gzip"
+        if self.codec == "zstd" and dictionary_path:
+            dictionary_id = self.add_dictionary(Path(dictionary_path).read_bytes())
+            self.codec = f"zstd-{dictionary_id}"
+
+    def add_dictionary(self, dictionary: bytes) -> str:
+        """
+        Keep a zstd dictionary in the store.
+
+        Args:
+            dictionary (bytes): The dictionary.
+
+        Returns:
+            str: The dictionary ID.
+        """
+        dictionary_id = generate_checksum(dictionary)[:16]
+        path = self.root / "dictionaries" / f"{dictionary_id}.dict"
+        if not path.exists():
+            self._write(path, dictionary)
+        self._dictionaries[dictionary_id] = dictionary
+        return dictionary_id
+
+    def chunk_path(self, chunk_hash: str, codec: str) -> Path:
+        """
+        The path of a chunk file.
+        """
+        return self.root / chunk_hash[:2] / f"{chunk_hash}.{codec}"
+
+    def put_chunk(self, chunk_hash: str, data: bytes) -> bool:
+        """
+        Compress and store a chunk with the store codec, unless it is already stored.
+
+        Args:
+            chunk_hash (str): The SHA-256 of the chunk.
+            data (bytes): The chunk.
+
+        Returns:
+            bool: Whether the chunk was written.
+        """
+        path = self.chunk_path(chunk_hash, self.codec)
+        if path.exists():
+            return False
+        name, dictionary = self._codec(self.codec)
+        self._write(path, compress_chunk(data, name, self.level, dictionary))
+        return True
+
+    def stored_size(self, chunk_hash: str, codec: str) -> int:
+        """
+        The compressed size of a stored chunk in bytes.
+        """
+        return self.chunk_path(chunk_hash, codec).stat().st_size
+
+    def get_chunk(self, chunk_hash: str, codec: str) -> bytes:
+        """
+        Read and decompress a chunk.
+
+        Args:
+            chunk_hash (str): The SHA-256 of the chunk.
+            codec (str): The codec of the file the chunk belongs to.
+
+        Returns:
+            bytes: The chunk.
+        """
+        name, dictionary = self._codec(codec)
+        return decompress_chunk(
+            self.chunk_path(chunk_hash, codec).read_bytes(), name, dictionary
+        )
+
+    def _codec(self, codec: str) -> Tuple[str, Optional[bytes]]:
+        name, _, dictionary_id = codec.partition("-")
+        if not dictionary_id:
+            return name, None
+        if dictionary_id not in self._dictionaries:
+            path = self.root / "dictionaries" / f"{dictionary_id}.dict"
+            self._dictionaries[dictionary_id] = path.read_bytes()
+        return name, self._dictionaries[dictionary_id]
+
+    @staticmethod
+    def _write(path: Path, data: bytes) -> None:
+        # Write to a temporary file and rename it, so that readers never see a partial chunk
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+
+_store: Optional[LocalChunkStore] = None
+_store_lock = threading.Lock()
+
+
+def get_qc_file_store() -> LocalChunkStore:
+    """
+    Dependency function to provide the process-wide QC file store.
+
+    Returns:
+        LocalChunkStore: The store configured in ``core.config``.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = LocalChunkStore(
+                QC_FILE_STORE_DIR, dictionary_path=QC_FILE_ZSTD_DICTIONARY
+            )
+        return _store
+
+
+class ContentWriter:
+    """
+    Write a file to the store incrementally: data is hashed, split into content-defined chunks
+    and stored as it is written, so that only a few chunks are buffered.
+
+    Args:
+        store (LocalChunkStore): The chunk store.
+        chunker (ContentDefinedChunker, optional): The chunker, with the configured chunk sizes by default.
+    """
+
+    def __init__(
+        self, store: LocalChunkStore, chunker: Optional[ContentDefinedChunker] = None
+    ):
+        self.store = store
+        self.chunker = chunker or ContentDefinedChunker(
+            QC_FILE_CHUNK_MIN_SIZE, QC_FILE_CHUNK_AVG_SIZE, QC_FILE_CHUNK_MAX_SIZE
+        )
+        self.size = 0
+        self.chunk_hashes = []
+        self.chunk_sizes = []
+        self.new_chunks = 0
+        self.written_bytes = 0
+        self._sha256 = hashlib.sha256()
+        self._chunks: Dict[str, Dict[str, Any]] = dict()
+
+    def write(self, data: bytes) -> None:
+        """
+        Append data to the file.
+        """
+        self._sha256.update(data)
+        self.size += len(data)
+        for chunk in self.chunker.feed(data):
+            self._put(chunk)
+
+    def save(self, db: Session) -> QCFileContent:
+        """
+        Store the last chunks and record the file and its chunks,
+        unless a file with the same content is already recorded. Nothing is committed.
+
+        Args:
+            db (Session): The database session.
+
+        Returns:
+            QCFileContent: The recorded file.
+        """
+        for chunk in self.chunker.flush():
+            self._put(chunk)
+        if self._chunks:
+            db.execute(
+                insert(QCFileChunk).on_conflict_do_nothing(),
+                list(self._chunks.values()),
+            )
+        sha256 = self._sha256.hexdigest()
+        db.execute(
+            insert(QCFileContent)
+            .values(
+                sha256=sha256,
+                size=self.size,
+                codec=self.store.codec,
+                chunk_hashes=self.chunk_hashes,
+                chunk_sizes=self.chunk_sizes,
+            )
+            .on_conflict_do_nothing(index_elements=[QCFileContent.sha256])
+        )
+        return db.execute(
+            select(QCFileContent).where(QCFileContent.sha256 == sha256)
+        ).scalar_one()
+
+    def _put(self, chunk: bytes) -> None:
+        chunk_hash = hashlib.sha256(chunk).hexdigest()
+        if chunk_hash not in self._chunks:
+            new = self.store.put_chunk(chunk_hash, chunk)
+            stored_size = self.store.stored_size(chunk_hash, self.store.codec)
+            self.new_chunks += new
+            self.written_bytes += stored_size if new else 0
+            self._chunks[chunk_hash] = {
+                "sha256": chunk_hash,
+                "codec": self.store.codec,
+                "size": len(chunk),
+                "stored_size": stored_size,
+            }
+        self.chunk_hashes.append(chunk_hash)
+        self.chunk_sizes.append(len(chunk))
+
+
+def store_content(
+    db: Session, pieces: Iterable[bytes], store: Optional[LocalChunkStore] = None
+) -> QCFileContent:
+    """
+    Store a file given as a stream of byte pieces. Nothing is committed.
+
+    Args:
+        db (Session): The database session.
+        pieces (Iterable[bytes]): The file data, e.g., read from a file object in blocks.
+        store (LocalChunkStore, optional): The chunk store, the configured store by default.
+
+    Returns:
+        QCFileContent: The recorded file.
+    """
+    writer = ContentWriter(store or get_qc_file_store())
+    for piece in pieces:
+        writer.write(piece)
+    return writer.save(db)
+
+
+def iter_content(
+    store: LocalChunkStore,
+    content: QCFileContent,
+    start: int = 0,
+    stop: Optional[int] = None,
+) -> Iterator[bytes]:
+    """
+    Read a byte range of a stored file, decompressing only the chunks that overlap it.
+
+    Args:
+        store (LocalChunkStore): The chunk store.
+        content (QCFileContent): The stored file.
+        start (int, optional): The first byte.
+        stop (int, optional): The end of the range (exclusive), the end of the file by default.
+
+    Yields:
+        bytes: The data of the range, one chunk at a time.
+    """
+    stop = content.size if stop is None else stop
+    offset = 0
+    for chunk_hash, chunk_size in zip(content.chunk_hashes, content.chunk_sizes):
+        chunk_stop = offset + chunk_size
+        if chunk_stop > start and offset < stop:
+            chunk = store.get_chunk(chunk_hash, content.codec)
+            yield chunk[max(start - offset, 0) : min(stop, chunk_stop) - offset]
+        if chunk_stop >= stop:
+            break
+        offset = chunk_stop
+
+
+def stored_file(
+    store: LocalChunkStore, qc_file: QCFile, kind: str
+) -> Tuple[int, str, RangeReader]:
+    """
+    Get the input or output file of a QC calculation, from the content store or the legacy blob columns.
+
+    Args:
+        store (LocalChunkStore): The chunk store.
+        qc_file (QCFile): The QC file record.
+        kind (str): ``"input"`` or ``"output"``.
+
+    Returns:
+        Tuple[int, str, RangeReader]: The size, the SHA-256 and a reader of byte ranges of the file.
+
+    Raises:
+        HTTPException: If the file was not uploaded.
+    """
+    content = getattr(qc_file, f"{kind}_content")
+    if content is not None:
+        return (
+            content.size,
+            content.sha256,
+            lambda start, stop: iter_content(store, content, start, stop),
+        )
+    data = getattr(qc_file, f"{kind}_file")
+    if data is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"QC file {qc_file.id} has no {kind} file.",
+        )
+    if qc_file.compressed:
+        data = decompress_bytes(data)
+    return (
+        len(data),
+        generate_checksum(data),
+        lambda start, stop: iter([data[start:stop]]),
+    )
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single byte range of an HTTP ``Range`` header.
+    Headers that are malformed or request several ranges are ignored (the whole file is served).
+
+    Args:
+        header (str): The ``Range`` header, if any.
+        size (int): The file size.
+
+    Returns:
+        Optional[Tuple[int, int]]: The range as ``(start, stop)``, stop excluded, or ``None`` for the whole file.
+
+    Raises:
+        HTTPException: If the range is not satisfiable.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, _, last = header[len("bytes=") :].strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            stop = min(int(last) + 1, size) if last else size
+        else:
+            start, stop = max(size - int(last), 0), size
+    except ValueError:
+        return None
+    if start >= stop:
+        raise HTTPException(
+            status_code=416,
+            detail=f"Range {header} is not satisfiable.",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, stop
+
+
+def storage_stats(db: Session) -> Dict[str, Any]:
+    """
+    Report the storage savings of the QC file store.
+
+    Args:
+        db (Session): The database session.
+
+    Returns:
+        Dict[str, Any]: The number of files and unique chunks, the total size of the files,
+            of their unique chunks and of the stored (compressed) chunks in bytes,
+            the deduplication ratio (file size over unique chunk size) and the overall ratio (file size over stored size).
+    """
+    files, file_bytes = db.execute(
+        select(func.count(), func.coalesce(func.sum(QCFileContent.size), 0))
+    ).one()
+    chunks, chunk_bytes, stored_bytes = db.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(QCFileChunk.size), 0),
+            func.coalesce(func.sum(QCFileChunk.stored_size), 0),
+        )
+    ).one()
+    file_bytes, chunk_bytes, stored_bytes = (
+        int(file_bytes),
+        int(chunk_bytes),
+        int(stored_bytes),
+    )
+    return {
+        "files": files,
+        "chunks": chunks,
+        "file_bytes": file_bytes,
+        "chunk_bytes": chunk_bytes,
+        "stored_bytes": stored_bytes,
+        "dedup_ratio": file_bytes / chunk_bytes if chunk_bytes else 1.0,
+        "storage_ratio": file_bytes / stored_bytes if stored_bytes else 1.0,
+    }
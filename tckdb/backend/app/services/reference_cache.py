@@ -0,0 +1,330 @@
+"""
+TCKDB backend app services reference cache module
+
+A process-wide read-through cache of the small reference tables (levels of theory, ESS, bots and
+frequency scales), keyed by natural key hash and by primary key, so that batches referencing the same
+few dozen rows resolve them without a database round trip.
+
+Only committed rows are cached: rows inserted by the current transaction are staged on the session
+and published when it commits. Updates and deletes invalidate the cached table:
+in this process when the session commits, and in every worker through the ``tckdb_reference``
+Postgres notification channel, which a trigger on each reference table notifies (see ``ReferenceCacheListener``).
+Each table has a generation counter, so that rows read before an invalidation are not cached after it.
+"""
+
+import atexit
+import select
+import sys
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+import psycopg2
+from psycopg2 import sql
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from tckdb.backend.app.core.config import (
+    REFERENCE_CACHE_ENABLED,
+    REFERENCE_CACHE_RECONNECT_INTERVAL,
+    SQLALCHEMY_DATABASE_URI,
+)
+from tckdb.backend.app.db.base_class import NaturalKeyMixin
+
+REFERENCE_CACHE_CHANNEL = "tckdb_reference"
+# Session.info keys of the rows inserted and the tables modified by the current transaction
+PENDING_IDS_KEY = "reference_cache_pending_ids"
+PENDING_ROWS_KEY = "reference_cache_pending_rows"
+PENDING_INVALIDATIONS_KEY = "reference_cache_pending_invalidations"
+
+
+class ReferenceCache:
+    """
+    A thread-safe cache of reference table rows.
+
+    Args:
+        enabled (bool, optional): Whether rows are cached; a disabled cache never hits.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._ids: Dict[str, Dict[str, int]] = dict()
+        self._rows: Dict[str, Dict[int, Dict[str, Any]]] = dict()
+        self._generations: Dict[str, int] = dict()
+
+    def generation(self, table: str) -> int:
+        """
+        The generation of a table, to be read before querying rows that will be cached.
+        """
+        with self._lock:
+            return self._generations.get(table, 0)
+
+    def get_ids(self, table: str, hashes: Iterable[str]) -> Dict[str, int]:
+        """
+        Get the cached primary keys of rows by natural key hash.
+
+        Args:
+            table (str): The table name.
+            hashes (Iterable[str]): The natural key hashes.
+
+        Returns:
+            Dict[str, int]: The primary key of each cached hash.
+        """
+        if not self.enabled:
+            return {}
+        with self._lock:
+            ids = self._ids.get(table, {})
+            return {key_hash: ids[key_hash] for key_hash in hashes if key_hash in ids}
+
+    def get_row(self, table: str, row_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Get the cached column values of a row by primary key.
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            row = self._rows.get(table, {}).get(row_id)
+            return dict(row) if row is not None else None
+
+    def store_ids(self, table: str, ids: Dict[str, int], generation: int) -> None:
+        """
+        Cache the primary keys of committed rows by natural key hash.
+
+        Args:
+            table (str): The table name.
+            ids (Dict[str, int]): The primary key of each natural key hash.
+            generation (int): The table generation read before the rows were queried.
+        """
+        if not self.enabled or not ids:
+            return
+        with self._lock:
+            if self._generations.get(table, 0) == generation:
+                self._ids.setdefault(table, dict()).update(ids)
+
+    def store_row(
+        self, table: str, row_id: int, values: Dict[str, Any], generation: int
+    ) -> None:
+        """
+        Cache the column values of a committed row.
+
+        Args:
+            table (str): The table name.
+            row_id (int): The primary key.
+            values (Dict[str, Any]): The column values.
+            generation (int): The table generation read before the row was queried.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._generations.get(table, 0) == generation:
+                self._rows.setdefault(table, dict())[row_id] = dict(values)
+
+    def invalidate(self, table: Optional[str] = None) -> None:
+        """
+        Drop the cached rows of a table, or of all tables.
+        """
+        with self._lock:
+            tables = [table] if table else set(self._generations) | set(self._ids)
+            for name in tables:
+                self._ids.pop(name, None)
+                self._rows.pop(name, None)
+                self._generations[name] = self._generations.get(name, 0) + 1
+
+
+reference_cache = ReferenceCache(enabled=REFERENCE_CACHE_ENABLED)
+
+
+def pending_ids(db: Session, table: str) -> Dict[str, int]:
+    """
+    The rows of a table inserted by the current transaction of a session, by natural key hash.
+    """
+    return db.info.get(PENDING_IDS_KEY, {}).get(table, {})
+
+
+def stage_inserted_ids(db: Session, table: str, ids: Dict[str, int]) -> None:
+    """
+    Record rows inserted by the current transaction, to be cached once it commits.
+    """
+    db.info.setdefault(PENDING_IDS_KEY, dict()).setdefault(table, dict()).update(ids)
+
+
+def stage_inserted_rows(
+    db: Session, table: str, rows: Dict[int, Dict[str, Any]]
+) -> None:
+    """
+    Record the column values of rows inserted by the current transaction, to be cached once it commits.
+    """
+    db.info.setdefault(PENDING_ROWS_KEY, dict()).setdefault(table, dict()).update(rows)
+
+
+def cache_committed_ids(
+    db: Session, table: str, ids: Dict[str, int], generation: int
+) -> None:
+    """
+    Cache rows found in the database, except the ones inserted by the current (uncommitted) transaction.
+
+    Args:
+        db (Session): The database session that found the rows.
+        table (str): The table name.
+        ids (Dict[str, int]): The primary key of each natural key hash.
+        generation (int): The table generation read before the rows were queried.
+    """
+    pending = set(pending_ids(db, table).values())
+    reference_cache.store_ids(
+        table,
+        {key_hash: row_id for key_hash, row_id in ids.items() if row_id not in pending},
+        generation,
+    )
+
+
+@event.listens_for(NaturalKeyMixin, "after_insert", propagate=True)
+def _stage_orm_insert(mapper, connection, target) -> None:
+    db = Session.object_session(target)
+    if db is not None:
+        stage_inserted_ids(
+            db, target.__tablename__, {target.natural_key_hash: target.id}
+        )
+
+
+@event.listens_for(NaturalKeyMixin, "after_update", propagate=True)
+@event.listens_for(NaturalKeyMixin, "after_delete", propagate=True)
+def _stage_orm_invalidation(mapper, connection, target) -> None:
+    db = Session.object_session(target)
+    if db is not None:
+        db.info.setdefault(PENDING_INVALIDATIONS_KEY, set()).add(target.__tablename__)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending(db: Session) -> None:
+    if db.get_nested_transaction() is not None:
+        return  # a SAVEPOINT was released, the transaction is still open
+    for table in db.info.pop(PENDING_INVALIDATIONS_KEY, set()):
+        reference_cache.invalidate(table)
+    for table, ids in db.info.pop(PENDING_IDS_KEY, {}).items():
+        reference_cache.store_ids(table, ids, reference_cache.generation(table))
+    for table, rows in db.info.pop(PENDING_ROWS_KEY, {}).items():
+        generation = reference_cache.generation(table)
+        for row_id, values in rows.items():
+            reference_cache.store_row(table, row_id, values, generation)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_pending(db: Session, transaction) -> None:
+    if transaction.parent is None:
+        db.info.pop(PENDING_IDS_KEY, None)
+        db.info.pop(PENDING_ROWS_KEY, None)
+        db.info.pop(PENDING_INVALIDATIONS_KEY, None)
+
+
+class ReferenceCacheListener:
+    """
+    A background thread that listens to the reference notification channel
+    and invalidates the cached table named by each notification.
+    The whole cache is invalidated whenever the listener (re)connects, since notifications may have been missed.
+
+    Args:
+        cache (ReferenceCache): The cache to invalidate.
+        dsn (str): The libpq connection string or URI.
+        channel (str, optional): The notification channel.
+        reconnect_interval (float, optional): The number of seconds to wait before reconnecting.
+    """
+
+    def __init__(
+        self,
+        cache: ReferenceCache,
+        dsn: str,
+        channel: str = REFERENCE_CACHE_CHANNEL,
+        reconnect_interval: float = REFERENCE_CACHE_RECONNECT_INTERVAL,
+    ):
+        self.cache = cache
+        self.dsn = dsn
+        self.channel = channel
+        self.reconnect_interval = reconnect_interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """
+        Start listening in a daemon thread.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="reference-cache-listener", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop listening and wait for the thread to exit.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.reconnect_interval + 1)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            connection = None
+            try:
+                connection = psycopg2.connect(self.dsn)
+                connection.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        sql.SQL("LISTEN {}").format(sql.Identifier(self.channel))
+                    )
+                self.cache.invalidate()
+                self._listen(connection)
+            except psycopg2.Error as e:
+                print(f"Reference cache listener error: {e}", file=sys.stderr)
+                self.cache.invalidate()
+                self._stop.wait(self.reconnect_interval)
+            finally:
+                if connection is not None:
+                    connection.close()
+
+    def _listen(self, connection) -> None:
+        while not self._stop.is_set():
+            if not select.select([connection], [], [], 1.0)[0]:
+                continue
+            connection.poll()
+            while connection.notifies:
+                notification = connection.notifies.pop(0)
+                self.cache.invalidate(notification.payload or None)
+
+
+_listener: Optional[ReferenceCacheListener] = None
+_listener_lock = threading.Lock()
+
+
+def start_reference_cache_listener() -> Optional[ReferenceCacheListener]:
+    """
+    Start the process-wide reference cache listener, if the cache is enabled.
+
+    Returns:
+        Optional[ReferenceCacheListener]: The listener, or ``None`` if the cache is disabled.
+    """
+    global _listener
+    if not reference_cache.enabled:
+        return None
+    with _listener_lock:
+        if _listener is None:
+            dsn = make_url(SQLALCHEMY_DATABASE_URI).set(drivername="postgresql")
+            _listener = ReferenceCacheListener(
+                reference_cache, dsn.render_as_string(hide_password=False)
+            )
+            atexit.register(stop_reference_cache_listener)
+        _listener.start()
+        return _listener
+
+
+def stop_reference_cache_listener() -> None:
+    """
+    Stop the process-wide reference cache listener.
+    """
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
@@ -0,0 +1,152 @@
+"""
+TCKDB backend app services reference module
+
+Get-or-create of the shared reference entities (levels of theory, ESS, bots and frequency scales).
+Reference tables carry a unique natural key hash (see ``db.base_class.NaturalKeyMixin``),
+so rows are found with an index probe per key, and concurrent uploads of the same entity are
+deduplicated by the database: missing rows are inserted with ``INSERT ... ON CONFLICT DO NOTHING``
+and rows inserted meanwhile by another transaction are read back by their hash.
+Committed rows are served from the process-wide reference cache (see ``services.reference_cache``).
+Core inserts bypass the ORM audit listeners, so the rows created in audited tables (bots) are audited explicitly.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from tckdb.backend.app.db.base_class import AuditMixin
+from tckdb.backend.app.models.audit import record_audit
+from tckdb.backend.app.services.reference_cache import (
+    cache_committed_ids,
+    pending_ids,
+    reference_cache,
+    stage_inserted_ids,
+    stage_inserted_rows,
+)
+
+
+def get_or_create_ids(
+    db: Session,
+    model,
+    rows: List[Dict[str, Any]],
+    created: Optional[set] = None,
+) -> List[int]:
+    """
+    Resolve a list of rows against a reference table by their natural key hash, inserting the missing ones.
+
+    Args:
+        db (Session): The database session.
+        model: The SQLAlchemy model class, a ``NaturalKeyMixin`` subclass.
+        rows (List[Dict[str, Any]]): The column values of each row.
+        created (set, optional): If given, the primary keys of newly inserted rows are added to it.
+
+    Returns:
+        List[int]: The primary keys of the rows, in the order of ``rows``.
+    """
+    if not rows:
+        return []
+    hashes = [model.compute_natural_key_hash(row) for row in rows]
+    unique_rows: Dict[str, Dict[str, Any]] = {}
+    for key_hash, row in zip(hashes, rows):
+        unique_rows.setdefault(key_hash, row)
+
+    table = model.__tablename__
+    id_map = reference_cache.get_ids(table, unique_rows.keys())
+    uncached = [key_hash for key_hash in unique_rows if key_hash not in id_map]
+    if uncached:
+        generation = reference_cache.generation(table)
+        found = lookup_ids(db, model, uncached)
+        cache_committed_ids(db, table, found, generation)
+        id_map.update(found)
+    missing = [key_hash for key_hash in unique_rows if key_hash not in id_map]
+    if missing:
+        stmt = (
+            insert(model)
+            .values(
+                [
+                    {**unique_rows[key_hash], "natural_key_hash": key_hash}
+                    for key_hash in missing
+                ]
+            )
+            .on_conflict_do_nothing(index_elements=[model.natural_key_hash])
+            .returning(*model.__table__.columns)
+        )
+        generation = reference_cache.generation(table)
+        inserted_rows = [dict(row._mapping) for row in db.execute(stmt)]
+        inserted = {row["natural_key_hash"]: row["id"] for row in inserted_rows}
+        stage_inserted_ids(db, table, inserted)
+        stage_inserted_rows(db, table, {row["id"]: row for row in inserted_rows})
+        if issubclass(model, AuditMixin):
+            record_audit(db, table, [row["id"] for row in inserted_rows], "create")
+        id_map.update(inserted)
+        if created is not None:
+            created.update(inserted.values())
+        # Rows committed by a concurrent transaction since the lookup
+        concurrent = lookup_ids(db, model, [h for h in missing if h not in inserted])
+        cache_committed_ids(db, table, concurrent, generation)
+        id_map.update(concurrent)
+    return [id_map[key_hash] for key_hash in hashes]
+
+
+def get_or_create_id(db: Session, model, values: Dict[str, Any]) -> int:
+    """
+    Get or create a single reference row.
+
+    Args:
+        db (Session): The database session.
+        model: The SQLAlchemy model class, a ``NaturalKeyMixin`` subclass.
+        values (Dict[str, Any]): The column values of the row.
+
+    Returns:
+        int: The primary key of the row.
+    """
+    return get_or_create_ids(db, model, [values])[0]
+
+
+def lookup_ids(db: Session, model, hashes: Iterable[str]) -> Dict[str, int]:
+    """
+    Find the rows of a reference table with the given natural key hashes.
+
+    Args:
+        db (Session): The database session.
+        model: The SQLAlchemy model class, a ``NaturalKeyMixin`` subclass.
+        hashes (Iterable[str]): The natural key hashes.
+
+    Returns:
+        Dict[str, int]: The primary key of the existing row for each hash that was found.
+    """
+    hashes = list(hashes)
+    if not hashes:
+        return {}
+    stmt = select(model.natural_key_hash, model.id).where(
+        model.natural_key_hash.in_(hashes)
+    )
+    return dict(db.execute(stmt).all())
+
+
+def get_reference(db: Session, model, row_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Get the column values of a reference row by primary key, from the reference cache if possible.
+
+    Args:
+        db (Session): The database session.
+        model: The SQLAlchemy model class, a ``NaturalKeyMixin`` subclass.
+        row_id (int): The primary key.
+
+    Returns:
+        Optional[Dict[str, Any]]: The column values, or ``None`` if the row does not exist.
+    """
+    table = model.__tablename__
+    row = reference_cache.get_row(table, row_id)
+    if row is not None:
+        return row
+    generation = reference_cache.generation(table)
+    row = db.execute(select(model.__table__).where(model.id == row_id)).first()
+    if row is None:
+        return None
+    values = dict(row._mapping)
+    if row_id not in pending_ids(db, table).values():
+        reference_cache.store_row(table, row_id, values, generation)
+    return values
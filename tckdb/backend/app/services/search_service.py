@@ -0,0 +1,285 @@
+"""
+TCKDB backend app services search module
+
+Substructure and similarity search over stored species.
+Search fingerprints of every species and non-physical species are kept in the ``speciesfingerprint`` sidecar table
+(see ``conversions.fingerprints``). Queries are first screened in the database on the fingerprint bits:
+
+- substructure queries keep the rows whose pattern fingerprint contains all query pattern bits,
+  and only these candidates are parsed and matched exactly with RDKit,
+- similarity queries bound the number of Morgan bits a row may have to reach the threshold
+  (an indexed range condition) before the Tanimoto similarity is computed, still in the database.
+"""
+
+import math
+from typing import Any, Dict, Iterable, List, Literal, Optional, Tuple
+
+from fastapi import HTTPException
+from rdkit import Chem
+from sqlalchemy import Float, Text, cast, delete, func, select
+from sqlalchemy.dialects.postgresql import BIT, insert
+from sqlalchemy.orm import Session
+
+from tckdb.backend.app.conversions.fingerprints import (
+    FINGERPRINT_SIZE,
+    FINGERPRINT_VERSION,
+    fingerprints_from_smiles,
+    morgan_fingerprint,
+    pattern_fingerprint,
+)
+from tckdb.backend.app.core.config import SPECIES_EXPORT_FETCH_SIZE
+from tckdb.backend.app.models.fingerprint import SpeciesFingerprint
+from tckdb.backend.app.models.np_species import NonPhysicalSpecies
+from tckdb.backend.app.models.species import Species
+
+SearchSource = Literal["all", "species", "np_species"]
+
+SPECIES_KEYS = {"species_id": Species, "np_species_id": NonPhysicalSpecies}
+# Guards the bit count bounds of similarity searches against floating point rounding
+BOUND_TOLERANCE = 1e-9
+
+
+def insert_fingerprints(
+    db: Session, species: Iterable[Tuple[int, str]], key: str = "species_id"
+) -> int:
+    """
+    Compute and store the search fingerprints of new species with a single multi-row insert.
+    Species that already have fingerprints, or whose SMILES cannot be parsed, are skipped.
+
+    Args:
+        db (Session): The database session.
+        species (Iterable[Tuple[int, str]]): The primary key and SMILES of each species.
+        key (str, optional): The species key column, ``"species_id"`` or ``"np_species_id"``.
+
+    Returns:
+        int: The number of species fingerprinted.
+    """
+    rows = list()
+    for species_id, smiles in species:
+        fingerprints = fingerprints_from_smiles(smiles)
+        if fingerprints is not None:
+            rows.append(
+                {
+                    key: species_id,
+                    "smiles": smiles,
+                    "version": FINGERPRINT_VERSION,
+                    **fingerprints._asdict(),
+                }
+            )
+    if rows:
+        db.execute(insert(SpeciesFingerprint).on_conflict_do_nothing(), rows)
+    return len(rows)
+
+
+def index_missing_fingerprints(db: Session, batch_size: int = 1000) -> int:
+    """
+    Fingerprint all species and non-physical species without up to date fingerprints (backfill).
+    Fingerprints computed with other parameters are recomputed.
+
+    Args:
+        db (Session): The database session.
+        batch_size (int, optional): The number of species fingerprinted per insert.
+
+    Returns:
+        int: The number of species fingerprinted.
+    """
+    db.execute(
+        delete(SpeciesFingerprint).where(
+            SpeciesFingerprint.version != FINGERPRINT_VERSION
+        )
+    )
+    count = 0
+    for key, model in SPECIES_KEYS.items():
+        fingerprinted = select(SpeciesFingerprint.id).where(
+            getattr(SpeciesFingerprint, key) == model.id
+        )
+        statement = (
+            select(model.id, model.smiles)
+            .where(~fingerprinted.exists())
+            .order_by(model.id)
+            .execution_options(yield_per=batch_size)
+        )
+        for rows in db.execute(statement).partitions():
+            count += insert_fingerprints(db, rows, key=key)
+    return count
+
+
+def _bits(bit_string: str):
+    """
+    A fingerprint bit string as a SQL ``BIT`` value.
+    """
+    return cast(bit_string, BIT(FINGERPRINT_SIZE))
+
+
+def _bit_count(db: Session, bits):
+    """
+    The number of set bits of a SQL ``BIT`` value: ``bit_count`` on PostgreSQL 14 or later,
+    and the length of its text representation stripped of zeros on older servers.
+    """
+    if db.get_bind().dialect.server_version_info >= (14,):
+        return func.bit_count(bits)
+    return func.length(func.replace(cast(bits, Text), "0", ""))
+
+
+def _search_statement(columns: List[Any], source: SearchSource):
+    """
+    Select from the fingerprint table, excluding soft deleted species.
+    """
+    statement = (
+        select(*columns)
+        .outerjoin(Species, SpeciesFingerprint.species_id == Species.id)
+        .outerjoin(
+            NonPhysicalSpecies,
+            SpeciesFingerprint.np_species_id == NonPhysicalSpecies.id,
+        )
+        .where(Species.deleted_at.is_(None), NonPhysicalSpecies.deleted_at.is_(None))
+    )
+    if source == "species":
+        statement = statement.where(SpeciesFingerprint.species_id.is_not(None))
+    elif source == "np_species":
+        statement = statement.where(SpeciesFingerprint.np_species_id.is_not(None))
+    return statement
+
+
+def substructure_search(
+    db: Session,
+    smarts: str,
+    limit: int,
+    after_id: Optional[int] = None,
+    source: SearchSource = "all",
+) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """
+    Find the species that contain a substructure.
+    Candidates are screened on their pattern fingerprints in the database and streamed in ID order;
+    only the candidates are parsed and matched exactly.
+
+    Args:
+        db (Session): The database session.
+        smarts (str): The SMARTS (or SMILES) substructure query.
+        limit (int): The maximal number of matches.
+        after_id (int, optional): The pagination cursor of a previous search.
+        source (SearchSource, optional): Search species, non-physical species, or all.
+
+    Returns:
+        Tuple[List[Dict[str, Any]], Optional[int]]: The matches, and the cursor of the next page (``None`` on the last page).
+
+    Raises:
+        HTTPException: If the query cannot be parsed.
+    """
+    query = Chem.MolFromSmarts(smarts)
+    if query is None:
+        raise HTTPException(status_code=400, detail=f"Invalid SMARTS: {smarts}")
+    query_pattern = pattern_fingerprint(query)
+    statement = _search_statement(
+        [
+            SpeciesFingerprint.id,
+            SpeciesFingerprint.species_id,
+            SpeciesFingerprint.np_species_id,
+            SpeciesFingerprint.smiles,
+        ],
+        source,
+    ).where(SpeciesFingerprint.pattern_count >= query_pattern.GetNumOnBits())
+    if query_pattern.GetNumOnBits():
+        query_bits = _bits(query_pattern.ToBitString())
+        statement = statement.where(
+            SpeciesFingerprint.pattern.op("&")(query_bits) == query_bits
+        )
+    if after_id is not None:
+        statement = statement.where(SpeciesFingerprint.id > after_id)
+    statement = statement.order_by(SpeciesFingerprint.id).execution_options(
+        yield_per=SPECIES_EXPORT_FETCH_SIZE
+    )
+
+    matches = list()
+    result = db.execute(statement)
+    try:
+        for row in result:
+            mol = Chem.MolFromSmiles(row.smiles)
+            if mol is not None and mol.HasSubstructMatch(query):
+                matches.append(
+                    {
+                        "species_id": row.species_id,
+                        "np_species_id": row.np_species_id,
+                        "smiles": row.smiles,
+                    }
+                )
+                if len(matches) == limit:
+                    return matches, row.id
+    finally:
+        result.close()
+    return matches, None
+
+
+def similarity_search(
+    db: Session,
+    smiles: str,
+    threshold: float,
+    limit: int,
+    source: SearchSource = "all",
+) -> List[Dict[str, Any]]:
+    """
+    Find the species most similar to a molecule (Tanimoto similarity of Morgan fingerprints).
+    Since the similarity of fingerprints with ``a`` and ``b`` bits set is at most ``min(a, b) / max(a, b)``,
+    only rows with between ``threshold * n`` and ``n / threshold`` bits set (``n`` bits in the query)
+    are compared, using the index on the bit count.
+
+    Args:
+        db (Session): The database session.
+        smiles (str): The SMILES descriptor of the query molecule.
+        threshold (float): The minimal similarity, in (0, 1].
+        limit (int): The maximal number of results.
+        source (SearchSource, optional): Search species, non-physical species, or all.
+
+    Returns:
+        List[Dict[str, Any]]: The most similar species, by decreasing similarity.
+
+    Raises:
+        HTTPException: If the query cannot be parsed.
+    """
+    mol = Chem.MolFromSmiles(smiles)
+    if mol is None:
+        raise HTTPException(status_code=400, detail=f"Invalid SMILES: {smiles}")
+    query = morgan_fingerprint(mol)
+    query_count = query.GetNumOnBits()
+    if not query_count:
+        return []
+    common = _bit_count(
+        db, SpeciesFingerprint.morgan.op("&")(_bits(query.ToBitString()))
+    )
+    similarity = cast(common, Float) / (
+        SpeciesFingerprint.morgan_count + query_count - common
+    )
+    candidates = (
+        _search_statement(
+            [
+                SpeciesFingerprint.id,
+                SpeciesFingerprint.species_id,
+                SpeciesFingerprint.np_species_id,
+                SpeciesFingerprint.smiles,
+                similarity.label("similarity"),
+            ],
+            source,
+        )
+        .where(
+            SpeciesFingerprint.morgan_count.between(
+                math.ceil(threshold * query_count - BOUND_TOLERANCE),
+                math.floor(query_count / threshold + BOUND_TOLERANCE),
+            )
+        )
+        .subquery()
+    )
+    statement = (
+        select(candidates)
+        .where(candidates.c.similarity >= threshold)
+        .order_by(candidates.c.similarity.desc(), candidates.c.id)
+        .limit(limit)
+    )
+    return [
+        {
+            "species_id": row.species_id,
+            "np_species_id": row.np_species_id,
+            "smiles": row.smiles,
+            "similarity": row.similarity,
+        }
+        for row in db.execute(statement)
+    ]
@@ -0,0 +1,355 @@
+"""
+TCKDB backend app services species module
+
+Projection-aware species reads.
+The columns of the species table are organized in groups. The heavy groups are mapped as deferred
+(see the ``Species`` model), and read queries only load the groups their caller asks for,
+so that, e.g., a thermo export never reads or decodes Hessians and trajectories.
+"""
+
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from fastapi import HTTPException
+from sqlalchemy import ColumnElement, Select, or_, select
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy.orm.interfaces import LoaderOption
+
+from tckdb.backend.app.core.config import SPECIES_EXPORT_FETCH_SIZE
+from tckdb.backend.app.models.species import Species
+from tckdb.backend.app.schemas.species import SpeciesRead
+
+SPECIES_COLUMN_GROUPS: Dict[str, Tuple[str, ...]] = {
+    "core": (
+        "id",
+        "identity_hash",
+        "version",
+        "label",
+        "statmech_software",
+        "timestamp",
+        "retracted",
+        "reviewed",
+        "approved",
+        "smiles",
+        "inchi",
+        "inchi_key",
+        "charge",
+        "multiplicity",
+        "electronic_state",
+        "fragments",
+        "external_symmetry",
+        "point_group",
+        "conformation_method",
+        "is_well",
+        "is_global_min",
+        "is_ts",
+        "electronic_energy",
+        "E0",
+        "rigid_rotor",
+        "statmech_treatment",
+        "freq_scale_id",
+        "encorr_id",
+        "literature_id",
+        "bot_id",
+        "opt_level_id",
+        "freq_level_id",
+        "scan_level_id",
+        "irc_level_id",
+        "sp_level_id",
+        "opt_ess_id",
+        "freq_ess_id",
+        "scan_ess_id",
+        "irc_ess_id",
+        "sp_ess_id",
+        "created_at",
+        "updated_at",
+        "deleted_at",
+    ),
+    "thermo": ("H298", "S298", "Cp_values", "Cp_T_list", "heat_capacity_model"),
+    "geometry": (
+        "coordinates",
+        "graph",
+        "fragment_orientation",
+        "chirality",
+        "global_min_geometry",
+    ),
+    "vibrational": (
+        "hessian",
+        "frequencies",
+        "scaled_projected_frequencies",
+        "normal_displacement_modes",
+        "rotational_constants",
+    ),
+    "scans": ("irc_trajectories", "torsions", "conformers"),
+    "extras": ("reviewer_flags", "active_space", "unconverged_jobs", "extras"),
+}
+
+DEFAULT_SPECIES_GROUPS = ("core",)
+
+# Columns exposed under a different name in ``SpeciesRead``
+SPECIES_READ_ALIASES = {"retracted": "retraction"}
+
+
+def resolve_column_groups(groups: Optional[Iterable[str]] = None) -> List[str]:
+    """
+    Check the requested column groups. The "core" group is always included.
+
+    Args:
+        groups (Iterable[str], optional): The requested column groups, ``None`` for the default groups.
+
+    Returns:
+        List[str]: The column groups to load, without duplicates.
+
+    Raises:
+        HTTPException: If a group is unknown.
+    """
+    groups = list(DEFAULT_SPECIES_GROUPS if groups is None else groups)
+    unknown = [group for group in groups if group not in SPECIES_COLUMN_GROUPS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown species column group(s) {unknown}, "
+            f"expected any of {list(SPECIES_COLUMN_GROUPS)}",
+        )
+    return list(dict.fromkeys(["core"] + groups))
+
+
+def species_columns(groups: Optional[Iterable[str]] = None) -> List[str]:
+    """
+    Get the names of the species columns in the requested groups.
+
+    Args:
+        groups (Iterable[str], optional): The requested column groups, ``None`` for the default groups.
+
+    Returns:
+        List[str]: The column names.
+    """
+    return [
+        column
+        for group in resolve_column_groups(groups)
+        for column in SPECIES_COLUMN_GROUPS[group]
+    ]
+
+
+def species_load_options(groups: Optional[Iterable[str]] = None) -> LoaderOption:
+    """
+    Get the ORM loader option that loads only the requested column groups of ``Species`` objects.
+    Other columns are loaded on access.
+
+    Args:
+        groups (Iterable[str], optional): The requested column groups, ``None`` for the default groups.
+
+    Returns:
+        LoaderOption: The loader option.
+    """
+    return load_only(*(getattr(Species, column) for column in species_columns(groups)))
+
+
+def species_filters(
+    inchi_key: Optional[str] = None,
+    smiles: Optional[str] = None,
+    charge: Optional[int] = None,
+    multiplicity: Optional[int] = None,
+    level_id: Optional[int] = None,
+    literature_id: Optional[int] = None,
+) -> List[ColumnElement]:
+    """
+    Build the filter conditions of a species read. Soft deleted species are always excluded.
+
+    Args:
+        inchi_key (str, optional): The InChI Key.
+        smiles (str, optional): The SMILES descriptor.
+        charge (int, optional): The net charge.
+        multiplicity (int, optional): The spin multiplicity.
+        level_id (int, optional): A level ID, matched against the opt, freq, scan, IRC and single point levels.
+        literature_id (int, optional): The literature ID.
+
+    Returns:
+        List[ColumnElement]: The filter conditions.
+    """
+    filters = [Species.deleted_at.is_(None)]
+    for column, value in (
+        (Species.inchi_key, inchi_key),
+        (Species.smiles, smiles),
+        (Species.charge, charge),
+        (Species.multiplicity, multiplicity),
+        (Species.literature_id, literature_id),
+    ):
+        if value is not None:
+            filters.append(column == value)
+    if level_id is not None:
+        filters.append(
+            or_(
+                Species.opt_level_id == level_id,
+                Species.freq_level_id == level_id,
+                Species.scan_level_id == level_id,
+                Species.irc_level_id == level_id,
+                Species.sp_level_id == level_id,
+            )
+        )
+    return filters
+
+
+def select_species(
+    groups: Optional[Iterable[str]] = None,
+    filters: Optional[List[ColumnElement]] = None,
+    after_id: Optional[int] = None,
+    limit: Optional[int] = None,
+) -> Select:
+    """
+    Build a select statement of the requested column groups of the species table.
+    Rows are returned as plain tuples, without creating ORM objects.
+    Pagination is keyset based: a page starts after the last species ID of the previous page,
+    so that every page is read from the primary key index, however deep it is.
+
+    Args:
+        groups (Iterable[str], optional): The requested column groups, ``None`` for the default groups.
+        filters (List[ColumnElement], optional): The filter conditions, see ``species_filters``.
+        after_id (int, optional): Only select species with a greater ID (the pagination cursor).
+        limit (int, optional): The maximal number of rows.
+
+    Returns:
+        Select: The select statement, ordered by species ID.
+    """
+    columns = [getattr(Species, column) for column in species_columns(groups)]
+    statement = select(*columns).where(*(filters or [])).order_by(Species.id)
+    if after_id is not None:
+        statement = statement.where(Species.id > after_id)
+    if limit is not None:
+        statement = statement.limit(limit)
+    return statement
+
+
+def select_species_by_id(
+    species_id: int, groups: Optional[Iterable[str]] = None
+) -> Select:
+    """
+    Build a select statement of the requested column groups of a (not soft deleted) species.
+
+    Args:
+        species_id (int): The species ID.
+        groups (Iterable[str], optional): The requested column groups, ``None`` for the default groups.
+
+    Returns:
+        Select: The select statement, returning at most one row.
+    """
+    filters = species_filters() + [Species.id == species_id]
+    return select_species(groups, filters, limit=1)
+
+
+def species_read_dict(values: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert the column values of a species into its ``SpeciesRead`` representation.
+    Only the fields of ``SpeciesRead`` are kept. The values are not validated again.
+
+    Args:
+        values (Dict[str, Any]): The column values by column name.
+
+    Returns:
+        Dict[str, Any]: The species fields.
+    """
+    species = dict()
+    for column, value in values.items():
+        field = SPECIES_READ_ALIASES.get(column, column)
+        if field in SpeciesRead.model_fields:
+            species[field] = value
+    return species
+
+
+def species_json_default(obj: Any) -> Any:
+    """
+    Encode the values of species columns that are not JSON serializable (``json.dumps`` default).
+
+    Args:
+        obj (Any): The value.
+
+    Returns:
+        Any: A JSON serializable form of the value.
+
+    Raises:
+        TypeError: If the value cannot be encoded.
+    """
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_species(species: Any) -> str:
+    """
+    Serialize species data to JSON.
+
+    Args:
+        species (Any): A species dictionary, or any JSON-like structure containing them.
+
+    Returns:
+        str: The JSON document.
+    """
+    return json.dumps(species, default=species_json_default)
+
+
+def iter_species_export(
+    db: Session, statement: Select, ndjson: bool = True
+) -> Iterator[str]:
+    """
+    Stream the species selected by a statement from a server-side cursor, one row at a time.
+    Only ``SPECIES_EXPORT_FETCH_SIZE`` rows are held in memory at any point of the export.
+
+    Args:
+        db (Session): The database session.
+        statement (Select): The species select statement, see ``select_species``.
+        ndjson (bool, optional): Whether to yield newline-delimited JSON records, otherwise a JSON array.
+
+    Yields:
+        str: The serialized species, with their separators.
+    """
+    result = db.execute(
+        statement.execution_options(yield_per=SPECIES_EXPORT_FETCH_SIZE)
+    )
+    try:
+        if ndjson:
+            for row in result.mappings():
+                yield dumps_species(species_read_dict(row)) + "\n"
+        else:
+            separator = "["
+            for row in result.mappings():
+                yield separator + dumps_species(species_read_dict(row))
+                separator = ","
+            yield "[]" if separator == "[" else "]"
+    finally:
+        result.close()
+
+
+def get_species(
+    db: Session, species_id: int, groups: Optional[Iterable[str]] = None
+) -> Species:
+    """
+    Get a species by its ID, loading only the requested column groups.
+
+    Args:
+        db (Session): The database session.
+        species_id (int): The species ID.
+        groups (Iterable[str], optional): The requested column groups, ``None`` for the default groups.
+
+    Returns:
+        Species: The species.
+
+    Raises:
+        HTTPException: If the species does not exist.
+    """
+    species = (
+        db.query(Species)
+        .options(species_load_options(groups))
+        .filter(Species.id == species_id, Species.deleted_at.is_(None))
+        .first()
+    )
+    if species is None:
+        raise HTTPException(
+            status_code=404, detail=f"Species with ID {species_id} not found."
+        )
+    return species
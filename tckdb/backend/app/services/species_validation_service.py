@@ -0,0 +1,93 @@
+"""
+TCKDB backend app services species validation module
+
+Parallel validation of the species of a batch payload.
+``SpeciesCreateBatch`` validation is CPU-bound (frequency, linearity, coordinate, conformer and graph checks),
+so instead of validating the species one after the other while the payload is parsed,
+the raw species are split into contiguous slices validated in the shared process pool.
+Results are reassembled by index, so the validated species and the errors do not depend on scheduling.
+"""
+
+import asyncio
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+
+from tckdb.backend.app.core.config import (
+    PROCESS_POOL_SIZE,
+    SPECIES_VALIDATION_INLINE_THRESHOLD,
+)
+from tckdb.backend.app.schemas.species import SpeciesCreateBatch
+from tckdb.backend.app.utils.process_pool import get_process_pool
+
+# The validation errors of each invalid species, by index in the payload
+SpeciesErrors = Dict[int, List[Dict[str, Any]]]
+# The number of slices per worker: more, smaller slices even out species of different sizes
+SLICES_PER_WORKER = 4
+
+
+def validate_species_slice(
+    species_list: List[Any],
+) -> List[Tuple[Optional[SpeciesCreateBatch], Optional[List[Dict[str, Any]]]]]:
+    """
+    Validate raw species, collecting the errors of invalid species instead of stopping at the first one.
+    Runs in the process pool workers; the errors are reduced to picklable values.
+
+    Args:
+        species_list (List[Any]): The raw species data.
+
+    Returns:
+        List[Tuple[Optional[SpeciesCreateBatch], Optional[List[Dict[str, Any]]]]]:
+            The validated species, or the validation errors, of each species.
+    """
+    results = []
+    for species_data in species_list:
+        try:
+            results.append((SpeciesCreateBatch.model_validate(species_data), None))
+        except ValidationError as e:
+            results.append(
+                (None, e.errors(include_url=False, include_context=False))
+            )
+    return results
+
+
+async def validate_species(
+    species_list: List[Any],
+) -> Tuple[List[Optional[SpeciesCreateBatch]], SpeciesErrors]:
+    """
+    Validate the species of a batch payload in parallel.
+    Small batches (fewer than ``SPECIES_VALIDATION_INLINE_THRESHOLD`` species) are validated in a thread,
+    since the round trip to the process pool would cost more than the validation.
+
+    Args:
+        species_list (List[Any]): The raw species data, with their descriptors already derived.
+
+    Returns:
+        Tuple[List[Optional[SpeciesCreateBatch]], SpeciesErrors]:
+            - The validated species in the order of ``species_list`` (``None`` for invalid species).
+            - The validation errors of the invalid species by index.
+    """
+    if len(species_list) < SPECIES_VALIDATION_INLINE_THRESHOLD:
+        results = await run_in_threadpool(validate_species_slice, species_list)
+    else:
+        slice_size = math.ceil(
+            len(species_list) / (max(1, PROCESS_POOL_SIZE) * SLICES_PER_WORKER)
+        )
+        loop = asyncio.get_running_loop()
+        executor = get_process_pool()
+        slices = await asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    executor,
+                    validate_species_slice,
+                    species_list[start : start + slice_size],
+                )
+                for start in range(0, len(species_list), slice_size)
+            )
+        )
+        results = [result for slice_results in slices for result in slice_results]
+    species = [model for model, _ in results]
+    errors = {i: error for i, (_, error) in enumerate(results) if error is not None}
+    return species, errors
@@ -0,0 +1,101 @@
+"""
+TCKDB backend app tests conversions test_descriptor_resolver module
+"""
+
+import asyncio
+
+import httpx
+import pytest
+
+import tckdb.backend.app.conversions.converter as converter
+import tckdb.backend.app.conversions.descriptor_resolver as descriptor_resolver
+
+METHANE_INCHI = "InChI=1S/CH4/h1H4"
+METHANE_INCHI_KEY = "VNWKTOKETHGBQD-UHFFFAOYSA-N"
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(converter, "identifier_cache", converter.IdentifierCache())
+    monkeypatch.setattr(
+        converter.molecule_env_pool, "adjlist_from_smiles", lambda smiles: None
+    )
+
+
+@pytest.mark.parametrize(
+    "species, expected",
+    [
+        ({"graph": "1 C u0 p0 c0"}, [("smiles_and_inchi_from_adjlist", "1 C u0 p0 c0")]),
+        (
+            {"inchi": METHANE_INCHI},
+            [("smiles_from_inchi", METHANE_INCHI), ("inchi_key_from_inchi", METHANE_INCHI)],
+        ),
+        ({"smiles": "C"}, [("inchi_from_smiles", "C"), ("adjlist_from_smiles", "C")]),
+        ({"inchi_key": METHANE_INCHI_KEY}, [("inchi_from_inchi_key", METHANE_INCHI_KEY)]),
+        (
+            {"smiles": "C", "inchi": METHANE_INCHI, "graph": "1 C", "inchi_key": "KEY"},
+            [],
+        ),
+    ],
+)
+def test_pending_conversions(species, expected):
+    assert descriptor_resolver.pending_conversions(species) == expected
+
+
+def test_resolve_descriptors_deduplicates_conversions(monkeypatch):
+    calls = []
+    run_conversion = descriptor_resolver.run_conversion
+
+    def counting_run_conversion(function, value):
+        calls.append((function, value))
+        return run_conversion(function, value)
+
+    monkeypatch.setattr(descriptor_resolver, "run_conversion", counting_run_conversion)
+    species_list = [
+        {"label": "CH4", "smiles": "C"},
+        {"label": "methane", "smiles": "C"},
+        {"label": "ethane", "smiles": "CC", "inchi_key": "GIVEN"},
+    ]
+    asyncio.run(descriptor_resolver.resolve_descriptors(species_list))
+
+    assert species_list[0]["inchi"] == species_list[1]["inchi"] == METHANE_INCHI
+    assert species_list[0]["inchi_key"] == METHANE_INCHI_KEY
+    assert species_list[0]["graph"].startswith("1 C u0 p0 c0")
+    assert species_list[2]["inchi_key"] == "GIVEN"
+    assert sorted(calls) == [
+        ("adjlist_from_smiles", "C"),
+        ("adjlist_from_smiles", "CC"),
+        ("inchi_from_smiles", "C"),
+        ("inchi_from_smiles", "CC"),
+        ("inchi_key_from_inchi", METHANE_INCHI),
+    ]
+    # The results are available to handle_descriptors through the identifier cache
+    assert converter.inchi_from_smiles("C") == METHANE_INCHI
+    assert converter.cache_info().hits == 1
+
+
+def test_fetch_inchi_from_inchi_key():
+    def handler(request):
+        assert request.url.params["molecule_structures__standard_inchi_key"] == METHANE_INCHI_KEY
+        return httpx.Response(
+            200, json={"molecules": [{"molecule_structures": {"standard_inchi": METHANE_INCHI}}]}
+        )
+
+    async def fetch():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await descriptor_resolver.fetch_inchi_from_inchi_key(
+                client, asyncio.Semaphore(1), METHANE_INCHI_KEY
+            )
+
+    assert asyncio.run(fetch()) == METHANE_INCHI
+
+
+def test_fetch_inchi_from_inchi_key_failure():
+    async def fetch():
+        transport = httpx.MockTransport(lambda request: httpx.Response(503))
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await descriptor_resolver.fetch_inchi_from_inchi_key(
+                client, asyncio.Semaphore(1), METHANE_INCHI_KEY
+            )
+
+    assert asyncio.run(fetch()) is None
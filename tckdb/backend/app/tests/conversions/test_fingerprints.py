@@ -0,0 +1,34 @@
+"""
+TCKDB backend app tests conversions test_fingerprints module
+"""
+
+from rdkit import Chem
+
+from tckdb.backend.app.conversions.fingerprints import (
+    FINGERPRINT_SIZE,
+    fingerprints_from_smiles,
+    pattern_fingerprint,
+)
+
+
+def bits(bit_string):
+    return {i for i, bit in enumerate(bit_string) if bit == "1"}
+
+
+def test_fingerprints_from_smiles():
+    fingerprints = fingerprints_from_smiles("CC=O")
+    assert len(fingerprints.morgan) == len(fingerprints.pattern) == FINGERPRINT_SIZE
+    assert len(bits(fingerprints.morgan)) == fingerprints.morgan_count > 0
+    assert len(bits(fingerprints.pattern)) == fingerprints.pattern_count > 0
+    assert fingerprints_from_smiles("C1CC") is None
+    assert fingerprints_from_smiles("") is None
+
+
+def test_pattern_screen():
+    """The pattern bits of a substructure are a subset of the pattern bits of every molecule containing it"""
+    carbonyl = bits(pattern_fingerprint(Chem.MolFromSmarts("C=O")).ToBitString())
+    for smiles, contains in (("CC=O", True), ("OC(=O)CC", True), ("CCO", False)):
+        molecule = bits(fingerprints_from_smiles(smiles).pattern)
+        assert Chem.MolFromSmiles(smiles).HasSubstructMatch(Chem.MolFromSmarts("C=O")) == contains
+        if contains:
+            assert carbonyl <= molecule
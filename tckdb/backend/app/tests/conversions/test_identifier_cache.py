@@ -0,0 +1,76 @@
+"""
+TCKDB backend app tests conversions test_identifier_cache module
+"""
+
+import pytest
+
+import tckdb.backend.app.conversions.converter as converter
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = converter.IdentifierCache(maxsize=2, path=str(tmp_path / "identifiers.sqlite"))
+    monkeypatch.setattr(converter, "identifier_cache", cache)
+    return cache
+
+
+def test_conversions_are_cached(cache, monkeypatch):
+    calls = []
+    original = converter.InchiToInchiKey
+
+    def counting_inchi_to_inchi_key(inchi):
+        calls.append(inchi)
+        return original(inchi)
+
+    monkeypatch.setattr(converter, "InchiToInchiKey", counting_inchi_to_inchi_key)
+    inchi = "InChI=1S/CH4/h1H4"
+    assert converter.inchi_key_from_inchi(inchi) == "VNWKTOKETHGBQD-UHFFFAOYSA-N"
+    assert converter.inchi_key_from_inchi(f"  {inchi}\n") == "VNWKTOKETHGBQD-UHFFFAOYSA-N"
+    assert calls == [inchi]
+    info = converter.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+
+
+def test_failed_conversions_are_not_cached(cache):
+    assert converter.inchi_from_smiles("not a smiles") is None
+    assert converter.inchi_from_smiles("not a smiles") is None
+    assert converter.cache_info().misses == 2
+    assert converter.cache_info().currsize == 0
+
+
+def test_lru_eviction_and_persistent_store(cache, tmp_path):
+    for smiles in ("C", "CC", "CCC"):
+        converter.inchi_from_smiles(smiles)
+    assert cache.info().currsize == 2
+
+    # A new process-level cache on the same file serves the entries without RDKit
+    reloaded = converter.IdentifierCache(maxsize=2, path=str(tmp_path / "identifiers.sqlite"))
+    assert reloaded.get(
+        ("inchi_from_smiles", "C", converter.TOOLKIT_VERSIONS["rdkit"])
+    ) == (True, "InChI=1S/CH4/h1H4")
+    assert reloaded.info().disk_hits == 1
+
+
+def test_tuples_survive_the_persistent_store(cache, tmp_path):
+    key = ("smiles_and_inchi_from_adjlist", "1 C u0 p0 c0", "molecule_env")
+    cache.set(key, ("C", "InChI=1S/CH4/h1H4"))
+    reloaded = converter.IdentifierCache(path=str(tmp_path / "identifiers.sqlite"))
+    assert reloaded.get(key) == (True, ("C", "InChI=1S/CH4/h1H4"))
+
+
+def test_canonical_input():
+    assert converter.canonical_input("  CCO \n") == "CCO"
+    adjlist = "multiplicity 2\n 1 C u1 p0 c0 {2,S}\n\n2 H u0 p0 c0 {1,S}  \n"
+    assert converter.canonical_input(adjlist) == (
+        "multiplicity 2\n1 C u1 p0 c0 {2,S}\n2 H u0 p0 c0 {1,S}"
+    )
+
+
+def test_molecule_env_entries_are_keyed_by_molecule_version(cache, monkeypatch):
+    monkeypatch.setattr(converter, "molecule_env_version", lambda: "3.1.0")
+    assert converter.toolkit_version("molecule_env") == "molecule_env-3.1.0"
+    converter.multiplicity_from_adjlist.cache_store("1 C u0 p0 c0", 1)
+    assert converter.multiplicity_from_adjlist.cache_lookup("1 C u0 p0 c0") == (True, 1)
+
+    monkeypatch.setattr(converter, "molecule_env_version", lambda: "3.2.0")
+    assert converter.multiplicity_from_adjlist.cache_lookup("1 C u0 p0 c0") == (False, None)
@@ -0,0 +1,40 @@
+"""
+TCKDB backend app tests conversions test_is_linear module
+"""
+
+import numpy as np
+
+from tckdb.backend.app.conversions.converter import is_linear, is_linear_batch
+
+
+def test_is_linear():
+    assert not is_linear(np.array([[0.0, 0.0, 0.0]]))
+    assert is_linear(np.array([[0.0, 0.0, 0.0], [0.0, 0.0, 1.1]]))
+    # CO2 with the carbon listed first, i.e., atom 0 between atoms 1 and 2
+    assert is_linear(np.array([[0.0, 0.0, 0.0], [0.0, 0.0, 1.16], [0.0, 0.0, -1.16]]))
+    # HCCH, not aligned with an axis
+    direction = np.array([1.0, 2.0, -0.5]) / np.linalg.norm([1.0, 2.0, -0.5])
+    acetylene = np.outer([0.0, 1.06, 2.26, 3.32], direction) + [0.3, -1.2, 4.0]
+    assert is_linear(acetylene)
+    # H2O
+    assert not is_linear(
+        np.array([[0.0, 0.0, 0.1173], [0.0, 0.7572, -0.4692], [0.0, -0.7572, -0.4692]])
+    )
+
+
+def test_is_linear_tolerance():
+    """The tolerance is 0.1 degrees between the first bond and the vectors to the other atoms"""
+    for angle, expected in ((0.05, True), (0.2, False)):
+        radians = np.radians(angle)
+        coordinates = np.array(
+            [[0.0, 0.0, -1.0], [0.0, 0.0, 0.0], [0.0, np.sin(radians), np.cos(radians)]]
+        )
+        assert is_linear(coordinates) is expected
+
+
+def test_is_linear_batch():
+    chain = np.zeros((50, 3))
+    chain[:, 0] = np.arange(50)
+    bent = chain.copy()
+    bent[25, 1] = 0.5
+    assert is_linear_batch([chain, bent, chain]).tolist() == [True, False, True]
@@ -0,0 +1,77 @@
+"""
+TCKDB backend app tests conversions test_local_adjlist module
+"""
+
+import pytest
+
+import tckdb.backend.app.conversions.converter as converter
+
+
+@pytest.mark.parametrize(
+    "smiles, expected",
+    [
+        (
+            "C",
+            """1 C u0 p0 c0 {2,S} {3,S} {4,S} {5,S}
+2 H u0 p0 c0 {1,S}
+3 H u0 p0 c0 {1,S}
+4 H u0 p0 c0 {1,S}
+5 H u0 p0 c0 {1,S}
+""",
+        ),
+        (
+            "[CH3]",
+            """multiplicity 2
+1 C u1 p0 c0 {2,S} {3,S} {4,S}
+2 H u0 p0 c0 {1,S}
+3 H u0 p0 c0 {1,S}
+4 H u0 p0 c0 {1,S}
+""",
+        ),
+        (
+            "C#N",
+            """1 C u0 p0 c0 {2,T} {3,S}
+2 N u0 p1 c0 {1,T}
+3 H u0 p0 c0 {1,S}
+""",
+        ),
+        (
+            "[OH-]",
+            """1 O u0 p3 c-1 {2,S}
+2 H u0 p0 c0 {1,S}
+""",
+        ),
+        (
+            "[O][O]",
+            """multiplicity 3
+1 O u1 p2 c0 {2,S}
+2 O u1 p2 c0 {1,S}
+""",
+        ),
+    ],
+)
+def test_rdkit_adjlist_from_smiles(smiles, expected):
+    assert converter.rdkit_adjlist_from_smiles(smiles) == expected
+
+
+def test_rdkit_adjlist_kekulizes_aromatic_rings():
+    adjlist = converter.rdkit_adjlist_from_smiles("c1ccccc1")
+    assert adjlist.count(",D}") == 6  # each of the 3 double bonds is listed on both atoms
+    assert ",B}" not in adjlist
+
+
+def test_rdkit_adjlist_invalid_smiles():
+    assert converter.rdkit_adjlist_from_smiles("not a smiles") is None
+
+
+def test_adjlist_from_smiles_does_not_use_the_web_service(monkeypatch):
+    monkeypatch.setattr(converter, "identifier_cache", converter.IdentifierCache())
+    monkeypatch.setattr(converter, "ADJLIST_WEB_FALLBACK", False)
+
+    def web_service(*args, **kwargs):
+        raise AssertionError("The web service must not be called")
+
+    monkeypatch.setattr(converter, "adjlist_from_smiles_web", web_service)
+    monkeypatch.setattr(converter.molecule_env_pool, "adjlist_from_smiles", lambda smiles: None)
+    assert converter.adjlist_from_smiles("CO").startswith("1 C u0 p0 c0")
+    assert converter.adjlist_from_smiles("not a smiles") is None
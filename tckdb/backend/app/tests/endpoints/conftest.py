@@ -16,6 +16,7 @@ from sqlalchemy.orm import sessionmaker
 from tckdb.backend.app.db.query import SoftDeleteQuery
 from tckdb.backend.app.db.session import get_db
 from tckdb.backend.app.main import app
+from tckdb.backend.app.services.reference_cache import reference_cache
 
 
 API_V1_STR = "/api/v1"
@@ -97,6 +98,8 @@ def db_session(setup_database):
     if transaction.is_active:
         transaction.rollback()
     connection.close()
+    # Rows committed by the session were rolled back with the test transaction
+    reference_cache.invalidate()
 
 
 @pytest.fixture(scope="class")
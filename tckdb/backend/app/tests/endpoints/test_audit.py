@@ -0,0 +1,104 @@
+import pytest
+from sqlalchemy import event
+
+from tckdb.backend.app.core.config import API_V1_STR
+from tckdb.backend.app.models.audit import AuditLog
+from tckdb.backend.app.models.bot import Bot as BotModel
+from tckdb.backend.app.models.literature import Literature as LiteratureModel
+from tckdb.backend.app.models.species import Species as SpeciesModel
+from tckdb.backend.app.tests.endpoints.conftest import engine
+from tckdb.backend.app.tests.endpoints.test_batch_upload import batch_payload
+
+
+@pytest.mark.usefixtures("setup_database")
+class TestAuditLog:
+    """
+    A class to test the buffered audit log
+    """
+
+    def test_records_written_at_commit(self, db_session):
+        """
+        Test that audit records are written in one insert at commit, without rolled back savepoints
+        """
+        kept = BotModel(name="T3", version="1.0", url="https://t3.example.org")
+        db_session.add(kept)
+        db_session.flush()
+        with pytest.raises(ValueError):
+            with db_session.begin_nested():
+                db_session.add(
+                    BotModel(name="AutoTST", version="1.0", url="https://autotst.org")
+                )
+                db_session.flush()
+                raise ValueError("rolled back")
+        assert db_session.query(AuditLog).count() == 0
+
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            db_session.commit()
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+        assert len([s for s in statements if "INSERT INTO audit_logs" in s]) == 1
+        logs = db_session.query(AuditLog).all()
+        assert [(log.model, log.model_id, log.action) for log in logs] == [
+            ("bot", kept.id, "create")
+        ]
+
+    def test_update_diffs_scalars_and_checksums_blobs(self, client, db_session):
+        """
+        Test that updates record scalar values and blob checksums
+        """
+        response = client.post(f"{API_V1_STR}/batch-upload", json=batch_payload())
+        assert response.status_code == 200, response.text
+        species_id = response.json()["species"][0]["id"]
+        db_session.commit()
+        assert db_session.query(AuditLog).filter_by(
+            model="species", model_id=species_id, action="create"
+        ).count() == 1
+
+        species = db_session.get(SpeciesModel, species_id)
+        species.label = "methane"
+        species.hessian = [[1.0, 0.0], [0.0, 1.0]]
+        db_session.commit()
+        log = (
+            db_session.query(AuditLog)
+            .filter_by(model="species", model_id=species_id, action="update")
+            .one()
+        )
+        assert log.changes["label"] == {"old": "CH4", "new": "methane"}
+        assert set(log.changes["hessian"]) == {"old_checksum", "new_checksum"}
+        assert len(log.changes["hessian"]["new_checksum"]) == 64
+        hessian = log.changes["hessian"]
+        assert hessian["old_checksum"] != hessian["new_checksum"]
+        assert set(log.changes) == {"label", "hessian"}
+
+    def test_batch_upload_audits_bots_and_literature(self, client, db_session):
+        """
+        Test that the bots and literature created by a batch upload with bulk inserts are audited
+        """
+        payload = batch_payload()
+        payload["bots"][0]["name"] = "ARC (audited)"
+        payload["literature"][0]["isbn"] = "9780306406157"
+        response = client.post(f"{API_V1_STR}/batch-upload", json=payload)
+        assert response.status_code == 200, response.text
+        db_session.commit()
+        bot = db_session.query(BotModel).filter_by(name="ARC (audited)").one()
+        literature = (
+            db_session.query(LiteratureModel).filter_by(isbn="9780306406157").one()
+        )
+        for model, model_id in (("bot", bot.id), ("literature", literature.id)):
+            assert db_session.query(AuditLog).filter_by(
+                model=model, model_id=model_id, action="create"
+            ).count() == 1
+
+        # Rows resolved to existing ones are not audited again
+        response = client.post(f"{API_V1_STR}/batch-upload", json=payload)
+        assert response.status_code == 200, response.text
+        db_session.commit()
+        assert db_session.query(AuditLog).filter_by(
+            model="bot", model_id=bot.id
+        ).count() == 1
@@ -0,0 +1,105 @@
+import copy
+
+import pytest
+
+from tckdb.backend.app.core.config import API_V1_STR
+from tckdb.backend.app.models.species import Species as SpeciesModel
+from tckdb.backend.app.services import batch_commit_service
+from tckdb.backend.app.tests.endpoints.test_batch_upload import batch_payload
+
+
+def chunked_payload(count=3):
+    """
+    A batch upload payload with several species, each persisted as a new version of the first one
+    """
+    payload = batch_payload()
+    species = payload["species"][0]
+    payload["species"] = []
+    for i in range(count):
+        species_data = copy.deepcopy(species)
+        species_data["connection_id"] = f"temp_species_{i + 1}"
+        payload["species"].append(species_data)
+    return payload
+
+
+@pytest.mark.usefixtures("setup_database")
+class TestBatchCommit:
+    """
+    A class to test the chunked batch uploads and their checkpoints
+    """
+
+    def upload(self, client, payload, key=None, chunk_size=2):
+        response = client.post(
+            f"{API_V1_STR}/batch-upload",
+            params={"chunk_size": chunk_size, "on_duplicate": "version"},
+            headers={"Idempotency-Key": key} if key else {},
+            json=payload,
+        )
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    def test_failed_chunk_is_isolated(self, client, db_session):
+        """
+        Test that a chunk with an invalid species fails on its own, and the other chunks are committed
+        """
+        payload = chunked_payload()
+        payload["species"][2]["charge"] = "spam"
+        count = db_session.query(SpeciesModel).count()
+        data = self.upload(client, payload)
+        assert data["detail"] == "Batch upload partially committed."
+        assert data["failed_chunks"] == 1
+        assert [chunk["status"] for chunk in data["chunks"]] == ["committed", "failed"]
+        assert data["chunks"][1]["start"] == 2
+        assert data["chunks"][1]["errors"]["2"][0]["loc"][:4] == [
+            "body",
+            "species",
+            2,
+            "charge",
+        ]
+        assert all(species["id"] for species in data["species"][:2])
+        assert data["species"][2] == {"id": None, "status": "failed"}
+        assert db_session.query(SpeciesModel).count() == count + 2
+
+    def test_resume_with_idempotency_key(self, client, db_session, monkeypatch):
+        """
+        Test that an upload repeated with its idempotency key only persists the chunks that did not commit
+        """
+        insert_species = batch_commit_service.insert_species
+
+        def fail_second_chunk(db, species, temp_id_map, on_duplicate):
+            if species[0].connection_id == "temp_species_3":
+                raise RuntimeError("connection lost")
+            return insert_species(db, species, temp_id_map, on_duplicate)
+
+        payload = chunked_payload()
+        count = db_session.query(SpeciesModel).count()
+        monkeypatch.setattr(batch_commit_service, "insert_species", fail_second_chunk)
+        data = self.upload(client, payload, key="upload-1")
+        assert data["chunks"][1]["errors"] == "Internal Server Error: connection lost"
+        assert db_session.query(SpeciesModel).count() == count + 2
+
+        monkeypatch.setattr(batch_commit_service, "insert_species", insert_species)
+        resumed = self.upload(client, payload, key="upload-1")
+        assert resumed["failed_chunks"] == 0
+        assert resumed["chunks"][0]["resumed"] is True
+        assert "resumed" not in resumed["chunks"][1]
+        assert resumed["species"][:2] == data["species"][:2]
+        assert db_session.query(SpeciesModel).count() == count + 3
+
+        again = self.upload(client, payload, key="upload-1")
+        assert all(chunk["resumed"] for chunk in again["chunks"])
+        assert again["species"] == resumed["species"]
+        assert db_session.query(SpeciesModel).count() == count + 3
+
+    def test_idempotency_key_reuse(self, client):
+        """
+        Test that an idempotency key cannot be reused for a different upload
+        """
+        self.upload(client, chunked_payload(), key="upload-2")
+        response = client.post(
+            f"{API_V1_STR}/batch-upload",
+            params={"chunk_size": 2, "on_duplicate": "version"},
+            headers={"Idempotency-Key": "upload-2"},
+            json=chunked_payload(count=4),
+        )
+        assert response.status_code == 409
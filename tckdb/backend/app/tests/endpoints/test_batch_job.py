@@ -0,0 +1,158 @@
+import threading
+from datetime import datetime, timezone
+
+import pytest
+
+from tckdb.backend.app.core.config import API_V1_STR
+from tckdb.backend.app.models.batch_job import BatchJob
+from tckdb.backend.app.models.species import Species as SpeciesModel
+from tckdb.backend.app.services import batch_job_service
+from tckdb.backend.app.services.batch_job_service import (
+    claim_batch_job,
+    run_next_batch_job,
+)
+from tckdb.backend.app.tests.endpoints.test_batch_upload import batch_payload
+
+EXPIRED = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.mark.usefixtures("setup_database")
+class TestBatchJob:
+    """
+    A class to test the queued batch uploads
+    """
+
+    def test_queued_upload(self, client, db_session):
+        """
+        Test that a queued upload is accepted at once and persisted by a worker
+        """
+        response = client.post(
+            f"{API_V1_STR}/batch-upload/jobs",
+            json=batch_payload(),
+            params={"on_duplicate": "skip"},
+        )
+        assert response.status_code == 202, response.text
+        job_id = response.json()["job_id"]
+        assert response.json()["status_url"].endswith(f"/batch-upload/jobs/{job_id}")
+        response = client.get(f"{API_V1_STR}/batch-upload/jobs/{job_id}")
+        assert response.json()["status"] == "queued"
+
+        assert run_next_batch_job(db_session, "test-worker") == job_id
+        assert run_next_batch_job(db_session, "test-worker") is None
+        db_session.expire_all()
+        job = client.get(f"{API_V1_STR}/batch-upload/jobs/{job_id}").json()
+        assert job["status"] == "succeeded", job
+        assert job["attempts"] == 1
+        assert job["progress"] == {"stage": "persisting", "species": 1, "total": 1}
+        species_id = job["result"]["species"][0]["id"]
+        assert db_session.get(SpeciesModel, species_id).label == "CH4"
+
+    def test_invalid_upload_fails(self, client, db_session):
+        """
+        Test that a payload that does not validate fails its job with the validation errors
+        """
+        payload = batch_payload()
+        payload["species"][0]["charge"] = "spam"
+        response = client.post(f"{API_V1_STR}/batch-upload/jobs", json=payload)
+        job_id = response.json()["job_id"]
+        run_next_batch_job(db_session, "test-worker")
+        db_session.expire_all()
+        job = client.get(f"{API_V1_STR}/batch-upload/jobs/{job_id}").json()
+        assert job["status"] == "failed"
+        assert job["error"]["detail"][0]["loc"][:3] == ["species", 0, "charge"]
+
+        response = client.post(f"{API_V1_STR}/batch-upload/jobs", json=[1, 2])
+        assert response.status_code == 400
+        response = client.get(f"{API_V1_STR}/batch-upload/jobs/0")
+        assert response.status_code == 404
+
+    def test_abandoned_job_is_reclaimed(self, db_session):
+        """
+        Test that a running job whose lease expired is claimed again, up to the maximal number of attempts
+        """
+        job = BatchJob(status="running", payload={}, on_duplicate="skip", attempts=1)
+        db_session.add(job)
+        db_session.commit()
+        db_session.execute(
+            BatchJob.__table__.update()
+            .where(BatchJob.id == job.id)
+            .values(lease_expires_at=EXPIRED)
+        )
+        assert claim_batch_job(db_session, "test-worker").id == job.id
+        assert job.attempts == 2 and job.worker == "test-worker"
+
+        db_session.execute(
+            BatchJob.__table__.update()
+            .where(BatchJob.id == job.id)
+            .values(attempts=3, lease_expires_at=EXPIRED)
+        )
+        assert claim_batch_job(db_session, "test-worker") is None
+        db_session.refresh(job)
+        assert job.status == "failed"
+
+    def test_worker_listens_to_reference_notifications(self, monkeypatch):
+        """
+        Test that a worker process runs its own reference cache listener while it runs
+        """
+        calls = []
+        monkeypatch.setattr(
+            batch_job_service,
+            "start_reference_cache_listener",
+            lambda: calls.append("start"),
+        )
+        monkeypatch.setattr(
+            batch_job_service,
+            "stop_reference_cache_listener",
+            lambda: calls.append("stop"),
+        )
+        stop = threading.Event()
+        stop.set()
+        batch_job_service.batch_job_worker(stop, "test-worker")
+        assert calls == ["start", "stop"]
+
+    def test_reclaimed_job_is_fenced(self, client, db_session, monkeypatch):
+        """
+        Test that a worker whose job was claimed again neither commits its data nor the job status
+        """
+        response = client.post(
+            f"{API_V1_STR}/batch-upload/jobs",
+            json=batch_payload(),
+            params={"on_duplicate": "version"},
+        )
+        job_id = response.json()["job_id"]
+        job = claim_batch_job(db_session, "stale-worker")
+        assert job.id == job_id
+        count = db_session.query(SpeciesModel).count()
+        reclaim = (
+            BatchJob.__table__.update()
+            .where(BatchJob.id == job_id)
+            .values(worker="other-worker", attempts=job.attempts + 1)
+        )
+
+        # Claimed again before the stale worker reports progress: the report is refused
+        db_session.execute(reclaim)
+        batch_job_service.run_batch_job(db_session, job)
+        db_session.expire_all()
+        assert db_session.get(BatchJob, job_id).status == "running"
+        assert db_session.get(BatchJob, job_id).progress is None
+        assert db_session.query(SpeciesModel).count() == count
+
+        # Claimed again while the stale worker persists the batch: its data is rolled back
+        db_session.execute(
+            BatchJob.__table__.update()
+            .where(BatchJob.id == job_id)
+            .values(worker="stale-worker", attempts=job.attempts)
+        )
+        persist_batch = batch_job_service.persist_batch
+
+        def persist_and_reclaim(db, *args, **kwargs):
+            species = persist_batch(db, *args, **kwargs)
+            db.execute(reclaim)
+            return species
+
+        monkeypatch.setattr(batch_job_service, "persist_batch", persist_and_reclaim)
+        batch_job_service.run_batch_job(db_session, job)
+        db_session.expire_all()
+        assert db_session.get(BatchJob, job_id).status == "running"
+        assert db_session.get(BatchJob, job_id).result is None
+        assert db_session.query(SpeciesModel).count() == count
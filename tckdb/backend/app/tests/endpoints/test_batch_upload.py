@@ -1,7 +1,301 @@
+import asyncio
+import json
+
 import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
 
 from tckdb.backend.app.core.config import API_V1_STR
+from tckdb.backend.app.models.author import Author as AuthorModel
+from tckdb.backend.app.models.bot import Bot as BotModel
+from tckdb.backend.app.models.ess import ESS as ESSModel
+from tckdb.backend.app.models.freqscale import FreqScale as FreqScaleModel
+from tckdb.backend.app.models.level import Level as LevelModel
+from tckdb.backend.app.models.literature import Literature as LiteratureModel
 from tckdb.backend.app.models.species import Species as SpeciesModel
+from tckdb.backend.app.schemas.author import AuthorCreate
+from tckdb.backend.app.schemas.batch import BatchUploadPayload
+from tckdb.backend.app.schemas.freq_scale import FreqScaleCreateBatch
+from tckdb.backend.app.services.author_service import resolve_authors
+from tckdb.backend.app.services.batch_service import (
+    BATCH_ENTITIES,
+    batch_stages,
+    resolve_freq_scales,
+)
+from tckdb.backend.app.services.batch_stream_service import iter_ndjson_lines
+
+
+def batch_payload():
+    """
+    A function to create the batch upload payload used by the endpoint tests
+    """
+    return {
+        # "authors": [
+        #     {
+        #     "connection_id": "temp_author_1",
+        #     "first_name": "Calvin",
+        #     "last_name": "Pieters",
+        #     "orcid": "0000-0001-6377-2161"},
+        #     {
+        #     "connection_id": "temp_author_2",
+        #     "first_name": "Florian",
+        #     "last_name": "Solbach",
+        #     "orcid": "0000-0003-1923-3747"}
+        # ],
+        "literature": [
+            {
+                "connection_id": "temp_literature_1",
+                # "author_connection_ids": ["temp_author_1", "temp_author_2"],
+                "authors": [
+                    {
+                        "first_name": "Calvin",
+                        "last_name": "Pieters",
+                        "orcid": "0000-0001-6377-2161",
+                    },
+                    {
+                        "first_name": "Florian",
+                        "last_name": "Solbach",
+                        "orcid": "0000-0003-1923-3747",
+                    },
+                ],
+                "type": "book",
+                "title": "Quantum Chemistry and Computing for the Curious",
+                "year": 2022,
+                "publisher": "Springer",
+                "editors": "Calvin Pieters",
+                "chapter_title": "Chapter 1",
+                "publication_place": "Berlin",
+                "isbn": "9781803238593",
+            }
+        ],
+        "freq_scales": [
+            {
+                "connection_id": "temp_freq_scale_1",
+                "factor": 1.0,
+                "source": "J.A. Montgomery, M.J. Frisch, J. Chem. Phys. 1999, 110, 2822–2827",
+                "level_connection_id": "temp_level_1",
+            }
+        ],
+        "encorr": [
+            {
+                "connection_id": "temp_encorr_1",
+                "supported_elements": ["H", "C", "N", "O", "S", "P"],
+                "energy_unit": "kJ/mol",
+                # "aec": {'H': -0.502155915123, 'C': -37.8574709934,
+                #         'N': -54.6007233609, 'O': -75.0909131284,
+                #         'P': -341.281730319, 'S': -398.134489850
+                #         },
+                # "bac": {'C-H': 0.25, 'C-C': -1.89, 'C=C': -0.40, 'C#C': -1.50,
+                #         'O-H': -1.09, 'C-O': -1.18, 'C=O': -0.01, 'N-H': 1.36,
+                #         'C-N': -0.44, 'C#N': 0.22, 'C-S': -2.35, 'O=S': -5.19,
+                #         'S-H': -0.52
+                #         },
+                "isodesmic_reactions": [
+                    {
+                        "reactants": ["[CH2]CCCC", "[CH]"],
+                        "products": ["[C]C", "[CH2]C(C)C"],
+                        "stoichiometry": [1, 1, 1, 1],
+                        "DHrxn298": 16.809,
+                    }
+                ],
+                "primary_level_connection_id": "temp_level_encorr",
+                "isodesmic_level_connection_id": "temp_level_isodesmic",
+            }
+        ],
+        "bots": [
+            {
+                "connection_id": "temp_bot_1",
+                "name": "ARC",
+                "version": "1.0",
+                "url": "https://arc.github.io",
+            }
+        ],
+        "levels": [
+            {
+                "connection_id": "temp_level_1",
+                "method": "B3LYP",
+                "basis": "6-31G(d,p)",
+                "dispersion": "gd3bj",
+            },
+            {
+                "connection_id": "temp_level_encorr",
+                "method": "B3LYP",
+                "basis": "6-31G(d,p)",
+                "dispersion": "gd3bj",
+            },
+            {
+                "connection_id": "temp_level_isodesmic",
+                "method": "M062X",
+                "basis": "cc-pVTZ",
+            },
+            {
+                "connection_id": "temp_level_irc",
+                "method": "B3LYP",
+                "basis": "6-31G(d,p)",
+                "dispersion": "gd3bj",
+            },
+            {
+                "connection_id": "temp_level_freq",
+                "method": "B3LYP",
+                "basis": "6-31G(d,p)",
+                "dispersion": "gd3bj",
+            },
+            {
+                "connection_id": "temp_level_sp",
+                "method": "B3LYP",
+                "basis": "6-31G(d,p)",
+                "dispersion": "gd3bj",
+            },
+            {
+                "connection_id": "temp_level_opt",
+                "method": "B3LYP",
+                "basis": "6-31G(d,p)",
+                "dispersion": "gd3bj",
+            },
+            {
+                "connection_id": "temp_level_freq_scan",
+                "method": "B3LYP",
+                "basis": "6-31G(d,p)",
+                "dispersion": "gd3bj",
+            },
+        ],
+        "ess": [
+            {
+                "connection_id": "temp_ess_irc_sp_scan",
+                "name": "Gaussian",
+                "version": "16",
+                "revision": "A",
+                "url": "https://gaussian.com",
+            },
+            {
+                "connection_id": "temp_ess_opt_freq",
+                "name": "Gaussian",
+                "version": "09",
+                "revision": "D",
+                "url": "https://gaussian.com",
+            },
+        ],
+        "species": [
+            {
+                "connection_id": "temp_species_1",
+                "label": "CH4",
+                "smiles": "C",
+                "charge": 0,
+                "multiplicity": 1,
+                "coordinates": {
+                    "symbols": ("C", "H", "H", "H", "H"),
+                    "isotopes": (12, 1, 1, 1, 1),
+                    "coords": (
+                        (0.0, 0.0, 0.0),
+                        (0.6300326, 0.6300326, 0.6300326),
+                        (-0.6300326, -0.6300326, 0.6300326),
+                        (-0.6300326, 0.6300326, -0.6300326),
+                        (0.6300326, -0.6300326, -0.6300326),
+                    ),
+                },
+                "external_symmetry": 4,
+                "point_group": "Td",
+                "conformation_method": "ARC v1.1.0",
+                "is_well": True,
+                "electronic_energy": -365.544,
+                "E0": -370.240,
+                "hessian": [
+                    [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
+                    [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
+                    [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
+                    [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
+                    [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
+                    [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
+                    [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
+                    [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
+                    [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
+                    [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
+                    [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
+                    [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
+                    [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
+                    [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
+                    [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
+                ],
+                "frequencies": [
+                    3046,
+                    1555,
+                    1555,
+                    3168,
+                    3168,
+                    3168,
+                    1368,
+                    1368,
+                    1368,
+                ],
+                "scaled_projected_frequencies": [
+                    3015.54,
+                    1539.45,
+                    1539.45,
+                    3136.32,
+                    3136.32,
+                    3136.32,
+                    1354.32,
+                    1354.32,
+                    1354.32,
+                ],
+                "normal_displacement_modes": [
+                    [[1, 2, 3], [1, 2, 3], [1, 2, 3], [1, 2, 3], [1, 2, 3]],
+                    [[1, 2, 3], [1, 2, 3], [1, 2, 3], [1, 2, 3], [1, 2, 3]],
+                    [[1, 2, 3], [1, 2, 3], [1, 2, 3], [1, 2, 3], [1, 2, 3]],
+                    [[1, 2, 3], [1, 2, 3], [1, 2, 3], [1, 2, 3], [1, 2, 3]],
+                    [[1, 2, 3], [1, 2, 3], [1, 2, 3], [1, 2, 3], [1, 2, 3]],
+                    [[1, 2, 3], [1, 2, 3], [1, 2, 3], [1, 2, 3], [1, 2, 3]],
+                    [[1, 2, 3], [1, 2, 3], [1, 2, 3], [1, 2, 3], [1, 2, 3]],
+                    [[1, 2, 3], [1, 2, 3], [1, 2, 3], [1, 2, 3], [1, 2, 3]],
+                    [[1, 2, 3], [1, 2, 3], [1, 2, 3], [1, 2, 3], [1, 2, 3]],
+                ],
+                "rigid_rotor": "spherical top",
+                "statmech_treatment": "RRHO",
+                "rotational_constants": [1, 2, 3],
+                "H298": -74.52,
+                "S298": 186.06,
+                "Cp_values": [36.07, 40.38, 45.77, 51.63, 62.30, 71.00, 85.94],
+                "Cp_T_list": [300, 400, 500, 600, 800, 1000, 1500],
+                "bot_connection_id": "temp_bot_1",
+                "literature_connection_id": "temp_literature_1",
+                "encorr_connection_id": "temp_encorr_1",
+                "freq_scale_connection_id": "temp_freq_scale_1",
+                "level_connections": {
+                    "irc": "temp_level_irc",
+                    "opt": "temp_level_opt",
+                    "scan": "temp_level_freq_scan",
+                    "sp": "temp_level_sp",
+                    "freq": "temp_level_freq",
+                },
+                "ess_connections": {
+                    "irc": "temp_ess_irc_sp_scan",
+                    "opt": "temp_ess_opt_freq",
+                    "scan": "temp_ess_irc_sp_scan",
+                    "sp": "temp_ess_irc_sp_scan",
+                    "freq": "temp_ess_opt_freq",
+                },
+            }
+        ],
+    }
+
+
+def test_iter_ndjson_lines_long_line():
+    """
+    Test that a line spanning many pieces of the stream is split out whole
+    """
+    piece_size = 64 * 1024
+    long_line = b'{"type": "species", "data": "' + b"x" * (16 * 1024 * 1024) + b'"}'
+    body = b"first\n\n" + long_line + b"\nlast"
+
+    async def stream():
+        for start in range(0, len(body), piece_size):
+            yield body[start : start + piece_size]
+
+    async def collect():
+        return [item async for item in iter_ndjson_lines(stream())]
+
+    assert asyncio.run(collect()) == [(1, b"first"), (3, long_line), (4, b"last")]
 
 
 @pytest.mark.usefixtures("setup_database")
@@ -15,255 +309,7 @@ class TestBatchEndpoint:
         """
         A function to setup a payload
         """
-        payload = {
-            # "authors": [
-            #     {
-            #     "connection_id": "temp_author_1",
-            #     "first_name": "Calvin",
-            #     "last_name": "Pieters",
-            #     "orcid": "0000-0001-6377-2161"},
-            #     {
-            #     "connection_id": "temp_author_2",
-            #     "first_name": "Florian",
-            #     "last_name": "Solbach",
-            #     "orcid": "0000-0003-1923-3747"}
-            # ],
-            "literature": [
-                {
-                    "connection_id": "temp_literature_1",
-                    # "author_connection_ids": ["temp_author_1", "temp_author_2"],
-                    "authors": [
-                        {
-                            "first_name": "Calvin",
-                            "last_name": "Pieters",
-                            "orcid": "0000-0001-6377-2161",
-                        },
-                        {
-                            "first_name": "Florian",
-                            "last_name": "Solbach",
-                            "orcid": "0000-0003-1923-3747",
-                        },
-                    ],
-                    "type": "book",
-                    "title": "Quantum Chemistry and Computing for the Curious",
-                    "year": 2022,
-                    "publisher": "Springer",
-                    "editors": "Calvin Pieters",
-                    "chapter_title": "Chapter 1",
-                    "publication_place": "Berlin",
-                    "isbn": "9781803238593",
-                }
-            ],
-            "freq_scales": [
-                {
-                    "connection_id": "temp_freq_scale_1",
-                    "factor": 1.0,
-                    "source": "J.A. Montgomery, M.J. Frisch, J. Chem. Phys. 1999, 110, 2822–2827",
-                    "level_connection_id": "temp_level_1",
-                }
-            ],
-            "encorr": [
-                {
-                    "connection_id": "temp_encorr_1",
-                    "supported_elements": ["H", "C", "N", "O", "S", "P"],
-                    "energy_unit": "kJ/mol",
-                    # "aec": {'H': -0.502155915123, 'C': -37.8574709934,
-                    #         'N': -54.6007233609, 'O': -75.0909131284,
-                    #         'P': -341.281730319, 'S': -398.134489850
-                    #         },
-                    # "bac": {'C-H': 0.25, 'C-C': -1.89, 'C=C': -0.40, 'C#C': -1.50,
-                    #         'O-H': -1.09, 'C-O': -1.18, 'C=O': -0.01, 'N-H': 1.36,
-                    #         'C-N': -0.44, 'C#N': 0.22, 'C-S': -2.35, 'O=S': -5.19,
-                    #         'S-H': -0.52
-                    #         },
-                    "isodesmic_reactions": [
-                        {
-                            "reactants": ["[CH2]CCCC", "[CH]"],
-                            "products": ["[C]C", "[CH2]C(C)C"],
-                            "stoichiometry": [1, 1, 1, 1],
-                            "DHrxn298": 16.809,
-                        }
-                    ],
-                    "primary_level_connection_id": "temp_level_encorr",
-                    "isodesmic_level_connection_id": "temp_level_isodesmic",
-                }
-            ],
-            "bots": [
-                {
-                    "connection_id": "temp_bot_1",
-                    "name": "ARC",
-                    "version": "1.0",
-                    "url": "https://arc.github.io",
-                }
-            ],
-            "levels": [
-                {
-                    "connection_id": "temp_level_1",
-                    "method": "B3LYP",
-                    "basis": "6-31G(d,p)",
-                    "dispersion": "gd3bj",
-                },
-                {
-                    "connection_id": "temp_level_encorr",
-                    "method": "B3LYP",
-                    "basis": "6-31G(d,p)",
-                    "dispersion": "gd3bj",
-                },
-                {
-                    "connection_id": "temp_level_isodesmic",
-                    "method": "M062X",
-                    "basis": "cc-pVTZ",
-                },
-                {
-                    "connection_id": "temp_level_irc",
-                    "method": "B3LYP",
-                    "basis": "6-31G(d,p)",
-                    "dispersion": "gd3bj",
-                },
-                {
-                    "connection_id": "temp_level_freq",
-                    "method": "B3LYP",
-                    "basis": "6-31G(d,p)",
-                    "dispersion": "gd3bj",
-                },
-                {
-                    "connection_id": "temp_level_sp",
-                    "method": "B3LYP",
-                    "basis": "6-31G(d,p)",
-                    "dispersion": "gd3bj",
-                },
-                {
-                    "connection_id": "temp_level_opt",
-                    "method": "B3LYP",
-                    "basis": "6-31G(d,p)",
-                    "dispersion": "gd3bj",
-                },
-                {
-                    "connection_id": "temp_level_freq_scan",
-                    "method": "B3LYP",
-                    "basis": "6-31G(d,p)",
-                    "dispersion": "gd3bj",
-                },
-            ],
-            "ess": [
-                {
-                    "connection_id": "temp_ess_irc_sp_scan",
-                    "name": "Gaussian",
-                    "version": "16",
-                    "revision": "A",
-                    "url": "https://gaussian.com",
-                },
-                {
-                    "connection_id": "temp_ess_opt_freq",
-                    "name": "Gaussian",
-                    "version": "09",
-                    "revision": "D",
-                    "url": "https://gaussian.com",
-                },
-            ],
-            "species": [
-                {
-                    "connection_id": "temp_species_1",
-                    "label": "CH4",
-                    "smiles": "C",
-                    "charge": 0,
-                    "multiplicity": 1,
-                    "coordinates": {
-                        "symbols": ("C", "H", "H", "H", "H"),
-                        "isotopes": (12, 1, 1, 1, 1),
-                        "coords": (
-                            (0.0, 0.0, 0.0),
-                            (0.6300326, 0.6300326, 0.6300326),
-                            (-0.6300326, -0.6300326, 0.6300326),
-                            (-0.6300326, 0.6300326, -0.6300326),
-                            (0.6300326, -0.6300326, -0.6300326),
-                        ),
-                    },
-                    "external_symmetry": 4,
-                    "point_group": "Td",
-                    "conformation_method": "ARC v1.1.0",
-                    "is_well": True,
-                    "electronic_energy": -365.544,
-                    "E0": -370.240,
-                    "hessian": [
-                        [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-                        [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-                        [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-                        [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-                        [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-                        [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-                        [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-                        [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-                        [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-                        [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-                        [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-                        [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-                        [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-                        [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-                        [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-                    ],
-                    "frequencies": [
-                        3046,
-                        1555,
-                        1555,
-                        3168,
-                        3168,
-                        3168,
-                        1368,
-                        1368,
-                        1368,
-                    ],
-                    "scaled_projected_frequencies": [
-                        3015.54,
-                        1539.45,
-                        1539.45,
-                        3136.32,
-                        3136.32,
-                        3136.32,
-                        1354.32,
-                        1354.32,
-                        1354.32,
-                    ],
-                    "normal_displacement_modes": [
-                        [[1, 2, 3], [1, 2, 3], [1, 2, 3], [1, 2, 3], [1, 2, 3]],
-                        [[1, 2, 3], [1, 2, 3], [1, 2, 3], [1, 2, 3], [1, 2, 3]],
-                        [[1, 2, 3], [1, 2, 3], [1, 2, 3], [1, 2, 3], [1, 2, 3]],
-                        [[1, 2, 3], [1, 2, 3], [1, 2, 3], [1, 2, 3], [1, 2, 3]],
-                        [[1, 2, 3], [1, 2, 3], [1, 2, 3], [1, 2, 3], [1, 2, 3]],
-                        [[1, 2, 3], [1, 2, 3], [1, 2, 3], [1, 2, 3], [1, 2, 3]],
-                        [[1, 2, 3], [1, 2, 3], [1, 2, 3], [1, 2, 3], [1, 2, 3]],
-                        [[1, 2, 3], [1, 2, 3], [1, 2, 3], [1, 2, 3], [1, 2, 3]],
-                        [[1, 2, 3], [1, 2, 3], [1, 2, 3], [1, 2, 3], [1, 2, 3]],
-                    ],
-                    "rigid_rotor": "spherical top",
-                    "statmech_treatment": "RRHO",
-                    "rotational_constants": [1, 2, 3],
-                    "H298": -74.52,
-                    "S298": 186.06,
-                    "Cp_values": [36.07, 40.38, 45.77, 51.63, 62.30, 71.00, 85.94],
-                    "Cp_T_list": [300, 400, 500, 600, 800, 1000, 1500],
-                    "bot_connection_id": "temp_bot_1",
-                    "literature_connection_id": "temp_literature_1",
-                    "encorr_connection_id": "temp_encorr_1",
-                    "freq_scale_connection_id": "temp_freq_scale_1",
-                    "level_connections": {
-                        "irc": "temp_level_irc",
-                        "opt": "temp_level_opt",
-                        "scan": "temp_level_freq_scan",
-                        "sp": "temp_level_sp",
-                        "freq": "temp_level_freq",
-                    },
-                    "ess_connections": {
-                        "irc": "temp_ess_irc_sp_scan",
-                        "opt": "temp_ess_opt_freq",
-                        "scan": "temp_ess_irc_sp_scan",
-                        "sp": "temp_ess_irc_sp_scan",
-                        "freq": "temp_ess_opt_freq",
-                    },
-                }
-            ],
-        }
-
+        payload = batch_payload()
         response = client.post(f"{API_V1_STR}/batch-upload", json=payload)
         assert response.status_code == 200, response.text
         data = response.json()
@@ -271,6 +317,7 @@ class TestBatchEndpoint:
         request.cls.data = data
         print("Created data: ", data)
         request.cls.species_id = data["species"][0]["id"]
+        request.cls.payload = payload
 
     def get_species_from_db(self, species_id, db):
         """
@@ -286,6 +333,263 @@ class TestBatchEndpoint:
         assert species.label == "CH4"
         assert species.smiles == "C"
         assert species.charge == 0
+        assert species.encorr.level_id is not None
+        assert species.encorr.isodesmic_high_level_id != species.encorr.level_id
+
+    def test_reupload_reuses_reference_rows(self, client, db_session):
+        """
+        Test that re-uploading a batch resolves levels, bots, ESS, literature and frequency scales
+        to the existing rows instead of creating duplicates
+        """
+        counts = {
+            model: db_session.query(model).count()
+            for model in (LevelModel, BotModel, ESSModel, LiteratureModel, FreqScaleModel)
+        }
+        assert counts[LevelModel] == 2  # identical levels are deduplicated
+        response = client.post(f"{API_V1_STR}/batch-upload", json=self.payload)
+        assert response.status_code == 200, response.text
+        for model, count in counts.items():
+            assert db_session.query(model).count() == count
+        new_species_id = response.json()["species"][0]["id"]
+        assert new_species_id != self.species_id
+        species = self.get_species_from_db(new_species_id, db_session)
+        original = self.get_species_from_db(self.species_id, db_session)
+        assert species.sp_level_id == original.sp_level_id
+        assert species.freq_scale_id == original.freq_scale_id
+        assert species.encorr_id is not None
+
+    def test_conflicting_freq_scales(self, db_session):
+        """
+        Test that a frequency scaling factor whose factor or source differs from the one stored
+        (or uploaded earlier in the batch) for its level is rejected instead of being resolved to it
+        """
+        scale = db_session.query(FreqScaleModel).first()
+        temp_id_map = {"temp_level": scale.level_id}
+
+        def freq_scale(**values):
+            values = {"factor": scale.factor, "source": scale.source, **values}
+            return FreqScaleCreateBatch(
+                connection_id="temp_scale", level_connection_id="temp_level", **values
+            )
+
+        resolve_freq_scales(db_session, [freq_scale()], temp_id_map)
+        assert temp_id_map["temp_scale"] == scale.id
+        for values in ({"factor": scale.factor * 0.98}, {"source": "Another source"}):
+            with pytest.raises(HTTPException) as e, db_session.begin_nested():
+                resolve_freq_scales(db_session, [freq_scale(**values)], temp_id_map)
+            assert e.value.status_code == 409
+
+        level = LevelModel(method="wb97xd", basis="def2tzvp")
+        db_session.add(level)
+        db_session.flush()
+        temp_id_map["temp_level"] = level.id
+        with pytest.raises(HTTPException) as e, db_session.begin_nested():
+            resolve_freq_scales(
+                db_session, [freq_scale(), freq_scale(factor=0.95)], temp_id_map
+            )
+        assert e.value.status_code == 409
+
+    def test_reupload_normalizes_reference_keys(self, client, db_session):
+        """
+        Test that reference rows are matched by their normalized natural key hash
+        """
+        levels = db_session.query(LevelModel).all()
+        assert all(level.natural_key_hash for level in levels)
+        counts = {
+            model: db_session.query(model).count()
+            for model in (LevelModel, BotModel, ESSModel)
+        }
+        payload = batch_payload()
+        payload["levels"][0]["method"] = " b3lyp "
+        payload["bots"][0]["name"] = "arc"
+        payload["ess"][0]["name"] = payload["ess"][0]["name"].upper()
+        response = client.post(f"{API_V1_STR}/batch-upload", json=payload)
+        assert response.status_code == 200, response.text
+        for model, count in counts.items():
+            assert db_session.query(model).count() == count
+
+    def test_resolve_literature_authors(self, db_session):
+        """
+        Test that literature authors are resolved case-insensitively and created in bulk
+        """
+        literature = db_session.query(LiteratureModel).first()
+        assert sorted(author.last_name for author in literature.authors) == [
+            "Pieters",
+            "Solbach",
+        ]
+        count = db_session.query(AuthorModel).count()
+        authors = [
+            AuthorCreate(first_name=" calvin ", last_name="PIETERS"),
+            AuthorCreate(
+                first_name="Florian", last_name="Solbach", orcid="0000-0003-1923-3747"
+            ),
+            AuthorCreate(first_name="Ada", last_name="Lovelace"),
+            AuthorCreate(first_name="ada", last_name="lovelace"),
+        ]
+        ids = resolve_authors(db_session, authors)
+        existing = {author.last_name: author.id for author in literature.authors}
+        assert ids[:2] == [existing["Pieters"], existing["Solbach"]]
+        assert ids[2] == ids[3]
+        assert db_session.query(AuthorModel).count() == count + 1
+
+    def test_duplicate_species_policies(self, client, db_session):
+        """
+        Test that uploaded species with the identity of an existing species are skipped, merged or versioned
+        """
+        original = self.get_species_from_db(self.species_id, db_session)
+        assert original.identity_hash is not None
+        payload = batch_payload()
+        payload["species"][0]["label"] = "methane"
+
+        response = client.post(
+            f"{API_V1_STR}/batch-upload", params={"on_duplicate": "version"}, json=payload
+        )
+        assert response.status_code == 200, response.text
+        versioned = response.json()["species"][0]
+        assert versioned["status"] == "versioned"
+        species = self.get_species_from_db(versioned["id"], db_session)
+        assert species.identity_hash == original.identity_hash
+        assert species.version > original.version
+
+        count = db_session.query(SpeciesModel).count()
+        response = client.post(
+            f"{API_V1_STR}/batch-upload", params={"on_duplicate": "skip"}, json=payload
+        )
+        assert response.json()["species"] == [{"id": versioned["id"], "status": "skipped"}]
+
+        payload["species"][0]["label"] = "CH4 (merged)"
+        response = client.post(
+            f"{API_V1_STR}/batch-upload", params={"on_duplicate": "merge"}, json=payload
+        )
+        assert response.json()["species"] == [{"id": versioned["id"], "status": "merged"}]
+        assert db_session.query(SpeciesModel).count() == count
+        db_session.expire_all()
+        assert self.get_species_from_db(versioned["id"], db_session).label == "CH4 (merged)"
+
+        response = client.post(
+            f"{API_V1_STR}/batch-upload", params={"on_duplicate": "spam"}, json=payload
+        )
+        assert response.status_code == 422
+
+    def test_species_versions_are_unique(self, client, db_session):
+        """
+        Test that the version of a species is unique among its identity, deleted species included
+        """
+        response = client.post(
+            f"{API_V1_STR}/batch-upload",
+            params={"on_duplicate": "version"},
+            json=batch_payload(),
+        )
+        species_id = response.json()["species"][0]["id"]
+        latest = self.get_species_from_db(species_id, db_session)
+        deleted_version = latest.version
+        with db_session.begin_nested():
+            db_session.query(SpeciesModel).filter(
+                SpeciesModel.identity_hash == latest.identity_hash
+            ).update({"deleted_at": func.now()})
+
+        response = client.post(
+            f"{API_V1_STR}/batch-upload",
+            params={"on_duplicate": "skip"},
+            json=batch_payload(),
+        )
+        created = response.json()["species"][0]
+        assert created["status"] == "created"
+        db_session.expire_all()
+        species = self.get_species_from_db(created["id"], db_session)
+        assert species.version == deleted_version + 1
+
+        with pytest.raises(IntegrityError), db_session.begin_nested():
+            db_session.execute(
+                update(SpeciesModel)
+                .where(SpeciesModel.id == created["id"])
+                .values(version=deleted_version)
+            )
+
+    def test_stream_upload(self, client, db_session):
+        """
+        Test uploading the batch as NDJSON records persisted in chunks
+        """
+        lines = [
+            json.dumps({"type": entity, "data": item})
+            for entity in (
+                "levels",
+                "ess",
+                "bots",
+                "literature",
+                "encorr",
+                "freq_scales",
+                "species",
+            )
+            for item in self.payload[entity]
+        ]
+        level_count = db_session.query(LevelModel).count()
+        response = client.post(
+            f"{API_V1_STR}/batch-upload/stream",
+            params={"chunk_size": 4},
+            content="\n".join(lines) + "\n",
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        assert response.status_code == 200, response.text
+        data = response.json()
+        assert len(data["chunks"]) == 4  # 15 records in chunks of 4
+        assert data["chunks"][0]["records"] == {"levels": 4}
+        assert data["chunks"][-1]["records"] == {
+            "encorr": 1,
+            "freq_scales": 1,
+            "species": 1,
+        }
+        assert db_session.query(LevelModel).count() == level_count
+        species = self.get_species_from_db(data["species"][0]["id"], db_session)
+        original = self.get_species_from_db(self.species_id, db_session)
+        assert species.label == "CH4"
+        assert species.opt_ess_id == original.opt_ess_id
+        assert species.freq_scale_id == original.freq_scale_id
+
+    def test_stream_upload_invalid_record(self, client):
+        """
+        Test that an invalid NDJSON record is reported with its line number
+        """
+        lines = [
+            json.dumps({"type": "bots", "data": self.payload["bots"][0]}),
+            "",
+            json.dumps({"type": "authors", "data": {}}),
+        ]
+        response = client.post(
+            f"{API_V1_STR}/batch-upload/stream", content="\n".join(lines)
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"].startswith("Line 3: unsupported record type")
+
+    def test_batch_stages(self):
+        """
+        Test that entity classes are staged by the connection IDs their items reference
+        """
+        payload = BatchUploadPayload.model_validate(batch_payload())
+        entities = {entity: getattr(payload, entity) or [] for entity in BATCH_ENTITIES}
+        assert batch_stages(entities, {}) == [
+            ["literature", "levels", "bots", "ess"],
+            ["encorr", "freq_scales"],
+            ["species"],
+        ]
+        # Connection IDs resolved by an earlier chunk are not dependencies
+        chunk = {"freq_scales": entities["freq_scales"], "species": entities["species"]}
+        resolved = {item.connection_id: 1 for key in entities for item in entities[key]}
+        assert batch_stages(chunk, resolved) == [["freq_scales"], ["species"]]
+
+    def test_unknown_connection_id(self, client, db_session):
+        """
+        Test that a reference to a connection ID that is not in the batch is rejected before persisting anything
+        """
+        payload = batch_payload()
+        payload["species"][0]["bot_connection_id"] = "temp_bot_missing"
+        count = db_session.query(LevelModel).count()
+        response = client.post(f"{API_V1_STR}/batch-upload", json=payload)
+        assert response.status_code == 400
+        assert response.json()["detail"] == (
+            "Connection ID temp_bot_missing referenced by species temp_species_1 is not found."
+        )
+        assert db_session.query(LevelModel).count() == count
 
     # def test_missing_required_fields(self, client):
     #     """
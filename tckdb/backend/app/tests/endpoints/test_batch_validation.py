@@ -0,0 +1,103 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from tckdb.backend.app.api.api_v1.endpoints import batch as batch_endpoints
+from tckdb.backend.app.core.config import API_V1_STR
+from tckdb.backend.app.models.batch_validation import BatchValidation
+from tckdb.backend.app.models.species import Species as SpeciesModel
+from tckdb.backend.app.services import batch_validation_service
+from tckdb.backend.app.tests.endpoints.test_batch_upload import batch_payload
+
+EXPIRED = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.mark.usefixtures("setup_database")
+class TestBatchValidation:
+    """
+    A class to test the dry-run batch uploads and their validation tokens
+    """
+
+    def dry_run(self, client, payload):
+        response = client.post(
+            f"{API_V1_STR}/batch-upload", params={"dry_run": True}, json=payload
+        )
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    def test_dry_run_and_commit(self, client, db_session, monkeypatch):
+        """
+        Test that a dry run persists nothing, and that its token commits the batch without validating it again
+        """
+        count = db_session.query(SpeciesModel).count()
+        report = self.dry_run(client, batch_payload())
+        assert report["valid"] is True
+        assert report["entities"]["species"] == {"count": 1, "invalid": 0, "errors": []}
+        assert report["entities"]["levels"]["count"] == 8
+        assert db_session.query(SpeciesModel).count() == count
+
+        async def fail(*args, **kwargs):
+            raise AssertionError("The batch was validated again.")
+
+        monkeypatch.setattr(batch_endpoints, "resolve_descriptors", fail)
+        monkeypatch.setattr(batch_endpoints, "validate_species", fail)
+        response = client.post(
+            f"{API_V1_STR}/batch-upload/commit/{report['token']}",
+            params={"on_duplicate": "version"},
+        )
+        assert response.status_code == 200, response.text
+        species_id = response.json()["species"][0]["id"]
+        assert db_session.get(SpeciesModel, species_id).label == "CH4"
+        assert db_session.query(SpeciesModel).count() == count + 1
+
+    def test_dry_run_reports_errors(self, client):
+        """
+        Test that a dry run reports the validation errors of each entity class and returns no token
+        """
+        payload = batch_payload()
+        payload["species"][0]["charge"] = "spam"
+        report = self.dry_run(client, payload)
+        assert report["valid"] is False
+        assert "token" not in report
+        assert report["entities"]["species"]["invalid"] == 1
+        assert report["entities"]["species"]["errors"][0]["loc"][:4] == [
+            "body",
+            "species",
+            0,
+            "charge",
+        ]
+        assert report["entities"]["bots"] == {"count": 1, "invalid": 0, "errors": []}
+
+        payload = batch_payload()
+        payload["species"][0]["bot_connection_id"] = "temp_bot_missing"
+        report = self.dry_run(client, payload)
+        assert report["valid"] is False
+        assert "temp_bot_missing" in report["errors"][0]["msg"]
+
+    def test_invalid_and_expired_tokens(self, client, db_session):
+        """
+        Test that tampered and expired tokens are rejected
+        """
+        token = self.dry_run(client, batch_payload())["token"]
+        validation_id, signature = token.split(".")
+        for invalid in (f"{validation_id}.{signature[::-1]}", "spam", f"0.{signature}"):
+            response = client.post(f"{API_V1_STR}/batch-upload/commit/{invalid}")
+            assert response.status_code == 400, invalid
+
+        db_session.get(BatchValidation, int(validation_id)).expires_at = EXPIRED
+        db_session.flush()
+        response = client.post(f"{API_V1_STR}/batch-upload/commit/{token}")
+        assert response.status_code == 410
+
+    def test_dry_run_requires_secret_key(self, client, monkeypatch):
+        """
+        Test that dry runs and their tokens are rejected if SECRET_KEY is not configured
+        """
+        token = self.dry_run(client, batch_payload())["token"]
+        monkeypatch.setattr(batch_validation_service, "SECRET_KEY_CONFIGURED", False)
+        response = client.post(
+            f"{API_V1_STR}/batch-upload", params={"dry_run": True}, json=batch_payload()
+        )
+        assert response.status_code == 503
+        response = client.post(f"{API_V1_STR}/batch-upload/commit/{token}")
+        assert response.status_code == 503
@@ -0,0 +1,77 @@
+"""
+TCKDB backend app tests endpoints test_migrations module
+"""
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import text
+
+from tckdb.backend.app.tests.endpoints.conftest import engine
+
+VERSIONS_DIR = Path(__file__).resolve().parents[5] / "alembic" / "versions"
+
+
+def load_migration(name):
+    """
+    A function to import a migration module by file name
+    """
+    spec = importlib.util.spec_from_file_location(name, VERSIONS_DIR / f"{name}.py")
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    return migration
+
+
+@pytest.mark.usefixtures("setup_database")
+def test_freqscale_natural_key_hash_with_shared_levels():
+    """
+    Test that the frequency scale natural key migration hashes only the oldest scale of a level,
+    so that existing scales sharing a level do not violate the unique index
+    """
+    migration = load_migration("5b7e2c94a1f8_reference_cache_notifications")
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        try:
+            with Operations.context(MigrationContext.configure(connection)):
+                migration.downgrade()
+                # A database whose frequency scales were created without the unique level constraint
+                for (name,) in connection.execute(
+                    text(
+                        "SELECT conname FROM pg_constraint "
+                        "WHERE conrelid = 'freqscale'::regclass AND contype = 'u'"
+                    )
+                ):
+                    connection.execute(
+                        text(f'ALTER TABLE freqscale DROP CONSTRAINT "{name}"')
+                    )
+                level_id = connection.execute(
+                    text("INSERT INTO level (method) VALUES ('b3lyp') RETURNING id")
+                ).scalar_one()
+                scale_ids = (
+                    connection.execute(
+                        text(
+                            "INSERT INTO freqscale (factor, level_id, source) "
+                            "VALUES (0.98, :level_id, 'first'), (0.99, :level_id, 'second') "
+                            "RETURNING id"
+                        ),
+                        {"level_id": level_id},
+                    )
+                    .scalars()
+                    .all()
+                )
+                migration.upgrade()
+            hashes = dict(
+                connection.execute(
+                    text(
+                        "SELECT id, natural_key_hash FROM freqscale WHERE level_id = :level_id"
+                    ),
+                    {"level_id": level_id},
+                ).all()
+            )
+        finally:
+            transaction.rollback()
+    assert hashes[min(scale_ids)] is not None
+    assert hashes[max(scale_ids)] is None
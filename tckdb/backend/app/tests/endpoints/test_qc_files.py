@@ -0,0 +1,118 @@
+import pytest
+
+from tckdb.backend.app.core.config import API_V1_STR
+from tckdb.backend.app.main import app
+from tckdb.backend.app.services.qc_file_store import (
+    LocalChunkStore,
+    get_qc_file_store,
+)
+
+GAUSSIAN_LOG = b"".join(
+    f" Cycle {i:6d}  E= -40.518383 Delta-E= 0.000000 Rises=F Damp=F\n".encode()
+    for i in range(40000)
+)
+
+
+@pytest.mark.usefixtures("setup_database")
+class TestQCFileContent:
+    """
+    A class to test the chunked QC file store endpoints
+    """
+
+    @pytest.fixture(scope="class", autouse=True)
+    def store(self, request, tmp_path_factory):
+        """
+        A function to serve the QC file store from a temporary directory
+        """
+        store = LocalChunkStore(str(tmp_path_factory.mktemp("qc_file_store")))
+        app.dependency_overrides[get_qc_file_store] = lambda: store
+        request.cls.store = store
+        yield store
+        app.dependency_overrides.pop(get_qc_file_store, None)
+
+    def test_upload_and_download(self, client):
+        """
+        Test that an upload is chunked, deduplicated and streamed back
+        """
+        response = client.post(
+            f"{API_V1_STR}/qc-files/content",
+            content=(
+                GAUSSIAN_LOG[i : i + 65536]
+                for i in range(0, len(GAUSSIAN_LOG), 65536)
+            ),
+        )
+        assert response.status_code == 200, response.text
+        content = response.json()
+        assert content["size"] == len(GAUSSIAN_LOG)
+        assert content["chunks"] == content["new_chunks"] > 1
+        chunk_files = [path for path in self.store.root.rglob("*") if path.is_file()]
+        assert sum(path.stat().st_size for path in chunk_files) < len(GAUSSIAN_LOG) / 4
+
+        response = client.post(f"{API_V1_STR}/qc-files/content", content=GAUSSIAN_LOG)
+        assert response.status_code == 200, response.text
+        assert response.json()["id"] == content["id"]
+        assert response.json()["new_chunks"] == 0
+
+        response = client.get(f"{API_V1_STR}/qc-files/content/{content['id']}")
+        assert response.status_code == 200
+        assert response.headers["accept-ranges"] == "bytes"
+        assert response.headers["etag"] == f'"{content["sha256"]}"'
+        assert response.content == GAUSSIAN_LOG
+
+    def test_range_download(self, client):
+        """
+        Test byte range requests spanning chunk boundaries
+        """
+        response = client.post(f"{API_V1_STR}/qc-files/content", content=GAUSSIAN_LOG)
+        content_id = response.json()["id"]
+        url = f"{API_V1_STR}/qc-files/content/{content_id}"
+        size = len(GAUSSIAN_LOG)
+
+        start, end = 100000, 300009
+        response = client.get(url, headers={"Range": f"bytes={start}-{end}"})
+        assert response.status_code == 206
+        assert response.headers["content-range"] == f"bytes {start}-{end}/{size}"
+        assert response.content == GAUSSIAN_LOG[start : end + 1]
+
+        response = client.get(url, headers={"Range": "bytes=-100"})
+        assert response.status_code == 206
+        assert response.content == GAUSSIAN_LOG[-100:]
+
+        response = client.get(url, headers={"Range": f"bytes={size}-"})
+        assert response.status_code == 416
+        assert response.headers["content-range"] == f"bytes */{size}"
+
+        response = client.get(f"{API_V1_STR}/qc-files/content/0")
+        assert response.status_code == 404
+
+    def test_near_duplicate_outputs(self, client):
+        """
+        Test that the sections shared by the outputs of a scan are stored once
+        """
+        header = b"".join(
+            f" Basis function {i:6d} S 1.0 {i * 0.37:.6f}\n".encode()
+            for i in range(10000)
+        )
+        before = client.get(f"{API_V1_STR}/qc-files/stats").json()
+        point_ids = []
+        for point in range(3):
+            scf = b"".join(
+                f" Scan point {point} cycle {i:5d} E= {-40.5 - i * 1e-7:.9f}\n".encode()
+                for i in range(1000)
+            )
+            response = client.post(
+                f"{API_V1_STR}/qc-files/content", content=header + scf + header
+            )
+            assert response.status_code == 200, response.text
+            point_ids.append(response.json()["id"])
+            if point:
+                output = response.json()
+                assert output["new_chunks"] <= 4 < output["chunks"]
+
+        stats = client.get(f"{API_V1_STR}/qc-files/stats").json()
+        assert stats["files"] == before["files"] + 3
+        file_bytes = stats["file_bytes"] - before["file_bytes"]
+        assert file_bytes > 3 * (stats["chunk_bytes"] - before["chunk_bytes"])
+        assert stats["stored_bytes"] < stats["chunk_bytes"]
+        response = client.get(f"{API_V1_STR}/qc-files/content/{point_ids[2]}")
+        assert response.content.startswith(header + b" Scan point 2 cycle")
@@ -0,0 +1,116 @@
+import time
+
+import pytest
+from sqlalchemy import event, text
+
+from tckdb.backend.app.core.config import API_V1_STR
+from tckdb.backend.app.models.level import Level as LevelModel
+from tckdb.backend.app.services.reference_cache import (
+    ReferenceCache,
+    ReferenceCacheListener,
+    reference_cache,
+)
+from tckdb.backend.app.services.reference_service import get_reference
+from tckdb.backend.app.tests.endpoints.conftest import SQLALCHEMY_DATABASE_URL, engine
+from tckdb.backend.app.tests.endpoints.test_batch_upload import batch_payload
+
+REFERENCE_TABLES = ("level", "ess", "bot", "freqscale")
+
+
+@pytest.mark.usefixtures("setup_database")
+class TestReferenceCache:
+    """
+    A class to test the reference data cache
+    """
+
+    def test_uncommitted_rows_are_not_cached(self, client, db_session):
+        """
+        Test that reference rows inserted by an open transaction are not cached
+        """
+        response = client.post(f"{API_V1_STR}/batch-upload", json=batch_payload())
+        assert response.status_code == 200, response.text
+        response = client.post(f"{API_V1_STR}/batch-upload", json=batch_payload())
+        assert response.status_code == 200, response.text
+        levels = db_session.query(LevelModel).all()
+        assert levels
+        assert not reference_cache.get_ids(
+            "level", [level.natural_key_hash for level in levels]
+        )
+
+    def test_committed_rows_are_cached(self, client, db_session):
+        """
+        Test that committed reference rows are resolved without querying the reference tables
+        """
+        db_session.commit()
+        levels = db_session.query(LevelModel).all()
+        cached = reference_cache.get_ids(
+            "level", [level.natural_key_hash for level in levels]
+        )
+        assert cached == {level.natural_key_hash: level.id for level in levels}
+
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            response = client.post(f"{API_V1_STR}/batch-upload", json=batch_payload())
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+        assert response.status_code == 200, response.text
+        assert statements
+        for statement in statements:
+            for table in REFERENCE_TABLES:
+                assert f"FROM {table} " not in statement
+                assert f"INTO {table} " not in statement
+
+    def test_get_reference_by_id(self, db_session):
+        """
+        Test reading reference rows by primary key through the cache
+        """
+        level = db_session.query(LevelModel).first()
+        values = get_reference(db_session, LevelModel, level.id)
+        assert values["method"] == level.method
+        assert reference_cache.get_row("level", level.id) == values
+        assert get_reference(db_session, LevelModel, 0) is None
+
+    def test_update_invalidates_cache(self, db_session):
+        """
+        Test that committing an update of a reference row invalidates its table
+        """
+        level = db_session.query(LevelModel).first()
+        assert reference_cache.get_ids("level", [level.natural_key_hash])
+        level.grid = "UltraFine"
+        db_session.commit()
+        assert not reference_cache.get_ids("level", [level.natural_key_hash])
+        assert reference_cache.get_row("level", level.id) is None
+
+
+@pytest.mark.usefixtures("setup_database")
+def test_reference_cache_listener():
+    """
+    Test that notifications on the reference channel invalidate the named table
+    """
+    cache = ReferenceCache()
+    listener = ReferenceCacheListener(
+        cache, SQLALCHEMY_DATABASE_URL, channel="tckdb_reference_test"
+    )
+    listener.start()
+    try:
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            generation = cache.generation("level")
+            cache.store_ids("level", {"hash": 1}, generation)
+            with engine.connect() as connection:
+                connection.execute(
+                    text("SELECT pg_notify('tckdb_reference_test', 'level')")
+                )
+                connection.commit()
+            time.sleep(0.2)
+            if not cache.get_ids("level", ["hash"]):
+                break
+        assert cache.get_ids("level", ["hash"]) == {}
+        assert cache.generation("level") > generation
+    finally:
+        listener.stop()
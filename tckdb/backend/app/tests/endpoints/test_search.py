@@ -0,0 +1,87 @@
+import pytest
+
+from tckdb.backend.app.core.config import API_V1_STR
+from tckdb.backend.app.models.fingerprint import SpeciesFingerprint
+from tckdb.backend.app.services.search_service import index_missing_fingerprints
+from tckdb.backend.app.tests.endpoints.test_batch_upload import batch_payload
+
+
+@pytest.mark.usefixtures("setup_database")
+class TestSearchEndpoint:
+    """
+    A class to test the chemical search endpoints
+    """
+
+    @pytest.fixture(scope="class", autouse=True)
+    def setup_species(self, request, client):
+        """
+        A function to upload a species
+        """
+        response = client.post(f"{API_V1_STR}/batch-upload", json=batch_payload())
+        assert response.status_code == 200, response.text
+        request.cls.species_id = response.json()["species"][0]["id"]
+
+    def test_species_are_indexed(self, db_session):
+        """
+        Test that uploaded species are fingerprinted
+        """
+        fingerprint = (
+            db_session.query(SpeciesFingerprint)
+            .filter(SpeciesFingerprint.species_id == self.species_id)
+            .one()
+        )
+        assert fingerprint.smiles == "C"
+        assert fingerprint.morgan.count("1") == fingerprint.morgan_count
+        assert index_missing_fingerprints(db_session) == 0
+
+    def test_substructure_search(self, client):
+        """
+        Test substructure queries
+        """
+        response = client.get(
+            f"{API_V1_STR}/search/substructure", params={"smarts": "[CX4]"}
+        )
+        assert response.status_code == 200, response.text
+        assert response.json() == {
+            "items": [{"species_id": self.species_id, "np_species_id": None, "smiles": "C"}],
+            "next_cursor": None,
+        }
+        response = client.get(
+            f"{API_V1_STR}/search/substructure", params={"smarts": "C=O"}
+        )
+        assert response.json()["items"] == []
+        response = client.get(
+            f"{API_V1_STR}/search/substructure",
+            params={"smarts": "C", "source": "np_species"},
+        )
+        assert response.json()["items"] == []
+        response = client.get(
+            f"{API_V1_STR}/search/substructure", params={"smarts": "[C"}
+        )
+        assert response.status_code == 400
+
+    def test_similarity_search(self, client):
+        """
+        Test similarity queries
+        """
+        response = client.get(f"{API_V1_STR}/search/similarity", params={"smiles": "C"})
+        assert response.status_code == 200, response.text
+        items = response.json()["items"]
+        assert [item["species_id"] for item in items] == [self.species_id]
+        assert items[0]["similarity"] == 1.0
+        response = client.get(
+            f"{API_V1_STR}/search/similarity", params={"smiles": "CCCCCCO"}
+        )
+        assert response.json()["items"] == []
+
+    def test_similarity_search_before_postgres_14(self, client, db_session, monkeypatch):
+        """
+        Test that similarity queries count the common bits without ``bit_count`` on older servers
+        """
+        dialect = db_session.get_bind().dialect
+        monkeypatch.setattr(dialect, "server_version_info", (13, 0))
+        response = client.get(f"{API_V1_STR}/search/similarity", params={"smiles": "C"})
+        assert response.status_code == 200, response.text
+        items = response.json()["items"]
+        assert [item["species_id"] for item in items] == [self.species_id]
+        assert items[0]["similarity"] == 1.0
@@ -0,0 +1,37 @@
+import pytest
+
+from tckdb.backend.app.core import config
+from tckdb.backend.app.db.session import engine_options
+
+
+class TestEngineOptions:
+    """
+    A class to test the engine options built from the configuration
+    """
+
+    def test_pool_options(self, monkeypatch):
+        """
+        Test that the pool is sized from the configuration
+        """
+        monkeypatch.setattr(config, "DB_POOL_SIZE", 20)
+        monkeypatch.setattr(config, "DB_MAX_OVERFLOW", 0)
+        monkeypatch.setattr(config, "DB_STATEMENT_TIMEOUT", 0)
+        options = engine_options()
+        assert options["pool_size"] == 20
+        assert options["max_overflow"] == 0
+        assert options["pool_pre_ping"] is True
+        assert "connect_args" not in options
+
+    @pytest.mark.parametrize(
+        "async_driver, connect_args",
+        [
+            (False, {"options": "-c statement_timeout=5000"}),
+            (True, {"server_settings": {"statement_timeout": "5000"}}),
+        ],
+    )
+    def test_statement_timeout(self, monkeypatch, async_driver, connect_args):
+        """
+        Test that the statement timeout is passed in the connect arguments of each driver
+        """
+        monkeypatch.setattr(config, "DB_STATEMENT_TIMEOUT", 5000)
+        assert engine_options(async_driver)["connect_args"] == connect_args
@@ -0,0 +1,113 @@
+import json
+
+import pytest
+
+from tckdb.backend.app.core.config import API_V1_STR
+from tckdb.backend.app.tests.endpoints.test_batch_upload import batch_payload
+
+METHANE_INCHI_KEY = "VNWKTOKETHGBQD-UHFFFAOYSA-N"
+
+
+@pytest.mark.usefixtures("setup_database")
+class TestSpeciesEndpoint:
+    """
+    A class to test the species read endpoints
+    """
+
+    @pytest.fixture(scope="class", autouse=True)
+    def setup_species(self, request, client):
+        """
+        A function to upload two species
+        """
+        payload = batch_payload()
+        species_ids = []
+        for label in ("CH4", "methane"):
+            payload["species"][0]["label"] = label
+            response = client.post(f"{API_V1_STR}/batch-upload", json=payload)
+            assert response.status_code == 200, response.text
+            species_ids.append(response.json()["species"][0]["id"])
+        request.cls.species_ids = species_ids
+        request.cls.payload = payload
+
+    def test_list_species_pages(self, client):
+        """
+        Test keyset pagination of the species list
+        """
+        response = client.get(f"{API_V1_STR}/species/", params={"limit": 1})
+        assert response.status_code == 200, response.text
+        page = response.json()
+        assert [item["id"] for item in page["items"]] == self.species_ids[:1]
+        assert page["next_cursor"] == self.species_ids[0]
+        item = page["items"][0]
+        assert item["label"] == "CH4"
+        assert item["inchi_key"] == METHANE_INCHI_KEY
+        assert "hessian" not in item and "H298" not in item
+
+        response = client.get(
+            f"{API_V1_STR}/species/",
+            params={"limit": 1, "after_id": page["next_cursor"]},
+        )
+        page = response.json()
+        assert [item["id"] for item in page["items"]] == self.species_ids[1:]
+
+        response = client.get(
+            f"{API_V1_STR}/species/", params={"after_id": self.species_ids[1]}
+        )
+        assert response.json() == {"items": [], "next_cursor": None}
+
+    def test_list_species_filters(self, client):
+        """
+        Test the species list filters
+        """
+        params = {"inchi_key": METHANE_INCHI_KEY, "multiplicity": 1, "smiles": "C"}
+        response = client.get(f"{API_V1_STR}/species/", params=params)
+        assert [item["id"] for item in response.json()["items"]] == self.species_ids
+        response = client.get(f"{API_V1_STR}/species/", params={"charge": 1})
+        assert response.json()["items"] == []
+        response = client.get(f"{API_V1_STR}/species/", params={"level_id": 0})
+        assert response.json()["items"] == []
+
+    def test_read_species_groups(self, client):
+        """
+        Test reading a species with additional column groups
+        """
+        response = client.get(
+            f"{API_V1_STR}/species/{self.species_ids[0]}",
+            params={"groups": ["thermo", "vibrational"]},
+        )
+        assert response.status_code == 200, response.text
+        species = response.json()
+        assert species["H298"] == -74.52
+        assert species["hessian"] == self.payload["species"][0]["hessian"]
+        assert "coordinates" not in species
+
+        response = client.get(
+            f"{API_V1_STR}/species/{self.species_ids[0]}", params={"groups": ["spam"]}
+        )
+        assert response.status_code == 400
+        response = client.get(f"{API_V1_STR}/species/0")
+        assert response.status_code == 404
+
+    def test_export_species(self, client):
+        """
+        Test streaming all species as NDJSON and as a JSON array
+        """
+        response = client.get(
+            f"{API_V1_STR}/species/export", params={"groups": ["geometry"]}
+        )
+        assert response.status_code == 200, response.text
+        assert response.headers["content-type"] == "application/x-ndjson"
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert [record["id"] for record in records] == self.species_ids
+        assert records[0]["coordinates"]["symbols"] == ["C", "H", "H", "H", "H"]
+
+        response = client.get(
+            f"{API_V1_STR}/species/export",
+            params={"format": "json", "after_id": self.species_ids[0]},
+        )
+        assert [record["id"] for record in response.json()] == self.species_ids[1:]
+
+        response = client.get(
+            f"{API_V1_STR}/species/export", params={"format": "json", "charge": 2}
+        )
+        assert response.json() == []
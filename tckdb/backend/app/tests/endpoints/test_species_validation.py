@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+from tckdb.backend.app.core.config import API_V1_STR
+from tckdb.backend.app.services import species_validation_service
+from tckdb.backend.app.services.species_validation_service import validate_species
+from tckdb.backend.app.tests.endpoints.test_batch_upload import batch_payload
+
+
+def species_batch(count):
+    """
+    A function to create raw species that differ by label
+    """
+    species = batch_payload()["species"][0]
+    return [{**species, "label": f"CH4_{i}"} for i in range(count)]
+
+
+class TestSpeciesValidation:
+    """
+    A class to test the parallel validation of batch species
+    """
+
+    @pytest.mark.parametrize("threshold", [100, 2])
+    def test_validate_species_in_order(self, monkeypatch, threshold):
+        """
+        Test that species validated inline or in the process pool keep their order and report errors by index
+        """
+        monkeypatch.setattr(
+            species_validation_service, "SPECIES_VALIDATION_INLINE_THRESHOLD", threshold
+        )
+        species_list = species_batch(6)
+        species_list[4]["charge"] = "spam"
+        species, errors = asyncio.run(validate_species(species_list))
+        assert [s.label if s else None for s in species] == [
+            "CH4_0",
+            "CH4_1",
+            "CH4_2",
+            "CH4_3",
+            None,
+            "CH4_5",
+        ]
+        assert list(errors) == [4]
+        assert errors[4][0]["loc"] == ("charge",)
+
+
+@pytest.mark.usefixtures("setup_database")
+class TestBatchUploadValidation:
+    """
+    A class to test the validation errors of the batch upload endpoint
+    """
+
+    def test_invalid_species_errors(self, client):
+        """
+        Test that the errors of all invalid species are reported with their index
+        """
+        payload = batch_payload()
+        payload["species"] = species_batch(3)
+        payload["species"][0]["multiplicity"] = "spam"
+        payload["species"][2]["charge"] = "spam"
+        response = client.post(f"{API_V1_STR}/batch-upload", json=payload)
+        assert response.status_code == 422
+        locs = [error["loc"][:4] for error in response.json()["detail"]]
+        assert locs == [
+            ["body", "species", 0, "multiplicity"],
+            ["body", "species", 2, "charge"],
+        ]
@@ -0,0 +1,87 @@
+"""
+TCKDB backend app tests models test_common module
+"""
+
+import numpy as np
+
+from tckdb.backend.app.models.common import (
+    MsgpackExt,
+    MsgpackNDArrayExt,
+    msgpackext_dumps,
+    msgpackext_loads,
+    msgpackext_pack_arrays,
+)
+
+
+def round_trip(column_type, value):
+    """Bind and load a value through a column type"""
+    return column_type.process_result_value(column_type.process_bind_param(value, None), None)
+
+
+def test_hessian_round_trip():
+    """Test that a square Hessian is loaded as a single contiguous buffer"""
+    hessian = np.random.default_rng(0).random((900, 900))
+    loaded = round_trip(MsgpackNDArrayExt(), hessian.tolist())
+    assert isinstance(loaded, np.ndarray)
+    assert loaded.dtype == np.float64
+    assert loaded.shape == (900, 900)
+    assert loaded.flags.c_contiguous
+    assert isinstance(loaded.base, bytes)
+    np.testing.assert_array_equal(loaded, hessian)
+
+
+def test_lower_triangle_round_trip():
+    """Test that ragged rows are loaded as views of a single buffer"""
+    triangle = [[1.0], [2.0, 5.0], [3, 4, 9.5]]
+    loaded = round_trip(MsgpackNDArrayExt(), triangle)
+    assert [row.tolist() for row in loaded] == triangle
+    assert loaded[0].base is loaded[2].base
+
+
+def test_nested_round_trip():
+    """Test that numeric lists nested in dictionaries are packed and other values are kept"""
+    torsions = [
+        {
+            "treatment": "hindered rotor",
+            "torsions": [[1, 2, 3, 4]],
+            "top": [3, 4],
+            "symmetry": 1,
+            "energies": [0.0, 1.2, 3.5, 1.1],
+            "trajectory": [
+                {
+                    "symbols": ("H", "H"),
+                    "isotopes": (1, 1),
+                    "coords": ((0.0, 0.0, 0.0), (0.0, 0.0, 0.74)),
+                }
+            ],
+            "invalidated": None,
+        }
+    ]
+    loaded = round_trip(MsgpackNDArrayExt(), torsions)[0]
+    assert loaded["treatment"] == "hindered rotor"
+    assert loaded["torsions"] == [[1, 2, 3, 4]]
+    assert loaded["invalidated"] is None
+    assert loaded["energies"].tolist() == [0.0, 1.2, 3.5, 1.1]
+    frame = loaded["trajectory"][0]
+    assert frame["symbols"] == ["H", "H"]
+    assert frame["isotopes"] == [1, 1]
+    assert frame["coords"].shape == (2, 3)
+
+
+def test_compression():
+    """Test that large arrays are compressed and decompressed"""
+    modes = np.zeros((30, 10, 3))
+    packed = msgpackext_pack_arrays(modes, compress_threshold=1024)
+    assert packed[b"codec"] == "zlib"
+    assert len(packed[b"data"]) < modes.nbytes
+    loaded = round_trip(MsgpackNDArrayExt(compress_threshold=1024), modes)
+    np.testing.assert_array_equal(loaded, modes)
+    assert b"codec" not in msgpackext_pack_arrays([0.5], compress_threshold=1024)
+
+
+def test_reads_msgpackext_values():
+    """Test that values written element by element are still read, and can be re-encoded"""
+    stored = MsgpackExt().process_bind_param([[1.5, 2.0], [2.0, 4.0]], None)
+    assert MsgpackNDArrayExt().process_result_value(stored, None) == [[1.5, 2.0], [2.0, 4.0]]
+    reencoded = msgpackext_dumps(msgpackext_pack_arrays(msgpackext_loads(stored)))
+    assert msgpackext_loads(reencoded).tolist() == [[1.5, 2.0], [2.0, 4.0]]
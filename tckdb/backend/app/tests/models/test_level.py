@@ -76,3 +76,20 @@ def test_level_model():
         == "DLPNO-CCSD(T)-F12/cc-pVTZ-F12/aug-cc-pVTZ/C cc-pVTZ-F12-CABS tight-PNO APFD/6-311+G(2d,p) "
         "SMD water e_elect = e_original + sp_e_sol_corrected - sp_e_uncorrected"
     )
+
+
+def test_level_natural_key_hash():
+    """Test the normalized, NULL-safe natural key hash of levels"""
+    key_hash = Level.compute_natural_key_hash(
+        {"method": "B3LYP", "basis": "6-31G(d,p)", "dispersion": "gd3bj"}
+    )
+    assert len(key_hash) == 64
+    assert key_hash == Level.compute_natural_key_hash(
+        {"method": " b3lyp", "basis": "6-31g(d,p)", "dispersion": "GD3BJ", "grid": ""}
+    )
+    assert key_hash != Level.compute_natural_key_hash(
+        {"method": "B3LYP", "basis": "6-31G(d,p)"}
+    )
+    assert Level.compute_natural_key_hash(
+        {"method": "B3LYP", "basis": None}
+    ) != Level.compute_natural_key_hash({"method": "B3LYP", "basis": "null"})
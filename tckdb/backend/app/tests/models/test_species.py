@@ -235,3 +235,58 @@ def test_species_relationships():
     assert str(species_1.sp_ess) == "Gaussian 16"
     assert species_1.opt_ess.name == "Psi4"
     assert species_1.freq_ess is None
+
+
+def test_species_column_groups():
+    """Test that heavy Species columns are deferred in the groups used for projections"""
+    from sqlalchemy import inspect
+
+    from tckdb.backend.app.services.species_service import (
+        SPECIES_COLUMN_GROUPS,
+        select_species,
+    )
+
+    column_attrs = inspect(Species).column_attrs
+    grouped = [column for columns in SPECIES_COLUMN_GROUPS.values() for column in columns]
+    assert sorted(grouped) == sorted(attr.key for attr in column_attrs)
+    for attr in column_attrs:
+        if attr.deferred:
+            assert attr.key in SPECIES_COLUMN_GROUPS[attr.group]
+    assert column_attrs["hessian"].deferred
+    assert not column_attrs["H298"].deferred
+
+    sql = str(select_species(["thermo"]))
+    assert 'species."H298"' in sql and "species.inchi_key" in sql
+    assert "hessian" not in sql and "coordinates" not in sql
+
+
+def test_species_identity_hash():
+    """Test that the species identity hash only depends on the identity of a species"""
+    from tckdb.backend.app.models.species import species_identity_hash
+
+    values = {
+        "label": "formaldehyde",
+        "inchi_key": "WSFSSNUMVMOOMR-UHFFFAOYSA-N",
+        "charge": 0,
+        "multiplicity": 1,
+        "electronic_state": "X",
+        "sp_level_id": 1,
+        "coordinates": formaldehyde_xyz,
+    }
+    identity_hash = species_identity_hash(values)
+    assert len(identity_hash) == 64
+    reordered = {
+        "symbols": ("H", "C", "H", "O"),
+        "isotopes": (1, 12, 1, 16),
+        "coords": formaldehyde_xyz["coords"],
+    }
+    same_identity = [
+        {**values, "label": None, "coordinates": reordered},
+        {**values, "inchi_key": " wsfssnumvmoomr-uhfffaoysa-n"},
+    ]
+    for other_values in same_identity:
+        assert species_identity_hash(other_values) == identity_hash
+    deuterated = {**formaldehyde_xyz, "isotopes": (12, 16, 2, 1)}
+    assert species_identity_hash({**values, "coordinates": deuterated}) != identity_hash
+    assert species_identity_hash({**values, "sp_level_id": 2}) != identity_hash
+    assert species_identity_hash({**values, "multiplicity": 3}) != identity_hash
@@ -317,3 +317,38 @@ def test_get_number_of_atoms():
     assert common.get_number_of_atoms(n3h5_xyz) == 8
     ch4_coords_in_dict = {"coordinates": ch4_coords}
     assert common.get_number_of_atoms(ch4_coords_in_dict) == 5
+
+
+def test_is_valid_coordinates_collision_threshold():
+    """Test validating coordinates with a collision threshold"""
+    assert common.is_valid_coordinates(ch4_coords, collision_threshold=0.55)[0]
+    colliding = converter.str_to_xyz("""C      0.0 0.0 0.0
+H       0.0 0.0 0.5""")
+    converter.add_common_isotopes_to_coords(colliding)
+    is_valid, err = common.is_valid_coordinates(colliding, collision_threshold=0.55)
+    assert not is_valid
+    assert "colliding atoms" in err
+
+
+def test_is_valid_coordinates_batch():
+    """Test validating a sequence of coordinates in one pass"""
+    ch4 = ch4_coords.model_dump()
+    frames = [dict(ch4) for _ in range(5)]
+    assert common.is_valid_coordinates_batch(frames) == (None, "")
+    frames[3] = dict(ch4, coords=ch4["coords"][:-1] + ((0.0, 0.0),))
+    index, err = common.is_valid_coordinates_batch(frames)
+    assert index == 3
+    assert "must be of length 3" in err
+    frames[3] = dict(ch4, energy=1.0)
+    assert common.is_valid_coordinates_batch(frames)[0] == 3
+    assert common.is_valid_coordinates_batch(frames, allowed_keys=["energy"]) == (None, "")
+
+
+def test_is_valid_coordinates_batch_checks_each_entry_of_a_failing_group():
+    """Test that an entry which cannot be stacked with the others of its group is reported"""
+    atom = {"symbols": ("H",), "isotopes": (1,), "coords": ((0.0, 0.0, 0.0),)}
+    frames = [dict(atom) for _ in range(4)]
+    frames[2] = dict(atom, coords=(((0.0, 0.0, 0.0),),))
+    index, err = common.is_valid_coordinates_batch(frames)
+    assert index == 2
+    assert "must be of length 3" in err
@@ -0,0 +1,90 @@
+"""Tests for the batched geometry validation utilities."""
+
+import numpy as np
+import pytest
+import qcelemental as qcel
+
+from tckdb.backend.app.utils import geometry
+
+ETHANE_SYMBOLS = ("C", "C", "H", "H", "H", "H", "H", "H")
+ETHANE_COORDS = (
+    (0.0, 0.0, 0.7654),
+    (0.0, 0.0, -0.7654),
+    (1.0192, 0.0, 1.1617),
+    (-0.5096, 0.8827, 1.1617),
+    (-0.5096, -0.8827, 1.1617),
+    (-1.0192, 0.0, -1.1617),
+    (0.5096, -0.8827, -1.1617),
+    (0.5096, 0.8827, -1.1617),
+)
+
+
+def qcel_colliding(symbols, coords, threshold):
+    return bool(
+        qcel.molutil.guess_connectivity(
+            symbols=symbols,
+            geometry=np.asarray(coords) * geometry.ANGSTROM_TO_BOHR,
+            threshold=threshold,
+        )
+    )
+
+
+def test_collisions_match_qcel():
+    rng = np.random.default_rng(0)
+    symbols = ("C", "N", "O", "H", "H", "S")
+    geometries = rng.uniform(-1.5, 1.5, size=(200, len(symbols), 3))
+    report = geometry.validate_geometries(symbols, geometries)
+    expected = [qcel_colliding(symbols, coords, 0.55) for coords in geometries]
+    assert report.colliding.tolist() == expected
+    assert 0 < sum(expected) < len(expected)
+
+
+def test_chunked_collisions_match_single_pass():
+    rng = np.random.default_rng(1)
+    symbols = ["C"] * 40
+    geometries = rng.uniform(-6, 6, size=(30, 40, 3))
+    single_pass = geometry.colliding_geometries(symbols, geometries)
+    chunked = geometry.colliding_geometries(symbols, geometries, block_size=97)
+    assert np.array_equal(single_pass, chunked)
+
+
+def test_irc_trajectory_in_one_pass():
+    trajectory = np.repeat(np.array(ETHANE_COORDS)[np.newaxis], 500, axis=0)
+    trajectory[321, 2] = trajectory[321, 0] + (0.0, 0.0, 0.1)
+    report = geometry.validate_geometries(ETHANE_SYMBOLS, trajectory)
+    assert np.flatnonzero(report.colliding).tolist() == [321]
+
+
+def test_monoatomic_geometries():
+    report = geometry.validate_geometries(("He",), [[[0.0, 0.0, 0.0]]], check_linearity=True)
+    assert report.colliding.tolist() == [False]
+    assert report.linear.tolist() == [False]
+
+
+def test_linearity():
+    co2 = ((0.0, 0.0, 0.0), (0.0, 0.0, 1.16), (0.0, 0.0, -1.16))
+    bent = ((0.0, 0.0, 0.0), (0.0, 0.0, 1.16), (0.0, 0.1, -1.16))
+    hcn = ((0.0, 0.0, -1.06), (0.0, 0.0, 0.0), (0.0, 0.0, 1.156))
+    linear = geometry.linear_geometries(geometry.stack_geometries([co2, bent, hcn]))
+    assert linear.tolist() == [True, False, True]
+    assert geometry.linear_geometries(
+        geometry.stack_geometries([ETHANE_COORDS])
+    ).tolist() == [False]
+
+
+@pytest.mark.parametrize(
+    "geometries",
+    [
+        [[0.0, 0.0, 0.0], [0.0, 0.0]],
+        [[0.0, 0.0, 0.0, 0.0]],
+        [[[0.0, 0.0, 0.0]], [[0.0, 0.0, 0.0], [1.0, 0.0, 0.0]]],
+    ],
+)
+def test_invalid_shapes(geometries):
+    with pytest.raises(ValueError):
+        geometry.stack_geometries(geometries)
+
+
+def test_atom_count_mismatch():
+    with pytest.raises(ValueError, match="Expected 8 atoms, got 2"):
+        geometry.validate_geometries(ETHANE_SYMBOLS, ETHANE_COORDS[:2])
@@ -0,0 +1,163 @@
+"""Tests for the molecule_env worker pool."""
+
+import sys
+import textwrap
+
+import pytest
+
+from tckdb.backend.app.schemas.common import is_valid_adjlist
+from tckdb.backend.app.utils import molecule_env_pool
+from tckdb.backend.app.utils.molecule_env_pool import (
+    MoleculeEnvError,
+    MoleculeEnvPool,
+    MoleculeEnvUnavailableError,
+    MoleculeEnvWorker,
+)
+
+METHANE_ADJLIST = """1 C u0 p0 c0 {2,S} {3,S} {4,S} {5,S}
+2 H u0 p0 c0 {1,S}
+3 H u0 p0 c0 {1,S}
+4 H u0 p0 c0 {1,S}
+5 H u0 p0 c0 {1,S}
+"""
+
+
+@pytest.fixture
+def fake_molecule_package(tmp_path, monkeypatch):
+    """
+    A minimal stand-in for RMG's molecule package, put on the workers' PYTHONPATH
+    so the worker protocol can be exercised without the molecule_env environment.
+    """
+    package = tmp_path / "molecule"
+    (package / "molecule").mkdir(parents=True)
+    (package / "__init__.py").write_text('__version__ = "0.0.1"\n')
+    (package / "exceptions.py").write_text(
+        "class InvalidAdjacencyListError(Exception):\n    pass\n"
+    )
+    (package / "molecule" / "__init__.py").write_text(textwrap.dedent("""
+        class Molecule:
+            def from_adjacency_list(self, adjlist):
+                return self
+
+            def to_smiles(self):
+                return "C"
+
+            def to_inchi(self):
+                return "InChI=1S/CH4/h1H4"
+
+            def from_smiles(self, smiles):
+                if smiles != "C":
+                    raise ValueError(f"Unsupported SMILES {smiles}")
+                return self
+
+            def to_adjacency_list(self):
+                return "1 C u0 p0 c0"
+        """))
+    (package / "molecule" / "adjlist.py").write_text(textwrap.dedent("""
+        from molecule.exceptions import InvalidAdjacencyListError
+
+        def from_adjacency_list(adjlist, group=False, saturate_h=False):
+            if not adjlist.startswith("1 "):
+                raise InvalidAdjacencyListError("Invalid adjacency list")
+            print("noise that must not corrupt the protocol")
+            return [], 1
+        """))
+    monkeypatch.setenv("PYTHONPATH", str(tmp_path))
+
+
+@pytest.fixture
+def pool(fake_molecule_package):
+    pool = MoleculeEnvPool(size=2, python=sys.executable, timeout=10)
+    yield pool
+    pool.close()
+
+
+def test_analyze_round_trip(pool):
+    result = pool.request("analyze", METHANE_ADJLIST)
+    assert result == {
+        "valid": True,
+        "error": None,
+        "smiles": "C",
+        "inchi": "InChI=1S/CH4/h1H4",
+        "multiplicity": 1,
+    }
+    invalid = pool.request("analyze", "not_an_adjacency_list")
+    assert invalid["valid"] is False
+    assert invalid["error"] == "Invalid adjacency list"
+    assert pool.request("validate", METHANE_ADJLIST) == [True, ""]
+
+
+def test_from_smiles(pool):
+    assert pool.request("from_smiles", "C") == ["1 C u0 p0 c0", None]
+    adjlist, error = pool.request("from_smiles", "CC")
+    assert adjlist is None
+    assert error == "Conversion Error: Unsupported SMILES CC"
+
+
+def test_worker_is_reused_and_restarted_after_crash(pool):
+    pool.request("ping")
+    (worker,) = pool._workers
+    pool.request("ping")
+    assert pool._workers == [worker]
+
+    worker.process.kill()
+    worker.process.wait()
+    assert pool.request("multiplicity", METHANE_ADJLIST) == [1, None]
+    assert len(pool._workers) == 1
+    assert pool._workers[0] is not worker
+
+
+def test_health_check_replaces_dead_workers(pool):
+    pool.request("ping")
+    pool._workers[0].process.kill()
+    pool._workers[0].process.wait()
+    assert pool.health_check() == 1
+    assert pool._workers == []
+    assert pool.request("ping") == {"molecule": "0.0.1"}
+    assert pool.molecule_version == "0.0.1"
+
+
+def test_unavailable_molecule_package(tmp_path, monkeypatch):
+    monkeypatch.setenv("PYTHONPATH", str(tmp_path))
+    pool = MoleculeEnvPool(size=1, python=sys.executable, timeout=10)
+    try:
+        pool.request("ping")
+    except MoleculeEnvUnavailableError:
+        pass
+    else:
+        pool.close()
+        pytest.skip("RMG's molecule package is installed in this interpreter")
+    assert pool.available is False
+    with pytest.raises(MoleculeEnvUnavailableError):
+        pool.request("analyze", METHANE_ADJLIST)
+
+
+def test_missing_interpreter(monkeypatch):
+    pool = MoleculeEnvPool(size=1, python="/nonexistent/bin/python", timeout=10)
+    with pytest.raises(MoleculeEnvError):
+        pool.request("ping")
+    assert pool._workers == []
+
+    monkeypatch.setattr(molecule_env_pool, "_pool", pool)
+    molecule_env_pool.analyze_adjlist.cache_clear()
+    valid, error = is_valid_adjlist(METHANE_ADJLIST)
+    assert valid is False
+    assert "/nonexistent/bin/python" in error
+
+
+def test_silent_worker_is_stopped(tmp_path, monkeypatch):
+    script = tmp_path / "silent.py"
+    script.write_text("import time\ntime.sleep(60)\n")
+    processes = []
+    popen = molecule_env_pool.subprocess.Popen
+
+    def recording_popen(*args, **kwargs):
+        processes.append(popen(*args, **kwargs))
+        return processes[-1]
+
+    monkeypatch.setattr(molecule_env_pool.subprocess, "Popen", recording_popen)
+    worker = MoleculeEnvWorker(sys.executable, script, timeout=0.5)
+    with pytest.raises(MoleculeEnvError):
+        worker.start()
+    assert worker.process is None
+    assert processes[0].poll() is not None
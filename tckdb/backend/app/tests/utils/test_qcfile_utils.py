@@ -1,9 +1,15 @@
 """Tests for qcfile utility functions."""
 
+import random
+
 from tckdb.backend.app.utils.qcfile_utils import (
+    ContentDefinedChunker,
     compress_bytes,
+    compress_chunk,
     decompress_bytes,
+    decompress_chunk,
     generate_checksum,
+    generate_stream_checksum,
 )
 
 
@@ -15,3 +21,30 @@ def test_compress_decompress_and_checksum():
     decompressed = decompress_bytes(compressed)
     assert decompressed == data
     assert checksum == generate_checksum(decompressed)
+
+
+def test_stream_checksum_and_chunk_codec():
+    data = b"SCF Done:  E(RB3LYP) =  -40.5183  A.U.\n" * 100
+    chunks = [data[i : i + 1000] for i in range(0, len(data), 1000)]
+    assert generate_stream_checksum(chunks) == generate_checksum(data)
+    compressed = compress_chunk(data, "gzip")
+    assert len(compressed) < len(data)
+    assert compress_chunk(data, "gzip") == compressed
+    assert decompress_chunk(compressed, "gzip") == data
+
+
+def test_content_defined_chunks_survive_insertions():
+    data = random.Random(0).randbytes(1000000)
+    chunker = ContentDefinedChunker(2048, 8192, 32768)
+    chunks = [
+        chunk
+        for i in range(0, len(data), 10000)
+        for chunk in chunker.feed(data[i : i + 10000])
+    ] + list(chunker.flush())
+    assert b"".join(chunks) == data
+    assert all(2048 <= len(chunk) <= 32768 for chunk in chunks[:-1])
+
+    edited = data[:500000] + b"inserted line\n" + data[500000:]
+    edited_chunks = list(chunker.feed(edited)) + list(chunker.flush())
+    assert b"".join(edited_chunks) == edited
+    assert len(set(edited_chunks) - set(chunks)) <= 2
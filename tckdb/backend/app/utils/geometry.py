@@ -0,0 +1,190 @@
+"""
+TCKDB backend app utils geometry module
+
+Batched validation of Cartesian geometries.
+Geometries that share the same atoms (conformers, IRC points, scan points) are stacked into a single
+``(n_geoms, n_atoms, 3)`` array and checked together: shapes, atom collisions (pairwise distances
+against covalent-radius thresholds) and linearity are each computed with a few NumPy calls for the whole stack.
+Pairwise distances are evaluated in blocks, so memory stays bounded for large clusters and long trajectories.
+"""
+
+import functools
+import math
+from typing import Any, NamedTuple, Optional, Sequence
+
+import numpy as np
+import qcelemental as qcel
+from qcelemental.exceptions import NotAnElementError
+
+ANGSTROM_TO_BOHR = 1.8897259886
+# Covalent radius (Bohr) used for symbols without a tabulated radius, as in ``qcel.molutil.guess_connectivity``
+MISSING_RADIUS = 1.8
+# Maximal number of pairwise distances computed at once (about 160 MB of float64 intermediates)
+PAIRWISE_BLOCK_SIZE = 2_000_000
+# Linearity tolerance in degrees
+# (from our experience, linear molecules have precisely 180.0 degrees between all atom triples)
+LINEARITY_TOLERANCE = 0.1
+
+
+class GeometryReport(NamedTuple):
+    """
+    The result of validating a stack of geometries.
+
+    Attributes:
+        colliding (np.ndarray): Whether each geometry has colliding atoms, shape ``(n_geoms,)``.
+        linear (Optional[np.ndarray]): Whether each geometry is linear, shape ``(n_geoms,)``, if requested.
+    """
+
+    colliding: np.ndarray
+    linear: Optional[np.ndarray]
+
+
+@functools.lru_cache(maxsize=None)
+def covalent_radius(symbol: str) -> float:
+    """
+    Get the covalent radius of an element in Bohr.
+
+    Args:
+        symbol (str): The element symbol.
+
+    Returns:
+        float: The covalent radius, or ``MISSING_RADIUS`` for unknown symbols.
+    """
+    try:
+        return qcel.covalentradii.get(symbol, missing=MISSING_RADIUS)
+    except NotAnElementError:
+        return MISSING_RADIUS
+
+
+def stack_geometries(geometries: Any, n_atoms: Optional[int] = None) -> np.ndarray:
+    """
+    Convert a geometry or a sequence of geometries into a ``(n_geoms, n_atoms, 3)`` float array.
+
+    Args:
+        geometries (Any): A single ``(n_atoms, 3)`` geometry or a sequence of them.
+        n_atoms (int, optional): The expected number of atoms.
+
+    Raises:
+        ValueError: If the geometries are ragged, not three-dimensional, or do not have ``n_atoms`` atoms.
+
+    Returns:
+        np.ndarray: The stacked geometries.
+    """
+    try:
+        array = np.asarray(geometries, dtype=np.float64)
+    except (TypeError, ValueError) as e:
+        raise ValueError(
+            f"Geometries must have the same number of atoms with three coordinates each: {e}"
+        ) from e
+    if array.ndim == 2:
+        array = array[np.newaxis]
+    if array.ndim != 3 or array.shape[-1] != 3:
+        raise ValueError(
+            f"All atom coordinates must be of length 3, got an array of shape {array.shape}"
+        )
+    if n_atoms is not None and array.shape[1] != n_atoms:
+        raise ValueError(f"Expected {n_atoms} atoms, got {array.shape[1]}")
+    return array
+
+
+def colliding_geometries(
+    symbols: Sequence[str],
+    geometries: np.ndarray,
+    threshold: float = 0.55,
+    block_size: int = PAIRWISE_BLOCK_SIZE,
+) -> np.ndarray:
+    """
+    Find the geometries in which two atoms are closer than ``threshold`` times the sum of their covalent radii.
+
+    Args:
+        symbols (Sequence[str]): The element symbols, shared by all geometries.
+        geometries (np.ndarray): The stacked geometries in Angstrom, shape ``(n_geoms, n_atoms, 3)``.
+        threshold (float, optional): The fraction of the covalent radii sum below which atoms collide.
+        block_size (int, optional): The maximal number of pairwise distances computed at once.
+
+    Returns:
+        np.ndarray: Whether each geometry has colliding atoms, shape ``(n_geoms,)``.
+    """
+    n_geoms, n_atoms, _ = geometries.shape
+    colliding = np.zeros(n_geoms, dtype=bool)
+    if n_atoms < 2:
+        return colliding
+    radii = np.array([covalent_radius(symbol) for symbol in symbols])
+    # Squared cutoffs in Angstrom, with the diagonal (an atom and itself) excluded
+    cutoff = ((radii[:, None] + radii[None, :]) * threshold / ANGSTROM_TO_BOHR) ** 2
+    np.fill_diagonal(cutoff, -1.0)
+
+    rows_per_block = max(1, min(n_atoms, block_size // n_atoms))
+    geoms_per_block = max(1, block_size // (rows_per_block * n_atoms))
+    for g in range(0, n_geoms, geoms_per_block):
+        block = geometries[g : g + geoms_per_block]
+        block_colliding = np.zeros(len(block), dtype=bool)
+        for r in range(0, n_atoms, rows_per_block):
+            diffs = block[:, r : r + rows_per_block, None, :] - block[:, None, :, :]
+            squared = np.einsum("gijk,gijk->gij", diffs, diffs)
+            block_colliding |= (squared < cutoff[r : r + rows_per_block]).any(axis=(1, 2))
+        colliding[g : g + geoms_per_block] = block_colliding
+    return colliding
+
+
+def linear_geometries(
+    geometries: np.ndarray, tolerance: float = LINEARITY_TOLERANCE
+) -> np.ndarray:
+    """
+    Find the linear geometries.
+    A geometry is linear if every atom lies on the line through the first two atoms,
+    i.e., if the angle between the first bond vector and the vector from the second atom to any other atom
+    is within ``tolerance`` degrees of 0 or 180. Monoatomic geometries are not linear, diatomic ones are.
+
+    Args:
+        geometries (np.ndarray): The stacked geometries, shape ``(n_geoms, n_atoms, 3)``.
+        tolerance (float, optional): The angle tolerance in degrees.
+
+    Returns:
+        np.ndarray: Whether each geometry is linear, shape ``(n_geoms,)``.
+    """
+    n_geoms, n_atoms, _ = geometries.shape
+    if n_atoms == 1:
+        return np.zeros(n_geoms, dtype=bool)
+    if n_atoms == 2:
+        return np.ones(n_geoms, dtype=bool)
+    axis = geometries[:, 1] - geometries[:, 0]
+    axis /= np.linalg.norm(axis, axis=1, keepdims=True)
+    vectors = geometries[:, 2:] - geometries[:, 1:2]
+    norms = np.linalg.norm(vectors, axis=2)
+    # |sin| of the angle between the first bond and each vector, from the cross product
+    sines = np.linalg.norm(np.cross(axis[:, None, :], vectors), axis=2) / np.where(
+        norms > 0, norms, 1.0
+    )
+    return (sines <= math.sin(math.radians(tolerance))).all(axis=1)
+
+
+def validate_geometries(
+    symbols: Sequence[str],
+    geometries: Any,
+    collision_threshold: Optional[float] = 0.55,
+    check_linearity: bool = False,
+) -> GeometryReport:
+    """
+    Validate a stack of geometries that share the same atoms in a single vectorized pass.
+
+    Args:
+        symbols (Sequence[str]): The element symbols, shared by all geometries.
+        geometries (Any): A single ``(n_atoms, 3)`` geometry or a sequence of them, in Angstrom.
+        collision_threshold (float, optional): The collision threshold, ``None`` to skip the collision check.
+        check_linearity (bool, optional): Whether to determine the linearity of each geometry.
+
+    Raises:
+        ValueError: If the geometries do not match the symbols or are not three-dimensional.
+
+    Returns:
+        GeometryReport: The collision and linearity flags of each geometry.
+    """
+    stacked = stack_geometries(geometries, n_atoms=len(symbols))
+    if collision_threshold is None:
+        colliding = np.zeros(len(stacked), dtype=bool)
+    else:
+        colliding = colliding_geometries(symbols, stacked, threshold=collision_threshold)
+    linear = linear_geometries(stacked) if check_linearity else None
+    return GeometryReport(colliding=colliding, linear=linear)
+
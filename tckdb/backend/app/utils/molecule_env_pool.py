@@ -0,0 +1,419 @@
+"""
+TCKDB backend app utils molecule env pool module
+
+A pool of long-lived ``molecule_env_scripts.py serve`` worker processes.
+RMG's ``molecule`` package lives in a separate environment (``MOLECULE_PYTHON``) and is slow to import,
+so instead of spawning an interpreter per call, requests are sent to warm workers over a framed
+stdin/stdout protocol (a 4-byte big-endian length followed by a UTF-8 JSON object).
+"""
+
+import atexit
+import collections
+import functools
+import itertools
+import json
+import os
+import queue
+import select
+import struct
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from tckdb.backend.app.core.config import (
+    MOLECULE_ENV_HEALTH_CHECK_INTERVAL,
+    MOLECULE_ENV_POOL_SIZE,
+    MOLECULE_ENV_TIMEOUT,
+)
+from tckdb.backend.app.utils.python_paths import MOLECULE_PYTHON
+
+MOLECULE_ENV_SCRIPT = Path(__file__).resolve().parent / "molecule_env_scripts.py"
+FRAME_HEADER = struct.Struct(">I")
+IMPORT_ERROR_EXIT_CODE = 2
+
+
+class MoleculeEnvError(Exception):
+    """
+    Raised when a molecule_env worker fails to answer a request
+    """
+
+    pass
+
+
+class MoleculeEnvUnavailableError(MoleculeEnvError):
+    """
+    Raised when RMG's molecule package cannot be imported in the molecule_env interpreter
+    """
+
+    pass
+
+
+class MoleculeEnvWorker:
+    """
+    A single ``molecule_env_scripts.py serve`` process.
+
+    Args:
+        python (str): The interpreter of the molecule_env environment.
+        script (Path): The path to ``molecule_env_scripts.py``.
+        timeout (float): The number of seconds to wait for a response.
+    """
+
+    def __init__(self, python: str, script: Path, timeout: float):
+        self.python = python
+        self.script = script
+        self.timeout = timeout
+        self.process: Optional[subprocess.Popen] = None
+        self.molecule_version: Optional[str] = None
+        self.last_used = 0.0
+        self._ids = itertools.count()
+        self._stderr = collections.deque(maxlen=50)
+
+    def start(self) -> None:
+        """
+        Start the process and wait until it answers a ping with the version of the molecule package.
+
+        Raises:
+            MoleculeEnvUnavailableError: If the molecule package cannot be imported.
+            MoleculeEnvError: If the process cannot be started or does not answer,
+                              it is stopped in the latter case.
+        """
+        try:
+            # trunk-ignore(bandit/B603)
+            self.process = subprocess.Popen(
+                [self.python, str(self.script), "serve"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+        except OSError as e:
+            raise MoleculeEnvError(
+                f"molecule_env worker could not be started with {self.python}: {e}"
+            ) from e
+        threading.Thread(target=self._drain_stderr, daemon=True).start()
+        try:
+            self.molecule_version = self.request("ping")["molecule"]
+        except MoleculeEnvError as e:
+            try:
+                returncode = self.process.wait(timeout=self.timeout)
+            except subprocess.TimeoutExpired:
+                self.close()
+                raise MoleculeEnvError(
+                    f"molecule_env worker did not answer its first ping: {e}"
+                ) from e
+            stderr = self.stderr
+            self.close()
+            if returncode == IMPORT_ERROR_EXIT_CODE:
+                raise MoleculeEnvUnavailableError(stderr) from e
+            raise
+
+    def is_alive(self) -> bool:
+        """
+        Whether the process is running.
+        """
+        return self.process is not None and self.process.poll() is None
+
+    @property
+    def stderr(self) -> str:
+        """
+        The last lines the process wrote to stderr.
+        """
+        return "".join(self._stderr).strip()
+
+    def request(self, op: str, value: Optional[str] = None) -> Any:
+        """
+        Send a request and wait for its response.
+
+        Args:
+            op (str): The operation
+                      (``ping``, ``validate``, ``convert``, ``multiplicity``, ``analyze`` or ``from_smiles``).
+            value (str, optional): The adjacency list, or the SMILES descriptor for ``from_smiles``.
+
+        Returns:
+            Any: The result of the operation.
+
+        Raises:
+            MoleculeEnvError: If the process died, timed out, or reported an error.
+        """
+        request_id = next(self._ids)
+        body = json.dumps({"id": request_id, "op": op, "value": value}).encode(
+            "utf-8"
+        )
+        deadline = time.monotonic() + self.timeout
+        try:
+            self.process.stdin.write(FRAME_HEADER.pack(len(body)) + body)
+            self.process.stdin.flush()
+            (length,) = FRAME_HEADER.unpack(self._read_exact(FRAME_HEADER.size, deadline))
+            response = json.loads(self._read_exact(length, deadline).decode("utf-8"))
+        except (OSError, EOFError, ValueError) as e:
+            raise MoleculeEnvError(f"molecule_env worker failed: {e}") from e
+        self.last_used = time.monotonic()
+        if response.get("id") != request_id:
+            raise MoleculeEnvError("molecule_env worker answered out of order")
+        if not response.get("ok"):
+            raise MoleculeEnvError(response.get("error"))
+        return response.get("result")
+
+    def close(self) -> None:
+        """
+        Stop the process, killing it if it does not exit on its own.
+        """
+        if self.process is None:
+            return
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=1)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
+        self.process = None
+
+    def _read_exact(self, size: int, deadline: float) -> bytes:
+        """
+        Read exactly ``size`` bytes from the process before the deadline.
+        """
+        stdout = self.process.stdout
+        data = b""
+        while len(data) < size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([stdout], [], [], remaining)[0]:
+                raise TimeoutError(f"no response within {self.timeout} s")
+            block = os.read(stdout.fileno(), size - len(data))
+            if not block:
+                raise EOFError(f"worker exited. stderr: {self.stderr}")
+            data += block
+        return data
+
+    def _drain_stderr(self) -> None:
+        """
+        Keep the tail of the process' stderr, so that a chatty worker never blocks on a full pipe.
+        """
+        for line in iter(self.process.stderr.readline, b""):
+            self._stderr.append(line.decode("utf-8", errors="replace"))
+
+
+class MoleculeEnvPool:
+    """
+    A fixed-size pool of molecule_env workers.
+    Workers are started lazily, replaced when they crash or time out,
+    and pinged before reuse if they have been idle longer than the health check interval.
+
+    Args:
+        size (int): The maximal number of workers.
+        python (str): The interpreter of the molecule_env environment.
+        script (Path): The path to ``molecule_env_scripts.py``.
+        timeout (float): The number of seconds to wait for a response.
+        health_check_interval (float): The idle time in seconds after which a worker is pinged before reuse.
+    """
+
+    def __init__(
+        self,
+        size: int = MOLECULE_ENV_POOL_SIZE,
+        python: str = MOLECULE_PYTHON,
+        script: Path = MOLECULE_ENV_SCRIPT,
+        timeout: float = MOLECULE_ENV_TIMEOUT,
+        health_check_interval: float = MOLECULE_ENV_HEALTH_CHECK_INTERVAL,
+    ):
+        self.size = max(1, size)
+        self.python = python
+        self.script = script
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.available = True
+        self.unavailable_reason = ""
+        self.molecule_version: Optional[str] = None
+        self._idle: "queue.LifoQueue[MoleculeEnvWorker]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._workers: List[MoleculeEnvWorker] = []
+        self._lock = threading.Lock()
+
+    def request(self, op: str, value: Optional[str] = None) -> Any:
+        """
+        Run a request on an idle worker, retrying once on a fresh worker if it fails.
+
+        Args:
+            op (str): The operation
+                      (``ping``, ``validate``, ``convert``, ``multiplicity``, ``analyze`` or ``from_smiles``).
+            value (str, optional): The adjacency list, or the SMILES descriptor for ``from_smiles``.
+
+        Returns:
+            Any: The result of the operation.
+
+        Raises:
+            MoleculeEnvUnavailableError: If the molecule package cannot be imported.
+            MoleculeEnvError: If the request failed on two workers.
+        """
+        if not self.available:
+            raise MoleculeEnvUnavailableError(self.unavailable_reason)
+        with self._slots:
+            for attempt in range(2):
+                worker = self._acquire()
+                try:
+                    result = worker.request(op, value)
+                except MoleculeEnvError:
+                    self._discard(worker)
+                    if attempt:
+                        raise
+                    continue
+                self._idle.put(worker)
+                return result
+
+    def health_check(self) -> int:
+        """
+        Ping every idle worker and replace the ones that do not answer.
+
+        Returns:
+            int: The number of workers that were replaced.
+        """
+        replaced = 0
+        workers = []
+        while True:
+            try:
+                workers.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        for worker in workers:
+            try:
+                worker.request("ping")
+            except MoleculeEnvError:
+                self._discard(worker)
+                replaced += 1
+                continue
+            self._idle.put(worker)
+        return replaced
+
+    def close(self) -> None:
+        """
+        Stop all workers.
+        """
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.close()
+        self._idle = queue.LifoQueue()
+
+    def _acquire(self) -> MoleculeEnvWorker:
+        """
+        Take an idle, healthy worker, or start a new one.
+        """
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                return self._start_worker()
+            if not worker.is_alive():
+                self._discard(worker)
+                continue
+            if time.monotonic() - worker.last_used > self.health_check_interval:
+                try:
+                    worker.request("ping")
+                except MoleculeEnvError:
+                    self._discard(worker)
+                    continue
+            return worker
+
+    def _start_worker(self) -> MoleculeEnvWorker:
+        """
+        Start a new worker, marking the pool unavailable if the molecule package is missing.
+        """
+        worker = MoleculeEnvWorker(self.python, self.script, self.timeout)
+        try:
+            worker.start()
+        except MoleculeEnvUnavailableError as e:
+            self.available = False
+            self.unavailable_reason = str(e)
+            worker.close()
+            raise
+        except MoleculeEnvError:
+            worker.close()
+            raise
+        with self._lock:
+            self._workers.append(worker)
+        self.molecule_version = worker.molecule_version
+        return worker
+
+    def _discard(self, worker: MoleculeEnvWorker) -> None:
+        """
+        Stop a failed worker and forget it.
+        """
+        worker.close()
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+
+
+_pool: Optional[MoleculeEnvPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_molecule_env_pool() -> MoleculeEnvPool:
+    """
+    Get the process-wide molecule_env worker pool, creating it on first use.
+
+    Returns:
+        MoleculeEnvPool: The pool.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = MoleculeEnvPool()
+            atexit.register(_pool.close)
+        return _pool
+
+
+def molecule_env_version() -> Optional[str]:
+    """
+    Get the version of RMG's molecule package reported by the molecule_env workers,
+    starting a worker if none was started yet.
+
+    Returns:
+        Optional[str]: The version, or None if RMG's molecule package is unavailable.
+    """
+    pool = get_molecule_env_pool()
+    if pool.molecule_version is None and pool.available:
+        try:
+            pool.request("ping")
+        except MoleculeEnvError:
+            return None
+    return pool.molecule_version
+
+
+@functools.lru_cache(maxsize=1024)
+def analyze_adjlist(adjlist: str) -> Optional[Dict[str, Any]]:
+    """
+    Validate an adjacency list and derive its SMILES, InChI and multiplicity with a single worker request.
+    Results are memoized, so validating a species and converting its graph costs one round trip.
+
+    Args:
+        adjlist (str): The adjacency list.
+
+    Returns:
+        Optional[Dict[str, Any]]: The keys ``valid``, ``error``, ``smiles``, ``inchi`` and ``multiplicity``,
+                                  or None if RMG's molecule package is unavailable.
+
+    Raises:
+        MoleculeEnvError: If the workers failed to answer.
+    """
+    try:
+        return get_molecule_env_pool().request("analyze", adjlist)
+    except MoleculeEnvUnavailableError:
+        return None
+
+
+def adjlist_from_smiles(smiles: str) -> Optional[str]:
+    """
+    Convert a SMILES descriptor to an RMG adjacency list with a worker request.
+
+    Args:
+        smiles (str): The SMILES descriptor.
+
+    Returns:
+        Optional[str]: The adjacency list, or None if the conversion failed
+                       or RMG's molecule package is unavailable.
+    """
+    try:
+        adjlist, _ = get_molecule_env_pool().request("from_smiles", smiles)
+    except MoleculeEnvError:
+        return None
+    return adjlist
@@ -1,10 +1,13 @@
 #!/usr/bin/env python
 import argparse
+import json
+import struct
 import sys
-from typing import Optional, Tuple
+from typing import Any, BinaryIO, Dict, Optional, Tuple
 
 # Import RMG-Py modules
 try:
+    import molecule
     from molecule.exceptions import InvalidAdjacencyListError
     from molecule.molecule import Molecule
     from molecule.molecule.adjlist import from_adjacency_list
@@ -13,6 +16,26 @@ except ImportError as e:
     sys.exit(2)  # Specific exit code for import errors
 
 
+def molecule_version() -> str:
+    """
+    Get the version of the installed molecule package, reported in the ``ping`` responses
+    so that the backend can version the cached conversions.
+
+    Returns:
+        str: The version, or ``"unknown"``.
+    """
+    version = getattr(molecule, "__version__", None)
+    if version is None:
+        try:
+            from importlib import metadata
+
+            distributions = metadata.packages_distributions().get("molecule", [])
+            version = metadata.version(distributions[0]) if distributions else None
+        except (AttributeError, ImportError, ValueError):
+            version = None
+    return version or "unknown"
+
+
 def is_valid_adjlist(adjlist: str) -> Tuple[bool, str]:
     """
     Check whether a string represents a valid adjacency list.
@@ -76,12 +99,139 @@ def multiplicity_from_adjlist(adjlist: str) -> Optional[int]:
         return None, f"Multiplicity Calculation Error: {e}"
 
 
+def adjlist_from_smiles(smiles: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Convert a SMILES descriptor to an adjacency list.
+
+    Args:
+        smiles (str): The SMILES descriptor.
+
+    Returns:
+        Tuple[Optional[str], Optional[str]]:
+            - The adjacency list if conversion is successful, else None.
+            - Error message if any, else None.
+    """
+    try:
+        return Molecule().from_smiles(smiles).to_adjacency_list(), None
+    except Exception as e:
+        return None, f"Conversion Error: {e}"
+
+
+def analyze_adjlist(adjlist: str) -> Dict[str, Any]:
+    """
+    Validate an adjacency list and, if valid, derive its SMILES, InChI and multiplicity in a single call.
+
+    Args:
+        adjlist (str): The adjacency list.
+
+    Returns:
+        Dict[str, Any]: The keys ``valid``, ``error``, ``smiles``, ``inchi`` and ``multiplicity``.
+    """
+    valid, message = is_valid_adjlist(adjlist)
+    result = {
+        "valid": valid,
+        "error": message or None,
+        "smiles": None,
+        "inchi": None,
+        "multiplicity": None,
+    }
+    if valid:
+        result["smiles"], result["inchi"], _ = convert_adjlist(adjlist)
+        result["multiplicity"], _ = multiplicity_from_adjlist(adjlist)
+    return result
+
+
+# Frames are a 4-byte big-endian length followed by a UTF-8 encoded JSON object.
+FRAME_HEADER = struct.Struct(">I")
+
+
+def read_frame(stream: BinaryIO) -> Optional[Dict[str, Any]]:
+    """
+    Read a single length-prefixed JSON frame.
+
+    Args:
+        stream (BinaryIO): The stream to read from.
+
+    Returns:
+        Optional[Dict[str, Any]]: The decoded frame, or None at the end of the stream.
+    """
+    header = stream.read(FRAME_HEADER.size)
+    if len(header) < FRAME_HEADER.size:
+        return None
+    (length,) = FRAME_HEADER.unpack(header)
+    return json.loads(stream.read(length).decode("utf-8"))
+
+
+def write_frame(stream: BinaryIO, message: Dict[str, Any]) -> None:
+    """
+    Write a single length-prefixed JSON frame.
+
+    Args:
+        stream (BinaryIO): The stream to write to.
+        message (Dict[str, Any]): The message to encode.
+    """
+    body = json.dumps(message).encode("utf-8")
+    stream.write(FRAME_HEADER.pack(len(body)) + body)
+    stream.flush()
+
+
+def handle_request(request: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Execute a single request of the worker protocol.
+
+    Args:
+        request (Dict[str, Any]): The request, with the keys ``id``, ``op`` and (except for ``ping``) ``value``,
+                                  the adjacency list or, for ``from_smiles``, the SMILES descriptor.
+
+    Returns:
+        Dict[str, Any]: The response, with the keys ``id``, ``ok`` and either ``result`` or ``error``.
+    """
+    op = request.get("op")
+    adjlist = request.get("value")
+    response = {"id": request.get("id"), "ok": True}
+    if op == "ping":
+        response["result"] = {"molecule": molecule_version()}
+    elif op == "validate":
+        response["result"] = list(is_valid_adjlist(adjlist))
+    elif op == "convert":
+        response["result"] = list(convert_adjlist(adjlist))
+    elif op == "multiplicity":
+        response["result"] = list(multiplicity_from_adjlist(adjlist))
+    elif op == "analyze":
+        response["result"] = analyze_adjlist(adjlist)
+    elif op == "from_smiles":
+        response["result"] = list(adjlist_from_smiles(request.get("value")))
+    else:
+        response = {"id": request.get("id"), "ok": False, "error": f"Unknown op: {op}"}
+    return response
+
+
+def serve() -> None:
+    """
+    Serve requests over stdin/stdout until stdin is closed.
+    Anything printed by the molecule package is redirected to stderr to keep the framed channel clean.
+    """
+    channel_in, channel_out = sys.stdin.buffer, sys.stdout.buffer
+    sys.stdout = sys.stderr
+    while True:
+        request = read_frame(channel_in)
+        if request is None:
+            break
+        try:
+            response = handle_request(request)
+        except Exception as e:
+            response = {"id": request.get("id"), "ok": False, "error": str(e)}
+        write_frame(channel_out, response)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Validate and convert RMG adjacency lists."
     )
     subparsers = parser.add_subparsers(
-        dest="command", required=True, help="Sub-commands: validate or convert"
+        dest="command",
+        required=True,
+        help="Sub-commands: validate, convert, multiplicity or serve",
     )
 
     # Subparser for validation
@@ -117,8 +267,17 @@ def main():
         help="Path to a file containing the adjacency list. If omitted, reads from standard input.",
     )
 
+    subparsers.add_parser(
+        "serve",
+        help="Serve framed requests over standard input and output until standard input is closed.",
+    )
+
     args = parser.parse_args()
 
+    if args.command == "serve":
+        serve()
+        sys.exit(0)
+
     # Read adjacency list from file or stdin
     if args.file:
         try:
@@ -0,0 +1,47 @@
+"""
+TCKDB backend app utils process pool module
+
+A process-wide pool of worker processes for CPU-bound work.
+Workers are spawned rather than forked, so they never inherit the pipes of the
+molecule_env workers or the database connections of the parent process.
+"""
+
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from tckdb.backend.app.core.config import PROCESS_POOL_SIZE
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Get the shared process pool, creating it on first use.
+
+    Returns:
+        ProcessPoolExecutor: The pool, with ``PROCESS_POOL_SIZE`` workers.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=max(1, PROCESS_POOL_SIZE),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            atexit.register(shutdown_process_pool)
+        return _executor
+
+
+def shutdown_process_pool() -> None:
+    """
+    Shut the shared process pool down, if it was started.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(cancel_futures=True)
+            _executor = None
@@ -2,6 +2,16 @@
 
 import gzip
 import hashlib
+from typing import Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional, chunks are gzip compressed without it
+    zstandard = None
+
+ZSTD_AVAILABLE = zstandard is not None
 
 
 def compress_bytes(data: bytes) -> bytes:
@@ -27,3 +37,217 @@ def generate_checksum(data: bytes, algorithm: str = "sha256") -> str:
     h = hashlib.new(algorithm)
     h.update(data)
     return h.hexdigest()
+
+
+def generate_stream_checksum(
+    chunks: Iterable[bytes], algorithm: str = "sha256"
+) -> str:
+    """Generate a checksum for data given as a sequence of chunks, without joining them.
+
+    Args:
+        chunks: The chunks of data, in order.
+        algorithm: Hash algorithm to use (default: sha256).
+
+    Returns:
+        The hex digest string of the checksum.
+    """
+    h = hashlib.new(algorithm)
+    for chunk in chunks:
+        h.update(chunk)
+    return h.hexdigest()
+
+
+def compress_chunk(
+    data: bytes, codec: str, level: int = 3, dictionary: Optional[bytes] = None
+) -> bytes:
+    """Compress a chunk of a stored file.
+
+    Args:
+        data: The chunk.
+        codec: ``"gzip"`` or ``"zstd"``.
+        level: The compression level.
+        dictionary: The zstd dictionary, if any.
+
+    Returns:
+        The compressed chunk.
+    """
+    if codec == "gzip":
+        return gzip.compress(data, compresslevel=min(level, 9), mtime=0)
+    return zstandard.ZstdCompressor(
+        level=level, dict_data=_zstd_dictionary(dictionary), write_content_size=True
+    ).compress(data)
+
+
+def decompress_chunk(
+    data: bytes, codec: str, dictionary: Optional[bytes] = None
+) -> bytes:
+    """Decompress a chunk compressed with ``compress_chunk``.
+
+    Args:
+        data: The compressed chunk.
+        codec: ``"gzip"`` or ``"zstd"``.
+        dictionary: The zstd dictionary the chunk was compressed with, if any.
+
+    Returns:
+        The chunk.
+    """
+    if codec == "gzip":
+        return gzip.decompress(data)
+    return zstandard.ZstdDecompressor(
+        dict_data=_zstd_dictionary(dictionary)
+    ).decompress(data)
+
+
+def train_zstd_dictionary(samples: Sequence[bytes], size: int = 112640) -> bytes:
+    """Train a zstd dictionary on sample files, e.g., ESS output logs.
+
+    Args:
+        samples: The sample files (or chunks of them).
+        size: The maximal dictionary size in bytes.
+
+    Returns:
+        The dictionary.
+
+    Raises:
+        RuntimeError: If zstandard is not installed.
+    """
+    if not ZSTD_AVAILABLE:
+        raise RuntimeError("Training a dictionary requires the zstandard package.")
+    return zstandard.train_dictionary(size, list(samples)).as_bytes()
+
+
+def _zstd_dictionary(dictionary: Optional[bytes]):
+    if dictionary is None:
+        return None
+    return zstandard.ZstdCompressionDict(dictionary)
+
+
+# Gear table of the rolling hash: 256 pseudo-random 32-bit values, fixed so that chunk boundaries are stable
+GEAR = np.array(
+    [
+        int.from_bytes(hashlib.sha256(bytes([i])).digest()[:4], "little")
+        for i in range(256)
+    ],
+    dtype=np.uint32,
+)
+
+
+def _boundary_mask(bits: int) -> int:
+    # The high bits of the gear hash, which depend on the whole 32 byte window
+    return ((1 << bits) - 1) << (32 - bits)
+
+
+def gear_hashes(data: bytes) -> np.ndarray:
+    """Compute the gear rolling hash at every position of the data.
+
+    The hash at position ``i`` is ``sum(GEAR[data[i - k]] << k for k in range(32))`` (modulo 2**32),
+    i.e. it only depends on the 32 bytes ending at ``i``. It is computed for all positions at once
+    by doubling the window five times.
+
+    Args:
+        data: The data.
+
+    Returns:
+        The hashes, as an array of ``uint32``.
+    """
+    hashes = GEAR[np.frombuffer(data, dtype=np.uint8)]
+    width = 1
+    while width < 32:
+        shifted = np.zeros_like(hashes)
+        shifted[width:] = hashes[:-width] << np.uint32(width)
+        hashes = hashes + shifted
+        width *= 2
+    return hashes
+
+
+class ContentDefinedChunker:
+    """Split a stream into content-defined chunks (FastCDC-style normalized chunking).
+
+    A chunk ends where the rolling hash of the last 32 bytes matches a mask, so that boundaries
+    depend on the content rather than on offsets: an insertion or deletion only changes the chunks around it,
+    and sections shared by files (e.g., basis set echoes and repeated SCF blocks) yield identical chunks.
+    A stricter mask is used before ``avg_size`` and a looser one after it, narrowing the size distribution.
+
+    Args:
+        min_size: The minimal chunk size in bytes (at least 64).
+        avg_size: The target average chunk size in bytes, a power of two.
+        max_size: The maximal chunk size in bytes.
+    """
+
+    def __init__(self, min_size: int, avg_size: int, max_size: int):
+        if not 64 <= min_size < avg_size < max_size:
+            raise ValueError(
+                f"Invalid chunk sizes: min {min_size}, avg {avg_size}, max {max_size}."
+            )
+        bits = avg_size.bit_length() - 1
+        self.min_size = min_size
+        self.avg_size = avg_size
+        self.max_size = max_size
+        self.strict_mask = _boundary_mask(bits + 2)
+        self.loose_mask = _boundary_mask(bits - 2)
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> Iterator[bytes]:
+        """Add data to the stream.
+
+        Args:
+            data: The data.
+
+        Yields:
+            The chunks completed by the data.
+        """
+        self._buffer += data
+        if len(self._buffer) >= 4 * self.max_size:
+            yield from self._split(final=False)
+
+    def flush(self) -> Iterator[bytes]:
+        """End the stream.
+
+        Yields:
+            The remaining chunks.
+        """
+        yield from self._split(final=True)
+
+    def boundaries(self, data: bytes, final: bool = True) -> List[int]:
+        """Find the chunk ends in data that starts at a chunk boundary.
+
+        Args:
+            data: The data.
+            final: Whether the data ends the stream, otherwise the chunk ends are only
+                given up to the last one that cannot change with more data.
+
+        Returns:
+            The offsets of the chunk ends.
+        """
+        hashes = gear_hashes(data)
+        strict = np.flatnonzero((hashes & np.uint32(self.strict_mask)) == 0) + 1
+        loose = np.flatnonzero((hashes & np.uint32(self.loose_mask)) == 0) + 1
+        ends, start, size = [], 0, len(data)
+        while size - start >= (1 if final else self.max_size):
+            end = self._next_end(strict, start + self.min_size, start + self.avg_size)
+            if end is None:
+                end = self._next_end(
+                    loose, start + self.avg_size, start + self.max_size
+                )
+            if end is None:
+                end = start + self.max_size
+            end = min(end, size)
+            ends.append(end)
+            start = end
+        return ends
+
+    @staticmethod
+    def _next_end(candidates: np.ndarray, low: int, high: int) -> Optional[int]:
+        # The first candidate chunk end in [low, high)
+        i = np.searchsorted(candidates, low)
+        if i < len(candidates) and candidates[i] < high:
+            return int(candidates[i])
+        return None
+
+    def _split(self, final: bool) -> Iterator[bytes]:
+        data = bytes(self._buffer)
+        start = 0
+        for end in self.boundaries(data, final=final):
+            yield data[start:end]
+            start = end
+        del self._buffer[:start]